@@ -9,8 +9,12 @@ from fastmcp.server.middleware import Middleware, MiddlewareContext
 from fastmcp.server.dependencies import get_access_token
 from fastmcp.server.dependencies import get_http_headers
 
-from auth.oauth21_session_store import ensure_session_from_access_token
+from auth.oauth21_session_store import (
+    ensure_session_from_access_token,
+    run_session_store_call,
+)
 from auth.oauth_types import WorkspaceAccessToken
+from auth.verified_token_cache import get_verified_token_cache
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -94,9 +98,11 @@ class AuthInfoMiddleware(Middleware):
 
                             if auth_provider:
                                 try:
-                                    # Verify the token
-                                    verified_auth = await auth_provider.verify_token(
-                                        token_str
+                                    # Verify the token (cached per token; see auth.verified_token_cache)
+                                    verified_auth = (
+                                        await get_verified_token_cache().verify(
+                                            token_str, auth_provider.verify_token
+                                        )
                                     )
                                     if verified_auth:
                                         # Extract user info from verified token
@@ -143,7 +149,8 @@ class AuthInfoMiddleware(Middleware):
                                         mcp_session_id = getattr(
                                             context.fastmcp_context, "session_id", None
                                         )
-                                        ensure_session_from_access_token(
+                                        await run_session_store_call(
+                                            ensure_session_from_access_token,
                                             verified_auth,
                                             user_email,
                                             mcp_session_id,
@@ -312,7 +319,9 @@ class AuthInfoMiddleware(Middleware):
                         store = get_oauth21_session_store()
 
                         # Check if user has a recent session
-                        if store.has_session(requested_user):
+                        if await run_session_store_call(
+                            store.has_session, requested_user
+                        ):
                             logger.debug(
                                 f"Using recent stdio session for {requested_user}"
                             )
@@ -337,7 +346,9 @@ class AuthInfoMiddleware(Middleware):
                         from auth.oauth21_session_store import get_oauth21_session_store
 
                         store = get_oauth21_session_store()
-                        single_user = store.get_single_user_email()
+                        single_user = await run_session_store_call(
+                            store.get_single_user_email
+                        )
                         if single_user:
                             logger.debug(
                                 f"Defaulting to single stdio OAuth session for {single_user}"
@@ -372,7 +383,9 @@ class AuthInfoMiddleware(Middleware):
                         store = get_oauth21_session_store()
 
                         # Check if this MCP session is bound to a user
-                        bound_user = store.get_user_by_mcp_session(mcp_session_id)
+                        bound_user = await run_session_store_call(
+                            store.get_user_by_mcp_session, mcp_session_id
+                        )
                         if bound_user:
                             logger.debug(f"MCP session bound to {bound_user}")
                             context.fastmcp_context.set_state(
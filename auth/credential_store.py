@@ -5,16 +5,103 @@ This module provides a standardized interface for credential storage and retriev
 supporting multiple backends configurable via environment variables.
 """
 
+import atexit
 import os
 import json
 import logging
+import sqlite3
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Optional, List
+from typing import Any, Dict, Optional, List, Tuple
 from datetime import datetime
 from google.oauth2.credentials import Credentials
 
 logger = logging.getLogger(__name__)
 
+# Files modified this recently are not cached: a rewrite within the same
+# filesystem timestamp tick could keep the same mtime and size.
+_RACY_WINDOW_NS = 2_000_000_000
+
+# Default SQLite store configuration (overridable via environment variables)
+DEFAULT_SQLITE_BATCH_WINDOW_MS = 50.0
+DEFAULT_SQLITE_BUSY_TIMEOUT_MS = 5000
+# A failed background commit is retried after this, doubling up to the maximum
+_FLUSH_RETRY_BASE_SECONDS = 0.1
+_FLUSH_RETRY_MAX_SECONDS = 30.0
+_CREDENTIAL_STORE_KEY_SALT = "workspace-mcp-credential-store"
+
+
+def get_credentials_dir() -> str:
+    """
+    Resolve the credentials directory from environment configuration.
+
+    Checked in this order:
+        1. WORKSPACE_MCP_CREDENTIALS_DIR (preferred)
+        2. GOOGLE_MCP_CREDENTIALS_DIR (backward compatibility)
+        3. ~/.google_workspace_mcp/credentials (default)
+    """
+    # Check WORKSPACE_MCP_CREDENTIALS_DIR first (preferred)
+    workspace_creds_dir = os.getenv("WORKSPACE_MCP_CREDENTIALS_DIR")
+    google_creds_dir = os.getenv("GOOGLE_MCP_CREDENTIALS_DIR")
+
+    if workspace_creds_dir:
+        base_dir = os.path.expanduser(workspace_creds_dir)
+        logger.info(
+            f"Using credentials directory from WORKSPACE_MCP_CREDENTIALS_DIR: {base_dir}"
+        )
+    # Fall back to GOOGLE_MCP_CREDENTIALS_DIR for backward compatibility
+    elif google_creds_dir:
+        base_dir = os.path.expanduser(google_creds_dir)
+        logger.info(
+            f"Using credentials directory from GOOGLE_MCP_CREDENTIALS_DIR: {base_dir}"
+        )
+    else:
+        home_dir = os.path.expanduser("~")
+        if home_dir and home_dir != "~":
+            base_dir = os.path.join(home_dir, ".google_workspace_mcp", "credentials")
+        else:
+            base_dir = os.path.join(os.getcwd(), ".credentials")
+        logger.info(f"Using default credentials directory: {base_dir}")
+    return base_dir
+
+
+def _credentials_to_dict(credentials: Credentials) -> Dict[str, Any]:
+    """Serialize credentials to the JSON layout shared by every backend."""
+    return {
+        "token": credentials.token,
+        "refresh_token": credentials.refresh_token,
+        "token_uri": credentials.token_uri,
+        "client_id": credentials.client_id,
+        "client_secret": credentials.client_secret,
+        "scopes": credentials.scopes,
+        "expiry": credentials.expiry.isoformat() if credentials.expiry else None,
+    }
+
+
+def _credential_kwargs(creds_data: Dict[str, Any], user_email: str) -> Dict[str, Any]:
+    """Turn serialized credential data back into Credentials constructor kwargs."""
+    # Parse expiry if present
+    expiry = None
+    if creds_data.get("expiry"):
+        try:
+            expiry = datetime.fromisoformat(creds_data["expiry"])
+            # Ensure timezone-naive datetime for Google auth library compatibility
+            if expiry.tzinfo is not None:
+                expiry = expiry.replace(tzinfo=None)
+        except (ValueError, TypeError) as e:
+            logger.warning(f"Could not parse expiry time for {user_email}: {e}")
+
+    return {
+        "token": creds_data.get("token"),
+        "refresh_token": creds_data.get("refresh_token"),
+        "token_uri": creds_data.get("token_uri"),
+        "client_id": creds_data.get("client_id"),
+        "client_secret": creds_data.get("client_secret"),
+        "scopes": creds_data.get("scopes"),
+        "expiry": expiry,
+    }
+
 
 class CredentialStore(ABC):
     """Abstract base class for credential storage."""
@@ -71,7 +158,14 @@ class CredentialStore(ABC):
 
 
 class LocalDirectoryCredentialStore(CredentialStore):
-    """Credential store that uses local JSON files for storage."""
+    """
+    Credential store that uses local JSON files for storage.
+
+    Parsed credential files are cached in memory and revalidated with a single
+    stat() per lookup: an entry is reused only while the file's mtime and size
+    are unchanged, so rewrites by another process are picked up. The user list
+    is cached against the directory's mtime in the same way.
+    """
 
     def __init__(self, base_dir: Optional[str] = None):
         """
@@ -85,75 +179,84 @@ class LocalDirectoryCredentialStore(CredentialStore):
                      3. ~/.google_workspace_mcp/credentials (default)
         """
         if base_dir is None:
-            # Check WORKSPACE_MCP_CREDENTIALS_DIR first (preferred)
-            workspace_creds_dir = os.getenv("WORKSPACE_MCP_CREDENTIALS_DIR")
-            google_creds_dir = os.getenv("GOOGLE_MCP_CREDENTIALS_DIR")
-
-            if workspace_creds_dir:
-                base_dir = os.path.expanduser(workspace_creds_dir)
-                logger.info(
-                    f"Using credentials directory from WORKSPACE_MCP_CREDENTIALS_DIR: {base_dir}"
-                )
-            # Fall back to GOOGLE_MCP_CREDENTIALS_DIR for backward compatibility
-            elif google_creds_dir:
-                base_dir = os.path.expanduser(google_creds_dir)
-                logger.info(
-                    f"Using credentials directory from GOOGLE_MCP_CREDENTIALS_DIR: {base_dir}"
-                )
-            else:
-                home_dir = os.path.expanduser("~")
-                if home_dir and home_dir != "~":
-                    base_dir = os.path.join(
-                        home_dir, ".google_workspace_mcp", "credentials"
-                    )
-                else:
-                    base_dir = os.path.join(os.getcwd(), ".credentials")
-                logger.info(f"Using default credentials directory: {base_dir}")
+            base_dir = get_credentials_dir()
 
         self.base_dir = base_dir
+        self._base_dir_ready = False
+        self._cache_lock = threading.Lock()
+        # Maps user email -> (mtime_ns, size, Credentials kwargs)
+        self._cache: Dict[str, Tuple[int, int, Dict[str, Any]]] = {}
+        # (directory mtime_ns, sorted user list)
+        self._user_index: Optional[Tuple[int, List[str]]] = None
+        self._cache_hits = 0
+        self._cache_misses = 0
         logger.info(
             f"LocalDirectoryCredentialStore initialized with base_dir: {base_dir}"
         )
 
     def _get_credential_path(self, user_email: str) -> str:
         """Get the file path for a user's credentials."""
-        if not os.path.exists(self.base_dir):
-            os.makedirs(self.base_dir)
-            logger.info(f"Created credentials directory: {self.base_dir}")
+        if not self._base_dir_ready:
+            if not os.path.exists(self.base_dir):
+                os.makedirs(self.base_dir)
+                logger.info(f"Created credentials directory: {self.base_dir}")
+            self._base_dir_ready = True
         return os.path.join(self.base_dir, f"{user_email}.json")
 
+    @staticmethod
+    def _is_cacheable(stat_result: os.stat_result) -> bool:
+        return time.time_ns() - stat_result.st_mtime_ns > _RACY_WINDOW_NS
+
+    def _cache_entry(
+        self, user_email: str, stat_result: os.stat_result, kwargs: Dict[str, Any]
+    ) -> None:
+        with self._cache_lock:
+            if self._is_cacheable(stat_result):
+                self._cache[user_email] = (
+                    stat_result.st_mtime_ns,
+                    stat_result.st_size,
+                    kwargs,
+                )
+            else:
+                self._cache.pop(user_email, None)
+
+    def _evict(self, user_email: str) -> None:
+        with self._cache_lock:
+            self._cache.pop(user_email, None)
+
     def get_credential(self, user_email: str) -> Optional[Credentials]:
-        """Get credentials from local JSON file."""
+        """Get credentials from local JSON file (served from cache while unchanged)."""
         creds_path = self._get_credential_path(user_email)
 
-        if not os.path.exists(creds_path):
+        try:
+            stat_result = os.stat(creds_path)
+        except FileNotFoundError:
+            self._evict(user_email)
             logger.debug(f"No credential file found for {user_email} at {creds_path}")
             return None
+        except OSError as e:
+            logger.error(f"Error reading credential file for {user_email}: {e}")
+            return None
+
+        with self._cache_lock:
+            cached = self._cache.get(user_email)
+            if (
+                cached is not None
+                and cached[0] == stat_result.st_mtime_ns
+                and cached[1] == stat_result.st_size
+            ):
+                self._cache_hits += 1
+                # Build a fresh object each time; callers refresh credentials in place
+                return Credentials(**cached[2])
+            self._cache_misses += 1
 
         try:
             with open(creds_path, "r") as f:
                 creds_data = json.load(f)
 
-            # Parse expiry if present
-            expiry = None
-            if creds_data.get("expiry"):
-                try:
-                    expiry = datetime.fromisoformat(creds_data["expiry"])
-                    # Ensure timezone-naive datetime for Google auth library compatibility
-                    if expiry.tzinfo is not None:
-                        expiry = expiry.replace(tzinfo=None)
-                except (ValueError, TypeError) as e:
-                    logger.warning(f"Could not parse expiry time for {user_email}: {e}")
-
-            credentials = Credentials(
-                token=creds_data.get("token"),
-                refresh_token=creds_data.get("refresh_token"),
-                token_uri=creds_data.get("token_uri"),
-                client_id=creds_data.get("client_id"),
-                client_secret=creds_data.get("client_secret"),
-                scopes=creds_data.get("scopes"),
-                expiry=expiry,
-            )
+            credential_kwargs = _credential_kwargs(creds_data, user_email)
+            credentials = Credentials(**credential_kwargs)
+            self._cache_entry(user_email, stat_result, credential_kwargs)
 
             logger.debug(f"Loaded credentials for {user_email} from {creds_path}")
             return credentials
@@ -168,19 +271,13 @@ class LocalDirectoryCredentialStore(CredentialStore):
         """Store credentials to local JSON file."""
         creds_path = self._get_credential_path(user_email)
 
-        creds_data = {
-            "token": credentials.token,
-            "refresh_token": credentials.refresh_token,
-            "token_uri": credentials.token_uri,
-            "client_id": credentials.client_id,
-            "client_secret": credentials.client_secret,
-            "scopes": credentials.scopes,
-            "expiry": credentials.expiry.isoformat() if credentials.expiry else None,
-        }
+        creds_data = _credentials_to_dict(credentials)
 
         try:
             with open(creds_path, "w") as f:
                 json.dump(creds_data, f, indent=2)
+            # The file was just written, so it is inside the racy window; re-read it next time
+            self._evict(user_email)
             logger.info(f"Stored credentials for {user_email} to {creds_path}")
             return True
         except IOError as e:
@@ -192,6 +289,7 @@ class LocalDirectoryCredentialStore(CredentialStore):
     def delete_credential(self, user_email: str) -> bool:
         """Delete credential file for a user."""
         creds_path = self._get_credential_path(user_email)
+        self._evict(user_email)
 
         try:
             if os.path.exists(creds_path):
@@ -210,9 +308,19 @@ class LocalDirectoryCredentialStore(CredentialStore):
             return False
 
     def list_users(self) -> List[str]:
-        """List all users with credential files."""
-        if not os.path.exists(self.base_dir):
+        """List all users with credential files (cached until the directory changes)."""
+        try:
+            dir_stat = os.stat(self.base_dir)
+        except FileNotFoundError:
             return []
+        except OSError as e:
+            logger.error(f"Error listing credential files in {self.base_dir}: {e}")
+            return []
+
+        with self._cache_lock:
+            index = self._user_index
+            if index is not None and index[0] == dir_stat.st_mtime_ns:
+                return list(index[1])
 
         users = []
         try:
@@ -225,27 +333,538 @@ class LocalDirectoryCredentialStore(CredentialStore):
             )
         except OSError as e:
             logger.error(f"Error listing credential files in {self.base_dir}: {e}")
+            return sorted(users)
+
+        users.sort()
+        with self._cache_lock:
+            self._user_index = (
+                (dir_stat.st_mtime_ns, users) if self._is_cacheable(dir_stat) else None
+            )
+        return list(users)
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get credential cache statistics."""
+        with self._cache_lock:
+            lookups = self._cache_hits + self._cache_misses
+            return {
+                "cached_users": len(self._cache),
+                "hits": self._cache_hits,
+                "misses": self._cache_misses,
+                "hit_rate": (self._cache_hits / lookups) if lookups else 0.0,
+                "user_index_cached": self._user_index is not None,
+            }
+
+
+class SqliteCredentialStore(CredentialStore):
+    """
+    Credential store backed by a single SQLite database.
+
+    Credentials live in one indexed table instead of one JSON file per user, so
+    lookups, deletes and user listings are single indexed queries. The database
+    runs in WAL mode, letting readers proceed while a write commits, and each
+    thread gets its own connection.
+
+    Token blobs are encrypted with Fernet before they are written. Writes are
+    batched: store and delete calls are queued and a background thread commits
+    everything queued within ``batch_window_ms`` in one transaction. Queued
+    writes are visible to reads from this store immediately; call flush() when
+    they must be durable before continuing.
+    """
+
+    SCHEMA_VERSION = 1
+
+    def __init__(
+        self,
+        path: str,
+        encryption_key: bytes,
+        batch_window_ms: float = DEFAULT_SQLITE_BATCH_WINDOW_MS,
+        busy_timeout_ms: int = DEFAULT_SQLITE_BUSY_TIMEOUT_MS,
+    ):
+        """
+        Initialize the SQLite credential store.
+
+        Args:
+            path: Database file path (created along with its directory if missing)
+            encryption_key: Fernet key used to encrypt token blobs
+            batch_window_ms: How long queued writes wait to be committed together.
+                0 commits every write before store/delete returns.
+            busy_timeout_ms: How long a connection waits for another writer's lock
+        """
+        from cryptography.fernet import Fernet
+
+        self.path = path
+        self.batch_window = max(0.0, batch_window_ms / 1000)
+        self._busy_timeout_ms = busy_timeout_ms
+        self._fernet = Fernet(encryption_key)
+
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        # Maps user email -> (blob, expiry, updated_at) to upsert, or None to delete
+        self._pending: Dict[str, Optional[Tuple[bytes, Optional[str], float]]] = {}
+        # The batch currently being committed, still served to readers
+        self._committing: Dict[str, Optional[Tuple[bytes, Optional[str], float]]] = {}
+        self._pending_cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        self._closed = False
+        self._batches = 0
+        self._batched_writes = 0
+        self._write_errors = 0
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._init_schema()
+        atexit.register(self.close)
+        logger.info(f"SqliteCredentialStore initialized with database: {path}")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path,
+                timeout=self._busy_timeout_ms / 1000,
+                isolation_level=None,
+                check_same_thread=False,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={int(self._busy_timeout_ms)}")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def _init_schema(self) -> None:
+        conn = self._connect()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS credentials (
+                user_email TEXT PRIMARY KEY,
+                blob BLOB NOT NULL,
+                expiry TEXT,
+                updated_at REAL NOT NULL
+            ) WITHOUT ROWID
+            """
+        )
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_credentials_expiry ON credentials (expiry)"
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS migrations (
+                name TEXT PRIMARY KEY,
+                applied_at REAL NOT NULL
+            ) WITHOUT ROWID
+            """
+        )
+        conn.execute(f"PRAGMA user_version={self.SCHEMA_VERSION}")
+
+    def _encode(self, credentials: Credentials) -> Tuple[bytes, Optional[str]]:
+        data = _credentials_to_dict(credentials)
+        blob = self._fernet.encrypt(json.dumps(data).encode("utf-8"))
+        return blob, data["expiry"]
+
+    def _decode(self, user_email: str, blob: bytes) -> Optional[Credentials]:
+        from cryptography.fernet import InvalidToken
+
+        try:
+            creds_data = json.loads(self._fernet.decrypt(blob))
+        except (InvalidToken, ValueError) as e:
+            logger.error(
+                f"Could not decrypt stored credentials for {user_email} "
+                f"(was the encryption key changed?): {e}"
+            )
+            return None
+        return Credentials(**_credential_kwargs(creds_data, user_email))
+
+    def _enqueue(
+        self, user_email: str, row: Optional[Tuple[bytes, Optional[str], float]]
+    ) -> bool:
+        with self._pending_cond:
+            if self._closed:
+                logger.error(
+                    f"Credential store is closed; dropping write for {user_email}"
+                )
+                return False
+            self._pending[user_email] = row
+            if self.batch_window > 0:
+                if self._flusher is None:
+                    self._flusher = threading.Thread(
+                        target=self._flush_loop,
+                        name="credential-store-flusher",
+                        daemon=True,
+                    )
+                    self._flusher.start()
+                self._pending_cond.notify()
+                return True
+        return self.flush()
+
+    def _wait_unless_closed(self, seconds: float) -> None:
+        """Sleep for ``seconds``, returning early if the store is closed."""
+        # New writes notify the condition too, so wait out the full delay
+        deadline = time.monotonic() + seconds
+        with self._pending_cond:
+            while not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                self._pending_cond.wait(remaining)
+
+    def _flush_loop(self) -> None:
+        failures = 0
+        while True:
+            with self._pending_cond:
+                while not self._pending and not self._closed:
+                    self._pending_cond.wait()
+                if self._closed:
+                    return
+            # Let more writes join this batch before committing; close()
+            # commits whatever is queued itself
+            self._wait_unless_closed(self.batch_window)
+            if self.flush():
+                failures = 0
+                continue
+
+            # The batch was requeued; back off so a persistent database error
+            # (disk full, read-only file) doesn't spin this thread
+            failures += 1
+            self._wait_unless_closed(
+                min(
+                    _FLUSH_RETRY_MAX_SECONDS,
+                    _FLUSH_RETRY_BASE_SECONDS * 2 ** (failures - 1),
+                )
+            )
+
+    def flush(self) -> bool:
+        """
+        Commit all queued writes in a single transaction.
+
+        Returns:
+            True if the queue was committed (or empty), False on a database error
+        """
+        with self._flush_lock:
+            with self._pending_cond:
+                batch = self._pending
+                self._pending = {}
+                self._committing = batch
+            if not batch:
+                return True
+
+            upserts = [
+                (user_email, row[0], row[1], row[2])
+                for user_email, row in batch.items()
+                if row is not None
+            ]
+            deletes = [
+                (user_email,) for user_email, row in batch.items() if row is None
+            ]
+            conn = self._connect()
+            try:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    if upserts:
+                        conn.executemany(
+                            """
+                            INSERT INTO credentials (user_email, blob, expiry, updated_at)
+                            VALUES (?, ?, ?, ?)
+                            ON CONFLICT (user_email) DO UPDATE SET
+                                blob = excluded.blob,
+                                expiry = excluded.expiry,
+                                updated_at = excluded.updated_at
+                            """,
+                            upserts,
+                        )
+                    if deletes:
+                        conn.executemany(
+                            "DELETE FROM credentials WHERE user_email = ?", deletes
+                        )
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            except sqlite3.Error as e:
+                logger.error(
+                    f"Error committing {len(batch)} credential writes to {self.path}: {e}"
+                )
+                with self._pending_cond:
+                    self._committing = {}
+                    self._write_errors += 1
+                    # Requeue the batch unless a newer write for the same user arrived
+                    for user_email, row in batch.items():
+                        self._pending.setdefault(user_email, row)
+                return False
+
+            with self._pending_cond:
+                self._committing = {}
+                self._batches += 1
+                self._batched_writes += len(batch)
+            logger.debug(f"Committed {len(batch)} credential writes to {self.path}")
+            return True
+
+    def get_credential(self, user_email: str) -> Optional[Credentials]:
+        """Get credentials from the database (or the pending write queue)."""
+        with self._pending_cond:
+            for queued in (self._pending, self._committing):
+                if user_email in queued:
+                    row = queued[user_email]
+                    if row is None:
+                        return None
+                    return self._decode(user_email, row[0])
+
+        try:
+            result = (
+                self._connect()
+                .execute(
+                    "SELECT blob FROM credentials WHERE user_email = ?", (user_email,)
+                )
+                .fetchone()
+            )
+        except sqlite3.Error as e:
+            logger.error(f"Error loading credentials for {user_email}: {e}")
+            return None
 
-        return sorted(users)
+        if result is None:
+            logger.debug(f"No stored credentials found for {user_email}")
+            return None
+        return self._decode(user_email, result[0])
+
+    def store_credential(self, user_email: str, credentials: Credentials) -> bool:
+        """Queue encrypted credentials to be written in the next batch."""
+        blob, expiry = self._encode(credentials)
+        if not self._enqueue(user_email, (blob, expiry, time.time())):
+            return False
+        logger.info(f"Stored credentials for {user_email} in {self.path}")
+        return True
+
+    def delete_credential(self, user_email: str) -> bool:
+        """Queue deletion of a user's credentials."""
+        if not self._enqueue(user_email, None):
+            return False
+        logger.info(f"Deleted credentials for {user_email} from {self.path}")
+        return True
+
+    def _pending_overlay(self, users: List[str]) -> List[str]:
+        with self._pending_cond:
+            result = set(users)
+            queued = dict(self._committing)
+            queued.update(self._pending)
+            for user_email, row in queued.items():
+                if row is None:
+                    result.discard(user_email)
+                else:
+                    result.add(user_email)
+        return sorted(result)
+
+    def list_users(self) -> List[str]:
+        """List all users with stored credentials."""
+        try:
+            rows = (
+                self._connect()
+                .execute("SELECT user_email FROM credentials ORDER BY user_email")
+                .fetchall()
+            )
+        except sqlite3.Error as e:
+            logger.error(f"Error listing users in {self.path}: {e}")
+            rows = []
+        return self._pending_overlay([row[0] for row in rows])
+
+    def list_users_expiring_before(self, deadline: datetime) -> List[str]:
+        """
+        List users whose stored access token expires before a deadline.
+
+        Args:
+            deadline: Timezone-naive UTC datetime, as stored on Credentials.expiry
+
+        Returns:
+            Sorted list of user email addresses
+        """
+        self.flush()
+        try:
+            rows = (
+                self._connect()
+                .execute(
+                    "SELECT user_email FROM credentials "
+                    "WHERE expiry IS NOT NULL AND expiry < ? ORDER BY user_email",
+                    (deadline.isoformat(),),
+                )
+                .fetchall()
+            )
+        except sqlite3.Error as e:
+            logger.error(f"Error listing expiring credentials in {self.path}: {e}")
+            return []
+        return [row[0] for row in rows]
+
+    def migrate_from_directory_store(
+        self, source: LocalDirectoryCredentialStore, overwrite: bool = False
+    ) -> int:
+        """
+        Copy credentials from a directory store into this database, once.
+
+        The migration is recorded in the database, so later calls for the same
+        directory are no-ops. The source files are left in place.
+
+        Args:
+            source: Directory store to read credentials from
+            overwrite: Replace credentials already present in the database
+
+        Returns:
+            Number of users migrated
+        """
+        name = f"directory:{os.path.abspath(source.base_dir)}"
+        with self._pending_cond:
+            if self._closed:
+                logger.error(f"Credential store is closed; skipping migration {name}")
+                return 0
+        conn = self._connect()
+        if conn.execute("SELECT 1 FROM migrations WHERE name = ?", (name,)).fetchone():
+            logger.debug(f"Credential migration {name} already applied")
+            return 0
+
+        existing = set(self.list_users())
+        migrated = 0
+        for user_email in source.list_users():
+            if user_email in existing and not overwrite:
+                continue
+            credentials = source.get_credential(user_email)
+            if credentials is None:
+                continue
+            blob, expiry = self._encode(credentials)
+            with self._pending_cond:
+                if self._closed:
+                    logger.error(
+                        f"Credential store closed during migration {name}; it will be retried"
+                    )
+                    return 0
+                self._pending[user_email] = (blob, expiry, time.time())
+            migrated += 1
+
+        if not self.flush():
+            logger.error(f"Credential migration {name} failed; it will be retried")
+            return 0
+        conn.execute(
+            "INSERT OR IGNORE INTO migrations (name, applied_at) VALUES (?, ?)",
+            (name, time.time()),
+        )
+        logger.info(f"Migrated {migrated} users' credentials from {source.base_dir}")
+        return migrated
+
+    def close(self) -> None:
+        """Flush queued writes, stop the flusher thread and close all connections."""
+        with self._pending_cond:
+            if self._closed:
+                return
+        self.flush()
+        with self._pending_cond:
+            self._closed = True
+            self._pending_cond.notify_all()
+            flusher = self._flusher
+        if flusher is not None and flusher is not threading.current_thread():
+            flusher.join()
+        self.flush()
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+        atexit.unregister(self.close)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get write batching statistics."""
+        with self._pending_cond:
+            return {
+                "pending_writes": len(self._pending),
+                "batches": self._batches,
+                "batched_writes": self._batched_writes,
+                "avg_batch_size": (self._batched_writes / self._batches)
+                if self._batches
+                else 0.0,
+                "write_errors": self._write_errors,
+            }
+
+
+def get_credential_encryption_key() -> bytes:
+    """
+    Derive the Fernet key used to encrypt credentials at rest.
+
+    WORKSPACE_MCP_CREDENTIAL_STORE_KEY takes precedence and may be a passphrase;
+    otherwise the key is derived from GOOGLE_OAUTH_CLIENT_SECRET.
+
+    Raises:
+        ValueError: If neither variable is set
+    """
+    from fastmcp.server.auth.jwt_issuer import derive_jwt_key
+
+    passphrase = os.getenv("WORKSPACE_MCP_CREDENTIAL_STORE_KEY")
+    if passphrase:
+        return derive_jwt_key(
+            low_entropy_material=passphrase, salt=_CREDENTIAL_STORE_KEY_SALT
+        )
+    client_secret = os.getenv("GOOGLE_OAUTH_CLIENT_SECRET")
+    if client_secret:
+        return derive_jwt_key(
+            high_entropy_material=client_secret, salt=_CREDENTIAL_STORE_KEY_SALT
+        )
+    raise ValueError(
+        "Encrypting the SQLite credential store requires "
+        "WORKSPACE_MCP_CREDENTIAL_STORE_KEY or GOOGLE_OAUTH_CLIENT_SECRET"
+    )
 
 
 # Global credential store instance
 _credential_store: Optional[CredentialStore] = None
 
 
+def _create_sqlite_credential_store() -> SqliteCredentialStore:
+    """Build the SQLite store from environment configuration and import legacy files."""
+    credentials_dir = get_credentials_dir()
+    path = os.path.expanduser(
+        os.getenv(
+            "WORKSPACE_MCP_CREDENTIAL_STORE_PATH",
+            os.path.join(credentials_dir, "credentials.sqlite3"),
+        )
+    )
+    store = SqliteCredentialStore(
+        path,
+        get_credential_encryption_key(),
+        batch_window_ms=float(
+            os.getenv(
+                "WORKSPACE_MCP_CREDENTIAL_STORE_BATCH_MS",
+                str(DEFAULT_SQLITE_BATCH_WINDOW_MS),
+            )
+        ),
+    )
+    if os.path.isdir(credentials_dir):
+        store.migrate_from_directory_store(
+            LocalDirectoryCredentialStore(credentials_dir)
+        )
+    return store
+
+
 def get_credential_store() -> CredentialStore:
     """
     Get the global credential store instance.
 
+    Environment variables:
+        WORKSPACE_MCP_CREDENTIAL_STORE: "directory" (default) or "sqlite"
+        WORKSPACE_MCP_CREDENTIAL_STORE_PATH: SQLite database path
+        WORKSPACE_MCP_CREDENTIAL_STORE_BATCH_MS: SQLite write batching window
+        WORKSPACE_MCP_CREDENTIAL_STORE_KEY: Passphrase for encrypting credentials
+
     Returns:
         Configured credential store instance
     """
     global _credential_store
 
     if _credential_store is None:
-        # always use LocalJsonCredentialStore as the default
-        # Future enhancement: support other backends via environment variables
-        _credential_store = LocalDirectoryCredentialStore()
+        backend = (
+            os.getenv("WORKSPACE_MCP_CREDENTIAL_STORE", "directory").strip().lower()
+        )
+        if backend == "sqlite":
+            _credential_store = _create_sqlite_credential_store()
+        else:
+            _credential_store = LocalDirectoryCredentialStore()
         logger.info(f"Initialized credential store: {type(_credential_store).__name__}")
 
     return _credential_store
@@ -5,6 +5,7 @@ import json
 import jwt
 import logging
 import os
+from datetime import datetime, timedelta, timezone
 
 from typing import List, Optional, Tuple, Dict, Any
 from urllib.parse import parse_qs, urlparse
@@ -13,17 +14,26 @@ from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import Flow
 from google.auth.transport.requests import Request
 from google.auth.exceptions import RefreshError
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from auth.scopes import SCOPES, get_current_scopes  # noqa
-from auth.oauth21_session_store import get_oauth21_session_store
-from auth.credential_store import get_credential_store
+from auth.oauth21_session_store import (
+    get_oauth21_session_store,
+    run_session_store_call,
+)
+from auth.credential_store import SqliteCredentialStore, get_credential_store
+from auth.service_pool import get_service_pool
+from auth.token_refresh import (
+    BackgroundTokenRefresher,
+    get_background_refresh_settings,
+    get_token_refresh_coordinator,
+)
 from auth.oauth_config import get_oauth_config, is_stateless_mode
 from core.config import (
     get_transport_mode,
     get_oauth_redirect_uri,
 )
 from core.context import get_fastmcp_session_id
+from core.discovery import build_service
 
 # Try to import FastMCP dependencies (may not be available in all environments)
 try:
@@ -388,7 +398,9 @@ async def start_auth_flow(
             )
 
         store = get_oauth21_session_store()
-        store.store_oauth_state(oauth_state, session_id=session_id)
+        await run_session_store_call(
+            store.store_oauth_state, oauth_state, session_id=session_id
+        )
 
         logger.info(
             f"Auth flow started for {user_display_name}. State: {oauth_state[:8]}... Advise user to visit: {auth_url}"
@@ -587,23 +599,31 @@ def get_credentials(
                 if credentials.valid:
                     return credentials
                 elif credentials.expired and credentials.refresh_token:
-                    # Try to refresh
+                    # Try to refresh (coalesced with concurrent refreshes of this grant)
                     try:
-                        credentials.refresh(Request())
+                        user_email = store.get_user_by_mcp_session(session_id)
+
+                        def persist(refreshed: Credentials):
+                            # Update stored credentials
+                            if user_email:
+                                store.store_session(
+                                    user_email=user_email,
+                                    access_token=refreshed.token,
+                                    refresh_token=refreshed.refresh_token,
+                                    scopes=refreshed.scopes,
+                                    expiry=refreshed.expiry,
+                                    mcp_session_id=session_id,
+                                )
+
+                        get_token_refresh_coordinator().refresh(
+                            credentials,
+                            Request(),
+                            persist=persist,
+                            user_email=user_email,
+                        )
                         logger.info(
                             f"[get_credentials] Refreshed OAuth 2.1 credentials for session {session_id}"
                         )
-                        # Update stored credentials
-                        user_email = store.get_user_by_mcp_session(session_id)
-                        if user_email:
-                            store.store_session(
-                                user_email=user_email,
-                                access_token=credentials.token,
-                                refresh_token=credentials.refresh_token,
-                                scopes=credentials.scopes,
-                                expiry=credentials.expiry,
-                                mcp_session_id=session_id,
-                            )
                         return credentials
                     except Exception as e:
                         logger.error(
@@ -713,16 +733,14 @@ def get_credentials(
                 "[get_credentials] Refreshing token using embedded client credentials"
             )
             # client_config = load_client_secrets(client_secrets_path) # Not strictly needed if creds have client_id/secret
-            credentials.refresh(Request())
-            logger.info(
-                f"[get_credentials] Credentials refreshed successfully. User: '{user_google_email}', Session: '{session_id}'"
-            )
 
-            # Save refreshed credentials (skip file save in stateless mode)
-            if user_google_email:  # Always save to credential store if email is known
+            def persist(refreshed: Credentials):
+                # Save refreshed credentials (skip file save in stateless mode)
+                if not user_google_email:
+                    return
                 if not is_stateless_mode():
                     credential_store = get_credential_store()
-                    credential_store.store_credential(user_google_email, credentials)
+                    credential_store.store_credential(user_google_email, refreshed)
                 else:
                     logger.info(
                         f"Skipping credential file save in stateless mode for {user_google_email}"
@@ -732,17 +750,25 @@ def get_credentials(
                 store = get_oauth21_session_store()
                 store.store_session(
                     user_email=user_google_email,
-                    access_token=credentials.token,
-                    refresh_token=credentials.refresh_token,
-                    token_uri=credentials.token_uri,
-                    client_id=credentials.client_id,
-                    client_secret=credentials.client_secret,
-                    scopes=credentials.scopes,
-                    expiry=credentials.expiry,
+                    access_token=refreshed.token,
+                    refresh_token=refreshed.refresh_token,
+                    token_uri=refreshed.token_uri,
+                    client_id=refreshed.client_id,
+                    client_secret=refreshed.client_secret,
+                    scopes=refreshed.scopes,
+                    expiry=refreshed.expiry,
                     mcp_session_id=session_id,
                     issuer="https://accounts.google.com",  # Add issuer for Google tokens
                 )
 
+            # Concurrent callers for the same grant share one refresh, persisted once
+            get_token_refresh_coordinator().refresh(
+                credentials, Request(), persist=persist, user_email=user_google_email
+            )
+            logger.info(
+                f"[get_credentials] Credentials refreshed successfully. User: '{user_google_email}', Session: '{session_id}'"
+            )
+
             if session_id:  # Update session cache if it was the source or is active
                 save_credentials_to_session(session_id, credentials)
             return credentials
@@ -773,7 +799,7 @@ def get_user_info(credentials: Credentials) -> Optional[Dict[str, Any]]:
     try:
         # Using googleapiclient discovery to get user info
         # Requires 'google-api-python-client' library
-        service = build("oauth2", "v2", credentials=credentials)
+        service = build_service("oauth2", "v2", credentials=credentials)
         user_info = service.userinfo().get().execute()
         logger.info(f"Successfully fetched user info: {user_info.get('email')}")
         return user_info
@@ -789,6 +815,96 @@ def get_user_info(credentials: Credentials) -> Optional[Dict[str, Any]]:
             service.close()
 
 
+# --- Proactive Token Refresh ---
+
+_background_token_refresher: Optional[BackgroundTokenRefresher] = None
+
+
+def _load_refreshable_credentials() -> Dict[str, Credentials]:
+    """Collect known credentials from the credential store and OAuth 2.1 session store."""
+    candidates: Dict[str, Credentials] = {}
+    if not is_stateless_mode():
+        credential_store = get_credential_store()
+        if isinstance(credential_store, SqliteCredentialStore):
+            # Only decrypt the tokens that can fall due before the next scan
+            settings = get_background_refresh_settings()
+            horizon = (
+                settings["margin_seconds"]
+                + settings["jitter_seconds"]
+                + settings["scan_interval_seconds"]
+            )
+            users = credential_store.list_users_expiring_before(
+                datetime.now(timezone.utc).replace(tzinfo=None)
+                + timedelta(seconds=horizon)
+            )
+        else:
+            users = credential_store.list_users()
+        for user_email in users:
+            credentials = credential_store.get_credential(user_email)
+            if credentials:
+                candidates[user_email] = credentials
+
+    session_store = get_oauth21_session_store()
+    for user_email in session_store.list_users():
+        credentials = session_store.get_credentials(user_email)
+        if not credentials:
+            continue
+        existing = candidates.get(user_email)
+        # Prefer whichever copy holds the newest token
+        if (
+            existing is None
+            or existing.expiry is None
+            or (credentials.expiry and credentials.expiry > existing.expiry)
+        ):
+            candidates[user_email] = credentials
+    return candidates
+
+
+def _persist_proactively_refreshed(user_email: str, credentials: Credentials):
+    """Write a token refreshed in the background back to the stores that know the user."""
+    if not is_stateless_mode():
+        get_credential_store().store_credential(user_email, credentials)
+    get_oauth21_session_store().update_session_tokens(
+        user_email,
+        access_token=credentials.token,
+        expiry=credentials.expiry,
+        refresh_token=credentials.refresh_token,
+    )
+
+
+def start_background_token_refresh() -> Optional[BackgroundTokenRefresher]:
+    """
+    Start refreshing stored tokens shortly before they expire.
+
+    Disabled with WORKSPACE_MCP_BACKGROUND_TOKEN_REFRESH=false. See
+    auth.token_refresh.get_background_refresh_settings() for tuning.
+
+    Returns:
+        The running refresher, or None if disabled.
+    """
+    global _background_token_refresher
+
+    enabled = os.getenv("WORKSPACE_MCP_BACKGROUND_TOKEN_REFRESH", "true").lower()
+    if enabled not in ("1", "true", "yes", "on"):
+        logger.info("Background token refresh disabled")
+        return None
+
+    if _background_token_refresher is None:
+        _background_token_refresher = BackgroundTokenRefresher(
+            load_credentials=_load_refreshable_credentials,
+            persist=_persist_proactively_refreshed,
+            request_factory=Request,
+            **get_background_refresh_settings(),
+        )
+    _background_token_refresher.start()
+    return _background_token_refresher
+
+
+def get_background_token_refresher() -> Optional[BackgroundTokenRefresher]:
+    """Get the background token refresher, if it has been started."""
+    return _background_token_refresher
+
+
 # --- Centralized Google Service Authentication ---
 
 
@@ -811,6 +927,7 @@ async def get_authenticated_google_service(
     """
     Centralized Google service authentication for all MCP tools.
     Returns (service, user_email) on success or raises GoogleAuthenticationError.
+    The service is leased from the service pool; return it with release_service().
 
     Args:
         service_name: The Google service name ("gmail", "calendar", "drive", "docs")
@@ -919,7 +1036,9 @@ async def get_authenticated_google_service(
         raise GoogleAuthenticationError(auth_response)
 
     try:
-        service = build(service_name, version, credentials=credentials)
+        service = get_service_pool().acquire(
+            user_google_email, service_name, version, credentials
+        )
         log_user_email = user_google_email
 
         # Try to get email from credentials if needed for validation
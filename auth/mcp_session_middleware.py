@@ -3,118 +3,215 @@ MCP Session Middleware
 
 This middleware intercepts MCP requests and sets the session context
 for use by tool functions.
+
+It is a pure ASGI middleware: it reads the headers it needs straight from the
+ASGI scope and hands ``receive``/``send`` to the app untouched, so
+streamable-HTTP request and response bodies pass through without the extra
+task and memory streams of Starlette's BaseHTTPMiddleware.
 """
 
 import logging
-from typing import Callable, Any
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
 
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from auth.oauth21_session_store import (
     SessionContext,
     SessionContextManager,
-    extract_session_from_headers,
+    get_oauth21_session_store,
+    hash_access_token,
+    run_session_store_call,
 )
 # OAuth 2.1 is now handled by FastMCP auth
 
 logger = logging.getLogger(__name__)
 
+# Bearer token claims cache configuration
+DEFAULT_TOKEN_CLAIMS_CACHE_TTL_SECONDS = 300.0
+DEFAULT_TOKEN_CLAIMS_CACHE_MAX_ENTRIES = 1024
+
+
+class BearerEmailCache:
+    """
+    Per-token cache of the email claim in unverified bearer JWTs.
 
-class MCPSessionMiddleware(BaseHTTPMiddleware):
+    Only the email is kept, keyed by a SHA-256 hash of the token. Opaque
+    tokens (e.g. Google ``ya29.*`` access tokens) are remembered as having no
+    email, so they are not parsed again either.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_TOKEN_CLAIMS_CACHE_TTL_SECONDS,
+        max_entries: int = DEFAULT_TOKEN_CLAIMS_CACHE_MAX_ENTRIES,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        # Maps token hash -> (email or None, monotonic expiry)
+        self._entries: "OrderedDict[str, Tuple[Optional[str], float]]" = OrderedDict()
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get_email(self, token: str) -> Optional[str]:
+        """Get the email claim of a bearer token, decoding the JWT only on a miss."""
+        key = hash_access_token(token)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+
+        email = _decode_email_claim(token)
+
+        with self._lock:
+            self._entries[key] = (email, now + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return email
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": (self._hits / lookups) if lookups else 0.0,
+            }
+
+
+def _decode_email_claim(token: str) -> Optional[str]:
+    """Read the email claim from a JWT without verifying it (None for non-JWTs)."""
+    if token.count(".") != 2:
+        return None
+    try:
+        import jwt
+
+        claims = jwt.decode(token, options={"verify_signature": False})
+    except Exception:
+        return None
+    email = claims.get("email") if isinstance(claims, dict) else None
+    if email:
+        logger.debug(f"Extracted user email from JWT: {email}")
+    return email
+
+
+def _session_id_for_bearer(token: str) -> str:
+    """Resolve a bearer token to its stored session ID, or a token-derived one."""
+    store = get_oauth21_session_store()
+    user_email = store.get_user_by_access_token(token) if token else None
+    session_info = store.get_session_info(user_email) if user_email else None
+    if session_info is not None:
+        return session_info.get("session_id") or f"bearer_{user_email}"
+    # No stored session: derive a stable session ID from the token hash so
+    # header-based authentication still gets a session context
+    return f"bearer_token_{hash_access_token(token)[:8]}"
+
+
+class MCPSessionMiddleware:
     """
     Middleware that extracts session information from requests and makes it
     available to MCP tool functions via context variables.
     """
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Any:
-        """Process request and set session context."""
-
-        logger.debug(
-            f"MCPSessionMiddleware processing request: {request.method} {request.url.path}"
-        )
-
-        # Skip non-MCP paths
-        if not request.url.path.startswith("/mcp"):
-            logger.debug(f"Skipping non-MCP path: {request.url.path}")
-            return await call_next(request)
+    def __init__(self, app: ASGIApp, email_cache: Optional[BearerEmailCache] = None):
+        self.app = app
+        self.email_cache = email_cache or BearerEmailCache()
 
-        session_context = None
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Process request and set session context."""
+        # Skip non-HTTP traffic and non-MCP paths
+        if scope["type"] != "http" or not scope["path"].startswith("/mcp"):
+            await self.app(scope, receive, send)
+            return
 
         try:
-            # Extract session information
-            headers = dict(request.headers)
-            session_id = extract_session_from_headers(headers)
-
-            # Try to get OAuth 2.1 auth context from FastMCP
-            auth_context = None
-            user_email = None
-            mcp_session_id = None
-            # Check for FastMCP auth context
-            if hasattr(request.state, "auth"):
-                auth_context = request.state.auth
-                # Extract user email from auth claims if available
-                if hasattr(auth_context, "claims") and auth_context.claims:
-                    user_email = auth_context.claims.get("email")
-
-            # Check for FastMCP session ID (from streamable HTTP transport)
-            if hasattr(request.state, "session_id"):
-                mcp_session_id = request.state.session_id
-                logger.debug(f"Found FastMCP session ID: {mcp_session_id}")
-
-            # Also check Authorization header for bearer tokens
-            auth_header = headers.get("authorization")
-            if (
-                auth_header
-                and auth_header.lower().startswith("bearer ")
-                and not user_email
-            ):
-                try:
-                    import jwt
-
-                    token = auth_header[7:]  # Remove "Bearer " prefix
-                    # Decode without verification to extract email
-                    claims = jwt.decode(token, options={"verify_signature": False})
-                    user_email = claims.get("email")
-                    if user_email:
-                        logger.debug(f"Extracted user email from JWT: {user_email}")
-                except Exception:
-                    pass
-
-            # Build session context
-            if session_id or auth_context or user_email or mcp_session_id:
-                # Create session ID hierarchy: explicit session_id > Google user session > FastMCP session
-                effective_session_id = session_id
-                if not effective_session_id and user_email:
-                    effective_session_id = f"google_{user_email}"
-                elif not effective_session_id and mcp_session_id:
-                    effective_session_id = mcp_session_id
-
-                session_context = SessionContext(
-                    session_id=effective_session_id,
-                    user_id=user_email
-                    or (auth_context.user_id if auth_context else None),
-                    auth_context=auth_context,
-                    request=request,
-                    metadata={
-                        "path": request.url.path,
-                        "method": request.method,
-                        "user_email": user_email,
-                        "mcp_session_id": mcp_session_id,
-                    },
-                )
-
-                logger.debug(
-                    f"MCP request with session: session_id={session_context.session_id}, "
-                    f"user_id={session_context.user_id}, path={request.url.path}"
-                )
-
-            # Process request with session context
-            with SessionContextManager(session_context):
-                response = await call_next(request)
-                return response
-
+            # Resolving a bearer token may read through to a shared session backend
+            session_context = await run_session_store_call(
+                self._build_session_context, scope, receive
+            )
         except Exception as e:
             logger.error(f"Error in MCP session middleware: {e}")
             # Continue without session context
-            return await call_next(request)
+            session_context = None
+
+        with SessionContextManager(session_context):
+            await self.app(scope, receive, send)
+
+    def _build_session_context(
+        self, scope: Scope, receive: Receive
+    ) -> Optional[SessionContext]:
+        # Pick out the headers we need; ASGI header names are lowercase bytes
+        mcp_session_header = None
+        x_session_header = None
+        auth_header = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                auth_header = value
+            elif name == b"mcp-session-id":
+                mcp_session_header = value.decode("latin-1")
+            elif name == b"x-session-id":
+                x_session_header = value.decode("latin-1")
+
+        # Try to get OAuth 2.1 auth context and session ID from FastMCP
+        state = scope.get("state") or {}
+        auth_context = state.get("auth")
+        mcp_session_id = state.get("session_id")
+        user_email = None
+        if auth_context is not None:
+            # Extract user email from auth claims if available
+            claims = getattr(auth_context, "claims", None)
+            if claims:
+                user_email = claims.get("email")
+
+        token = None
+        if auth_header is not None and auth_header[:7].lower() == b"bearer ":
+            token = auth_header[7:].decode("latin-1")
+            if token and not user_email:
+                user_email = self.email_cache.get_email(token)
+
+        # Session ID: explicit header first, then the bearer token's session
+        session_id = mcp_session_header or x_session_header
+        if not session_id and token is not None:
+            session_id = _session_id_for_bearer(token)
+
+        if not (session_id or auth_context or user_email or mcp_session_id):
+            return None
+
+        # Create session ID hierarchy: explicit session_id > Google user session > FastMCP session
+        effective_session_id = session_id
+        if not effective_session_id and user_email:
+            effective_session_id = f"google_{user_email}"
+        elif not effective_session_id and mcp_session_id:
+            effective_session_id = mcp_session_id
+
+        session_context = SessionContext(
+            session_id=effective_session_id,
+            user_id=user_email or getattr(auth_context, "user_id", None),
+            auth_context=auth_context,
+            request=Request(scope, receive),
+            metadata={
+                "path": scope["path"],
+                "method": scope["method"],
+                "user_email": user_email,
+                "mcp_session_id": mcp_session_id,
+            },
+        )
+
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                f"MCP request with session: session_id={session_context.session_id}, "
+                f"user_id={session_context.user_id}, path={scope['path']}"
+            )
+        return session_context
@@ -7,18 +7,41 @@ session context management and credential conversion functionality.
 """
 
 import contextvars
+import hashlib
+import heapq
 import logging
-from typing import Dict, Optional, Any, Tuple
-from threading import RLock
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from operator import itemgetter
+from typing import Callable, Dict, List, Optional, Any, Set, Tuple
+from threading import Lock, RLock
 from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass
 
 from fastmcp.server.auth import AccessToken
 from google.oauth2.credentials import Credentials
-from auth.oauth_config import is_external_oauth21_provider
+from auth.oauth_config import is_external_oauth21_provider, is_stateless_mode
+from auth.session_backend import SessionBackend
+from core.google_executor import run_blocking
 
 logger = logging.getLogger(__name__)
 
+# Number of lock stripes guarding session writes
+DEFAULT_LOCK_STRIPES = 256
+
+# Default session eviction configuration (overridable via environment variables)
+DEFAULT_MAX_SESSIONS = 10000
+DEFAULT_SESSION_IDLE_TTL_SECONDS = 86400.0
+DEFAULT_SESSION_SWEEP_INTERVAL_SECONDS = 60.0
+# How many evicted users are remembered for transparent rehydration. Their
+# session bindings are kept regardless, until the user is explicitly removed.
+_MAX_EVICTED_USERS_TRACKED = 100000
+# How long a session read from a shared backend is served from memory
+DEFAULT_NEAR_CACHE_TTL_SECONDS = 5.0
+
 
 def _normalize_expiry_to_naive_utc(expiry: Optional[Any]) -> Optional[datetime]:
     """
@@ -156,12 +179,12 @@ def extract_session_from_headers(headers: Dict[str, str]) -> Optional[str]:
         # Extract bearer token and try to find associated session
         token = auth_header[7:]  # Remove "Bearer " prefix
         if token:
-            # Look for a session that has this access token
-            # This requires scanning sessions, but bearer tokens should be unique
+            # Look up the session that holds this access token
             store = get_oauth21_session_store()
-            for user_email, session_info in store._sessions.items():
-                if session_info.get("access_token") == token:
-                    return session_info.get("session_id") or f"bearer_{user_email}"
+            user_email = store.get_user_by_access_token(token)
+            session_info = store.get_session_info(user_email) if user_email else None
+            if session_info is not None:
+                return session_info.get("session_id") or f"bearer_{user_email}"
 
         # If no session found, create a temporary session ID from token hash
         # This allows header-based authentication to work with session context
@@ -178,6 +201,18 @@ def extract_session_from_headers(headers: Dict[str, str]) -> Optional[str]:
 # =============================================================================
 
 
+class _OAuthStateShard:
+    """One shard of pending OAuth states, with its own lock and expiry heap."""
+
+    __slots__ = ("lock", "states", "expiry_heap")
+
+    def __init__(self):
+        self.lock = Lock()
+        self.states: Dict[str, Dict[str, Any]] = {}
+        # Min-heap of (expires_at, state); entries for consumed states are skipped lazily
+        self.expiry_heap: List[Tuple[datetime, str]] = []
+
+
 class OAuth21SessionStore:
     """
     Global store for OAuth 2.1 authenticated sessions.
@@ -188,9 +223,49 @@ class OAuth21SessionStore:
 
     Security: Sessions are bound to specific users and can only access
     their own credentials.
+
+    Concurrency: writes for a user take one of a fixed set of striped locks,
+    chosen by user email, so writes for different users rarely contend.
+    Session IDs are bound with an atomic first-wins insert. Session records
+    are replaced rather than mutated, which lets lookups read without locking.
+    A user -> session IDs index makes removal O(sessions of that user), and
+    OAuth states are sharded the same way and expire from per-shard heaps
+    instead of a full scan.
+
+    Scaling out: with a SessionBackend (e.g. Valkey) sessions, bindings and
+    OAuth states are shared by every replica. The in-memory dicts then act as
+    a read-through near cache: session records are re-read after
+    ``near_cache_ttl_seconds``, and bindings, which never change once made,
+    are kept until the user is removed. Writes go to the backend
+    first and raise if it fails; reads fall back to the near cache. Backend
+    calls are never made while holding a lock stripe, and async code calls
+    the store through run_session_store_call() to keep them off the event loop.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        lock_stripes: int = DEFAULT_LOCK_STRIPES,
+        max_sessions: Optional[int] = None,
+        idle_ttl_seconds: Optional[float] = None,
+        credential_loader: Optional[Callable[[str], Optional[Credentials]]] = None,
+        backend: Optional[SessionBackend] = None,
+        near_cache_ttl_seconds: float = DEFAULT_NEAR_CACHE_TTL_SECONDS,
+    ):
+        """
+        Initialize the session store.
+
+        Args:
+            lock_stripes: Number of locks user writes are spread over
+            max_sessions: Max users kept in memory; the sweeper evicts the least
+                recently used beyond this. None means unbounded.
+            idle_ttl_seconds: Evict users not used for this long. None disables.
+            credential_loader: Loads an evicted user's credentials back; defaults
+                to the configured credential store
+            backend: Shared store for sessions, bindings and OAuth states, or
+                None to keep them in process memory only
+            near_cache_ttl_seconds: How long a session read from the backend
+                is served from memory before being read again
+        """
         self._sessions: Dict[str, Dict[str, Any]] = {}
         self._mcp_session_mapping: Dict[
             str, str
@@ -198,19 +273,228 @@ class OAuth21SessionStore:
         self._session_auth_binding: Dict[
             str, str
         ] = {}  # Maps session ID -> authenticated user email (immutable)
-        self._oauth_states: Dict[str, Dict[str, Any]] = {}
-        self._lock = RLock()
+        # Maps user email -> session IDs (MCP and OAuth) mapped or bound to the user
+        self._user_session_ids: Dict[str, Set[str]] = {}
+        # Maps access token hash -> user email, for resolving bearer tokens to sessions
+        self._access_token_users: Dict[str, str] = {}
+        self._stripes = [RLock() for _ in range(max(1, lock_stripes))]
+
+        self._oauth_state_shards = [
+            _OAuthStateShard() for _ in range(len(self._stripes))
+        ]
+
+        # Eviction: last use per user (monotonic), and the session IDs of
+        # recently evicted users, needed to rehydrate them
+        self.max_sessions = max_sessions
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._credential_loader = credential_loader
+        self._last_access: Dict[str, float] = {}
+        self._evicted_users: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._eviction_lock = Lock()
+        self._idle_evictions = 0
+        self._capacity_evictions = 0
+        self._rehydrations = 0
+        self._sweeps = 0
+        self._sweeper: Optional[threading.Thread] = None
+        self._sweeper_stop = threading.Event()
+
+        # Shared backend; the dicts above are its near cache
+        self._backend = backend
+        self.near_cache_ttl_seconds = near_cache_ttl_seconds
+        self._near_cache_expiry: Dict[str, float] = {}
+
+    def set_backend(
+        self,
+        backend: Optional[SessionBackend],
+        near_cache_ttl_seconds: float = DEFAULT_NEAR_CACHE_TTL_SECONDS,
+    ) -> None:
+        """
+        Share sessions, bindings and OAuth states through a backend.
+
+        Call at startup, before sessions are stored: sessions already in
+        memory are not copied to the backend.
+
+        Args:
+            backend: Shared store, or None to keep state in process memory only
+            near_cache_ttl_seconds: How long a session read from the backend
+                is served from memory before being read again
+        """
+        self._backend = backend
+        self.near_cache_ttl_seconds = near_cache_ttl_seconds
+
+    @property
+    def has_backend(self) -> bool:
+        """Whether sessions are shared through a backend (and reads may do network I/O)."""
+        return self._backend is not None
+
+    def _lock_for(self, user_email: str) -> Any:
+        """Get the lock stripe guarding a user's session and session ID index."""
+        return self._stripes[hash(user_email) % len(self._stripes)]
+
+    def _set_session_locked(self, user_email: str, session_info: Dict[str, Any]):
+        """Replace a user's session record, keeping the access token index in step."""
+        previous = self._sessions.get(user_email)
+        if previous is not None:
+            self._unindex_access_token(previous, user_email)
+        self._sessions[user_email] = session_info
+        if session_info.get("access_token"):
+            token_hash = hash_access_token(session_info["access_token"])
+            self._access_token_users[token_hash] = user_email
+
+    def _unindex_access_token(self, session_info: Dict[str, Any], user_email: str):
+        access_token = session_info.get("access_token")
+        if not access_token:
+            return
+        token_hash = hash_access_token(access_token)
+        if self._access_token_users.get(token_hash) == user_email:
+            del self._access_token_users[token_hash]
+
+    def _bind_session_id(self, session_id: str, user_email: str) -> str:
+        """
+        Bind a session ID to a user unless it is already bound (first binding wins).
+
+        dict.setdefault is atomic, so concurrent binders for other users need no
+        shared lock: exactly one of them wins.
+
+        Returns:
+            The user the session ID is bound to
+        """
+        return self._session_auth_binding.setdefault(session_id, user_email)
+
+    @staticmethod
+    def _reject_rebind(session_id: str, bound_user: str, user_email: str):
+        # Security: Attempt to bind session to different user
+        logger.error(
+            f"SECURITY: Attempt to rebind session {session_id} from {bound_user} to {user_email}"
+        )
+        raise ValueError(f"Session {session_id} is already bound to a different user")
+
+    def _session_record(self, user_email: str) -> Optional[Dict[str, Any]]:
+        """Get a user's session record, marking it used and rehydrating it if evicted."""
+        session_info = self._sessions.get(user_email)
+        now = time.monotonic()
+        if self._backend is not None and (
+            session_info is None or self._near_cache_expiry.get(user_email, 0) <= now
+        ):
+            session_info = self._load_from_backend(user_email, session_info)
+        if session_info is None:
+            return self._rehydrate(user_email)
+        self._last_access[user_email] = now
+        return session_info
+
+    def _load_from_backend(
+        self, user_email: str, cached: Optional[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """Read a user's session through to the backend, refreshing the near cache."""
+        try:
+            session_info = self._backend.get_session(user_email)
+        except Exception as e:
+            logger.warning(
+                f"Session backend read failed for {user_email}, using cached session: {e}"
+            )
+            return cached
+
+        with self._lock_for(user_email):
+            if session_info is None:
+                # Removed on another replica
+                if cached is not None:
+                    self._remove_user_locked(user_email)
+                return None
+            self._set_session_locked(user_email, session_info)
+            self._near_cache_expiry[user_email] = (
+                time.monotonic() + self.near_cache_ttl_seconds
+            )
+        return session_info
+
+    def _bound_user(self, session_id: str) -> Optional[str]:
+        """Get the user a session ID is bound to, reading through to the backend."""
+        bound_user = self._session_auth_binding.get(session_id)
+        if bound_user is not None or self._backend is None:
+            return bound_user
+        try:
+            bound_user = self._backend.get_bound_user(session_id)
+        except Exception as e:
+            logger.warning(f"Session backend read failed for binding {session_id}: {e}")
+            return None
+        if bound_user is not None:
+            with self._lock_for(bound_user):
+                self._bind_session_id(session_id, bound_user)
+                self._user_session_ids.setdefault(bound_user, set()).add(session_id)
+        return bound_user
+
+    def _mcp_session_user(self, mcp_session_id: str) -> Optional[str]:
+        """Get the user an MCP session is mapped to, reading through to the backend."""
+        user_email = self._mcp_session_mapping.get(mcp_session_id)
+        if user_email is not None or self._backend is None:
+            return user_email
+        try:
+            user_email = self._backend.get_mcp_session_user(mcp_session_id)
+        except Exception as e:
+            logger.warning(
+                f"Session backend read failed for MCP session {mcp_session_id}: {e}"
+            )
+            return None
+        if user_email is not None:
+            with self._lock_for(user_email):
+                self._mcp_session_mapping[mcp_session_id] = user_email
+                self._user_session_ids.setdefault(user_email, set()).add(mcp_session_id)
+        return user_email
+
+    def _rehydrate(self, user_email: str) -> Optional[Dict[str, Any]]:
+        """Reload an evicted user's session from the credential store."""
+        if user_email not in self._evicted_users:
+            return None
+        with self._eviction_lock:
+            evicted = self._evicted_users.pop(user_email, None)
+            if evicted is None:
+                return self._sessions.get(user_email)
+
+        loader = self._credential_loader or _load_credentials_for_rehydration
+        try:
+            credentials = loader(user_email)
+        except Exception as e:
+            logger.warning(
+                f"Could not rehydrate OAuth 2.1 session for {user_email}: {e}"
+            )
+            return None
+        if credentials is None:
+            logger.debug(f"No stored credentials to rehydrate {user_email}")
+            return None
+
+        # The user's session bindings survived eviction; restore the record
+        # under the same session IDs so they resolve to it again
+        self.store_session(
+            user_email=user_email,
+            access_token=credentials.token,
+            refresh_token=credentials.refresh_token,
+            token_uri=credentials.token_uri or "https://oauth2.googleapis.com/token",
+            client_id=credentials.client_id,
+            client_secret=credentials.client_secret,
+            scopes=credentials.scopes,
+            expiry=credentials.expiry,
+            session_id=evicted["session_id"] or f"google_{user_email}",
+            mcp_session_id=evicted["mcp_session_id"],
+            issuer=evicted["issuer"] or "https://accounts.google.com",
+        )
+        with self._eviction_lock:
+            self._rehydrations += 1
+        logger.info(f"Rehydrated evicted OAuth 2.1 session for {user_email}")
+        return self._sessions.get(user_email)
+
+    def _oauth_state_shard(self, state: str) -> "_OAuthStateShard":
+        return self._oauth_state_shards[hash(state) % len(self._oauth_state_shards)]
 
-    def _cleanup_expired_oauth_states_locked(self):
-        """Remove expired OAuth state entries. Caller must hold lock."""
+    def _cleanup_expired_oauth_states_locked(self, shard: "_OAuthStateShard"):
+        """Remove a shard's expired OAuth state entries. Caller must hold its lock."""
         now = datetime.now(timezone.utc)
-        expired_states = [
-            state
-            for state, data in self._oauth_states.items()
-            if data.get("expires_at") and data["expires_at"] <= now
-        ]
-        for state in expired_states:
-            del self._oauth_states[state]
+        heap = shard.expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, state = heapq.heappop(heap)
+            data = shard.states.get(state)
+            # Skip heap entries for states consumed or re-stored since
+            if data is None or data.get("expires_at") != expires_at:
+                continue
+            del shard.states[state]
             logger.debug(
                 "Removed expired OAuth state: %s",
                 state[:8] if len(state) > 8 else state,
@@ -228,15 +512,35 @@ class OAuth21SessionStore:
         if expires_in_seconds < 0:
             raise ValueError("expires_in_seconds must be non-negative")
 
-        with self._lock:
-            self._cleanup_expired_oauth_states_locked()
+        if self._backend is not None:
+            # The callback may reach another replica, so the state lives in the backend
+            now = datetime.now(timezone.utc)
+            self._backend.put_oauth_state(
+                state,
+                {
+                    "session_id": session_id,
+                    "expires_at": now + timedelta(seconds=expires_in_seconds),
+                    "created_at": now,
+                },
+                expires_in_seconds,
+            )
+            logger.debug(
+                "Stored OAuth state %s in session backend",
+                state[:8] if len(state) > 8 else state,
+            )
+            return
+
+        shard = self._oauth_state_shard(state)
+        with shard.lock:
+            self._cleanup_expired_oauth_states_locked(shard)
             now = datetime.now(timezone.utc)
             expiry = now + timedelta(seconds=expires_in_seconds)
-            self._oauth_states[state] = {
+            shard.states[state] = {
                 "session_id": session_id,
                 "expires_at": expiry,
                 "created_at": now,
             }
+            heapq.heappush(shard.expiry_heap, (expiry, state))
             logger.debug(
                 "Stored OAuth state %s (expires at %s)",
                 state[:8] if len(state) > 8 else state,
@@ -264,9 +568,28 @@ class OAuth21SessionStore:
         if not state:
             raise ValueError("Missing OAuth state parameter")
 
-        with self._lock:
-            self._cleanup_expired_oauth_states_locked()
-            state_info = self._oauth_states.get(state)
+        if self._backend is not None:
+            # GETDEL consumes the state atomically across replicas
+            state_info = self._backend.pop_oauth_state(state)
+            if not state_info or state_info["expires_at"] <= datetime.now(timezone.utc):
+                logger.error(
+                    "SECURITY: OAuth callback received unknown or expired state"
+                )
+                raise ValueError("Invalid or expired OAuth state parameter")
+            bound_session = state_info.get("session_id")
+            if bound_session and session_id and bound_session != session_id:
+                logger.error(
+                    "SECURITY: OAuth state session mismatch (expected %s, got %s)",
+                    bound_session,
+                    session_id,
+                )
+                raise ValueError("OAuth state does not match the initiating session")
+            return state_info
+
+        shard = self._oauth_state_shard(state)
+        with shard.lock:
+            self._cleanup_expired_oauth_states_locked(shard)
+            state_info = shard.states.get(state)
 
             if not state_info:
                 logger.error(
@@ -277,7 +600,7 @@ class OAuth21SessionStore:
             bound_session = state_info.get("session_id")
             if bound_session and session_id and bound_session != session_id:
                 # Consume the state to prevent replay attempts
-                del self._oauth_states[state]
+                del shard.states[state]
                 logger.error(
                     "SECURITY: OAuth state session mismatch (expected %s, got %s)",
                     bound_session,
@@ -286,7 +609,7 @@ class OAuth21SessionStore:
                 raise ValueError("OAuth state does not match the initiating session")
 
             # State is valid – consume it to prevent reuse
-            del self._oauth_states[state]
+            del shard.states[state]
             logger.debug(
                 "Validated OAuth state %s",
                 state[:8] if len(state) > 8 else state,
@@ -323,41 +646,62 @@ class OAuth21SessionStore:
             mcp_session_id: FastMCP session ID to map to this user
             issuer: Token issuer (e.g., "https://accounts.google.com")
         """
-        with self._lock:
-            normalized_expiry = _normalize_expiry_to_naive_utc(expiry)
-            session_info = {
-                "access_token": access_token,
-                "refresh_token": refresh_token,
-                "token_uri": token_uri,
-                "client_id": client_id,
-                "client_secret": client_secret,
-                "scopes": scopes or [],
-                "expiry": normalized_expiry,
-                "session_id": session_id,
-                "mcp_session_id": mcp_session_id,
-                "issuer": issuer,
-            }
+        normalized_expiry = _normalize_expiry_to_naive_utc(expiry)
+        session_info = {
+            "access_token": access_token,
+            "refresh_token": refresh_token,
+            "token_uri": token_uri,
+            "client_id": client_id,
+            "client_secret": client_secret,
+            "scopes": scopes or [],
+            "expiry": normalized_expiry,
+            "session_id": session_id,
+            "mcp_session_id": mcp_session_id,
+            "issuer": issuer,
+        }
 
-            self._sessions[user_email] = session_info
+        if mcp_session_id:
+            bound_user = self._session_auth_binding.get(mcp_session_id, user_email)
+            if bound_user == user_email and self._backend is not None:
+                # The backend decides between replicas
+                bound_user = self._backend.bind_session_id(mcp_session_id, user_email)
+            if bound_user != user_email:
+                self._reject_rebind(mcp_session_id, bound_user, user_email)
+
+        # Backend writes are network round trips; make them before taking the
+        # user's lock stripe so they never hold up other users on that stripe
+        if self._backend is not None:
+            self._backend.put_session(user_email, session_info)
+            if mcp_session_id:
+                self._backend.map_mcp_session(mcp_session_id, user_email)
+            if session_id:
+                self._backend.bind_session_id(session_id, user_email)
 
+        with self._lock_for(user_email):
             # Store MCP session mapping if provided
             if mcp_session_id:
                 # Create immutable session binding (first binding wins, cannot be changed)
-                if mcp_session_id not in self._session_auth_binding:
-                    self._session_auth_binding[mcp_session_id] = user_email
+                created = mcp_session_id not in self._session_auth_binding
+                bound_user = self._bind_session_id(mcp_session_id, user_email)
+                if bound_user != user_email:
+                    self._reject_rebind(mcp_session_id, bound_user, user_email)
+                if created:
                     logger.info(
                         f"Created immutable session binding: {mcp_session_id} -> {user_email}"
                     )
-                elif self._session_auth_binding[mcp_session_id] != user_email:
-                    # Security: Attempt to bind session to different user
-                    logger.error(
-                        f"SECURITY: Attempt to rebind session {mcp_session_id} from {self._session_auth_binding[mcp_session_id]} to {user_email}"
-                    )
-                    raise ValueError(
-                        f"Session {mcp_session_id} is already bound to a different user"
-                    )
 
+            if self._backend is not None:
+                self._near_cache_expiry[user_email] = (
+                    time.monotonic() + self.near_cache_ttl_seconds
+                )
+
+            self._set_session_locked(user_email, session_info)
+            self._last_access[user_email] = time.monotonic()
+            session_ids = self._user_session_ids.setdefault(user_email, set())
+
+            if mcp_session_id:
                 self._mcp_session_mapping[mcp_session_id] = user_email
+                session_ids.add(mcp_session_id)
                 logger.info(
                     f"Stored OAuth 2.1 session for {user_email} (session_id: {session_id}, mcp_session_id: {mcp_session_id})"
                 )
@@ -367,8 +711,11 @@ class OAuth21SessionStore:
                 )
 
             # Also create binding for the OAuth session ID
-            if session_id and session_id not in self._session_auth_binding:
-                self._session_auth_binding[session_id] = user_email
+            if (
+                session_id
+                and self._bind_session_id(session_id, user_email) == user_email
+            ):
+                session_ids.add(session_id)
 
     def get_credentials(self, user_email: str) -> Optional[Credentials]:
         """
@@ -380,30 +727,30 @@ class OAuth21SessionStore:
         Returns:
             Google Credentials object or None
         """
-        with self._lock:
-            session_info = self._sessions.get(user_email)
-            if not session_info:
-                logger.debug(f"No OAuth 2.1 session found for {user_email}")
-                return None
+        # Session records are replaced, never mutated, so this read needs no lock
+        session_info = self._session_record(user_email)
+        if not session_info:
+            logger.debug(f"No OAuth 2.1 session found for {user_email}")
+            return None
 
-            try:
-                # Create Google credentials from session info
-                credentials = Credentials(
-                    token=session_info["access_token"],
-                    refresh_token=session_info.get("refresh_token"),
-                    token_uri=session_info["token_uri"],
-                    client_id=session_info.get("client_id"),
-                    client_secret=session_info.get("client_secret"),
-                    scopes=session_info.get("scopes", []),
-                    expiry=session_info.get("expiry"),
-                )
+        try:
+            # Create Google credentials from session info
+            credentials = Credentials(
+                token=session_info["access_token"],
+                refresh_token=session_info.get("refresh_token"),
+                token_uri=session_info["token_uri"],
+                client_id=session_info.get("client_id"),
+                client_secret=session_info.get("client_secret"),
+                scopes=session_info.get("scopes", []),
+                expiry=session_info.get("expiry"),
+            )
 
-                logger.debug(f"Retrieved OAuth 2.1 credentials for {user_email}")
-                return credentials
+            logger.debug(f"Retrieved OAuth 2.1 credentials for {user_email}")
+            return credentials
 
-            except Exception as e:
-                logger.error(f"Failed to create credentials for {user_email}: {e}")
-                return None
+        except Exception as e:
+            logger.error(f"Failed to create credentials for {user_email}: {e}")
+            return None
 
     def get_credentials_by_mcp_session(
         self, mcp_session_id: str
@@ -417,15 +764,14 @@ class OAuth21SessionStore:
         Returns:
             Google Credentials object or None
         """
-        with self._lock:
-            # Look up user email from MCP session mapping
-            user_email = self._mcp_session_mapping.get(mcp_session_id)
-            if not user_email:
-                logger.debug(f"No user mapping found for MCP session {mcp_session_id}")
-                return None
+        # Look up user email from MCP session mapping
+        user_email = self._mcp_session_user(mcp_session_id)
+        if not user_email:
+            logger.debug(f"No user mapping found for MCP session {mcp_session_id}")
+            return None
 
-            logger.debug(f"Found user {user_email} for MCP session {mcp_session_id}")
-            return self.get_credentials(user_email)
+        logger.debug(f"Found user {user_email} for MCP session {mcp_session_id}")
+        return self.get_credentials(user_email)
 
     def get_credentials_with_validation(
         self,
@@ -448,72 +794,71 @@ class OAuth21SessionStore:
         Returns:
             Google Credentials object if validation passes, None otherwise
         """
-        with self._lock:
-            # Priority 1: Check auth token email (most secure, from verified JWT)
-            if auth_token_email:
-                if auth_token_email != requested_user_email:
+        # Priority 1: Check auth token email (most secure, from verified JWT)
+        if auth_token_email:
+            if auth_token_email != requested_user_email:
+                logger.error(
+                    f"SECURITY VIOLATION: Token for {auth_token_email} attempted to access "
+                    f"credentials for {requested_user_email}"
+                )
+                return None
+            # Token email matches, allow access
+            return self.get_credentials(requested_user_email)
+
+        # Priority 2: Check session binding
+        if session_id:
+            bound_user = self._bound_user(session_id)
+            if bound_user:
+                if bound_user != requested_user_email:
                     logger.error(
-                        f"SECURITY VIOLATION: Token for {auth_token_email} attempted to access "
-                        f"credentials for {requested_user_email}"
+                        f"SECURITY VIOLATION: Session {session_id} (bound to {bound_user}) "
+                        f"attempted to access credentials for {requested_user_email}"
                     )
                     return None
-                # Token email matches, allow access
+                # Session binding matches, allow access
                 return self.get_credentials(requested_user_email)
 
-            # Priority 2: Check session binding
-            if session_id:
-                bound_user = self._session_auth_binding.get(session_id)
-                if bound_user:
-                    if bound_user != requested_user_email:
-                        logger.error(
-                            f"SECURITY VIOLATION: Session {session_id} (bound to {bound_user}) "
-                            f"attempted to access credentials for {requested_user_email}"
-                        )
-                        return None
-                    # Session binding matches, allow access
-                    return self.get_credentials(requested_user_email)
-
-                # Check if this is an MCP session
-                mcp_user = self._mcp_session_mapping.get(session_id)
-                if mcp_user:
-                    if mcp_user != requested_user_email:
-                        logger.error(
-                            f"SECURITY VIOLATION: MCP session {session_id} (user {mcp_user}) "
-                            f"attempted to access credentials for {requested_user_email}"
-                        )
-                        return None
-                    # MCP session matches, allow access
-                    return self.get_credentials(requested_user_email)
-
-            # Special case: Allow access if user has recently authenticated (for clients that don't send tokens)
-            # CRITICAL SECURITY: This is ONLY allowed in stdio mode, NEVER in OAuth 2.1 mode
-            if allow_recent_auth and requested_user_email in self._sessions:
-                # Check transport mode to ensure this is only used in stdio
-                try:
-                    from core.config import get_transport_mode
-
-                    transport_mode = get_transport_mode()
-                    if transport_mode != "stdio":
-                        logger.error(
-                            f"SECURITY: Attempted to use allow_recent_auth in {transport_mode} mode. "
-                            f"This is only allowed in stdio mode!"
-                        )
-                        return None
-                except Exception as e:
-                    logger.error(f"Failed to check transport mode: {e}")
+            # Check if this is an MCP session
+            mcp_user = self._mcp_session_user(session_id)
+            if mcp_user:
+                if mcp_user != requested_user_email:
+                    logger.error(
+                        f"SECURITY VIOLATION: MCP session {session_id} (user {mcp_user}) "
+                        f"attempted to access credentials for {requested_user_email}"
+                    )
                     return None
-
-                logger.info(
-                    f"Allowing credential access for {requested_user_email} based on recent authentication "
-                    f"(stdio mode only - client not sending bearer token)"
-                )
+                # MCP session matches, allow access
                 return self.get_credentials(requested_user_email)
 
-            # No session or token info available - deny access for security
-            logger.warning(
-                f"Credential access denied for {requested_user_email}: No valid session or token"
+        # Special case: Allow access if user has recently authenticated (for clients that don't send tokens)
+        # CRITICAL SECURITY: This is ONLY allowed in stdio mode, NEVER in OAuth 2.1 mode
+        if allow_recent_auth and self._session_record(requested_user_email) is not None:
+            # Check transport mode to ensure this is only used in stdio
+            try:
+                from core.config import get_transport_mode
+
+                transport_mode = get_transport_mode()
+                if transport_mode != "stdio":
+                    logger.error(
+                        f"SECURITY: Attempted to use allow_recent_auth in {transport_mode} mode. "
+                        f"This is only allowed in stdio mode!"
+                    )
+                    return None
+            except Exception as e:
+                logger.error(f"Failed to check transport mode: {e}")
+                return None
+
+            logger.info(
+                f"Allowing credential access for {requested_user_email} based on recent authentication "
+                f"(stdio mode only - client not sending bearer token)"
             )
-            return None
+            return self.get_credentials(requested_user_email)
+
+        # No session or token info available - deny access for security
+        logger.warning(
+            f"Credential access denied for {requested_user_email}: No valid session or token"
+        )
+        return None
 
     def get_user_by_mcp_session(self, mcp_session_id: str) -> Optional[str]:
         """
@@ -525,8 +870,19 @@ class OAuth21SessionStore:
         Returns:
             User email or None
         """
-        with self._lock:
-            return self._mcp_session_mapping.get(mcp_session_id)
+        return self._mcp_session_user(mcp_session_id)
+
+    def get_user_by_access_token(self, access_token: str) -> Optional[str]:
+        """
+        Get the user whose stored session holds an access token.
+
+        Args:
+            access_token: OAuth access token
+
+        Returns:
+            User email or None
+        """
+        return self._access_token_users.get(hash_access_token(access_token))
 
     def get_session_info(self, user_email: str) -> Optional[Dict[str, Any]]:
         """
@@ -538,64 +894,310 @@ class OAuth21SessionStore:
         Returns:
             Session information dictionary or None
         """
-        with self._lock:
-            return self._sessions.get(user_email)
+        return self._session_record(user_email)
 
-    def remove_session(self, user_email: str):
-        """Remove session for a user."""
-        with self._lock:
-            if user_email in self._sessions:
-                # Get session IDs to clean up mappings
-                session_info = self._sessions.get(user_email, {})
-                mcp_session_id = session_info.get("mcp_session_id")
-                session_id = session_info.get("session_id")
-
-                # Remove from sessions
-                del self._sessions[user_email]
-
-                # Remove from MCP mapping if exists
-                if mcp_session_id and mcp_session_id in self._mcp_session_mapping:
-                    del self._mcp_session_mapping[mcp_session_id]
-                    # Also remove from auth binding
-                    if mcp_session_id in self._session_auth_binding:
-                        del self._session_auth_binding[mcp_session_id]
-                    logger.info(
-                        f"Removed OAuth 2.1 session for {user_email} and MCP mapping for {mcp_session_id}"
-                    )
+    def list_users(self) -> List[str]:
+        """List the emails of all users with a stored session."""
+        if self._backend is not None:
+            try:
+                return self._backend.list_users()
+            except Exception as e:
+                logger.warning(f"Session backend read failed listing users: {e}")
+        return list(self._sessions)
+
+    def update_session_tokens(
+        self,
+        user_email: str,
+        access_token: str,
+        expiry: Optional[Any] = None,
+        refresh_token: Optional[str] = None,
+    ) -> bool:
+        """
+        Update the tokens of an existing session in place, keeping its session bindings.
+
+        Args:
+            user_email: User's email address
+            access_token: New access token
+            expiry: New token expiry time
+            refresh_token: New refresh token, if it was rotated
+
+        Returns:
+            True if a session was updated, False if the user has no session
+        """
+        session_info = self._session_record(user_email)
+        if not session_info:
+            return False
+        # Replace the record so lock-free readers never see a half-updated session
+        session_info = dict(session_info)
+        session_info["access_token"] = access_token
+        session_info["expiry"] = _normalize_expiry_to_naive_utc(expiry)
+        if refresh_token:
+            session_info["refresh_token"] = refresh_token
+        if self._backend is not None:
+            self._backend.put_session(user_email, session_info)
+        with self._lock_for(user_email):
+            self._set_session_locked(user_email, session_info)
+        return True
+
+    def _drop_session_record_locked(self, user_email: str) -> Optional[Dict[str, Any]]:
+        """
+        Drop a user's session record, keeping the session IDs bound to them.
+
+        Caller must hold the user's lock stripe.
+
+        Returns:
+            The removed session record, or None
+        """
+        session_info = self._sessions.pop(user_email, None)
+        if session_info is not None:
+            self._unindex_access_token(session_info, user_email)
+        self._last_access.pop(user_email, None)
+        self._near_cache_expiry.pop(user_email, None)
+        return session_info
+
+    def _remove_user_locked(
+        self, user_email: str
+    ) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+        """
+        Drop a user's session and every session ID mapped or bound to them.
 
-                # Remove OAuth session binding if exists
-                if session_id and session_id in self._session_auth_binding:
-                    del self._session_auth_binding[session_id]
+        Caller must hold the user's lock stripe.
 
-                if not mcp_session_id:
-                    logger.info(f"Removed OAuth 2.1 session for {user_email}")
+        Returns:
+            Tuple of (removed session record or None, removed MCP session IDs)
+        """
+        session_info = self._drop_session_record_locked(user_email)
+        session_ids = self._user_session_ids.pop(user_email, set())
+
+        removed_mcp_sessions = []
+        for session_id in session_ids:
+            # Drop the mapping before the binding: while the binding exists no
+            # other user can claim the session ID
+            if self._mcp_session_mapping.get(session_id) == user_email:
+                self._mcp_session_mapping.pop(session_id, None)
+                removed_mcp_sessions.append(session_id)
+            if self._session_auth_binding.get(session_id) == user_email:
+                self._session_auth_binding.pop(session_id, None)
+        return session_info, removed_mcp_sessions
+
+    def remove_session(self, user_email: str):
+        """Remove session for a user, along with every session ID mapped or bound to them."""
+        if self._backend is not None:
+            self._backend.remove_user(user_email)
+        with self._lock_for(user_email):
+            session_info, removed_mcp_sessions = self._remove_user_locked(user_email)
+        with self._eviction_lock:
+            # An explicit removal must not be undone by rehydration
+            self._evicted_users.pop(user_email, None)
+
+        if session_info is not None:
+            if removed_mcp_sessions:
+                logger.info(
+                    f"Removed OAuth 2.1 session for {user_email} and MCP mapping for {', '.join(sorted(removed_mcp_sessions))}"
+                )
+            else:
+                logger.info(f"Removed OAuth 2.1 session for {user_email}")
+
+        # Rebuild (and re-store) credentials on the user's next call
+        get_access_token_credential_cache().invalidate_user(user_email)
 
     def has_session(self, user_email: str) -> bool:
         """Check if a user has an active session."""
-        with self._lock:
-            return user_email in self._sessions
+        return self._session_record(user_email) is not None
 
     def has_mcp_session(self, mcp_session_id: str) -> bool:
         """Check if an MCP session has an associated user session."""
-        with self._lock:
-            return mcp_session_id in self._mcp_session_mapping
+        return self._mcp_session_user(mcp_session_id) is not None
 
     def get_single_user_email(self) -> Optional[str]:
         """Return the sole authenticated user email when exactly one session exists."""
-        with self._lock:
-            if len(self._sessions) == 1:
-                return next(iter(self._sessions))
-            return None
+        users = self.list_users()
+        if len(users) == 1:
+            return users[0]
+        return None
+
+    def configure_eviction(
+        self,
+        max_sessions: Optional[int] = None,
+        idle_ttl_seconds: Optional[float] = None,
+    ) -> None:
+        """
+        Set the session cap and idle timeout enforced by sweep().
+
+        Args:
+            max_sessions: Max users kept in memory, or None for unbounded
+            idle_ttl_seconds: Evict users idle this long, or None to disable
+        """
+        self.max_sessions = max_sessions
+        self.idle_ttl_seconds = idle_ttl_seconds
+
+    def _evict(self, user_email: str, idle_before: Optional[float] = None) -> bool:
+        """
+        Evict a user to be rehydrated on next use; skip them if used since idle_before.
+
+        Only the session record (the tokens) is dropped. The user's MCP session
+        mappings and session bindings stay, so a bound session keeps resolving
+        to its user and cannot be claimed by anyone else while evicted.
+        """
+        with self._lock_for(user_email):
+            if idle_before is not None:
+                last_access = self._last_access.get(user_email)
+                if last_access is not None and last_access > idle_before:
+                    return False
+            session_info = self._drop_session_record_locked(user_email)
+        if session_info is None:
+            return False
+
+        with self._eviction_lock:
+            self._evicted_users[user_email] = {
+                "session_id": session_info.get("session_id"),
+                "mcp_session_id": session_info.get("mcp_session_id"),
+                "issuer": session_info.get("issuer"),
+            }
+            self._evicted_users.move_to_end(user_email)
+            while len(self._evicted_users) > _MAX_EVICTED_USERS_TRACKED:
+                self._evicted_users.popitem(last=False)
+        get_access_token_credential_cache().invalidate_user(user_email)
+        return True
+
+    def sweep(self) -> Dict[str, int]:
+        """
+        Evict idle users, then least recently used users beyond the session cap.
+
+        Also purges expired OAuth states. Normally run by the background sweeper.
+
+        Returns:
+            Counts of users evicted for being idle and for capacity
+        """
+        now = time.monotonic()
+        idle_evicted = 0
+        capacity_evicted = 0
+
+        if self.idle_ttl_seconds:
+            cutoff = now - self.idle_ttl_seconds
+            for user_email, last_access in list(self._last_access.items()):
+                if last_access <= cutoff and self._evict(user_email, cutoff):
+                    idle_evicted += 1
+
+        if self.max_sessions is not None:
+            excess = len(self._sessions) - self.max_sessions
+            if excess > 0:
+                victims = heapq.nsmallest(
+                    excess, list(self._last_access.items()), key=itemgetter(1)
+                )
+                for user_email, _ in victims:
+                    if self._evict(user_email):
+                        capacity_evicted += 1
+
+        for shard in self._oauth_state_shards:
+            with shard.lock:
+                self._cleanup_expired_oauth_states_locked(shard)
+
+        with self._eviction_lock:
+            self._sweeps += 1
+            self._idle_evictions += idle_evicted
+            self._capacity_evictions += capacity_evicted
+        if idle_evicted or capacity_evicted:
+            logger.info(
+                f"Evicted OAuth 2.1 sessions: {idle_evicted} idle, {capacity_evicted} over the cap "
+                f"({len(self._sessions)} remaining)"
+            )
+        return {"idle": idle_evicted, "capacity": capacity_evicted}
+
+    def _run_sweeper(self, interval_seconds: float) -> None:
+        while not self._sweeper_stop.wait(interval_seconds):
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"OAuth 2.1 session sweep failed: {e}", exc_info=True)
+
+    def start_sweeper(
+        self, interval_seconds: float = DEFAULT_SESSION_SWEEP_INTERVAL_SECONDS
+    ) -> None:
+        """Run sweep() every interval on a daemon thread (no-op if already running)."""
+        with self._eviction_lock:
+            if self._sweeper is not None and self._sweeper.is_alive():
+                return
+            self._sweeper_stop.clear()
+            self._sweeper = threading.Thread(
+                target=self._run_sweeper,
+                args=(interval_seconds,),
+                name="oauth21-session-sweeper",
+                daemon=True,
+            )
+            self._sweeper.start()
+        logger.info(
+            f"OAuth 2.1 session sweeper started (max_sessions={self.max_sessions}, "
+            f"idle_ttl={self.idle_ttl_seconds}s, interval={interval_seconds}s)"
+        )
+
+    def stop_sweeper(self) -> None:
+        """Stop the background sweeper."""
+        self._sweeper_stop.set()
+        with self._eviction_lock:
+            sweeper, self._sweeper = self._sweeper, None
+        if sweeper is not None:
+            sweeper.join()
+
+    def _approximate_memory_bytes(self) -> int:
+        """Rough size of the session data held in memory (containers, keys and values)."""
+        total = 0
+        for mapping in (
+            self._sessions,
+            self._mcp_session_mapping,
+            self._session_auth_binding,
+            self._user_session_ids,
+            self._last_access,
+            self._access_token_users,
+        ):
+            total += sys.getsizeof(mapping)
+        for user_email, session_info in list(self._sessions.items()):
+            total += sys.getsizeof(user_email) + sys.getsizeof(session_info)
+            total += sum(sys.getsizeof(value) for value in session_info.values())
+        for session_id in list(self._session_auth_binding):
+            total += sys.getsizeof(session_id)
+        return total
 
     def get_stats(self) -> Dict[str, Any]:
-        """Get store statistics."""
-        with self._lock:
-            return {
-                "total_sessions": len(self._sessions),
-                "users": list(self._sessions.keys()),
-                "mcp_session_mappings": len(self._mcp_session_mapping),
-                "mcp_sessions": list(self._mcp_session_mapping.keys()),
+        """Get store statistics, including memory use and evictions."""
+        users = list(self._sessions)
+        mcp_sessions = list(self._mcp_session_mapping)
+        pending_oauth_states = sum(
+            len(shard.states) for shard in self._oauth_state_shards
+        )
+        with self._eviction_lock:
+            eviction_stats = {
+                "max_sessions": self.max_sessions,
+                "idle_ttl_seconds": self.idle_ttl_seconds,
+                "sweeper_running": self._sweeper is not None
+                and self._sweeper.is_alive(),
+                "sweeps": self._sweeps,
+                "idle_evictions": self._idle_evictions,
+                "capacity_evictions": self._capacity_evictions,
+                "rehydrations": self._rehydrations,
+                "evicted_users_tracked": len(self._evicted_users),
             }
+        return {
+            "total_sessions": len(users),
+            "users": users,
+            "mcp_session_mappings": len(mcp_sessions),
+            "mcp_sessions": mcp_sessions,
+            "session_bindings": len(self._session_auth_binding),
+            "pending_oauth_states": pending_oauth_states,
+            "lock_stripes": len(self._stripes),
+            "backend": type(self._backend).__name__ if self._backend else "memory",
+            "approx_memory_bytes": self._approximate_memory_bytes(),
+            "eviction": eviction_stats,
+        }
+
+
+def _load_credentials_for_rehydration(user_email: str) -> Optional[Credentials]:
+    """Load a user's credentials from the configured credential store."""
+    if is_stateless_mode():
+        return None
+    from auth.credential_store import get_credential_store
+
+    return get_credential_store().get_credential(user_email)
 
 
 # Global instance
@@ -607,6 +1209,94 @@ def get_oauth21_session_store() -> OAuth21SessionStore:
     return _global_store
 
 
+async def run_session_store_call(func: Callable[..., Any], *args: Any, **kwargs: Any):
+    """
+    Call a session store method, or a function that uses the store, from async code.
+
+    With a shared backend the store makes synchronous network round trips, so
+    the call runs on the blocking-call executor instead of the event loop.
+    Without one everything is in memory and the call runs inline.
+    """
+    if not get_oauth21_session_store().has_backend:
+        return func(*args, **kwargs)
+    return await run_blocking(func, *args, **kwargs)
+
+
+def configure_session_backend() -> bool:
+    """
+    Attach the session backend selected by environment configuration to the global store.
+
+    Environment variables:
+        WORKSPACE_MCP_SESSION_BACKEND: "memory" (default) or "valkey"
+        WORKSPACE_MCP_SESSION_NEAR_CACHE_TTL: Seconds a session read from the
+            backend is served from memory
+
+    Returns:
+        True if a shared backend is in use
+    """
+    from auth.session_backend import create_session_backend
+
+    backend = create_session_backend()
+    if backend is None:
+        return False
+    get_oauth21_session_store().set_backend(
+        backend,
+        near_cache_ttl_seconds=float(
+            os.getenv(
+                "WORKSPACE_MCP_SESSION_NEAR_CACHE_TTL",
+                str(DEFAULT_NEAR_CACHE_TTL_SECONDS),
+            )
+        ),
+    )
+    return True
+
+
+def get_session_eviction_settings() -> Dict[str, Any]:
+    """
+    Read session eviction configuration from the environment.
+
+    Environment variables:
+        WORKSPACE_MCP_SESSION_MAX: Max users held in memory (0 = unbounded)
+        WORKSPACE_MCP_SESSION_IDLE_TTL: Seconds before an unused session is evicted (0 = never)
+        WORKSPACE_MCP_SESSION_SWEEP_INTERVAL: Seconds between eviction sweeps
+    """
+    max_sessions = int(
+        os.getenv("WORKSPACE_MCP_SESSION_MAX", str(DEFAULT_MAX_SESSIONS))
+    )
+    idle_ttl = float(
+        os.getenv(
+            "WORKSPACE_MCP_SESSION_IDLE_TTL", str(DEFAULT_SESSION_IDLE_TTL_SECONDS)
+        )
+    )
+    return {
+        "max_sessions": max_sessions if max_sessions > 0 else None,
+        "idle_ttl_seconds": idle_ttl if idle_ttl > 0 else None,
+        "sweep_interval_seconds": float(
+            os.getenv(
+                "WORKSPACE_MCP_SESSION_SWEEP_INTERVAL",
+                str(DEFAULT_SESSION_SWEEP_INTERVAL_SECONDS),
+            )
+        ),
+    }
+
+
+def start_session_sweeper() -> bool:
+    """
+    Apply the configured session limits and start the background sweeper.
+
+    Returns:
+        True if the sweeper was started, False if no limits are configured
+    """
+    settings = get_session_eviction_settings()
+    store = get_oauth21_session_store()
+    store.configure_eviction(settings["max_sessions"], settings["idle_ttl_seconds"])
+    if settings["max_sessions"] is None and settings["idle_ttl_seconds"] is None:
+        logger.info("OAuth 2.1 session eviction disabled")
+        return False
+    store.start_sweeper(settings["sweep_interval_seconds"])
+    return True
+
+
 # =============================================================================
 # Google Credentials Bridge (absorbed from oauth21_google_bridge.py)
 # =============================================================================
@@ -659,6 +1349,196 @@ def _resolve_client_credentials() -> Tuple[Optional[str], Optional[str]]:
     return client_id, client_secret
 
 
+# Default access-token credential cache configuration (overridable via environment variables)
+DEFAULT_TOKEN_CREDENTIAL_CACHE_TTL_SECONDS = 300.0
+DEFAULT_TOKEN_CREDENTIAL_CACHE_MAX_ENTRIES = 1024
+# Stop serving cached credentials this long before the token itself expires
+_TOKEN_EXPIRY_SKEW_SECONDS = 30.0
+
+
+def hash_access_token(token: str) -> str:
+    """Hash a bearer token for use as a cache key, so raw tokens are never kept as keys."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class _CachedTokenCredentials:
+    __slots__ = ("credentials", "user_email", "mcp_session_id", "expires_at")
+
+    def __init__(
+        self,
+        credentials: Credentials,
+        user_email: Optional[str],
+        mcp_session_id: Optional[str],
+        expires_at: float,
+    ):
+        self.credentials = credentials
+        self.user_email = user_email
+        self.mcp_session_id = mcp_session_id
+        self.expires_at = expires_at
+
+
+class AccessTokenCredentialCache:
+    """
+    Short-lived cache of Google credentials built from OAuth 2.1 bearer tokens.
+
+    Entries are keyed by a SHA-256 hash of the token and live for at most
+    ``ttl_seconds``, and never past the token's own expiry. The cache is
+    LRU-bounded and uses its own lock, independent of the session store's.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_TOKEN_CREDENTIAL_CACHE_TTL_SECONDS,
+        max_entries: int = DEFAULT_TOKEN_CREDENTIAL_CACHE_MAX_ENTRIES,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[str, _CachedTokenCredentials]" = OrderedDict()
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get(
+        self,
+        token: str,
+        user_email: Optional[str],
+        mcp_session_id: Optional[str],
+    ) -> Optional[Credentials]:
+        """
+        Get cached credentials for a token, if they were stored for the same user and session.
+
+        Returns:
+            The cached Credentials, or None on a miss
+        """
+        if self.ttl_seconds <= 0:
+            return None
+        key = hash_access_token(token)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= now:
+                del self._entries[key]
+                entry = None
+            if (
+                entry is None
+                or entry.user_email != user_email
+                or entry.mcp_session_id != mcp_session_id
+            ):
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry.credentials
+
+    def put(
+        self,
+        token: str,
+        credentials: Credentials,
+        user_email: Optional[str],
+        mcp_session_id: Optional[str],
+    ) -> None:
+        """Cache credentials built from a token, bounded by the token's expiry."""
+        ttl = self.ttl_seconds
+        if credentials.expiry is not None:
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            remaining = (
+                credentials.expiry - now
+            ).total_seconds() - _TOKEN_EXPIRY_SKEW_SECONDS
+            ttl = min(ttl, remaining)
+        if ttl <= 0:
+            return
+
+        key = hash_access_token(token)
+        entry = _CachedTokenCredentials(
+            credentials, user_email, mcp_session_id, time.monotonic() + ttl
+        )
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, token: str) -> None:
+        """Drop the cached credentials for a token (e.g. after Google rejected it)."""
+        with self._lock:
+            self._entries.pop(hash_access_token(token), None)
+
+    def invalidate_user(self, user_email: str) -> None:
+        """Drop every cached entry for a user."""
+        with self._lock:
+            for key in [
+                key
+                for key, entry in self._entries.items()
+                if entry.user_email == user_email
+            ]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": (self._hits / lookups) if lookups else 0.0,
+            }
+
+
+# Global access-token credential cache
+_token_credential_cache: Optional[AccessTokenCredentialCache] = None
+_token_credential_cache_lock = Lock()
+
+
+def get_access_token_credential_cache() -> AccessTokenCredentialCache:
+    """
+    Get the global access-token credential cache, creating it from environment configuration.
+
+    Environment variables:
+        WORKSPACE_MCP_TOKEN_CREDENTIAL_CACHE_TTL: Max seconds to reuse credentials (0 disables)
+        WORKSPACE_MCP_TOKEN_CREDENTIAL_CACHE_SIZE: Max number of cached tokens
+    """
+    global _token_credential_cache
+
+    if _token_credential_cache is None:
+        with _token_credential_cache_lock:
+            if _token_credential_cache is None:
+                _token_credential_cache = AccessTokenCredentialCache(
+                    ttl_seconds=float(
+                        os.getenv(
+                            "WORKSPACE_MCP_TOKEN_CREDENTIAL_CACHE_TTL",
+                            str(DEFAULT_TOKEN_CREDENTIAL_CACHE_TTL_SECONDS),
+                        )
+                    ),
+                    max_entries=int(
+                        os.getenv(
+                            "WORKSPACE_MCP_TOKEN_CREDENTIAL_CACHE_SIZE",
+                            str(DEFAULT_TOKEN_CREDENTIAL_CACHE_MAX_ENTRIES),
+                        )
+                    ),
+                )
+
+    return _token_credential_cache
+
+
+def set_access_token_credential_cache(cache: Optional[AccessTokenCredentialCache]):
+    """
+    Set the global access-token credential cache.
+
+    Args:
+        cache: Cache to use, or None to rebuild from configuration
+    """
+    global _token_credential_cache
+    _token_credential_cache = cache
+
+
 def _build_credentials_from_provider(
     access_token: AccessToken,
 ) -> Optional[Credentials]:
@@ -708,7 +1588,13 @@ def ensure_session_from_access_token(
     user_email: Optional[str],
     mcp_session_id: Optional[str] = None,
 ) -> Optional[Credentials]:
-    """Ensure credentials derived from an access token are cached and returned."""
+    """
+    Ensure credentials derived from an access token are cached and returned.
+
+    Credentials are cached per token (see AccessTokenCredentialCache), so the
+    object is built and the session store written only when the token, user
+    or MCP session changes.
+    """
 
     if not access_token:
         return None
@@ -717,6 +1603,11 @@ def ensure_session_from_access_token(
     if not email and getattr(access_token, "claims", None):
         email = access_token.claims.get("email")
 
+    cache = get_access_token_credential_cache()
+    cached = cache.get(access_token.token, email, mcp_session_id)
+    if cached is not None:
+        return cached
+
     credentials = _build_credentials_from_provider(access_token)
     store_expiry: Optional[datetime] = None
 
@@ -763,7 +1654,10 @@ def ensure_session_from_access_token(
             )
         except Exception as exc:  # pragma: no cover - defensive
             logger.debug(f"Failed to cache credentials for {email}: {exc}")
+            # Retry the store write on the next call rather than caching past it
+            return credentials
 
+    cache.put(access_token.token, credentials, email, mcp_session_id)
     return credentials
 
 
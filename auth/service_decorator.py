@@ -7,20 +7,27 @@ from typing import Dict, List, Optional, Any, Callable, Union, Tuple
 from contextlib import ExitStack
 
 from google.auth.exceptions import RefreshError
-from googleapiclient.discovery import build
 from fastmcp.server.dependencies import get_access_token, get_context
 from auth.google_auth import get_authenticated_google_service, GoogleAuthenticationError
+from auth.service_pool import get_service_pool, release_service
 from auth.oauth21_session_store import (
     get_auth_provider,
     get_oauth21_session_store,
     ensure_session_from_access_token,
+    run_session_store_call,
 )
 from auth.oauth_config import (
     is_oauth21_enabled,
     get_oauth_config,
     is_external_oauth21_provider,
 )
-from core.context import set_fastmcp_session_id
+from core.context import (
+    reset_current_tool_name,
+    reset_current_user_email,
+    set_current_tool_name,
+    set_current_user_email,
+    set_fastmcp_session_id,
+)
 from auth.scopes import (
     GMAIL_READONLY_SCOPE,
     GMAIL_SEND_SCOPE,
@@ -136,7 +143,7 @@ def _override_oauth21_user_email(
     current_user_email: str,
     args: tuple,
     kwargs: dict,
-    param_names: List[str],
+    user_email_index: Optional[int],
     tool_name: str,
     service_type: str = "",
 ) -> Tuple[str, tuple]:
@@ -161,11 +168,8 @@ def _override_oauth21_user_email(
         kwargs["user_google_email"] = authenticated_user
 
     # Update in args if user_google_email is passed positionally
-    try:
-        user_email_index = param_names.index("user_google_email")
+    if user_email_index is not None:
         args = _update_email_in_args(args, user_email_index, authenticated_user)
-    except ValueError:
-        pass  # user_google_email not in positional parameters
 
     return authenticated_user, args
 
@@ -247,8 +251,8 @@ async def get_authenticated_google_service_oauth21(
                 f"Authenticated account {token_email} does not match requested user {user_google_email}."
             )
 
-        credentials = ensure_session_from_access_token(
-            access_token, resolved_email, session_id
+        credentials = await run_session_store_call(
+            ensure_session_from_access_token, access_token, resolved_email, session_id
         )
         if not credentials:
             raise GoogleAuthenticationError(
@@ -264,14 +268,17 @@ async def get_authenticated_google_service_oauth21(
                 f"OAuth credentials lack required scopes. Need: {required_scopes}, Have: {sorted(scopes_available)}"
             )
 
-        service = build(service_name, version, credentials=credentials)
+        service = get_service_pool().acquire(
+            resolved_email, service_name, version, credentials
+        )
         logger.info(f"[{tool_name}] Authenticated {service_name} for {resolved_email}")
         return service, resolved_email
 
     store = get_oauth21_session_store()
 
     # Use the validation method to ensure session can only access its own credentials
-    credentials = store.get_credentials_with_validation(
+    credentials = await run_session_store_call(
+        store.get_credentials_with_validation,
         requested_user_email=user_google_email,
         session_id=session_id,
         auth_token_email=auth_token_email,
@@ -294,7 +301,9 @@ async def get_authenticated_google_service_oauth21(
             f"OAuth 2.1 credentials lack required scopes. Need: {required_scopes}, Have: {sorted(scopes_available)}"
         )
 
-    service = build(service_name, version, credentials=credentials)
+    service = get_service_pool().acquire(
+        user_google_email, service_name, version, credentials
+    )
     logger.info(f"[{tool_name}] Authenticated {service_name} for {user_google_email}")
 
     return service, user_google_email
@@ -324,7 +333,7 @@ def _extract_oauth21_user_email(
 
 
 def _extract_oauth20_user_email(
-    args: tuple, kwargs: dict, wrapper_sig: inspect.Signature
+    args: tuple, kwargs: dict, plan: "_ToolCallPlan"
 ) -> str:
     """
     Extract user email for OAuth 2.0 mode from function arguments.
@@ -332,7 +341,7 @@ def _extract_oauth20_user_email(
     Args:
         args: Positional arguments passed to wrapper
         kwargs: Keyword arguments passed to wrapper
-        wrapper_sig: Function signature for parameter binding
+        plan: The tool's call plan, locating the user_google_email parameter
 
     Returns:
         User email string
@@ -340,10 +349,13 @@ def _extract_oauth20_user_email(
     Raises:
         Exception: If user_google_email parameter not found
     """
-    bound_args = wrapper_sig.bind(*args, **kwargs)
-    bound_args.apply_defaults()
+    if "user_google_email" in kwargs:
+        user_google_email = kwargs["user_google_email"]
+    elif plan.user_email_index is not None and plan.user_email_index < len(args):
+        user_google_email = args[plan.user_email_index]
+    else:
+        user_google_email = plan.user_email_default
 
-    user_google_email = bound_args.arguments.get("user_google_email")
     if not user_google_email:
         raise Exception("'user_google_email' parameter is required but was not found.")
     return user_google_email
@@ -442,6 +454,82 @@ def _resolve_scopes(scopes: Union[str, List[str]]) -> List[str]:
     return resolved
 
 
+class _ServicePlan:
+    """A service a tool needs, with its name, version and scopes resolved."""
+
+    __slots__ = (
+        "service_type",
+        "service_name",
+        "service_version",
+        "scopes",
+        "param_name",
+    )
+
+    def __init__(
+        self,
+        service_type: str,
+        scopes: Union[str, List[str]],
+        version: Optional[str] = None,
+        param_name: Optional[str] = None,
+    ):
+        if service_type not in SERVICE_CONFIGS:
+            raise ValueError(f"Unknown service type: {service_type}")
+        config = SERVICE_CONFIGS[service_type]
+        self.service_type = service_type
+        self.service_name = config["service"]
+        self.service_version = version or config["version"]
+        self.scopes = _resolve_scopes(scopes)
+        self.param_name = param_name
+
+
+class _ToolCallPlan:
+    """
+    Everything the service decorators need about a tool, compiled once.
+
+    Scopes, service configuration, the OAuth mode and the position of the
+    user_google_email parameter do not change between calls, so they are
+    resolved when the tool is decorated rather than on every invocation.
+    """
+
+    __slots__ = (
+        "tool_name",
+        "oauth21",
+        "wrapper_sig",
+        "services",
+        "required_scopes",
+        "user_email_index",
+        "user_email_default",
+    )
+
+    def __init__(
+        self,
+        func: Callable,
+        wrapper_sig: inspect.Signature,
+        services: List[_ServicePlan],
+    ):
+        self.tool_name = func.__name__
+        # The wrapper signature already depends on the mode, so it is fixed here too
+        self.oauth21 = is_oauth21_enabled()
+        self.wrapper_sig = wrapper_sig
+        self.services = services
+        self.required_scopes = [
+            scope for service in services for scope in service.scopes
+        ]
+
+        self.user_email_index: Optional[int] = None
+        self.user_email_default: Any = None
+        for index, param in enumerate(wrapper_sig.parameters.values()):
+            if param.name != "user_google_email":
+                continue
+            if param.kind in (
+                inspect.Parameter.POSITIONAL_ONLY,
+                inspect.Parameter.POSITIONAL_OR_KEYWORD,
+            ):
+                self.user_email_index = index
+            if param.default is not inspect.Parameter.empty:
+                self.user_email_default = param.default
+
+
 def _handle_token_refresh_error(
     error: RefreshError, user_email: str, service_name: str
 ) -> str:
@@ -561,6 +649,12 @@ def require_google_service(
             # Only remove 'service' parameter for OAuth 2.0 mode
             wrapper_sig = original_sig.replace(parameters=params[1:])
 
+        plan = _ToolCallPlan(
+            func, wrapper_sig, [_ServicePlan(service_type, scopes, version)]
+        )
+        service_plan = plan.services[0]
+        tool_name = plan.tool_name
+
         @wraps(func)
         async def wrapper(*args, **kwargs):
             # Note: `args` and `kwargs` are now the arguments for the *wrapper*,
@@ -568,65 +662,50 @@ def require_google_service(
 
             # Get authentication context early to determine OAuth mode
             authenticated_user, auth_method, mcp_session_id = _get_auth_context(
-                func.__name__
+                tool_name
             )
 
             # Extract user_google_email based on OAuth mode
-            if is_oauth21_enabled():
+            if plan.oauth21:
                 user_google_email = _extract_oauth21_user_email(
-                    authenticated_user, func.__name__
+                    authenticated_user, tool_name
                 )
             else:
-                user_google_email = _extract_oauth20_user_email(
-                    args, kwargs, wrapper_sig
-                )
-
-            # Get service configuration from the decorator's arguments
-            if service_type not in SERVICE_CONFIGS:
-                raise Exception(f"Unknown service type: {service_type}")
-
-            config = SERVICE_CONFIGS[service_type]
-            service_name = config["service"]
-            service_version = version or config["version"]
-
-            # Resolve scopes
-            resolved_scopes = _resolve_scopes(scopes)
+                user_google_email = _extract_oauth20_user_email(args, kwargs, plan)
 
             try:
-                tool_name = func.__name__
-
                 # Log authentication status
-                logger.debug(
-                    f"[{tool_name}] Auth: {authenticated_user or 'none'} via {auth_method or 'none'} (session: {mcp_session_id[:8] if mcp_session_id else 'none'})"
-                )
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        f"[{tool_name}] Auth: {authenticated_user or 'none'} via {auth_method or 'none'} (session: {mcp_session_id[:8] if mcp_session_id else 'none'})"
+                    )
 
                 # Detect OAuth version
-                use_oauth21 = _detect_oauth_version(
-                    authenticated_user, mcp_session_id, tool_name
+                use_oauth21 = plan.oauth21 and await run_session_store_call(
+                    _detect_oauth_version, authenticated_user, mcp_session_id, tool_name
                 )
 
                 # In OAuth 2.1 mode, user_google_email is already set to authenticated_user
                 # In OAuth 2.0 mode, we may need to override it
-                if not is_oauth21_enabled():
-                    wrapper_params = list(wrapper_sig.parameters.keys())
+                if not plan.oauth21:
                     user_google_email, args = _override_oauth21_user_email(
                         use_oauth21,
                         authenticated_user,
                         user_google_email,
                         args,
                         kwargs,
-                        wrapper_params,
+                        plan.user_email_index,
                         tool_name,
                     )
 
                 # Authenticate service
                 service, actual_user_email = await _authenticate_service(
                     use_oauth21,
-                    service_name,
-                    service_version,
+                    service_plan.service_name,
+                    service_plan.service_version,
                     tool_name,
                     user_google_email,
-                    resolved_scopes,
+                    service_plan.scopes,
                     mcp_session_id,
                     authenticated_user,
                 )
@@ -634,32 +713,37 @@ def require_google_service(
                 logger.error(
                     f"[{tool_name}] GoogleAuthenticationError during authentication. "
                     f"Method={auth_method or 'none'}, User={authenticated_user or 'none'}, "
-                    f"Service={service_name} v{service_version}, MCPSessionID={mcp_session_id or 'none'}: {e}"
+                    f"Service={service_plan.service_name} v{service_plan.service_version}, MCPSessionID={mcp_session_id or 'none'}: {e}"
                 )
                 # Re-raise the original error without wrapping it
                 raise
 
+            # Attribute blocking Google work in this call to the user and tool
+            user_token = set_current_user_email(actual_user_email)
+            tool_token = set_current_tool_name(tool_name)
             try:
                 # In OAuth 2.1 mode, we need to add user_google_email to kwargs since it was removed from signature
-                if is_oauth21_enabled():
+                if plan.oauth21:
                     kwargs["user_google_email"] = user_google_email
 
                 # Prepend the fetched service object to the original arguments
                 return await func(service, *args, **kwargs)
             except RefreshError as e:
                 error_message = _handle_token_refresh_error(
-                    e, actual_user_email, service_name
+                    e, actual_user_email, service_plan.service_name
                 )
                 raise GoogleAuthenticationError(error_message)
             finally:
+                reset_current_tool_name(tool_token)
+                reset_current_user_email(user_token)
                 if service:
-                    service.close()
+                    release_service(service)
 
         # Set the wrapper's signature to the one without 'service'
         wrapper.__signature__ = wrapper_sig
 
         # Conditionally modify docstring to remove user_google_email parameter documentation
-        if is_oauth21_enabled():
+        if plan.oauth21:
             logger.debug(
                 "OAuth 2.1 mode enabled, removing user_google_email from docstring"
             )
@@ -667,7 +751,8 @@ def require_google_service(
                 wrapper.__doc__ = _remove_user_email_arg_from_docstring(func.__doc__)
 
         # Attach required scopes to the wrapper for tool filtering
-        wrapper._required_google_scopes = _resolve_scopes(scopes)
+        wrapper._required_google_scopes = list(plan.required_scopes)
+        wrapper._tool_call_plan = plan
 
         return wrapper
 
@@ -708,86 +793,83 @@ def require_multiple_services(service_configs: List[Dict[str, Any]]):
             ]
 
         wrapper_sig = original_sig.replace(parameters=filtered_params)
-        wrapper_param_names = [p.name for p in filtered_params]
+        plan = _ToolCallPlan(
+            func,
+            wrapper_sig,
+            [
+                _ServicePlan(
+                    config["service_type"],
+                    config["scopes"],
+                    config.get("version"),
+                    config["param_name"],
+                )
+                for config in service_configs
+            ],
+        )
+        tool_name = plan.tool_name
 
         @wraps(func)
         async def wrapper(*args, **kwargs):
             # Get authentication context early
-            tool_name = func.__name__
             authenticated_user, _, mcp_session_id = _get_auth_context(tool_name)
 
             # Extract user_google_email based on OAuth mode
-            if is_oauth21_enabled():
+            if plan.oauth21:
                 user_google_email = _extract_oauth21_user_email(
                     authenticated_user, tool_name
                 )
             else:
-                user_google_email = _extract_oauth20_user_email(
-                    args, kwargs, wrapper_sig
-                )
+                user_google_email = _extract_oauth20_user_email(args, kwargs, plan)
+
+            # Detect OAuth version (simplified for multiple services)
+            use_oauth21 = plan.oauth21 and authenticated_user is not None
 
             # Authenticate all services
             with ExitStack() as stack:
-                for config in service_configs:
-                    service_type = config["service_type"]
-                    scopes = config["scopes"]
-                    param_name = config["param_name"]
-                    version = config.get("version")
-
-                    if service_type not in SERVICE_CONFIGS:
-                        raise Exception(f"Unknown service type: {service_type}")
-
-                    service_config = SERVICE_CONFIGS[service_type]
-                    service_name = service_config["service"]
-                    service_version = version or service_config["version"]
-                    resolved_scopes = _resolve_scopes(scopes)
-
+                for service_plan in plan.services:
                     try:
-                        # Detect OAuth version (simplified for multiple services)
-                        use_oauth21 = (
-                            is_oauth21_enabled() and authenticated_user is not None
-                        )
-
                         # In OAuth 2.0 mode, we may need to override user_google_email
-                        if not is_oauth21_enabled():
+                        if not plan.oauth21:
                             user_google_email, args = _override_oauth21_user_email(
                                 use_oauth21,
                                 authenticated_user,
                                 user_google_email,
                                 args,
                                 kwargs,
-                                wrapper_param_names,
+                                plan.user_email_index,
                                 tool_name,
-                                service_type,
+                                service_plan.service_type,
                             )
 
                         # Authenticate service
                         service, _ = await _authenticate_service(
                             use_oauth21,
-                            service_name,
-                            service_version,
+                            service_plan.service_name,
+                            service_plan.service_version,
                             tool_name,
                             user_google_email,
-                            resolved_scopes,
+                            service_plan.scopes,
                             mcp_session_id,
                             authenticated_user,
                         )
 
                         # Inject service with specified parameter name
-                        kwargs[param_name] = service
-                        stack.callback(service.close)
+                        kwargs[service_plan.param_name] = service
+                        stack.callback(release_service, service)
 
                     except GoogleAuthenticationError as e:
                         logger.error(
-                            f"[{tool_name}] GoogleAuthenticationError for service '{service_type}' (user: {user_google_email}): {e}"
+                            f"[{tool_name}] GoogleAuthenticationError for service '{service_plan.service_type}' (user: {user_google_email}): {e}"
                         )
                         # Re-raise the original error without wrapping it
                         raise
 
                 # Call the original function with refresh error handling
+                user_token = set_current_user_email(user_google_email)
+                tool_token = set_current_tool_name(tool_name)
                 try:
                     # In OAuth 2.1 mode, we need to add user_google_email to kwargs since it was removed from signature
-                    if is_oauth21_enabled():
+                    if plan.oauth21:
                         kwargs["user_google_email"] = user_google_email
 
                     return await func(*args, **kwargs)
@@ -797,12 +879,15 @@ def require_multiple_services(service_configs: List[Dict[str, Any]]):
                         e, user_google_email, "Multiple Services"
                     )
                     raise GoogleAuthenticationError(error_message)
+                finally:
+                    reset_current_tool_name(tool_token)
+                    reset_current_user_email(user_token)
 
         # Set the wrapper's signature
         wrapper.__signature__ = wrapper_sig
 
         # Conditionally modify docstring to remove user_google_email parameter documentation
-        if is_oauth21_enabled():
+        if plan.oauth21:
             logger.debug(
                 "OAuth 2.1 mode enabled, removing user_google_email from docstring"
             )
@@ -810,10 +895,8 @@ def require_multiple_services(service_configs: List[Dict[str, Any]]):
                 wrapper.__doc__ = _remove_user_email_arg_from_docstring(func.__doc__)
 
         # Attach all required scopes to the wrapper for tool filtering
-        all_scopes = []
-        for config in service_configs:
-            all_scopes.extend(_resolve_scopes(config["scopes"]))
-        wrapper._required_google_scopes = all_scopes
+        wrapper._required_google_scopes = list(plan.required_scopes)
+        wrapper._tool_call_plan = plan
 
         return wrapper
 
@@ -0,0 +1,293 @@
+"""
+Google API Service Pool
+
+This module keeps built googleapiclient service objects around between tool
+calls so that each call does not have to rebuild the client and set up a new
+HTTP transport.
+
+Services are leased to one caller at a time because each one carries the
+credentials of the call that leased it (and, with the httplib2 transport, its
+own non-thread-safe connection). When a caller is done the service is released
+back into the pool, where it stays idle until it is reused, expires, or is
+evicted to make room for another entry.
+"""
+
+import hashlib
+import logging
+import os
+import time
+import weakref
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.oauth2.credentials import Credentials
+
+from core.discovery import build_service
+
+logger = logging.getLogger(__name__)
+
+# Default pool configuration (overridable via environment variables)
+DEFAULT_POOL_MAX_SIZE = 64
+DEFAULT_POOL_IDLE_TTL_SECONDS = 300.0
+
+PoolKey = Tuple[str, str, str, str]
+
+
+def _credential_identity(credentials: Credentials) -> str:
+    """
+    Derive a stable identity for a set of credentials.
+
+    The refresh token (plus client ID) identifies a grant across access token
+    refreshes, so a refreshed credential maps to the same pool entry. Access-token
+    only credentials fall back to hashing the access token itself.
+    """
+    refresh_token = getattr(credentials, "refresh_token", None)
+    if refresh_token:
+        material = f"rt:{getattr(credentials, 'client_id', None) or ''}:{refresh_token}"
+    else:
+        material = f"at:{getattr(credentials, 'token', None) or ''}"
+    return hashlib.sha256(material.encode()).hexdigest()[:16]
+
+
+class GoogleServicePool:
+    """
+    Bounded, thread-safe pool of built Google API service objects.
+
+    Entries are keyed by (user, service, version, credential identity). Idle
+    services are evicted least-recently-used first once the pool is full, and
+    expire after sitting idle for longer than the configured TTL.
+    """
+
+    def __init__(
+        self,
+        max_size: int = DEFAULT_POOL_MAX_SIZE,
+        idle_ttl_seconds: float = DEFAULT_POOL_IDLE_TTL_SECONDS,
+    ):
+        self.max_size = max(0, max_size)
+        self.idle_ttl_seconds = idle_ttl_seconds
+        # Maps pool key -> list of (service, released_at) idle entries, LRU order
+        self._idle: "OrderedDict[PoolKey, List[Tuple[Any, float]]]" = OrderedDict()
+        self._idle_count = 0
+        # Maps leased service -> pool key so release() knows where it belongs
+        self._leased: "weakref.WeakKeyDictionary[Any, PoolKey]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = Lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._credential_swaps = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0
+
+    def _build(self, service_name: str, version: str, credentials: Credentials):
+        return build_service(service_name, version, credentials=credentials)
+
+    @staticmethod
+    def _swap_credentials(service: Any, credentials: Credentials) -> bool:
+        """Point a pooled service at a newer credentials object without rebuilding."""
+        http = getattr(service, "_http", None)
+        if http is None or not hasattr(http, "credentials"):
+            return False
+        if http.credentials is credentials:
+            return False
+        http.credentials = credentials
+        return True
+
+    def _close(self, service: Any) -> None:
+        try:
+            service.close()
+        except Exception as e:  # pragma: no cover - defensive
+            logger.debug(f"Error closing pooled service: {e}")
+
+    def _purge_expired_locked(self, now: float) -> List[Any]:
+        """Drop idle entries older than the TTL. Caller must hold lock."""
+        expired: List[Any] = []
+        if self.idle_ttl_seconds <= 0:
+            return expired
+        cutoff = now - self.idle_ttl_seconds
+        for key in list(self._idle.keys()):
+            entries = self._idle[key]
+            fresh = [(svc, ts) for svc, ts in entries if ts > cutoff]
+            if len(fresh) != len(entries):
+                expired.extend(svc for svc, ts in entries if ts <= cutoff)
+                if fresh:
+                    self._idle[key] = fresh
+                else:
+                    del self._idle[key]
+        self._idle_count -= len(expired)
+        self._expirations += len(expired)
+        return expired
+
+    def _evict_overflow_locked(self) -> List[Any]:
+        """Evict least-recently-used idle entries until within max_size. Caller must hold lock."""
+        evicted: List[Any] = []
+        while self._idle_count > self.max_size and self._idle:
+            key, entries = next(iter(self._idle.items()))
+            service, _ = entries.pop(0)
+            if not entries:
+                del self._idle[key]
+            evicted.append(service)
+            self._idle_count -= 1
+        self._evictions += len(evicted)
+        return evicted
+
+    def acquire(
+        self,
+        user_email: str,
+        service_name: str,
+        version: str,
+        credentials: Credentials,
+    ) -> Any:
+        """
+        Lease a service for the given user, building one if no idle entry exists.
+
+        Args:
+            user_email: User the service acts on behalf of
+            service_name: Google API name (e.g. "gmail")
+            version: Google API version (e.g. "v1")
+            credentials: Credentials to authorize requests with
+
+        Returns:
+            A googleapiclient Resource. Return it with release() when done.
+        """
+        if not self.enabled:
+            return self._build(service_name, version, credentials)
+
+        key = (
+            user_email or "",
+            service_name,
+            version,
+            _credential_identity(credentials),
+        )
+        service = None
+        with self._lock:
+            stale = self._purge_expired_locked(time.monotonic())
+            entries = self._idle.get(key)
+            if entries:
+                service, _ = entries.pop()
+                self._idle_count -= 1
+                if entries:
+                    self._idle.move_to_end(key)
+                else:
+                    del self._idle[key]
+                self._hits += 1
+                if self._swap_credentials(service, credentials):
+                    self._credential_swaps += 1
+            else:
+                self._misses += 1
+
+        for svc in stale:
+            self._close(svc)
+
+        if service is None:
+            service = self._build(service_name, version, credentials)
+
+        with self._lock:
+            self._leased[service] = key
+        return service
+
+    def release(self, service: Any) -> None:
+        """Return a leased service to the pool (or close it if it is not pooled)."""
+        if service is None:
+            return
+
+        with self._lock:
+            key = self._leased.pop(service, None)
+            if key is None or not self.enabled:
+                to_close = [service]
+            else:
+                self._idle.setdefault(key, []).append((service, time.monotonic()))
+                self._idle.move_to_end(key)
+                self._idle_count += 1
+                to_close = self._evict_overflow_locked()
+
+        for svc in to_close:
+            self._close(svc)
+
+    def clear(self) -> None:
+        """Close and drop every idle service."""
+        with self._lock:
+            services = [svc for entries in self._idle.values() for svc, _ in entries]
+            self._idle.clear()
+            self._idle_count = 0
+        for svc in services:
+            self._close(svc)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics for sizing and monitoring."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": self.enabled,
+                "max_size": self.max_size,
+                "idle_ttl_seconds": self.idle_ttl_seconds,
+                "idle": self._idle_count,
+                "leased": len(self._leased),
+                "keys": len(self._idle),
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": (self._hits / lookups) if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "credential_swaps": self._credential_swaps,
+            }
+
+
+# Global pool instance
+_service_pool: Optional[GoogleServicePool] = None
+_service_pool_lock = Lock()
+
+
+def get_service_pool() -> GoogleServicePool:
+    """
+    Get the global service pool, creating it from environment configuration.
+
+    Environment variables:
+        WORKSPACE_MCP_SERVICE_POOL_SIZE: Max idle services kept (0 disables pooling)
+        WORKSPACE_MCP_SERVICE_POOL_IDLE_TTL: Seconds an idle service is kept
+    """
+    global _service_pool
+
+    if _service_pool is None:
+        with _service_pool_lock:
+            if _service_pool is None:
+                max_size = int(
+                    os.getenv(
+                        "WORKSPACE_MCP_SERVICE_POOL_SIZE", str(DEFAULT_POOL_MAX_SIZE)
+                    )
+                )
+                idle_ttl = float(
+                    os.getenv(
+                        "WORKSPACE_MCP_SERVICE_POOL_IDLE_TTL",
+                        str(DEFAULT_POOL_IDLE_TTL_SECONDS),
+                    )
+                )
+                _service_pool = GoogleServicePool(
+                    max_size=max_size, idle_ttl_seconds=idle_ttl
+                )
+                logger.info(
+                    f"Initialized Google service pool (max_size={max_size}, idle_ttl={idle_ttl}s)"
+                )
+
+    return _service_pool
+
+
+def set_service_pool(pool: Optional[GoogleServicePool]):
+    """
+    Set the global service pool instance.
+
+    Args:
+        pool: Pool instance to use, or None to rebuild from configuration
+    """
+    global _service_pool
+    _service_pool = pool
+
+
+def release_service(service: Any) -> None:
+    """Return a service obtained from the authentication helpers to the pool."""
+    get_service_pool().release(service)
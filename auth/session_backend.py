@@ -0,0 +1,335 @@
+"""
+Shared storage backends for OAuth21SessionStore.
+
+OAuth21SessionStore keeps sessions, session ID bindings and pending OAuth
+states in process memory. That is enough for a single replica, but behind a
+load balancer a request (or an OAuth callback) can land on a replica that never
+saw the session. A SessionBackend holds that state somewhere all replicas can
+reach; the store keeps its in-memory dicts as a near cache in front of it.
+
+Backends:
+    - ValkeySessionBackend: Valkey/Redis through a synchronous client such as
+      ``valkey.Valkey`` (install ``workspace-mcp[valkey]``)
+
+Configuration:
+    WORKSPACE_MCP_SESSION_BACKEND=valkey enables the Valkey backend. Connection
+    settings are shared with the OAuth proxy storage
+    (WORKSPACE_MCP_OAUTH_PROXY_VALKEY_HOST, _PORT, _DB, _USE_TLS, _USERNAME,
+    _PASSWORD, _REQUEST_TIMEOUT_MS, _CONNECTION_TIMEOUT_MS).
+"""
+
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KEY_PREFIX = "workspace-mcp:session:"
+
+
+def _decode(value: Any) -> Optional[str]:
+    """Valkey clients return bytes unless decode_responses is set."""
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    return value
+
+
+class SessionBackend(ABC):
+    """Abstract shared store for OAuth 2.1 sessions, session bindings and OAuth states."""
+
+    @abstractmethod
+    def get_session(self, user_email: str) -> Optional[Dict[str, Any]]:
+        """Get a user's session record, or None if there is none."""
+        pass
+
+    @abstractmethod
+    def put_session(self, user_email: str, session_info: Dict[str, Any]) -> None:
+        """Store a user's session record, replacing any existing one."""
+        pass
+
+    @abstractmethod
+    def list_users(self) -> List[str]:
+        """List the emails of all users with a stored session."""
+        pass
+
+    @abstractmethod
+    def bind_session_id(self, session_id: str, user_email: str) -> str:
+        """
+        Bind a session ID to a user unless it is already bound (first binding wins).
+
+        Returns:
+            The user the session ID is bound to
+        """
+        pass
+
+    @abstractmethod
+    def get_bound_user(self, session_id: str) -> Optional[str]:
+        """Get the user a session ID is bound to."""
+        pass
+
+    @abstractmethod
+    def map_mcp_session(self, mcp_session_id: str, user_email: str) -> None:
+        """Map a FastMCP session ID to a user."""
+        pass
+
+    @abstractmethod
+    def get_mcp_session_user(self, mcp_session_id: str) -> Optional[str]:
+        """Get the user a FastMCP session ID is mapped to."""
+        pass
+
+    @abstractmethod
+    def remove_user(self, user_email: str) -> None:
+        """Remove a user's session and every session ID mapped or bound to them."""
+        pass
+
+    @abstractmethod
+    def put_oauth_state(
+        self, state: str, state_info: Dict[str, Any], ttl_seconds: int
+    ) -> None:
+        """Store a pending OAuth state that expires after ttl_seconds."""
+        pass
+
+    @abstractmethod
+    def pop_oauth_state(self, state: str) -> Optional[Dict[str, Any]]:
+        """Atomically get and delete a pending OAuth state."""
+        pass
+
+
+def _encode_record(record: Dict[str, Any]) -> str:
+    """Serialize a session record or OAuth state, keeping datetimes as ISO strings."""
+    encoded = {}
+    datetime_fields = []
+    for key, value in record.items():
+        if isinstance(value, datetime):
+            encoded[key] = value.isoformat()
+            datetime_fields.append(key)
+        else:
+            encoded[key] = value
+    encoded["_datetime_fields"] = datetime_fields
+    return json.dumps(encoded)
+
+
+def _decode_record(data: str) -> Dict[str, Any]:
+    record = json.loads(data)
+    for key in record.pop("_datetime_fields", []):
+        if record.get(key):
+            record[key] = datetime.fromisoformat(record[key])
+    return record
+
+
+class ValkeySessionBackend(SessionBackend):
+    """
+    Session backend on Valkey/Redis.
+
+    Keys (under ``key_prefix``):
+        user:<email>           Session record (Fernet-encrypted JSON when a key is given)
+        users                  Set of users with a session
+        user-sessions:<email>  Set of session IDs mapped or bound to the user
+        binding:<session_id>   User a session ID is bound to (SET NX, first wins)
+        mcp:<session_id>       User a FastMCP session ID is mapped to
+        state:<state>          Pending OAuth state (SET EX, consumed with GETDEL)
+
+    The client must be synchronous with the redis-py command API, such as
+    ``valkey.Valkey``; async callers reach it through
+    ``run_session_store_call``, off the event loop. GETDEL needs Valkey, or
+    Redis 6.2 or newer.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        key_prefix: str = DEFAULT_KEY_PREFIX,
+        encryption_key: Optional[bytes] = None,
+    ):
+        """
+        Initialize the Valkey session backend.
+
+        Args:
+            client: Synchronous Valkey/Redis client
+            key_prefix: Prefix for every key this backend writes
+            encryption_key: Fernet key for session records and OAuth states;
+                None stores them unencrypted
+        """
+        self._client = client
+        self._prefix = key_prefix
+        self._fernet = None
+        if encryption_key is not None:
+            from cryptography.fernet import Fernet
+
+            self._fernet = Fernet(encryption_key)
+
+    def _key(self, kind: str, name: str = "") -> str:
+        return f"{self._prefix}{kind}{':' + name if name else ''}"
+
+    def _dumps(self, record: Dict[str, Any]) -> str:
+        data = _encode_record(record)
+        if self._fernet is not None:
+            return self._fernet.encrypt(data.encode("utf-8")).decode("ascii")
+        return data
+
+    def _loads(self, value: Any) -> Optional[Dict[str, Any]]:
+        data = _decode(value)
+        if data is None:
+            return None
+        if self._fernet is not None:
+            data = self._fernet.decrypt(data.encode("ascii")).decode("utf-8")
+        return _decode_record(data)
+
+    def get_session(self, user_email: str) -> Optional[Dict[str, Any]]:
+        return self._loads(self._client.get(self._key("user", user_email)))
+
+    def put_session(self, user_email: str, session_info: Dict[str, Any]) -> None:
+        self._client.set(self._key("user", user_email), self._dumps(session_info))
+        self._client.sadd(self._key("users"), user_email)
+
+    def list_users(self) -> List[str]:
+        return sorted(
+            _decode(user) for user in self._client.smembers(self._key("users"))
+        )
+
+    def bind_session_id(self, session_id: str, user_email: str) -> str:
+        key = self._key("binding", session_id)
+        # Retry once: the binding can be removed between SET NX and GET
+        for _ in range(2):
+            if self._client.set(key, user_email, nx=True):
+                self._client.sadd(self._key("user-sessions", user_email), session_id)
+                return user_email
+            bound_user = _decode(self._client.get(key))
+            if bound_user is not None:
+                return bound_user
+        return bound_user
+
+    def get_bound_user(self, session_id: str) -> Optional[str]:
+        return _decode(self._client.get(self._key("binding", session_id)))
+
+    def map_mcp_session(self, mcp_session_id: str, user_email: str) -> None:
+        self._client.set(self._key("mcp", mcp_session_id), user_email)
+        self._client.sadd(self._key("user-sessions", user_email), mcp_session_id)
+
+    def get_mcp_session_user(self, mcp_session_id: str) -> Optional[str]:
+        return _decode(self._client.get(self._key("mcp", mcp_session_id)))
+
+    def remove_user(self, user_email: str) -> None:
+        index_key = self._key("user-sessions", user_email)
+        for session_id in self._client.smembers(index_key):
+            session_id = _decode(session_id)
+            # Drop the mapping before the binding: while the binding exists no
+            # other user can claim the session ID
+            for kind in ("mcp", "binding"):
+                key = self._key(kind, session_id)
+                if _decode(self._client.get(key)) == user_email:
+                    self._client.delete(key)
+        self._client.delete(self._key("user", user_email), index_key)
+        self._client.srem(self._key("users"), user_email)
+
+    def put_oauth_state(
+        self, state: str, state_info: Dict[str, Any], ttl_seconds: int
+    ) -> None:
+        if ttl_seconds <= 0:
+            return
+        self._client.set(
+            self._key("state", state), self._dumps(state_info), ex=ttl_seconds
+        )
+
+    def pop_oauth_state(self, state: str) -> Optional[Dict[str, Any]]:
+        return self._loads(self._client.getdel(self._key("state", state)))
+
+
+def _create_valkey_client() -> Any:
+    """Create a Valkey client from the OAuth proxy's Valkey settings."""
+    import valkey
+
+    host = os.getenv("WORKSPACE_MCP_OAUTH_PROXY_VALKEY_HOST", "").strip() or "localhost"
+    port = int(os.getenv("WORKSPACE_MCP_OAUTH_PROXY_VALKEY_PORT", "6379").strip())
+    use_tls_raw = os.getenv("WORKSPACE_MCP_OAUTH_PROXY_VALKEY_USE_TLS", "").strip()
+    use_tls = (
+        use_tls_raw.lower() in ("1", "true", "yes", "on")
+        if use_tls_raw
+        else port == 6380
+    )
+    is_remote_host = host not in {"localhost", "127.0.0.1"}
+
+    request_timeout_ms_raw = os.getenv(
+        "WORKSPACE_MCP_OAUTH_PROXY_VALKEY_REQUEST_TIMEOUT_MS", ""
+    ).strip()
+    connection_timeout_ms_raw = os.getenv(
+        "WORKSPACE_MCP_OAUTH_PROXY_VALKEY_CONNECTION_TIMEOUT_MS", ""
+    ).strip()
+    request_timeout_ms = (
+        int(request_timeout_ms_raw)
+        if request_timeout_ms_raw
+        else (5000 if use_tls or is_remote_host else 250)
+    )
+    connection_timeout_ms = (
+        int(connection_timeout_ms_raw)
+        if connection_timeout_ms_raw
+        else (10000 if use_tls or is_remote_host else 1000)
+    )
+
+    return valkey.Valkey(
+        host=host,
+        port=port,
+        db=int(os.getenv("WORKSPACE_MCP_OAUTH_PROXY_VALKEY_DB", "0").strip()),
+        username=os.getenv("WORKSPACE_MCP_OAUTH_PROXY_VALKEY_USERNAME", "").strip()
+        or None,
+        password=os.getenv("WORKSPACE_MCP_OAUTH_PROXY_VALKEY_PASSWORD", "").strip()
+        or None,
+        ssl=use_tls,
+        socket_timeout=request_timeout_ms / 1000,
+        socket_connect_timeout=connection_timeout_ms / 1000,
+    )
+
+
+def create_session_backend() -> Optional[SessionBackend]:
+    """
+    Create the session backend selected by environment configuration.
+
+    Environment variables:
+        WORKSPACE_MCP_SESSION_BACKEND: "memory" (default, no shared backend) or "valkey"
+        WORKSPACE_MCP_SESSION_KEY_PREFIX: Prefix for the backend's keys
+
+    Returns:
+        The configured backend, or None to keep sessions in process memory only
+    """
+    backend_type = os.getenv("WORKSPACE_MCP_SESSION_BACKEND", "memory").strip().lower()
+    if backend_type in ("", "memory"):
+        return None
+    if backend_type != "valkey":
+        logger.warning(
+            f"Unknown WORKSPACE_MCP_SESSION_BACKEND '{backend_type}'; keeping sessions in memory"
+        )
+        return None
+
+    try:
+        client = _create_valkey_client()
+    except ImportError as e:
+        logger.warning(
+            f"Valkey session backend requested but the 'valkey' package is not installed ({e}). "
+            "Install 'workspace-mcp[valkey]'; keeping sessions in memory."
+        )
+        return None
+    except ValueError as e:
+        logger.warning(
+            f"Invalid Valkey configuration ({e}); keeping sessions in memory"
+        )
+        return None
+
+    from auth.credential_store import get_credential_encryption_key
+
+    try:
+        encryption_key = get_credential_encryption_key()
+    except ValueError:
+        logger.warning(
+            "Valkey session backend needs WORKSPACE_MCP_CREDENTIAL_STORE_KEY or "
+            "GOOGLE_OAUTH_CLIENT_SECRET to encrypt sessions; keeping sessions in memory"
+        )
+        return None
+
+    key_prefix = os.getenv("WORKSPACE_MCP_SESSION_KEY_PREFIX", DEFAULT_KEY_PREFIX)
+    logger.info(f"Using Valkey session backend (key prefix '{key_prefix}')")
+    return ValkeySessionBackend(
+        client, key_prefix=key_prefix, encryption_key=encryption_key
+    )
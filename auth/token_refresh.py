@@ -0,0 +1,510 @@
+"""
+Single-flight OAuth token refresh.
+
+When an access token expires, every concurrent tool call for that user notices
+at the same time. Without coordination each one hits Google's token endpoint
+and writes the refreshed credentials back to the stores.
+
+TokenRefreshCoordinator lets exactly one caller per grant (refresh token)
+perform the refresh. Concurrent callers wait for it and copy the new token
+into their own Credentials object, and the refreshed credentials are persisted
+once, by the caller that refreshed them. Callers that arrive shortly after a
+refresh, still holding the old token, reuse the result without a new request.
+
+BackgroundTokenRefresher refreshes tokens a configurable margin before they
+expire, so tool calls rarely find an expired token on the critical path.
+Grants that Google rejects with ``invalid_grant`` are remembered as revoked and
+fail fast until the user re-authenticates with a new refresh token (for a
+bounded time and number of grants).
+"""
+
+import hashlib
+import logging
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional, Set
+
+from google.auth.exceptions import RefreshError
+from google.oauth2.credentials import Credentials
+
+logger = logging.getLogger(__name__)
+
+# How long followers wait for an in-flight refresh before refreshing themselves
+DEFAULT_FOLLOWER_TIMEOUT_SECONDS = 30.0
+
+# How long, and for how many grants, invalid_grant rejections are remembered.
+# A forgotten revoked grant just costs one more rejected refresh.
+DEFAULT_REVOKED_TTL_SECONDS = 3600.0
+DEFAULT_MAX_REVOKED = 10000
+
+# Default background refresh configuration (overridable via environment variables)
+DEFAULT_REFRESH_MARGIN_SECONDS = 300.0
+DEFAULT_REFRESH_JITTER_SECONDS = 60.0
+DEFAULT_REFRESH_SCAN_INTERVAL_SECONDS = 60.0
+DEFAULT_REFRESH_CONCURRENCY = 4
+
+
+def refresh_key(credentials: Credentials) -> str:
+    """Identify the grant a credential belongs to (client ID + refresh token)."""
+    material = f"{getattr(credentials, 'client_id', None) or ''}:{getattr(credentials, 'refresh_token', None) or ''}"
+    return hashlib.sha256(material.encode()).hexdigest()[:24]
+
+
+def is_invalid_grant(error: BaseException) -> bool:
+    """Whether a refresh error means the refresh token was revoked or expired."""
+    return isinstance(error, RefreshError) and "invalid_grant" in str(error)
+
+
+class _RefreshResult:
+    __slots__ = ("token", "expiry", "refresh_token", "id_token")
+
+    def __init__(self, credentials: Credentials):
+        self.token = credentials.token
+        self.expiry = credentials.expiry
+        self.refresh_token = credentials.refresh_token
+        self.id_token = getattr(credentials, "id_token", None)
+
+    def apply_to(self, credentials: Credentials) -> None:
+        credentials.token = self.token
+        credentials.expiry = self.expiry
+        # Google may rotate the refresh token; Credentials exposes it read-only
+        if self.refresh_token and self.refresh_token != credentials.refresh_token:
+            credentials._refresh_token = self.refresh_token
+        if self.id_token is not None:
+            credentials._id_token = self.id_token
+
+
+class _InFlightRefresh:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[_RefreshResult] = None
+        self.error: Optional[BaseException] = None
+
+
+class TokenRefreshCoordinator:
+    """Coalesces concurrent refreshes of the same grant into one request."""
+
+    def __init__(
+        self,
+        follower_timeout_seconds: float = DEFAULT_FOLLOWER_TIMEOUT_SECONDS,
+        revoked_ttl_seconds: float = DEFAULT_REVOKED_TTL_SECONDS,
+        max_revoked: int = DEFAULT_MAX_REVOKED,
+    ):
+        self.follower_timeout_seconds = follower_timeout_seconds
+        self.revoked_ttl_seconds = revoked_ttl_seconds
+        self.max_revoked = max(1, max_revoked)
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, _InFlightRefresh] = {}
+        self._recent: Dict[str, _RefreshResult] = {}
+        # Grants Google rejected with invalid_grant -> monotonic rejection time,
+        # oldest first
+        self._revoked: "OrderedDict[str, float]" = OrderedDict()
+        self._refreshes = 0
+        self._coalesced = 0
+        self._reused = 0
+        self._failures = 0
+        self._fast_failures = 0
+
+    def refresh(
+        self,
+        credentials: Credentials,
+        request: Any,
+        persist: Optional[Callable[[Credentials], None]] = None,
+        user_email: Optional[str] = None,
+    ) -> Credentials:
+        """
+        Refresh credentials, sharing the refresh with concurrent callers.
+
+        Args:
+            credentials: Credentials to refresh; updated in place
+            request: google.auth transport Request used for the token call
+            persist: Called once with the refreshed credentials by the caller that
+                performed the refresh. Errors are logged, not raised.
+            user_email: Used for logging only
+
+        Returns:
+            The same credentials object, now holding a fresh token.
+
+        Raises:
+            google.auth.exceptions.RefreshError: If the refresh fails (raised to
+                every caller waiting on that refresh)
+        """
+        if not getattr(credentials, "refresh_token", None):
+            credentials.refresh(request)
+            return credentials
+
+        key = refresh_key(credentials)
+        with self._lock:
+            if self._is_revoked_locked(key):
+                self._fast_failures += 1
+                raise RefreshError(
+                    "invalid_grant: refresh token was previously rejected; re-authentication required"
+                )
+
+            recent = self._recent.get(key)
+            if recent is not None and recent.token != credentials.token:
+                recent.apply_to(credentials)
+                if credentials.valid:
+                    self._reused += 1
+                    logger.debug(
+                        f"Reusing token refreshed moments ago for {user_email or 'unknown user'}"
+                    )
+                    return credentials
+
+            in_flight = self._in_flight.get(key)
+            leader = in_flight is None
+            if leader:
+                in_flight = self._in_flight[key] = _InFlightRefresh()
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            if in_flight.done.wait(self.follower_timeout_seconds):
+                if in_flight.error is not None:
+                    raise in_flight.error
+                in_flight.result.apply_to(credentials)
+                logger.debug(
+                    f"Joined in-flight token refresh for {user_email or 'unknown user'}"
+                )
+                return credentials
+            logger.warning(
+                f"Timed out waiting for in-flight token refresh for {user_email or 'unknown user'}; refreshing directly"
+            )
+            credentials.refresh(request)
+            return credentials
+
+        try:
+            credentials.refresh(request)
+        except BaseException as e:
+            with self._lock:
+                self._failures += 1
+                del self._in_flight[key]
+                if is_invalid_grant(e):
+                    self._mark_revoked_locked(key)
+                    logger.warning(
+                        f"Refresh token for {user_email or 'unknown user'} was rejected (invalid_grant); "
+                        "failing fast until the user re-authenticates"
+                    )
+            in_flight.error = e
+            in_flight.done.set()
+            raise
+
+        result = _RefreshResult(credentials)
+        with self._lock:
+            self._refreshes += 1
+            self._prune_recent_locked()
+            self._recent[key] = result
+            del self._in_flight[key]
+        in_flight.result = result
+        in_flight.done.set()
+
+        if persist is not None:
+            try:
+                persist(credentials)
+            except Exception as e:
+                logger.error(
+                    f"Failed to persist refreshed credentials for {user_email or 'unknown user'}: {e}"
+                )
+        return credentials
+
+    def _prune_recent_locked(self) -> None:
+        """Drop remembered results whose token has expired. Caller must hold lock."""
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        expired = [
+            key
+            for key, result in self._recent.items()
+            if result.expiry is not None and result.expiry <= now
+        ]
+        for key in expired:
+            del self._recent[key]
+
+    def _is_revoked_locked(self, key: str) -> bool:
+        revoked_at = self._revoked.get(key)
+        if revoked_at is None:
+            return False
+        if time.monotonic() - revoked_at >= self.revoked_ttl_seconds:
+            del self._revoked[key]
+            return False
+        return True
+
+    def _mark_revoked_locked(self, key: str) -> None:
+        now = time.monotonic()
+        self._revoked[key] = now
+        self._revoked.move_to_end(key)
+        # Oldest first, so expired entries and the LRU overflow sit at the front
+        while self._revoked and (
+            len(self._revoked) > self.max_revoked
+            or now - next(iter(self._revoked.values())) >= self.revoked_ttl_seconds
+        ):
+            self._revoked.popitem(last=False)
+
+    def forget(self, credentials: Credentials) -> None:
+        """Drop any remembered refresh result or revocation for this grant."""
+        key = refresh_key(credentials)
+        with self._lock:
+            self._recent.pop(key, None)
+            self._revoked.pop(key, None)
+
+    def is_revoked(self, credentials: Credentials) -> bool:
+        """Whether this grant's refresh token has been rejected with invalid_grant."""
+        if not getattr(credentials, "refresh_token", None):
+            return False
+        with self._lock:
+            return self._is_revoked_locked(refresh_key(credentials))
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get refresh statistics."""
+        with self._lock:
+            return {
+                "refreshes": self._refreshes,
+                "coalesced": self._coalesced,
+                "reused": self._reused,
+                "failures": self._failures,
+                "fast_failures": self._fast_failures,
+                "revoked": len(self._revoked),
+                "in_flight": len(self._in_flight),
+                "remembered": len(self._recent),
+            }
+
+
+# Global coordinator instance
+_token_refresh_coordinator: Optional[TokenRefreshCoordinator] = None
+_token_refresh_coordinator_lock = threading.Lock()
+
+
+def get_token_refresh_coordinator() -> TokenRefreshCoordinator:
+    """Get the global token refresh coordinator."""
+    global _token_refresh_coordinator
+
+    if _token_refresh_coordinator is None:
+        with _token_refresh_coordinator_lock:
+            if _token_refresh_coordinator is None:
+                _token_refresh_coordinator = TokenRefreshCoordinator()
+
+    return _token_refresh_coordinator
+
+
+def set_token_refresh_coordinator(coordinator: Optional[TokenRefreshCoordinator]):
+    """
+    Set the global token refresh coordinator instance.
+
+    Args:
+        coordinator: Coordinator to use, or None to create a fresh one on next use
+    """
+    global _token_refresh_coordinator
+    _token_refresh_coordinator = coordinator
+
+
+class BackgroundTokenRefresher:
+    """
+    Daemon thread that refreshes tokens shortly before they expire.
+
+    Every scan interval it asks ``load_credentials`` for the known credentials
+    (user email -> Credentials) and refreshes those expiring within the margin,
+    plus a random jitter so refreshes for many users spread out. Refreshes run
+    on a small bounded pool through the shared coordinator, so they coalesce
+    with any refresh a tool call triggers at the same time; ``persist`` is
+    called once with each refreshed credential.
+    """
+
+    def __init__(
+        self,
+        load_credentials: Callable[[], Dict[str, Credentials]],
+        persist: Callable[[str, Credentials], None],
+        request_factory: Callable[[], Any],
+        margin_seconds: float = DEFAULT_REFRESH_MARGIN_SECONDS,
+        jitter_seconds: float = DEFAULT_REFRESH_JITTER_SECONDS,
+        scan_interval_seconds: float = DEFAULT_REFRESH_SCAN_INTERVAL_SECONDS,
+        concurrency: int = DEFAULT_REFRESH_CONCURRENCY,
+        coordinator: Optional[TokenRefreshCoordinator] = None,
+    ):
+        self.load_credentials = load_credentials
+        self.persist = persist
+        self.request_factory = request_factory
+        self.margin_seconds = margin_seconds
+        self.jitter_seconds = jitter_seconds
+        self.scan_interval_seconds = scan_interval_seconds
+        self.concurrency = max(1, concurrency)
+        self._coordinator = coordinator
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._scheduled: Set[str] = set()
+        self._scans = 0
+        self._refreshed = 0
+        self._failed = 0
+
+    @property
+    def coordinator(self) -> TokenRefreshCoordinator:
+        return self._coordinator or get_token_refresh_coordinator()
+
+    def _is_due(self, credentials: Credentials, now: datetime) -> bool:
+        if not credentials.refresh_token or credentials.expiry is None:
+            return False
+        if not (
+            credentials.client_id
+            and credentials.client_secret
+            and credentials.token_uri
+        ):
+            # Cannot be refreshed without client details; leave it to the inline path
+            return False
+        jitter = random.uniform(0, self.jitter_seconds) if self.jitter_seconds else 0
+        refresh_at = credentials.expiry - timedelta(
+            seconds=self.margin_seconds + jitter
+        )
+        return now >= refresh_at
+
+    def scan(self) -> int:
+        """
+        Schedule refreshes for every credential that is due.
+
+        Returns:
+            Number of refreshes scheduled.
+        """
+        try:
+            candidates = self.load_credentials()
+        except Exception as e:
+            logger.error(f"Background token refresh could not list credentials: {e}")
+            return 0
+
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        scheduled = 0
+        for user_email, credentials in candidates.items():
+            if not self._is_due(credentials, now):
+                continue
+            if self.coordinator.is_revoked(credentials):
+                continue
+            with self._lock:
+                if user_email in self._scheduled:
+                    continue
+                self._scheduled.add(user_email)
+            self._get_executor().submit(self._refresh_one, user_email, credentials)
+            scheduled += 1
+
+        with self._lock:
+            self._scans += 1
+        if scheduled:
+            logger.debug(f"Scheduled {scheduled} proactive token refreshes")
+        return scheduled
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.concurrency,
+                    thread_name_prefix="token-refresh",
+                )
+            return self._executor
+
+    def _refresh_one(self, user_email: str, credentials: Credentials) -> None:
+        try:
+            self.coordinator.refresh(
+                credentials,
+                self.request_factory(),
+                persist=lambda refreshed: self.persist(user_email, refreshed),
+                user_email=user_email,
+            )
+            with self._lock:
+                self._refreshed += 1
+            logger.info(f"Proactively refreshed token for {user_email}")
+        except Exception as e:
+            with self._lock:
+                self._failed += 1
+            if is_invalid_grant(e):
+                logger.warning(
+                    f"Proactive token refresh for {user_email} failed: refresh token revoked"
+                )
+            else:
+                logger.warning(f"Proactive token refresh for {user_email} failed: {e}")
+        finally:
+            with self._lock:
+                self._scheduled.discard(user_email)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.scan_interval_seconds):
+            self.scan()
+
+    def start(self) -> None:
+        """Start the background scan thread (no-op if already running)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="token-refresh-scanner", daemon=True
+            )
+            self._thread.start()
+        logger.info(
+            f"Background token refresh started (margin={self.margin_seconds}s, "
+            f"jitter={self.jitter_seconds}s, interval={self.scan_interval_seconds}s, "
+            f"concurrency={self.concurrency})"
+        )
+
+    def stop(self) -> None:
+        """Stop scanning and wait for in-progress refreshes."""
+        self._stop.set()
+        with self._lock:
+            thread, executor = self._thread, self._executor
+            self._thread = None
+            self._executor = None
+        if thread is not None:
+            thread.join()
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get background refresh statistics."""
+        with self._lock:
+            return {
+                "running": self._thread is not None and self._thread.is_alive(),
+                "scans": self._scans,
+                "refreshed": self._refreshed,
+                "failed": self._failed,
+                "scheduled": len(self._scheduled),
+            }
+
+
+def get_background_refresh_settings() -> Dict[str, Any]:
+    """
+    Read background token refresh configuration from the environment.
+
+    Environment variables:
+        WORKSPACE_MCP_TOKEN_REFRESH_MARGIN: Seconds before expiry to refresh
+        WORKSPACE_MCP_TOKEN_REFRESH_JITTER: Max random extra seconds added to the margin
+        WORKSPACE_MCP_TOKEN_REFRESH_INTERVAL: Seconds between expiry scans
+        WORKSPACE_MCP_TOKEN_REFRESH_CONCURRENCY: Max refreshes running at once
+    """
+    return {
+        "margin_seconds": float(
+            os.getenv(
+                "WORKSPACE_MCP_TOKEN_REFRESH_MARGIN",
+                str(DEFAULT_REFRESH_MARGIN_SECONDS),
+            )
+        ),
+        "jitter_seconds": float(
+            os.getenv(
+                "WORKSPACE_MCP_TOKEN_REFRESH_JITTER",
+                str(DEFAULT_REFRESH_JITTER_SECONDS),
+            )
+        ),
+        "scan_interval_seconds": float(
+            os.getenv(
+                "WORKSPACE_MCP_TOKEN_REFRESH_INTERVAL",
+                str(DEFAULT_REFRESH_SCAN_INTERVAL_SECONDS),
+            )
+        ),
+        "concurrency": int(
+            os.getenv(
+                "WORKSPACE_MCP_TOKEN_REFRESH_CONCURRENCY",
+                str(DEFAULT_REFRESH_CONCURRENCY),
+            )
+        ),
+    }
@@ -0,0 +1,220 @@
+"""
+Cache of bearer token verification results.
+
+Google access tokens (``ya29.*``) are opaque: verifying one means a round trip
+to Google. AuthInfoMiddleware verifies the bearer token on every MCP request,
+and an agent session sends the same token dozens of times a minute.
+
+VerifiedTokenCache remembers verification results keyed by a SHA-256 hash of
+the token. A successful result is reused for at most ``ttl_seconds`` and never
+past the token's own expiry; a failed verification is remembered for
+``negative_ttl_seconds`` so a bad token cannot make every request call Google.
+When Google rejects a token with a 401, invalidate_verified_token() drops it so
+the next request verifies it again.
+"""
+
+import logging
+import os
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from auth.oauth21_session_store import (
+    get_access_token_credential_cache,
+    hash_access_token,
+)
+
+logger = logging.getLogger(__name__)
+
+# Default cache configuration (overridable via environment variables)
+DEFAULT_VERIFIED_TOKEN_TTL_SECONDS = 300.0
+DEFAULT_NEGATIVE_TTL_SECONDS = 10.0
+DEFAULT_MAX_ENTRIES = 1024
+# Stop trusting a cached result this long before the token itself expires
+_TOKEN_EXPIRY_SKEW_SECONDS = 30.0
+
+
+class VerifiedTokenCache:
+    """
+    Bounded TTL cache of token verification results.
+
+    Positive results expire at the earlier of ``ttl_seconds`` and the token's
+    ``expires_at``; negative results after ``negative_ttl_seconds``. Errors
+    raised by the verifier are not cached. Least recently used entries are
+    evicted beyond ``max_entries``. A ``ttl_seconds`` of 0 disables the cache
+    entirely; a ``negative_ttl_seconds`` of 0 only stops remembering failures.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_VERIFIED_TOKEN_TTL_SECONDS,
+        negative_ttl_seconds: float = DEFAULT_NEGATIVE_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.max_entries = max(1, max_entries)
+        # Maps token hash -> (verification result or None, monotonic expiry)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = Lock()
+        self._hits = 0
+        self._negative_hits = 0
+        self._misses = 0
+        self._invalidations = 0
+
+    def _ttl_for(self, result: Any) -> float:
+        if self.ttl_seconds <= 0:
+            # The cache is disabled, remembered failures included
+            return 0.0
+        if result is None:
+            return self.negative_ttl_seconds
+        ttl = self.ttl_seconds
+        expires_at = getattr(result, "expires_at", None)
+        if expires_at:
+            ttl = min(ttl, expires_at - time.time() - _TOKEN_EXPIRY_SKEW_SECONDS)
+        return ttl
+
+    async def verify(
+        self, token: str, verifier: Callable[[str], Awaitable[Any]]
+    ) -> Any:
+        """
+        Verify a token, reusing a cached result when one is still fresh.
+
+        Args:
+            token: The bearer token
+            verifier: Coroutine function that verifies a token (e.g. the
+                auth provider's verify_token), returning None if it is invalid
+
+        Returns:
+            The verifier's result, or None if the token is invalid
+        """
+        key = hash_access_token(token)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._entries.move_to_end(key)
+                    if entry[0] is None:
+                        self._negative_hits += 1
+                    else:
+                        self._hits += 1
+                    return entry[0]
+                del self._entries[key]
+            self._misses += 1
+
+        result = await verifier(token)
+
+        ttl = self._ttl_for(result)
+        if ttl > 0:
+            with self._lock:
+                self._entries[key] = (result, time.monotonic() + ttl)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return result
+
+    def invalidate(self, token: str) -> bool:
+        """
+        Drop the cached verification result for a token.
+
+        Returns:
+            True if an entry was removed
+        """
+        with self._lock:
+            removed = self._entries.pop(hash_access_token(token), None) is not None
+            if removed:
+                self._invalidations += 1
+        return removed
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        with self._lock:
+            lookups = self._hits + self._negative_hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "negative_hits": self._negative_hits,
+                "misses": self._misses,
+                "invalidations": self._invalidations,
+                "hit_rate": ((self._hits + self._negative_hits) / lookups)
+                if lookups
+                else 0.0,
+            }
+
+
+# Global cache instance
+_verified_token_cache: Optional[VerifiedTokenCache] = None
+_verified_token_cache_lock = Lock()
+
+
+def get_verified_token_cache() -> VerifiedTokenCache:
+    """
+    Get the global verified-token cache, creating it from environment configuration.
+
+    Environment variables:
+        WORKSPACE_MCP_VERIFIED_TOKEN_CACHE_TTL: Max seconds a verified token is
+            trusted (0 disables the cache, including remembered failures)
+        WORKSPACE_MCP_VERIFIED_TOKEN_NEGATIVE_TTL: Seconds a failed verification
+            is remembered (0 disables only this)
+        WORKSPACE_MCP_VERIFIED_TOKEN_CACHE_SIZE: Max number of cached tokens
+    """
+    global _verified_token_cache
+
+    if _verified_token_cache is None:
+        with _verified_token_cache_lock:
+            if _verified_token_cache is None:
+                _verified_token_cache = VerifiedTokenCache(
+                    ttl_seconds=float(
+                        os.getenv(
+                            "WORKSPACE_MCP_VERIFIED_TOKEN_CACHE_TTL",
+                            str(DEFAULT_VERIFIED_TOKEN_TTL_SECONDS),
+                        )
+                    ),
+                    negative_ttl_seconds=float(
+                        os.getenv(
+                            "WORKSPACE_MCP_VERIFIED_TOKEN_NEGATIVE_TTL",
+                            str(DEFAULT_NEGATIVE_TTL_SECONDS),
+                        )
+                    ),
+                    max_entries=int(
+                        os.getenv(
+                            "WORKSPACE_MCP_VERIFIED_TOKEN_CACHE_SIZE",
+                            str(DEFAULT_MAX_ENTRIES),
+                        )
+                    ),
+                )
+
+    return _verified_token_cache
+
+
+def set_verified_token_cache(cache: Optional[VerifiedTokenCache]):
+    """
+    Set the global verified-token cache.
+
+    Args:
+        cache: Cache to use, or None to rebuild from configuration
+    """
+    global _verified_token_cache
+    _verified_token_cache = cache
+
+
+def invalidate_verified_token(token: Optional[str]) -> None:
+    """
+    Forget everything cached for a token Google has rejected.
+
+    Drops both the verification result and the credentials built from it, so
+    the next request with this token is verified with Google again.
+    """
+    if not token:
+        return
+    if get_verified_token_cache().invalidate(token):
+        logger.info("Invalidated cached verification for a token rejected by Google")
+    get_access_token_credential_cache().invalidate(token)
@@ -0,0 +1,120 @@
+"""
+Micro-benchmark for the per-call overhead of the Google service decorators.
+
+Authentication and service construction are stubbed out, so the numbers
+measure only the work the decorator wrappers do on each call. Run it on two
+revisions to compare them:
+
+    python benchmarks/decorator_overhead.py
+    python benchmarks/decorator_overhead.py --calls 200000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from auth import service_decorator  # noqa: E402
+from auth.service_decorator import (  # noqa: E402
+    require_google_service,
+    require_multiple_services,
+)
+
+
+async def _fake_authenticate_service(
+    use_oauth21,
+    service_name,
+    service_version,
+    tool_name,
+    user_google_email,
+    resolved_scopes,
+    mcp_session_id,
+    authenticated_user,
+):
+    return object(), user_google_email
+
+
+def _install_stubs() -> None:
+    service_decorator._get_auth_context = lambda tool_name: (None, None, None)
+    service_decorator._authenticate_service = _fake_authenticate_service
+    service_decorator.release_service = lambda service: None
+
+
+@require_google_service("gmail", "gmail_read")
+async def single_service_tool(
+    service, user_google_email: str, query: str, page_size: int = 10
+):
+    return query
+
+
+@require_multiple_services(
+    [
+        {"service_type": "docs", "scopes": "docs_read", "param_name": "docs_service"},
+        {
+            "service_type": "sheets",
+            "scopes": "sheets_read",
+            "param_name": "sheets_service",
+        },
+    ]
+)
+async def multi_service_tool(
+    docs_service, sheets_service, user_google_email: str, document_id: str
+):
+    return document_id
+
+
+async def _undecorated_tool(user_google_email: str, query: str, page_size: int = 10):
+    return query
+
+
+async def _measure(call, calls: int) -> float:
+    """Return the mean time per call in microseconds."""
+    for _ in range(min(1000, calls)):
+        await call()
+    start = time.perf_counter()
+    for _ in range(calls):
+        await call()
+    return (time.perf_counter() - start) / calls * 1_000_000
+
+
+async def _run(calls: int) -> None:
+    email = "user@example.com"
+    baseline = await _measure(lambda: _undecorated_tool(email, "in:inbox"), calls)
+    single_kw = await _measure(
+        lambda: single_service_tool(user_google_email=email, query="in:inbox"), calls
+    )
+    single_pos = await _measure(lambda: single_service_tool(email, "in:inbox"), calls)
+    multi = await _measure(
+        lambda: multi_service_tool(user_google_email=email, document_id="doc"), calls
+    )
+
+    print(f"calls per case: {calls}")
+    print(f"undecorated call:              {baseline:8.2f} us")
+    for label, value in (
+        ("require_google_service (kw)", single_kw),
+        ("require_google_service (pos)", single_pos),
+        ("require_multiple_services", multi),
+    ):
+        print(
+            f"{label + ':':<30}{value:8.2f} us  (+{value - baseline:.2f} us overhead)"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=50_000)
+    args = parser.parse_args()
+
+    # Match a production server logging at INFO
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    logging.getLogger().handlers[0].setLevel(logging.CRITICAL)
+    _install_stubs()
+    asyncio.run(_run(args.calls))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Requests-per-second benchmark for the MCP session middleware.
+
+Drives a Starlette app wrapped in MCPSessionMiddleware directly through ASGI
+(no sockets or HTTP client), so the numbers measure the middleware and routing
+cost per /mcp request. Each request carries a bearer JWT, as streamable-HTTP
+clients do. Run it on two revisions to compare them:
+
+    python benchmarks/session_middleware.py
+    python benchmarks/session_middleware.py --requests 50000 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import jwt  # noqa: E402
+from starlette.applications import Starlette  # noqa: E402
+from starlette.middleware import Middleware  # noqa: E402
+from starlette.responses import Response  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+from auth.mcp_session_middleware import MCPSessionMiddleware  # noqa: E402
+
+_BODY = b'{"jsonrpc": "2.0", "id": 1, "method": "tools/list"}'
+
+
+async def _endpoint(request):
+    await request.body()
+    return Response(b'{"jsonrpc": "2.0", "id": 1, "result": {}}')
+
+
+def _build_app():
+    return Starlette(
+        routes=[Route("/mcp", _endpoint, methods=["POST"])],
+        middleware=[Middleware(MCPSessionMiddleware)],
+    )
+
+
+def _scope(token: str) -> dict:
+    return {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/mcp",
+        "raw_path": b"/mcp",
+        "root_path": "",
+        "query_string": b"",
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 12345),
+        "headers": [
+            (b"host", b"testserver"),
+            (b"content-type", b"application/json"),
+            (b"accept", b"application/json, text/event-stream"),
+            (b"authorization", f"Bearer {token}".encode()),
+            (b"content-length", str(len(_BODY)).encode()),
+        ],
+    }
+
+
+async def _request(app, token: str) -> None:
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": _BODY, "more_body": False}
+
+    async def send(message):
+        pass
+
+    await app(_scope(token), receive, send)
+
+
+async def _run(requests: int, concurrency: int) -> float:
+    app = _build_app()
+    token = jwt.encode(
+        {"email": "bench@example.com", "sub": "1"}, "k" * 32, algorithm="HS256"
+    )
+    per_worker = requests // concurrency
+
+    async def worker():
+        for _ in range(per_worker):
+            await _request(app, token)
+
+    # Warm up routing and caches
+    for _ in range(100):
+        await _request(app, token)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return (per_worker * concurrency) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    results = [
+        asyncio.run(_run(args.requests, args.concurrency)) for _ in range(args.rounds)
+    ]
+    print(
+        f"MCPSessionMiddleware: {max(results):,.0f} req/s best of {args.rounds} "
+        f"({args.requests} requests, concurrency {args.concurrency})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""
+Concurrency stress benchmark for OAuth21SessionStore.
+
+Loads the store with many users (each with an MCP session binding) and some
+abandoned OAuth states, then has
+worker threads run a mixed workload against it: validated credential lookups,
+MCP session lookups, token updates, new session stores and OAuth state
+round trips. Reports throughput and per-operation latency percentiles.
+
+    python benchmarks/session_store_stress.py
+    python benchmarks/session_store_stress.py --sessions 10000 --threads 32
+"""
+
+import argparse
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from auth.oauth21_session_store import OAuth21SessionStore  # noqa: E402
+
+# Operation mix, as cumulative weights
+_OPERATIONS = (
+    ("validated_lookup", 0.70),
+    ("mcp_session_lookup", 0.85),
+    ("update_tokens", 0.93),
+    ("store_session", 0.97),
+    ("oauth_state", 1.00),
+)
+
+
+def _populate(store: OAuth21SessionStore, sessions: int, pending_states: int) -> None:
+    for i in range(sessions):
+        store.store_session(
+            user_email=f"user{i}@example.com",
+            access_token=f"ya29.token{i}",
+            refresh_token=f"refresh{i}",
+            scopes=["https://www.googleapis.com/auth/gmail.readonly"],
+            session_id=f"google_user{i}@example.com",
+            mcp_session_id=f"mcp-{i}",
+        )
+    # OAuth flows that were started but never completed
+    for i in range(pending_states):
+        store.store_oauth_state(f"abandoned-{i}", session_id=f"mcp-{i}")
+
+
+def _worker(store, sessions, operations, seed, latencies, start_barrier):
+    rng = random.Random(seed)
+    local = defaultdict(list)
+    start_barrier.wait()
+    for n in range(operations):
+        i = rng.randrange(sessions)
+        user = f"user{i}@example.com"
+        pick = rng.random()
+        op = next(name for name, weight in _OPERATIONS if pick < weight)
+
+        started = time.perf_counter()
+        if op == "validated_lookup":
+            store.get_credentials_with_validation(user, session_id=f"mcp-{i}")
+        elif op == "mcp_session_lookup":
+            store.get_user_by_mcp_session(f"mcp-{i}")
+        elif op == "update_tokens":
+            store.update_session_tokens(user, f"ya29.rotated{seed}-{n}")
+        elif op == "store_session":
+            store.store_session(
+                user_email=user,
+                access_token=f"ya29.new{seed}-{n}",
+                session_id=f"google_{user}",
+                mcp_session_id=f"mcp-{i}",
+            )
+        else:
+            state = f"state-{seed}-{n}"
+            store.store_oauth_state(state, session_id=f"mcp-{i}")
+            store.validate_and_consume_oauth_state(state, session_id=f"mcp-{i}")
+        local[op].append(time.perf_counter() - started)
+    latencies.append(local)
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=10_000)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--operations", type=int, default=20_000, help="per thread")
+    parser.add_argument(
+        "--pending-states",
+        type=int,
+        default=1_000,
+        help="unconsumed OAuth states left in the store",
+    )
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    store = OAuth21SessionStore()
+    populate_started = time.perf_counter()
+    _populate(store, args.sessions, args.pending_states)
+    populate_time = time.perf_counter() - populate_started
+
+    latencies = []
+    barrier = threading.Barrier(args.threads + 1)
+    threads = [
+        threading.Thread(
+            target=_worker,
+            args=(store, args.sessions, args.operations, seed, latencies, barrier),
+        )
+        for seed in range(args.threads)
+    ]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    total = args.threads * args.operations
+    print(
+        f"sessions={args.sessions} threads={args.threads} operations={total} "
+        f"pending_states={args.pending_states} "
+        f"(populate {populate_time:.2f}s)"
+    )
+    print(f"throughput: {total / elapsed:,.0f} ops/s over {elapsed:.2f}s")
+    merged = defaultdict(list)
+    for local in latencies:
+        for op, values in local.items():
+            merged[op].extend(values)
+    for op, _ in _OPERATIONS:
+        values = merged[op]
+        if not values:
+            continue
+        print(
+            f"  {op:<20} n={len(values):>7}  "
+            f"p50={_percentile(values, 0.50) * 1e6:7.1f} us  "
+            f"p99={_percentile(values, 0.99) * 1e6:7.1f} us"
+        )
+
+
+if __name__ == "__main__":
+    main()
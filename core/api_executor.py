@@ -0,0 +1,300 @@
+"""
+Native asyncio execution for Google API requests.
+
+Tools used to push every blocking ``HttpRequest.execute()`` into the default
+thread pool with ``asyncio.to_thread``, so each in-flight Google call held a
+worker thread. ``execute_async`` sends the same request on a non-blocking
+httpx.AsyncClient instead, so concurrent calls cost coroutines, not threads:
+
+    result = await execute_async(service.users().messages().list(userId="me"))
+
+Semantics match ``HttpRequest.execute()``: credentials are applied (and
+refreshed when expired or rejected with a 401), long GET URIs are sent as POST
+with ``x-http-method-override``, 429/5xx responses are retried with
+exponential backoff when ``num_retries`` is set, error statuses raise
+``HttpError`` and the result goes through the request's ``postproc``.
+Before sending, every request waits for its quota budget in the client-side
+rate limiter (see core.rate_limiter). Requests of tools configured for
+hedging may be sent twice when the first copy is slow (see core.hedging).
+
+Requests that cannot be sent natively (batches, resumable uploads, clients
+built without credentials, or the httplib2 transport mode) run their regular
+``execute()`` on the dedicated Google API executor (see core.google_executor).
+"""
+
+import asyncio
+import logging
+import random
+import socket
+import weakref
+from threading import Lock
+from typing import Any, Dict, Tuple
+from urllib.parse import urlparse, urlunparse
+
+import httplib2
+import httpx
+from google_auth_httplib2 import Request as AuthRequest
+from googleapiclient.errors import HttpError
+from googleapiclient.http import MAX_URI_LENGTH, HttpRequest, _should_retry_response
+
+from auth.token_refresh import get_token_refresh_coordinator
+from auth.verified_token_cache import invalidate_verified_token
+from core.context import get_current_tool_name, get_current_user_email
+from core.google_executor import run_blocking
+from core.hedging import get_request_hedger
+from core.http_transport import (
+    get_http_transport,
+    get_transport_settings,
+    is_pooled_transport_enabled,
+    request_timeout,
+    to_httplib2_response,
+    translate_transport_error,
+)
+from core.rate_limiter import get_rate_limiter, is_rate_limiter_enabled
+
+logger = logging.getLogger(__name__)
+
+# Status codes that trigger a credential refresh, and how often to try
+REFRESH_STATUS_CODES = (401,)
+MAX_REFRESH_ATTEMPTS = 2
+
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+_clients_lock = Lock()
+
+_stats_lock = Lock()
+_stats: Dict[str, int] = {
+    "native_requests": 0,
+    "thread_fallbacks": 0,
+    "credential_refreshes": 0,
+    "retries": 0,
+    "in_flight": 0,
+    "peak_in_flight": 0,
+}
+
+
+def _bump(name: str, amount: int = 1) -> None:
+    with _stats_lock:
+        _stats[name] += amount
+        if name == "in_flight" and _stats["in_flight"] > _stats["peak_in_flight"]:
+            _stats["peak_in_flight"] = _stats["in_flight"]
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Get the pooled AsyncClient for the running event loop, creating it if needed."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is not None and not client.is_closed:
+        return client
+
+    with _clients_lock:
+        client = _clients.get(loop)
+        if client is None or client.is_closed:
+            settings = get_transport_settings()
+            # Reuse the sync transport's h2 availability check and warning
+            http2 = settings["http2"] and get_http_transport().http2
+            client = httpx.AsyncClient(
+                http2=http2,
+                timeout=settings["timeout"],
+                limits=httpx.Limits(
+                    max_connections=settings["max_connections"],
+                    max_keepalive_connections=settings["max_keepalive_connections"],
+                    keepalive_expiry=settings["keepalive_expiry"],
+                ),
+            )
+            _clients[loop] = client
+        return client
+
+
+async def close_async_http_client() -> None:
+    """Close the running event loop's AsyncClient, if one was created."""
+    loop = asyncio.get_running_loop()
+    with _clients_lock:
+        client = _clients.pop(loop, None)
+    if client is not None:
+        await client.aclose()
+
+
+def _can_execute_natively(request: Any) -> bool:
+    if not isinstance(request, HttpRequest):
+        return False
+    if request.resumable is not None:
+        return False
+    if not is_pooled_transport_enabled():
+        return False
+    return getattr(request.http, "credentials", None) is not None
+
+
+def _prepare(request: HttpRequest) -> Tuple[str, str, Any, Dict[str, str]]:
+    """Apply HttpRequest.execute()'s long-URI rewrite without mutating the request."""
+    uri = request.uri
+    method = request.method
+    body = request.body
+    headers = dict(request.headers)
+
+    if len(uri) > MAX_URI_LENGTH and method == "GET":
+        method = "POST"
+        headers["x-http-method-override"] = "GET"
+        headers["content-type"] = "application/x-www-form-urlencoded"
+        parsed = urlparse(uri)
+        uri = urlunparse(
+            (parsed.scheme, parsed.netloc, parsed.path, parsed.params, None, None)
+        )
+        body = parsed.query
+    return uri, method, body, headers
+
+
+async def _refresh_credentials(credentials: Any) -> None:
+    # Token refresh is a blocking call into google-auth; keep it off the event loop
+    # and share it with any concurrent refresh of the same grant.
+    await run_blocking(
+        get_token_refresh_coordinator().refresh,
+        credentials,
+        AuthRequest(get_http_transport()),
+        user_email=get_current_user_email(),
+    )
+    _bump("credential_refreshes")
+
+
+async def _send_authorized(
+    client: httpx.AsyncClient,
+    credentials: Any,
+    uri: str,
+    method: str,
+    body: Any,
+    headers: Dict[str, str],
+) -> Tuple[httplib2.Response, bytes]:
+    """Send one request with credentials applied, refreshing on 401 like AuthorizedHttp."""
+    if not credentials.valid:
+        await _refresh_credentials(credentials)
+
+    for refresh_attempt in range(MAX_REFRESH_ATTEMPTS + 1):
+        request_headers = dict(headers)
+        credentials.apply(request_headers)
+        try:
+            response = await client.request(
+                method,
+                uri,
+                content=body,
+                headers=request_headers,
+                follow_redirects=method in ("GET", "HEAD"),
+                timeout=request_timeout(client.timeout.read),
+            )
+        except httpx.TransportError as e:
+            raise translate_transport_error(e) from e
+
+        if response.status_code not in REFRESH_STATUS_CODES:
+            break
+        # Google rejected this token; stop trusting any cached verification of it
+        invalidate_verified_token(credentials.token)
+        if refresh_attempt == MAX_REFRESH_ATTEMPTS:
+            break
+        logger.info(
+            f"Refreshing credentials due to a {response.status_code} response "
+            f"(attempt {refresh_attempt + 1}/{MAX_REFRESH_ATTEMPTS})"
+        )
+        await _refresh_credentials(credentials)
+
+    return to_httplib2_response(response), response.content
+
+
+async def _send_with_retries(
+    request: HttpRequest, num_retries: int
+) -> Tuple[Any, bytes]:
+    """Send a request natively, retrying 429/5xx and connection errors like execute()."""
+    client = get_async_http_client()
+    credentials = request.http.credentials
+    uri, method, body, headers = _prepare(request)
+
+    _bump("native_requests")
+    _bump("in_flight")
+    try:
+        for retry_num in range(num_retries + 1):
+            if retry_num > 0:
+                _bump("retries")
+                delay = random.random() * 2**retry_num
+                logger.warning(
+                    f"Retrying {method} {request.methodId or uri} in {delay:.2f}s "
+                    f"(attempt {retry_num}/{num_retries})"
+                )
+                await asyncio.sleep(delay)
+            try:
+                resp, content = await _send_authorized(
+                    client, credentials, uri, method, body, headers
+                )
+            except (socket.timeout, ConnectionError):
+                if retry_num == num_retries:
+                    raise
+                continue
+            if not _should_retry_response(resp.status, content):
+                break
+    finally:
+        _bump("in_flight", -1)
+
+    return resp, content
+
+
+def _reserve_hedge_budget(request: HttpRequest) -> bool:
+    # A hedge is a second real request, so it must fit the quota budget without waiting
+    if not is_rate_limiter_enabled():
+        return True
+    return get_rate_limiter().try_acquire(request)
+
+
+async def execute_async(request: Any, num_retries: int = 0) -> Any:
+    """
+    Execute a googleapiclient request without blocking the event loop.
+
+    Args:
+        request: An HttpRequest (or BatchHttpRequest) built from a service
+        num_retries: Retries with randomized exponential backoff for 429/5xx
+            responses and connection errors, as in HttpRequest.execute()
+
+    Returns:
+        The deserialized response, exactly as request.execute() would return it.
+
+    Raises:
+        googleapiclient.errors.HttpError: If the response status is an error
+    """
+    if is_rate_limiter_enabled():
+        # Wait for quota budget rather than sending a request Google would reject
+        await get_rate_limiter().acquire(request)
+
+    if not _can_execute_natively(request):
+        _bump("thread_fallbacks")
+        try:
+            if isinstance(request, HttpRequest):
+                return await run_blocking(request.execute, num_retries=num_retries)
+            return await run_blocking(request.execute)
+        except HttpError as e:
+            if e.resp.status in REFRESH_STATUS_CODES:
+                credentials = getattr(
+                    getattr(request, "http", None), "credentials", None
+                )
+                invalidate_verified_token(getattr(credentials, "token", None))
+            raise
+
+    hedger = get_request_hedger()
+    tool_name = get_current_tool_name()
+    if hedger is not None and hedger.is_hedged(tool_name):
+        resp, content = await hedger.run(
+            tool_name,
+            request.methodId or request.uri,
+            lambda: _send_with_retries(request, num_retries),
+            lambda: _reserve_hedge_budget(request),
+        )
+    else:
+        resp, content = await _send_with_retries(request, num_retries)
+
+    for callback in request.response_callbacks:
+        callback(resp)
+    if resp.status >= 300:
+        raise HttpError(resp, content, uri=request.uri)
+    return request.postproc(resp, content)
+
+
+def get_execution_stats() -> Dict[str, int]:
+    """Get counters for native vs thread-backed Google API execution."""
+    with _stats_lock:
+        return dict(_stats)
@@ -0,0 +1,352 @@
+"""
+Per-API circuit breakers for Google API outages.
+
+When a Google API degrades, every tool call still waits through full timeouts
+and retries, so MCP requests and worker threads pile up behind an API that
+cannot answer. ``handle_http_errors`` consults a breaker per (API, error
+class) before each attempt:
+
+- closed: calls go through, and outcomes are counted in a rolling window.
+- open: once the failure rate of one error class crosses the threshold (with
+  enough calls to judge), calls fail fast with a transient error.
+- half-open: after ``open_seconds``, one probe call is let through per
+  ``probe_interval``. A successful probe closes the breaker; a failed one
+  reopens it.
+
+Only outage-like errors trip a breaker: 5xx responses and network errors.
+Rate limits are per user and handled by the quota limiter and retries, so one
+user's 429s never fail calls for everyone else.
+"""
+
+import logging
+import os
+import time
+from collections import deque
+from threading import Lock
+from typing import Any, Deque, Dict, List, Optional
+
+from googleapiclient.errors import HttpError
+
+from core.retry_policy import NETWORK_ERROR, SERVER_ERROR, classify_error
+
+logger = logging.getLogger(__name__)
+
+# Default breaker configuration (overridable via environment variables)
+DEFAULT_FAILURE_RATE_THRESHOLD = 0.5
+DEFAULT_MINIMUM_CALLS = 10
+DEFAULT_WINDOW_SECONDS = 30.0
+DEFAULT_OPEN_SECONDS = 30.0
+DEFAULT_PROBE_INTERVAL_SECONDS = 5.0
+
+# Error classes that get their own breaker per API
+BREAKER_ERROR_CLASSES = (SERVER_ERROR, NETWORK_ERROR)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Rolling failure-rate breaker for one (API, error class).
+
+    Outcomes are counted in one-second buckets covering ``window_seconds``.
+    """
+
+    def __init__(
+        self,
+        failure_rate_threshold: float = DEFAULT_FAILURE_RATE_THRESHOLD,
+        minimum_calls: int = DEFAULT_MINIMUM_CALLS,
+        window_seconds: float = DEFAULT_WINDOW_SECONDS,
+        open_seconds: float = DEFAULT_OPEN_SECONDS,
+        probe_interval: float = DEFAULT_PROBE_INTERVAL_SECONDS,
+    ):
+        self.failure_rate_threshold = failure_rate_threshold
+        self.minimum_calls = max(1, minimum_calls)
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self.probe_interval = probe_interval
+        self._lock = Lock()
+        # [second, calls, failures] buckets, oldest first
+        self._buckets: Deque[List[int]] = deque()
+        self._calls = 0
+        self._failures = 0
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._last_probe_at = 0.0
+        self._times_opened = 0
+        self._rejected = 0
+
+    def _expire_locked(self, now: float) -> None:
+        horizon = int(now - self.window_seconds)
+        while self._buckets and self._buckets[0][0] <= horizon:
+            _, calls, failures = self._buckets.popleft()
+            self._calls -= calls
+            self._failures -= failures
+
+    def _count_locked(self, now: float, failed: bool) -> None:
+        self._expire_locked(now)
+        second = int(now)
+        if not self._buckets or self._buckets[-1][0] != second:
+            self._buckets.append([second, 0, 0])
+        bucket = self._buckets[-1]
+        bucket[1] += 1
+        self._calls += 1
+        if failed:
+            bucket[2] += 1
+            self._failures += 1
+
+    def _reset_window_locked(self) -> None:
+        self._buckets.clear()
+        self._calls = 0
+        self._failures = 0
+
+    def _state_locked(self, now: float) -> str:
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+        return self._state
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state_locked(time.monotonic())
+
+    def _would_allow_locked(self, now: float) -> bool:
+        state = self._state_locked(now)
+        return state == CLOSED or (
+            state == HALF_OPEN and now - self._last_probe_at >= self.probe_interval
+        )
+
+    def would_allow(self) -> bool:
+        """Whether allow() would let a call through now, without taking a probe slot."""
+        with self._lock:
+            return self._would_allow_locked(time.monotonic())
+
+    def reject(self) -> None:
+        """Count a call rejected on this breaker's account."""
+        with self._lock:
+            self._rejected += 1
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead now (half-open lets a probe through periodically)."""
+        now = time.monotonic()
+        with self._lock:
+            if not self._would_allow_locked(now):
+                self._rejected += 1
+                return False
+            if self._state_locked(now) == HALF_OPEN:
+                self._last_probe_at = now
+            return True
+
+    def retry_in(self) -> float:
+        """Seconds until the breaker lets a call through again."""
+        now = time.monotonic()
+        with self._lock:
+            state = self._state_locked(now)
+            if state == CLOSED:
+                return 0.0
+            if state == OPEN:
+                return self.open_seconds - (now - self._opened_at)
+            return max(0.0, self.probe_interval - (now - self._last_probe_at))
+
+    def record_success(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if self._state_locked(now) == HALF_OPEN:
+                self._state = CLOSED
+                self._reset_window_locked()
+                logger.info("Circuit breaker closed after a successful probe")
+            self._count_locked(now, failed=False)
+
+    def record_failure(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            state = self._state_locked(now)
+            self._count_locked(now, failed=True)
+            if state == HALF_OPEN or (
+                state == CLOSED
+                and self._calls >= self.minimum_calls
+                and self._failures / self._calls >= self.failure_rate_threshold
+            ):
+                self._state = OPEN
+                self._opened_at = now
+                self._times_opened += 1
+                self._reset_window_locked()
+
+    def get_stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        with self._lock:
+            self._expire_locked(now)
+            return {
+                "state": self._state_locked(now),
+                "calls": self._calls,
+                "failures": self._failures,
+                "failure_rate": (self._failures / self._calls) if self._calls else 0.0,
+                "times_opened": self._times_opened,
+                "rejected": self._rejected,
+            }
+
+
+class ApiCircuitBreakers:
+    """The breakers for one Google API, one per error class."""
+
+    def __init__(self, api: str, **settings: Any):
+        self.api = api
+        self._lock = Lock()
+        self.breakers = {
+            error_class: CircuitBreaker(**settings)
+            for error_class in BREAKER_ERROR_CLASSES
+        }
+
+    def allow(self) -> bool:
+        """Whether a call may go ahead; every error class's breaker must agree."""
+        with self._lock:
+            # Check every breaker first, so a half-open breaker only spends its
+            # probe slot on a call that the other breakers let through
+            blocking = [
+                breaker
+                for breaker in self.breakers.values()
+                if not breaker.would_allow()
+            ]
+            if blocking:
+                for breaker in blocking:
+                    breaker.reject()
+                return False
+            for breaker in self.breakers.values():
+                breaker.allow()
+            return True
+
+    def record(self, error: Optional[BaseException]) -> None:
+        """
+        Record the outcome of a call.
+
+        Args:
+            error: The exception the call raised, or None on success
+        """
+        error_class = None
+        if error is not None:
+            error_class = classify_error(error)
+            if error_class is None and isinstance(
+                error, (TimeoutError, ConnectionError)
+            ):
+                error_class = NETWORK_ERROR
+            if error_class is None and not isinstance(error, HttpError):
+                # Not an answer from the API (e.g. invalid input); says nothing about its health
+                return
+        for name, breaker in self.breakers.items():
+            if name == error_class:
+                was_open = breaker.state != CLOSED
+                breaker.record_failure()
+                if not was_open and breaker.state == OPEN:
+                    logger.warning(
+                        f"Circuit breaker for {self.api} ({name}) opened; failing fast "
+                        f"for {breaker.open_seconds:.0f}s"
+                    )
+            else:
+                # Errors of other classes (e.g. a 404) still prove the API answers
+                breaker.record_success()
+
+    def open_message(self, tool_name: str) -> str:
+        """A user-facing explanation for a call rejected by an open breaker."""
+        open_classes = [
+            name for name, breaker in self.breakers.items() if breaker.state != CLOSED
+        ]
+        retry_in = max(
+            (self.breakers[name].retry_in() for name in open_classes), default=0.0
+        )
+        return (
+            f"The Google {self.api} API is currently failing ({', '.join(open_classes)}), "
+            f"so '{tool_name}' was not attempted. This is a temporary outage; "
+            f"please try again in about {max(1, round(retry_in))} seconds."
+        )
+
+    def is_open(self) -> bool:
+        return any(breaker.state != CLOSED for breaker in self.breakers.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {name: breaker.get_stats() for name, breaker in self.breakers.items()}
+
+
+# Global breakers, keyed by API (service_type)
+_breakers: Dict[str, ApiCircuitBreakers] = {}
+_breakers_lock = Lock()
+_breaker_settings: Optional[Dict[str, Any]] = None
+
+
+def is_circuit_breaker_enabled() -> bool:
+    """Whether circuit breakers are on (WORKSPACE_MCP_CIRCUIT_BREAKER, default true)."""
+    return os.getenv("WORKSPACE_MCP_CIRCUIT_BREAKER", "true").lower() in (
+        "true",
+        "1",
+        "yes",
+    )
+
+
+def _get_breaker_settings() -> Dict[str, Any]:
+    global _breaker_settings
+
+    if _breaker_settings is None:
+        _breaker_settings = {
+            "failure_rate_threshold": float(
+                os.getenv(
+                    "WORKSPACE_MCP_CIRCUIT_FAILURE_RATE",
+                    str(DEFAULT_FAILURE_RATE_THRESHOLD),
+                )
+            ),
+            "minimum_calls": int(
+                os.getenv("WORKSPACE_MCP_CIRCUIT_MIN_CALLS", str(DEFAULT_MINIMUM_CALLS))
+            ),
+            "window_seconds": float(
+                os.getenv("WORKSPACE_MCP_CIRCUIT_WINDOW", str(DEFAULT_WINDOW_SECONDS))
+            ),
+            "open_seconds": float(
+                os.getenv(
+                    "WORKSPACE_MCP_CIRCUIT_OPEN_SECONDS", str(DEFAULT_OPEN_SECONDS)
+                )
+            ),
+        }
+    return _breaker_settings
+
+
+def get_circuit_breakers(api: str) -> ApiCircuitBreakers:
+    """
+    Get the circuit breakers for a Google API, creating them from configuration.
+
+    Environment variables:
+        WORKSPACE_MCP_CIRCUIT_FAILURE_RATE: Failure rate (0-1) that opens a breaker
+        WORKSPACE_MCP_CIRCUIT_MIN_CALLS: Calls in the window before the rate is judged
+        WORKSPACE_MCP_CIRCUIT_WINDOW: Rolling window in seconds
+        WORKSPACE_MCP_CIRCUIT_OPEN_SECONDS: Seconds a breaker stays open before probing
+    """
+    breakers = _breakers.get(api)
+    if breakers is None:
+        with _breakers_lock:
+            breakers = _breakers.get(api)
+            if breakers is None:
+                breakers = _breakers[api] = ApiCircuitBreakers(
+                    api, **_get_breaker_settings()
+                )
+    return breakers
+
+
+def reset_circuit_breakers() -> None:
+    """Forget all breakers and reload settings from the environment."""
+    global _breaker_settings
+
+    with _breakers_lock:
+        _breakers.clear()
+        _breaker_settings = None
+
+
+def any_circuit_open() -> bool:
+    """Whether any API currently has an open or half-open breaker."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return any(api_breakers.is_open() for api_breakers in breakers)
+
+
+def get_circuit_breaker_stats() -> Dict[str, Any]:
+    """Get breaker state per API and error class."""
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {api: breakers[api].get_stats() for api in sorted(breakers)}
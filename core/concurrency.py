@@ -0,0 +1,327 @@
+"""
+Adaptive concurrency control for Google API fan-out.
+
+Tools that fetch many items (e.g. a list of Gmail messages or threads) used to
+fan out with fixed batch sizes. Those waste throughput when quota is available
+and trigger 429s when it is not.
+
+AdaptiveConcurrencyController keeps an in-flight window per (user, API) and
+adjusts it with AIMD (additive increase, multiplicative decrease). The window
+grows by about one slot per window of successful requests. It is cut in half
+when Google answers 429/503, or when latency rises well above its observed
+baseline. Fan-out code sizes batches from ``window`` and bounds parallel
+requests with ``slot()``:
+
+    controller = get_concurrency_controller(user_google_email, "gmail")
+    async with controller.slot():
+        await execute_async(request)
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from threading import Lock
+from typing import Any, Deque, Dict, Optional, Tuple
+
+from googleapiclient.errors import HttpError
+
+logger = logging.getLogger(__name__)
+
+# Default controller configuration (overridable via environment variables)
+DEFAULT_INITIAL_WINDOW = 10
+DEFAULT_MIN_WINDOW = 1
+DEFAULT_MAX_WINDOW = 50
+DEFAULT_DECREASE_FACTOR = 0.5
+# A request slower than this multiple of the baseline latency counts as congestion
+DEFAULT_LATENCY_TOLERANCE = 3.0
+# Smoothing factor for the baseline latency moving average
+_BASELINE_ALPHA = 0.05
+
+# Controllers are pruned once this many exist, dropping idle ones first
+MAX_CONTROLLERS = 10000
+
+# Statuses that mean Google wants fewer requests in flight
+OVERLOAD_STATUSES = frozenset({429, 503})
+
+
+def is_overload_error(error: Optional[BaseException]) -> bool:
+    """Whether an error is Google signalling overload (429 or 503)."""
+    return isinstance(error, HttpError) and error.resp.status in OVERLOAD_STATUSES
+
+
+class _Slot:
+    """Async context manager holding one in-flight slot and reporting its outcome."""
+
+    __slots__ = ("_controller", "_started_at")
+
+    def __init__(self, controller: "AdaptiveConcurrencyController"):
+        self._controller = controller
+        self._started_at = 0.0
+
+    async def __aenter__(self) -> "_Slot":
+        await self._controller.acquire()
+        self._started_at = time.monotonic()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        controller = self._controller
+        controller.release()
+        if is_overload_error(exc):
+            controller.record_overload(self._started_at)
+        elif exc is None:
+            controller.record_success(
+                time.monotonic() - self._started_at, started_at=self._started_at
+            )
+
+
+class AdaptiveConcurrencyController:
+    """
+    AIMD in-flight window for one (user, API) pair.
+
+    ``window`` is the number of requests that may be in flight (or the size of
+    the next batch). ``acquire``/``release`` enforce it, waking waiters FIFO.
+    A decrease is applied at most once per round trip: signals from requests
+    that started before the last decrease are ignored, since they reflect the
+    old window.
+    """
+
+    def __init__(
+        self,
+        initial_window: int = DEFAULT_INITIAL_WINDOW,
+        min_window: int = DEFAULT_MIN_WINDOW,
+        max_window: int = DEFAULT_MAX_WINDOW,
+        decrease_factor: float = DEFAULT_DECREASE_FACTOR,
+        latency_tolerance: float = DEFAULT_LATENCY_TOLERANCE,
+    ):
+        self.min_window = max(1, min_window)
+        self.max_window = max(self.min_window, max_window)
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self._window = float(min(max(initial_window, self.min_window), self.max_window))
+        self._lock = Lock()
+        self._in_flight = 0
+        self._waiters: Deque[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._baseline_latency: Optional[float] = None
+        self._last_decrease_at = 0.0
+        self._increases = 0
+        self._decreases = 0
+
+    @property
+    def window(self) -> int:
+        """Current window, in whole requests."""
+        return int(self._window)
+
+    @property
+    def idle(self) -> bool:
+        return self._in_flight == 0 and not self._waiters
+
+    async def acquire(self) -> None:
+        """Wait for an in-flight slot."""
+        with self._lock:
+            if self._in_flight < self.window and not self._waiters:
+                self._in_flight += 1
+                return
+            loop = asyncio.get_running_loop()
+            waiter = loop.create_future()
+            self._waiters.append((loop, waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            with self._lock:
+                try:
+                    self._waiters.remove((loop, waiter))
+                except ValueError:
+                    # The slot was already handed to us; pass it on
+                    self._in_flight -= 1
+                    self._wake_locked()
+            raise
+
+    def release(self) -> None:
+        """Give back a slot taken by acquire()."""
+        with self._lock:
+            self._in_flight -= 1
+            self._wake_locked()
+
+    def _wake_locked(self) -> None:
+        # Hand free slots to waiters in FIFO order. Caller must hold the lock.
+        while self._waiters and self._in_flight < self.window:
+            loop, waiter = self._waiters.popleft()
+            self._in_flight += 1
+            loop.call_soon_threadsafe(_resolve, waiter)
+
+    def slot(self) -> _Slot:
+        """Async context manager that holds a slot and reports the request's outcome."""
+        return _Slot(self)
+
+    def record_success(
+        self, latency: float, count: int = 1, started_at: Optional[float] = None
+    ) -> None:
+        """
+        Record successful requests and grow the window additively.
+
+        Args:
+            latency: Time per request in seconds (for a batch, its time divided by its size)
+            count: Number of requests that succeeded
+            started_at: Monotonic time the request started, used to ignore
+                signals from before the last decrease
+        """
+        with self._lock:
+            baseline = self._baseline_latency
+            if baseline is not None and latency > baseline * self.latency_tolerance:
+                if started_at is None or started_at >= self._last_decrease_at:
+                    self._decrease_locked("latency")
+            else:
+                # +1 per window's worth of successes
+                self._window = min(self.max_window, self._window + count / self._window)
+                self._increases += 1
+                self._wake_locked()
+            if baseline is None:
+                self._baseline_latency = latency
+            else:
+                self._baseline_latency = baseline + _BASELINE_ALPHA * (
+                    latency - baseline
+                )
+
+    def record_overload(self, started_at: Optional[float] = None) -> None:
+        """
+        Record a 429/503 response and cut the window multiplicatively.
+
+        Args:
+            started_at: Monotonic time the rejected request started
+        """
+        with self._lock:
+            if started_at is None or started_at >= self._last_decrease_at:
+                self._decrease_locked("overload")
+
+    def _decrease_locked(self, reason: str) -> None:
+        previous = self._window
+        self._window = max(float(self.min_window), self._window * self.decrease_factor)
+        self._last_decrease_at = time.monotonic()
+        self._decreases += 1
+        logger.debug(
+            f"Concurrency window cut from {previous:.1f} to {self._window:.1f} ({reason})"
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the current window and adjustment counters."""
+        with self._lock:
+            return {
+                "window": self.window,
+                "in_flight": self._in_flight,
+                "waiting": len(self._waiters),
+                "baseline_latency_ms": (
+                    self._baseline_latency * 1000
+                    if self._baseline_latency is not None
+                    else None
+                ),
+                "increases": self._increases,
+                "decreases": self._decreases,
+            }
+
+
+def _resolve(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+    # A waiter cancelled after being handed a slot releases it in acquire()
+
+
+# Global controller registry, keyed by (user, api)
+_controllers: "OrderedDict[Tuple[str, str], AdaptiveConcurrencyController]" = (
+    OrderedDict()
+)
+_controllers_lock = Lock()
+_controller_settings: Optional[Dict[str, Any]] = None
+
+
+def _get_controller_settings() -> Dict[str, Any]:
+    global _controller_settings
+
+    if _controller_settings is None:
+        _controller_settings = {
+            "initial_window": int(
+                os.getenv(
+                    "WORKSPACE_MCP_CONCURRENCY_INITIAL", str(DEFAULT_INITIAL_WINDOW)
+                )
+            ),
+            "min_window": int(
+                os.getenv("WORKSPACE_MCP_CONCURRENCY_MIN", str(DEFAULT_MIN_WINDOW))
+            ),
+            "max_window": int(
+                os.getenv("WORKSPACE_MCP_CONCURRENCY_MAX", str(DEFAULT_MAX_WINDOW))
+            ),
+        }
+    return _controller_settings
+
+
+def get_concurrency_controller(
+    user: Optional[str], api: str
+) -> AdaptiveConcurrencyController:
+    """
+    Get the concurrency controller for a user's calls to one Google API.
+
+    Environment variables:
+        WORKSPACE_MCP_CONCURRENCY_INITIAL: Starting window for a new (user, API)
+        WORKSPACE_MCP_CONCURRENCY_MIN: Smallest window
+        WORKSPACE_MCP_CONCURRENCY_MAX: Largest window (also the largest batch)
+    """
+    key = (user or "", api)
+    with _controllers_lock:
+        controller = _controllers.get(key)
+        if controller is not None:
+            _controllers.move_to_end(key)
+            return controller
+        if len(_controllers) >= MAX_CONTROLLERS:
+            # Dropping an idle controller only forgets its learned window
+            for old_key in [k for k, c in _controllers.items() if c.idle]:
+                del _controllers[old_key]
+                if len(_controllers) < MAX_CONTROLLERS:
+                    break
+        controller = _controllers[key] = AdaptiveConcurrencyController(
+            **_get_controller_settings()
+        )
+        return controller
+
+
+def reset_concurrency_controllers() -> None:
+    """Forget all controllers and reload settings from the environment."""
+    global _controller_settings
+
+    with _controllers_lock:
+        _controllers.clear()
+        _controller_settings = None
+
+
+def get_concurrency_stats() -> Dict[str, Any]:
+    """
+    Get concurrency windows aggregated per API.
+
+    Windows are not reported per user so /health does not expose user emails.
+    """
+    with _controllers_lock:
+        controllers = list(_controllers.items())
+    apis: Dict[str, Dict[str, Any]] = {}
+    for (_, api), controller in controllers:
+        stats = controller.get_stats()
+        entry = apis.get(api)
+        if entry is None:
+            entry = apis[api] = {
+                "controllers": 0,
+                "window_min": stats["window"],
+                "window_max": stats["window"],
+                "window_total": 0,
+                "in_flight": 0,
+                "waiting": 0,
+                "decreases": 0,
+            }
+        entry["controllers"] += 1
+        entry["window_min"] = min(entry["window_min"], stats["window"])
+        entry["window_max"] = max(entry["window_max"], stats["window"])
+        entry["window_total"] += stats["window"]
+        entry["in_flight"] += stats["in_flight"]
+        entry["waiting"] += stats["waiting"]
+        entry["decreases"] += stats["decreases"]
+    for entry in apis.values():
+        entry["window_avg"] = entry.pop("window_total") / entry["controllers"]
+    return {"apis": dict(sorted(apis.items()))}
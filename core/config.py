@@ -7,7 +7,11 @@ NOTE: OAuth configuration has been moved to auth.oauth_config for centralization
 This module now imports from there for backward compatibility.
 """
 
+import json
+import logging
 import os
+from typing import Dict, Optional
+
 from auth.oauth_config import (
     get_oauth_base_url,
     get_oauth_redirect_uri,
@@ -25,11 +29,72 @@ USER_GOOGLE_EMAIL = (
     None if is_oauth21_enabled() else os.getenv("USER_GOOGLE_EMAIL", None)
 )
 
+# Tool deadlines (seconds). A tool call that runs past its deadline is
+# cancelled, and the remaining time also bounds the socket timeout of each
+# Google request it makes. Read-only tools get tighter defaults than writes.
+DEFAULT_READ_ONLY_TOOL_DEADLINE_SECONDS = float(
+    os.getenv("WORKSPACE_MCP_READ_ONLY_TOOL_DEADLINE", "45")
+)
+DEFAULT_WRITE_TOOL_DEADLINE_SECONDS = float(
+    os.getenv("WORKSPACE_MCP_WRITE_TOOL_DEADLINE", "120")
+)
+
+# Tools whose work differs from their class default
+TOOL_DEADLINES: Dict[str, float] = {
+    # Bulk fetches fan out over many messages or threads
+    "get_gmail_message_content": 90.0,
+    "get_gmail_thread_content": 90.0,
+    "search_gmail_messages": 30.0,
+    # Attachments can be large downloads
+    "get_gmail_attachment_content": 120.0,
+    "send_gmail_message": 60.0,
+}
+
+
+def _load_tool_deadline_overrides() -> Dict[str, float]:
+    raw = os.getenv("WORKSPACE_MCP_TOOL_DEADLINES", "").strip()
+    if not raw:
+        return {}
+    try:
+        return {tool: float(seconds) for tool, seconds in json.loads(raw).items()}
+    except (ValueError, TypeError, AttributeError) as e:
+        logging.getLogger(__name__).warning(
+            f"Ignoring invalid WORKSPACE_MCP_TOOL_DEADLINES: {e}"
+        )
+        return {}
+
+
+TOOL_DEADLINES.update(_load_tool_deadline_overrides())
+
+
+def get_tool_deadline(tool_name: str, is_read_only: bool = False) -> Optional[float]:
+    """
+    Get the deadline for a tool call, in seconds.
+
+    Looks up TOOL_DEADLINES (extended by the WORKSPACE_MCP_TOOL_DEADLINES JSON
+    object), then falls back to the read-only or write default. A value of 0
+    disables the deadline.
+
+    Returns:
+        Seconds the tool may run, or None for no deadline
+    """
+    deadline = TOOL_DEADLINES.get(tool_name)
+    if deadline is None:
+        deadline = (
+            DEFAULT_READ_ONLY_TOOL_DEADLINE_SECONDS
+            if is_read_only
+            else DEFAULT_WRITE_TOOL_DEADLINE_SECONDS
+        )
+    return deadline if deadline > 0 else None
+
+
 # Re-export OAuth functions for backward compatibility
 __all__ = [
     "WORKSPACE_MCP_PORT",
     "WORKSPACE_MCP_BASE_URI",
     "USER_GOOGLE_EMAIL",
+    "TOOL_DEADLINES",
+    "get_tool_deadline",
     "get_oauth_base_url",
     "get_oauth_redirect_uri",
     "set_transport_mode",
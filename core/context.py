@@ -41,3 +41,80 @@ def set_fastmcp_session_id(session_id: Optional[str]):
     This is called when a FastMCP request starts.
     """
     _fastmcp_session_id.set(session_id)
+
+
+# Context variables identifying the Google user and tool a request is running for.
+# Used to attribute blocking Google API work to a user for fair scheduling.
+_current_user_email = contextvars.ContextVar("current_user_email", default=None)
+_current_tool_name = contextvars.ContextVar("current_tool_name", default=None)
+
+
+def get_current_user_email() -> Optional[str]:
+    """
+    Retrieve the Google user email the current tool call acts on behalf of.
+    """
+    return _current_user_email.get()
+
+
+def set_current_user_email(user_email: Optional[str]) -> contextvars.Token:
+    """
+    Set the Google user email for the current tool call.
+    Returns a token that can be passed to reset_current_user_email().
+    """
+    return _current_user_email.set(user_email)
+
+
+def reset_current_user_email(token: contextvars.Token):
+    """
+    Restore the user email that was current before set_current_user_email().
+    """
+    _current_user_email.reset(token)
+
+
+def get_current_tool_name() -> Optional[str]:
+    """
+    Retrieve the name of the tool currently being executed.
+    """
+    return _current_tool_name.get()
+
+
+def set_current_tool_name(tool_name: Optional[str]) -> contextvars.Token:
+    """
+    Set the name of the tool currently being executed.
+    Returns a token that can be passed to reset_current_tool_name().
+    """
+    return _current_tool_name.set(tool_name)
+
+
+def reset_current_tool_name(token: contextvars.Token):
+    """
+    Restore the tool name that was current before set_current_tool_name().
+    """
+    _current_tool_name.reset(token)
+
+
+# Context variable holding the monotonic time by which the current tool call must finish.
+# Google requests made on its behalf cap their socket timeouts at the time remaining.
+_current_deadline = contextvars.ContextVar("current_deadline", default=None)
+
+
+def get_current_deadline() -> Optional[float]:
+    """
+    Retrieve the monotonic deadline of the current tool call, if it has one.
+    """
+    return _current_deadline.get()
+
+
+def set_current_deadline(deadline: Optional[float]) -> contextvars.Token:
+    """
+    Set the monotonic deadline of the current tool call.
+    Returns a token that can be passed to reset_current_deadline().
+    """
+    return _current_deadline.set(deadline)
+
+
+def reset_current_deadline(token: contextvars.Token):
+    """
+    Restore the deadline that was current before set_current_deadline().
+    """
+    _current_deadline.reset(token)
@@ -0,0 +1,206 @@
+"""
+Pinned Google API discovery documents.
+
+The server ships the discovery JSON for every Google API it calls in
+core/discovery_documents/. Documents are parsed once into memory and clients
+are built from them with build_from_document(), so building a client never
+touches the network or the filesystem after startup.
+
+To update a pinned document, download it from
+https://www.googleapis.com/discovery/v1/apis/<api>/<version>/rest and replace
+core/discovery_documents/<api>.<version>.json.
+"""
+
+import json
+import logging
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple
+
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build, build_from_document
+
+from core.http_transport import get_http_transport, is_pooled_transport_enabled
+
+logger = logging.getLogger(__name__)
+
+DISCOVERY_DOCUMENTS_DIR = Path(__file__).parent / "discovery_documents"
+
+# Every (service, version) the server builds clients for
+PINNED_DISCOVERY_DOCUMENTS: Tuple[Tuple[str, str], ...] = (
+    ("gmail", "v1"),
+    ("calendar", "v3"),
+    ("docs", "v1"),
+    ("sheets", "v4"),
+    ("slides", "v1"),
+    ("script", "v1"),
+    ("drive", "v3"),
+    ("oauth2", "v2"),
+)
+
+DEFAULT_DISCOVERY_MAX_AGE_DAYS = 180
+
+_documents: Dict[Tuple[str, str], Dict[str, Any]] = {}
+_missing: set = set()
+_documents_lock = Lock()
+
+
+class _NoopHttp:
+    """Placeholder transport used while warming documents; never sends requests."""
+
+    def close(self):
+        pass
+
+
+def _warm_resource(resource: Any, resource_desc: Dict[str, Any]) -> None:
+    """
+    Instantiate every nested resource once.
+
+    googleapiclient normalizes method descriptions in place the first time a
+    resource is created. Doing that up front, on one thread, means later
+    concurrent builds only ever re-apply identical values to the shared document.
+    """
+    for name, nested_desc in resource_desc.get("resources", {}).items():
+        nested_attr = getattr(resource, name, None)
+        if nested_attr is None:
+            nested_attr = getattr(resource, f"{name}_", None)
+        if nested_attr is None:
+            continue
+        _warm_resource(nested_attr(), nested_desc)
+
+
+def _load_document(service_name: str, version: str) -> Optional[Dict[str, Any]]:
+    path = DISCOVERY_DOCUMENTS_DIR / f"{service_name}.{version}.json"
+    if not path.exists():
+        return None
+
+    with open(path, "r") as f:
+        document = json.load(f)
+
+    _warm_resource(build_from_document(document, http=_NoopHttp()), document)
+    logger.debug(
+        f"Loaded pinned discovery document {service_name} {version} (revision {document.get('revision')})"
+    )
+    return document
+
+
+def get_discovery_document(service_name: str, version: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the parsed, pinned discovery document for an API.
+
+    Returns:
+        The discovery document dict, or None if no pinned document exists.
+    """
+    key = (service_name, version)
+    document = _documents.get(key)
+    if document is not None or key in _missing:
+        return document
+
+    with _documents_lock:
+        if key in _documents:
+            return _documents[key]
+        if key in _missing:
+            return None
+        try:
+            document = _load_document(service_name, version)
+        except (IOError, json.JSONDecodeError) as e:
+            logger.error(
+                f"Failed to load pinned discovery document {service_name} {version}: {e}"
+            )
+            document = None
+        if document is None:
+            _missing.add(key)
+        else:
+            _documents[key] = document
+        return document
+
+
+def preload_discovery_documents() -> int:
+    """
+    Parse every pinned discovery document into memory.
+
+    Returns:
+        Number of documents loaded.
+    """
+    loaded = 0
+    for service_name, version in PINNED_DISCOVERY_DOCUMENTS:
+        if get_discovery_document(service_name, version) is not None:
+            loaded += 1
+        else:
+            logger.warning(
+                f"No pinned discovery document for {service_name} {version}; clients will use build()"
+            )
+    return loaded
+
+
+def build_service(
+    service_name: str,
+    version: str,
+    credentials: Any = None,
+    http: Any = None,
+) -> Any:
+    """
+    Build a Google API client, preferring the pinned in-memory discovery document.
+
+    Falls back to googleapiclient's build() for APIs that are not pinned. When
+    only credentials are given, requests are authorized on top of the shared
+    pooled transport (see core.http_transport) unless it has been disabled.
+    """
+    if http is None and credentials is not None and is_pooled_transport_enabled():
+        http = AuthorizedHttp(credentials, http=get_http_transport())
+        credentials = None
+
+    document = get_discovery_document(service_name, version)
+    if document is None:
+        return build(service_name, version, credentials=credentials, http=http)
+    return build_from_document(document, credentials=credentials, http=http)
+
+
+def get_stale_discovery_documents(
+    max_age_days: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Find pinned documents whose revision is older than the allowed age.
+
+    Args:
+        max_age_days: Maximum allowed age. Defaults to
+            WORKSPACE_MCP_DISCOVERY_MAX_AGE_DAYS (or 180 days).
+
+    Returns:
+        List of dicts with service, version, revision and age_days.
+    """
+    if max_age_days is None:
+        max_age_days = int(
+            os.getenv(
+                "WORKSPACE_MCP_DISCOVERY_MAX_AGE_DAYS",
+                str(DEFAULT_DISCOVERY_MAX_AGE_DAYS),
+            )
+        )
+
+    today = datetime.now(timezone.utc).date()
+    stale = []
+    for service_name, version in PINNED_DISCOVERY_DOCUMENTS:
+        document = get_discovery_document(service_name, version)
+        if not document:
+            continue
+        revision = document.get("revision")
+        try:
+            revision_date = datetime.strptime(revision, "%Y%m%d").date()
+        except (TypeError, ValueError):
+            logger.debug(
+                f"Discovery document {service_name} {version} has unparseable revision '{revision}'"
+            )
+            continue
+        age_days = (today - revision_date).days
+        if age_days > max_age_days:
+            stale.append(
+                {
+                    "service": service_name,
+                    "version": version,
+                    "revision": revision,
+                    "age_days": age_days,
+                }
+            )
+    return stale
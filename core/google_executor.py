@@ -0,0 +1,362 @@
+"""
+Dedicated, fair executor for blocking Google API work.
+
+Blocking Google calls that remain (batch requests, resumable uploads, token
+refreshes, the httplib2 transport mode) used to share the event loop's default
+thread pool with unrelated work such as credential file I/O. One user's bulk
+fetch could occupy every worker and stall everyone else.
+
+FairExecutor runs that work on its own threads. Pending work is queued per
+user and workers pick users round-robin, never letting one user hold more
+than ``per_user_limit`` workers at a time. Queue depth, wait time and run time
+are tracked per tool.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from core.context import get_current_tool_name, get_current_user_email
+
+logger = logging.getLogger(__name__)
+
+# Default executor configuration (overridable via environment variables)
+DEFAULT_MAX_WORKERS = 32
+DEFAULT_PER_USER_LIMIT = 8
+
+_ANONYMOUS_USER = ""
+_UNKNOWN_TOOL = "unknown"
+
+
+class _WorkItem:
+    __slots__ = ("future", "fn", "user", "tool", "submitted_at")
+
+    def __init__(self, future: Future, fn: Callable[[], Any], user: str, tool: str):
+        self.future = future
+        self.fn = fn
+        self.user = user
+        self.tool = tool
+        self.submitted_at = time.monotonic()
+
+
+class _ToolStats:
+    __slots__ = (
+        "submitted",
+        "completed",
+        "failed",
+        "queued",
+        "running",
+        "total_wait",
+        "max_wait",
+        "total_run",
+        "max_run",
+        "abandoned",
+    )
+
+    def __init__(self):
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.abandoned = 0
+        self.queued = 0
+        self.running = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+        self.max_run = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        started = self.completed + self.failed + self.running
+        finished = self.completed + self.failed
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "abandoned": self.abandoned,
+            "queue_depth": self.queued,
+            "running": self.running,
+            "avg_wait_ms": (self.total_wait / started * 1000) if started else 0.0,
+            "max_wait_ms": self.max_wait * 1000,
+            "avg_run_ms": (self.total_run / finished * 1000) if finished else 0.0,
+            "max_run_ms": self.max_run * 1000,
+        }
+
+
+class FairExecutor:
+    """
+    Thread pool that schedules work fairly across users.
+
+    Work for each user is queued FIFO; workers take the next item from the
+    next user in round-robin order that is below its concurrency limit.
+    Worker threads are started lazily, up to max_workers.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        per_user_limit: int = DEFAULT_PER_USER_LIMIT,
+        thread_name_prefix: str = "google-api",
+    ):
+        self.max_workers = max(1, max_workers)
+        self.per_user_limit = max(1, min(per_user_limit, self.max_workers))
+        self._thread_name_prefix = thread_name_prefix
+        self._cond = threading.Condition()
+        self._pending: Dict[str, Deque[_WorkItem]] = {}
+        # Users with pending work, in the order they will next be served
+        self._ready: Deque[str] = deque()
+        self._running: Dict[str, int] = {}
+        self._threads: List[threading.Thread] = []
+        self._idle_workers = 0
+        self._queue_depth = 0
+        self._shutdown = False
+        self._tool_stats: Dict[str, _ToolStats] = {}
+        self._abandoned = 0
+
+    def submit(
+        self,
+        fn: Callable[[], Any],
+        user: Optional[str] = None,
+        tool: Optional[str] = None,
+    ) -> Future:
+        """
+        Schedule a blocking callable on behalf of a user.
+
+        Args:
+            fn: Zero-argument callable to run
+            user: User the work is attributed to for fair scheduling
+            tool: Tool name the work is attributed to for statistics
+
+        Returns:
+            A concurrent.futures.Future for the result.
+        """
+        future: Future = Future()
+        item = _WorkItem(future, fn, user or _ANONYMOUS_USER, tool or _UNKNOWN_TOOL)
+
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("Cannot schedule new work after shutdown")
+            queue = self._pending.get(item.user)
+            if queue is None:
+                queue = self._pending[item.user] = deque()
+                self._ready.append(item.user)
+            queue.append(item)
+            self._queue_depth += 1
+            stats = self._tool_stats_locked(item.tool)
+            stats.submitted += 1
+            stats.queued += 1
+            if (
+                self._queue_depth > self._idle_workers
+                and len(self._threads) < self.max_workers
+            ):
+                self._start_worker_locked()
+            self._cond.notify()
+        return future
+
+    def _tool_stats_locked(self, tool: str) -> _ToolStats:
+        stats = self._tool_stats.get(tool)
+        if stats is None:
+            stats = self._tool_stats[tool] = _ToolStats()
+        return stats
+
+    def _start_worker_locked(self) -> None:
+        thread = threading.Thread(
+            target=self._worker,
+            name=f"{self._thread_name_prefix}-{len(self._threads)}",
+            daemon=True,
+        )
+        self._threads.append(thread)
+        thread.start()
+
+    def _next_item_locked(self) -> Optional[_WorkItem]:
+        """Pop the next runnable item, rotating through users. Caller must hold lock."""
+        for _ in range(len(self._ready)):
+            user = self._ready.popleft()
+            if self._running.get(user, 0) >= self.per_user_limit:
+                self._ready.append(user)
+                continue
+            queue = self._pending[user]
+            item = queue.popleft()
+            if queue:
+                self._ready.append(user)
+            else:
+                del self._pending[user]
+            self._queue_depth -= 1
+            return item
+        return None
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                item = self._next_item_locked()
+                while item is None:
+                    if self._shutdown and not self._pending:
+                        return
+                    self._idle_workers += 1
+                    self._cond.wait()
+                    self._idle_workers -= 1
+                    item = self._next_item_locked()
+                self._running[item.user] = self._running.get(item.user, 0) + 1
+                stats = self._tool_stats_locked(item.tool)
+                stats.queued -= 1
+                stats.running += 1
+                wait = time.monotonic() - item.submitted_at
+                stats.total_wait += wait
+                stats.max_wait = max(stats.max_wait, wait)
+
+            result: Any = None
+            error: Optional[BaseException] = None
+            cancelled = not item.future.set_running_or_notify_cancel()
+            started_at = time.monotonic()
+            if not cancelled:
+                try:
+                    result = item.fn()
+                except BaseException as e:
+                    error = e
+            run = time.monotonic() - started_at
+
+            # Record stats before resolving the future so callers see them
+            with self._cond:
+                remaining = self._running[item.user] - 1
+                if remaining:
+                    self._running[item.user] = remaining
+                else:
+                    del self._running[item.user]
+                stats.running -= 1
+                if error is not None:
+                    stats.failed += 1
+                elif not cancelled:
+                    stats.completed += 1
+                stats.total_run += run
+                stats.max_run = max(stats.max_run, run)
+                # A per-user slot just freed up; wake a worker that may have skipped this user
+                self._cond.notify()
+
+            if error is not None:
+                item.future.set_exception(error)
+            elif not cancelled:
+                item.future.set_result(result)
+
+    def record_abandoned(self, tool: Optional[str] = None) -> None:
+        """
+        Record work whose caller stopped waiting while it was already running.
+
+        The worker thread stays busy until the call returns; its socket timeout
+        is bounded by the tool deadline (see core.http_transport.request_timeout).
+        """
+        with self._cond:
+            self._abandoned += 1
+            self._tool_stats_locked(tool or _UNKNOWN_TOOL).abandoned += 1
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting work; workers exit once the queue drains."""
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+            threads = list(self._threads)
+        if wait:
+            for thread in threads:
+                thread.join()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get executor statistics, including queue depth, wait and run time per tool."""
+        with self._cond:
+            return {
+                "max_workers": self.max_workers,
+                "per_user_limit": self.per_user_limit,
+                "workers": len(self._threads),
+                "busy_workers": sum(self._running.values()),
+                "queue_depth": self._queue_depth,
+                "active_users": len(self._running),
+                "waiting_users": len(self._pending),
+                "abandoned": self._abandoned,
+                "tools": {
+                    tool: stats.as_dict()
+                    for tool, stats in sorted(self._tool_stats.items())
+                },
+            }
+
+
+# Global executor instance
+_google_executor: Optional[FairExecutor] = None
+_google_executor_lock = threading.Lock()
+
+
+def get_google_executor() -> FairExecutor:
+    """
+    Get the global Google API executor, creating it from environment configuration.
+
+    Environment variables:
+        WORKSPACE_MCP_GOOGLE_EXECUTOR_WORKERS: Worker threads for blocking Google calls
+        WORKSPACE_MCP_GOOGLE_EXECUTOR_PER_USER: Max workers a single user may hold
+    """
+    global _google_executor
+
+    if _google_executor is None:
+        with _google_executor_lock:
+            if _google_executor is None:
+                max_workers = int(
+                    os.getenv(
+                        "WORKSPACE_MCP_GOOGLE_EXECUTOR_WORKERS",
+                        str(DEFAULT_MAX_WORKERS),
+                    )
+                )
+                per_user_limit = int(
+                    os.getenv(
+                        "WORKSPACE_MCP_GOOGLE_EXECUTOR_PER_USER",
+                        str(DEFAULT_PER_USER_LIMIT),
+                    )
+                )
+                _google_executor = FairExecutor(
+                    max_workers=max_workers, per_user_limit=per_user_limit
+                )
+                logger.info(
+                    f"Initialized Google API executor (workers={_google_executor.max_workers}, "
+                    f"per_user_limit={_google_executor.per_user_limit})"
+                )
+
+    return _google_executor
+
+
+def set_google_executor(executor: Optional[FairExecutor]):
+    """
+    Set the global Google API executor instance.
+
+    Args:
+        executor: Executor to use, or None to rebuild from configuration
+    """
+    global _google_executor
+    _google_executor = executor
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a blocking Google call on the dedicated executor and await its result.
+
+    The call runs in a copy of the caller's context and is attributed to the
+    current user and tool (see core.context) for scheduling and statistics.
+    If the caller is cancelled, queued work is dropped and running work is
+    counted as abandoned.
+    """
+    context = contextvars.copy_context()
+    executor = get_google_executor()
+    tool = get_current_tool_name()
+    future = executor.submit(
+        functools.partial(context.run, func, *args, **kwargs),
+        user=get_current_user_email(),
+        tool=tool,
+    )
+    try:
+        return await asyncio.wrap_future(future)
+    except asyncio.CancelledError:
+        # Queued work is cancelled along with the caller; work already running
+        # in a thread cannot be interrupted and is abandoned instead
+        if not future.cancel() and not future.done():
+            executor.record_abandoned(tool)
+        raise
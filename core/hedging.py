@@ -0,0 +1,317 @@
+"""
+Hedged Google API requests for latency-sensitive read-only tools.
+
+The slowest percent of reads is usually one slow Google frontend, not our
+code. When hedging is enabled for a tool, ``execute_async`` sends its request
+as usual. If no response has arrived by a configurable percentile of that
+method's observed latency, it sends a duplicate, and whichever response
+arrives first is used. The other request is cancelled.
+
+Latency percentiles come from live, decaying histograms per API method.
+Every hedge is charged to the client-side quota budget (core.rate_limiter).
+A hedge that would have to wait for budget is skipped, so hedging never
+pushes a user over quota.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import time
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Default hedging configuration (overridable via environment variables)
+DEFAULT_HEDGE_PERCENTILE = 95.0
+DEFAULT_HEDGED_TOOLS = frozenset(
+    {"search_gmail_messages", "get_events", "read_sheet_values", "get_doc_content"}
+)
+# Samples a method needs before its percentile is trusted
+MIN_SAMPLES = 20
+# Never hedge sooner than this, whatever the histogram says
+MIN_HEDGE_DELAY_SECONDS = 0.01
+
+# Histogram buckets grow geometrically from 1 ms, ~10% apart, up to ~2 minutes
+_BUCKET_BASE_SECONDS = 0.001
+_BUCKET_GROWTH = 1.1
+_BUCKET_COUNT = 125
+# Counts are halved every this many samples so the histogram follows live latency
+_DECAY_EVERY = 1000
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with periodic exponential decay."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._counts: List[float] = [0.0] * _BUCKET_COUNT
+        self._total = 0.0
+        self._samples = 0
+
+    @staticmethod
+    def _bucket(latency: float) -> int:
+        if latency <= _BUCKET_BASE_SECONDS:
+            return 0
+        index = int(math.log(latency / _BUCKET_BASE_SECONDS, _BUCKET_GROWTH)) + 1
+        return min(index, _BUCKET_COUNT - 1)
+
+    @staticmethod
+    def _upper_bound(index: int) -> float:
+        return _BUCKET_BASE_SECONDS * _BUCKET_GROWTH**index
+
+    def record(self, latency: float) -> None:
+        with self._lock:
+            self._counts[self._bucket(latency)] += 1
+            self._total += 1
+            self._samples += 1
+            if self._samples % _DECAY_EVERY == 0:
+                self._counts = [count / 2 for count in self._counts]
+                self._total /= 2
+
+    @property
+    def samples(self) -> int:
+        return self._samples
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """Latency in seconds below which ``percentile`` percent of samples fall."""
+        with self._lock:
+            if not self._total:
+                return None
+            target = self._total * percentile / 100
+            seen = 0.0
+            for index, count in enumerate(self._counts):
+                seen += count
+                if seen >= target:
+                    return self._upper_bound(index)
+            return self._upper_bound(_BUCKET_COUNT - 1)
+
+
+class _ToolHedgeStats:
+    __slots__ = ("calls", "hedges", "hedge_wins", "skipped_for_budget")
+
+    def __init__(self):
+        self.calls = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.skipped_for_budget = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "skipped_for_budget": self.skipped_for_budget,
+        }
+
+
+class RequestHedger:
+    """
+    Issues a duplicate request when the first one is slower than usual.
+
+    Args:
+        tools: Names of the tools whose requests may be hedged
+        percentile: Latency percentile after which a hedge is sent
+    """
+
+    def __init__(
+        self,
+        tools: FrozenSet[str] = DEFAULT_HEDGED_TOOLS,
+        percentile: float = DEFAULT_HEDGE_PERCENTILE,
+    ):
+        self.tools = frozenset(tools)
+        self.percentile = percentile
+        self._lock = Lock()
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._stats: Dict[str, _ToolHedgeStats] = {}
+
+    def is_hedged(self, tool_name: Optional[str]) -> bool:
+        return tool_name is not None and tool_name in self.tools
+
+    def _histogram(self, method_id: str) -> LatencyHistogram:
+        histogram = self._histograms.get(method_id)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(method_id, LatencyHistogram())
+        return histogram
+
+    def _tool_stats(self, tool_name: str) -> _ToolHedgeStats:
+        stats = self._stats.get(tool_name)
+        if stats is None:
+            with self._lock:
+                stats = self._stats.setdefault(tool_name, _ToolHedgeStats())
+        return stats
+
+    def hedge_delay(self, method_id: str) -> Optional[float]:
+        """Seconds to wait before hedging a method, or None while there is too little data."""
+        histogram = self._histogram(method_id)
+        if histogram.samples < MIN_SAMPLES:
+            return None
+        delay = histogram.percentile(self.percentile)
+        return None if delay is None else max(MIN_HEDGE_DELAY_SECONDS, delay)
+
+    async def run(
+        self,
+        tool_name: str,
+        method_id: str,
+        send: Callable[[], Awaitable[Any]],
+        reserve_budget: Callable[[], bool],
+    ) -> Any:
+        """
+        Run ``send``, hedging it with a second call if it is slow.
+
+        Args:
+            tool_name: Tool the request belongs to (for statistics)
+            method_id: Google API method, used to pick the latency histogram
+            send: Coroutine factory that performs the request once
+            reserve_budget: Takes quota for a hedge without waiting; returns
+                False if the budget is exhausted
+
+        Returns:
+            The result of whichever call succeeded first
+        """
+        stats = self._tool_stats(tool_name)
+        with self._lock:
+            stats.calls += 1
+        histogram = self._histogram(method_id)
+        delay = self.hedge_delay(method_id)
+
+        async def timed_primary():
+            # Only the primary's latency is recorded: hedges finish early by
+            # design and would drag the percentile (and the hedge delay) down.
+            # A primary cancelled after losing records its elapsed time, a
+            # lower bound that is still past the hedge delay.
+            started_at = time.monotonic()
+            try:
+                return await send()
+            finally:
+                histogram.record(time.monotonic() - started_at)
+
+        if delay is None:
+            return await timed_primary()
+
+        primary = asyncio.ensure_future(timed_primary())
+        tasks = {primary}
+        hedge = None
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                if reserve_budget():
+                    hedge = asyncio.ensure_future(send())
+                    tasks.add(hedge)
+                    with self._lock:
+                        stats.hedges += 1
+                    logger.debug(
+                        f"Hedging {method_id} for {tool_name} after {delay * 1000:.0f}ms"
+                    )
+                else:
+                    with self._lock:
+                        stats.skipped_for_budget += 1
+
+            first_error: Optional[BaseException] = None
+            while tasks:
+                done, tasks = await asyncio.wait(
+                    tasks, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        if task is hedge:
+                            with self._lock:
+                                stats.hedge_wins += 1
+                        return task.result()
+                    if first_error is None:
+                        first_error = error
+            # Every call failed; report the first failure
+            raise first_error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hedging counts per tool and latency percentiles per method."""
+        with self._lock:
+            histograms = dict(self._histograms)
+            tools = {name: stats.as_dict() for name, stats in self._stats.items()}
+        return {
+            "percentile": self.percentile,
+            "tools": tools,
+            "methods": {
+                method_id: {
+                    "samples": histogram.samples,
+                    "p50_ms": _ms(histogram.percentile(50)),
+                    "p95_ms": _ms(histogram.percentile(95)),
+                    "p99_ms": _ms(histogram.percentile(99)),
+                }
+                for method_id, histogram in sorted(histograms.items())
+            },
+        }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+# Global hedger instance (None while hedging is disabled)
+_request_hedger: Optional[RequestHedger] = None
+_request_hedger_loaded = False
+_request_hedger_lock = Lock()
+
+
+def get_request_hedger() -> Optional[RequestHedger]:
+    """
+    Get the global request hedger, or None if hedging is disabled.
+
+    Environment variables:
+        WORKSPACE_MCP_HEDGING: Enable hedging for the default latency-sensitive
+            read tools (search_gmail_messages, get_events, read_sheet_values,
+            get_doc_content)
+        WORKSPACE_MCP_HEDGED_TOOLS: Comma-separated tools to hedge instead of
+            the defaults (implies WORKSPACE_MCP_HEDGING)
+        WORKSPACE_MCP_HEDGE_PERCENTILE: Latency percentile after which a
+            duplicate request is sent
+    """
+    global _request_hedger, _request_hedger_loaded
+
+    if not _request_hedger_loaded:
+        with _request_hedger_lock:
+            if not _request_hedger_loaded:
+                tools_env = os.getenv("WORKSPACE_MCP_HEDGED_TOOLS", "").strip()
+                enabled = os.getenv("WORKSPACE_MCP_HEDGING", "false").lower() in (
+                    "true",
+                    "1",
+                    "yes",
+                )
+                if tools_env or enabled:
+                    tools = (
+                        frozenset(t.strip() for t in tools_env.split(",") if t.strip())
+                        if tools_env
+                        else DEFAULT_HEDGED_TOOLS
+                    )
+                    percentile = float(
+                        os.getenv(
+                            "WORKSPACE_MCP_HEDGE_PERCENTILE",
+                            str(DEFAULT_HEDGE_PERCENTILE),
+                        )
+                    )
+                    _request_hedger = RequestHedger(tools, percentile)
+                    logger.info(
+                        f"Request hedging enabled at p{percentile:g} for: {', '.join(sorted(tools))}"
+                    )
+                _request_hedger_loaded = True
+
+    return _request_hedger
+
+
+def set_request_hedger(hedger: Optional[RequestHedger], loaded: bool = True):
+    """
+    Set the global request hedger.
+
+    Args:
+        hedger: Hedger to use, or None to disable hedging
+        loaded: Pass False to rebuild from configuration on next use
+    """
+    global _request_hedger, _request_hedger_loaded
+    _request_hedger = hedger
+    _request_hedger_loaded = loaded
@@ -0,0 +1,324 @@
+"""
+Shared HTTP transport for Google API clients.
+
+googleapiclient talks to an httplib2-style object (anything with a
+``request(uri, method, body, headers)`` method returning ``(response, content)``).
+httplib2 itself keeps one connection per Http instance and is not thread-safe,
+so every built service ends up paying for its own TCP and TLS handshakes.
+
+PooledHttp implements the same interface on top of a single, thread-safe
+httpx.Client that keeps a per-host pool of keep-alive connections (and can use
+HTTP/2 when the optional ``h2`` package is installed). It is shared by every
+service the server builds and can be used from any worker thread.
+"""
+
+import logging
+import os
+import socket
+import ssl
+import time
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+import httplib2
+import httpx
+
+from core.context import get_current_deadline
+
+logger = logging.getLogger(__name__)
+
+# Default transport configuration (overridable via environment variables)
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY_SECONDS = 60.0
+DEFAULT_TIMEOUT_SECONDS = 60.0
+
+_REDIRECT_METHODS = {"GET", "HEAD"}
+
+
+def _parse_bool_env(value: str) -> bool:
+    """Parse environment variable string to boolean."""
+    return value.lower() in ("1", "true", "yes", "on")
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _underlying_ssl_error(exc: BaseException) -> Optional[ssl.SSLError]:
+    """Find an ssl.SSLError in an exception's cause chain, if there is one."""
+    seen = set()
+    current: Optional[BaseException] = exc
+    while current is not None and id(current) not in seen:
+        if isinstance(current, ssl.SSLError):
+            return current
+        seen.add(id(current))
+        current = current.__cause__ or current.__context__
+    return None
+
+
+def request_timeout(default: Optional[float]) -> Optional[float]:
+    """
+    Timeout for one Google request: the transport default, capped at the time
+    left before the current tool call's deadline (see core.context).
+
+    Raises:
+        socket.timeout: If the deadline has already passed
+    """
+    deadline = get_current_deadline()
+    if deadline is None:
+        return default
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise socket.timeout("tool deadline exceeded")
+    return remaining if default is None else min(default, remaining)
+
+
+def translate_transport_error(exc: httpx.TransportError) -> Exception:
+    """
+    Map an httpx transport error to the exception httplib2 callers expect.
+
+    Timeouts become socket.timeout, TLS failures the underlying ssl.SSLError and
+    other network failures ConnectionError.
+    """
+    if isinstance(exc, httpx.TimeoutException):
+        return socket.timeout(str(exc) or "timed out")
+    ssl_error = _underlying_ssl_error(exc)
+    if ssl_error is not None:
+        return ssl_error
+    return ConnectionError(str(exc))
+
+
+def to_httplib2_response(response: httpx.Response) -> httplib2.Response:
+    """Convert an httpx response into the httplib2.Response googleapiclient reads."""
+    info: Dict[str, Any] = {}
+    for key, value in response.headers.multi_items():
+        key = key.lower()
+        info[key] = f"{info[key]}, {value}" if key in info else value
+    info["status"] = str(response.status_code)
+    resp = httplib2.Response(info)
+    resp.reason = response.reason_phrase
+    return resp
+
+
+class PooledHttp:
+    """
+    Thread-safe, connection-pooling drop-in for httplib2.Http.
+
+    Errors are translated to the exception types googleapiclient and the tool
+    error handlers already understand: timeouts raise socket.timeout, TLS
+    failures raise ssl.SSLError and other network failures raise
+    ConnectionError.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY_SECONDS,
+        timeout: Optional[float] = DEFAULT_TIMEOUT_SECONDS,
+        http2: bool = False,
+        client: Optional[httpx.Client] = None,
+    ):
+        if http2 and not _http2_available():
+            logger.warning(
+                "HTTP/2 requested for the Google API transport but the 'h2' package "
+                "is not installed; falling back to HTTP/1.1 (pip install 'httpx[http2]')"
+            )
+            http2 = False
+
+        self.max_connections = max_connections
+        self.http2 = http2
+        self.timeout = timeout
+        self._client = client or httpx.Client(
+            http2=http2,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+        )
+        # googleapiclient strips 308 from the redirect codes of its own transports
+        # because resumable uploads use it for "resume incomplete".
+        self.redirect_codes = frozenset({300, 301, 302, 303, 307})
+
+        self._lock = Lock()
+        self._requests = 0
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._saturated = 0
+        self._connections_opened = 0
+        self._tls_handshakes = 0
+        self._errors = 0
+
+    def _trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        """httpcore trace hook used to count new connections and TLS handshakes."""
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self._connections_opened += 1
+        elif event_name == "connection.start_tls.complete":
+            with self._lock:
+                self._tls_handshakes += 1
+
+    def request(
+        self,
+        uri: str,
+        method: str = "GET",
+        body: Any = None,
+        headers: Optional[Dict[str, str]] = None,
+        redirections: int = httplib2.DEFAULT_MAX_REDIRECTS,
+        connection_type: Any = None,
+    ) -> Tuple[httplib2.Response, bytes]:
+        """
+        Send a request the way httplib2.Http.request() does.
+
+        Returns:
+            Tuple of (httplib2.Response, content bytes)
+        """
+        method = method.upper()
+        # Bound the socket wait by the tool deadline so an abandoned worker thread frees itself
+        timeout = request_timeout(self.timeout)
+        with self._lock:
+            self._requests += 1
+            self._in_flight += 1
+            if self._in_flight > self._peak_in_flight:
+                self._peak_in_flight = self._in_flight
+            if self._in_flight > self.max_connections:
+                self._saturated += 1
+
+        try:
+            response = self._client.request(
+                method,
+                uri,
+                content=body,
+                headers=headers,
+                follow_redirects=method in _REDIRECT_METHODS and redirections > 0,
+                timeout=timeout,
+                extensions={"trace": self._trace},
+            )
+        except httpx.TransportError as e:
+            self._record_error()
+            raise translate_transport_error(e) from e
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+        return to_httplib2_response(response), response.content
+
+    def _record_error(self) -> None:
+        with self._lock:
+            self._errors += 1
+
+    def close(self) -> None:
+        """No-op: the shared pool outlives any one service. Use shutdown()."""
+
+    def shutdown(self) -> None:
+        """Close every pooled connection."""
+        self._client.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get transport statistics (pool saturation and handshake counts)."""
+        with self._lock:
+            reused = max(0, self._requests - self._connections_opened)
+            return {
+                "http2": self.http2,
+                "max_connections": self.max_connections,
+                "requests": self._requests,
+                "in_flight": self._in_flight,
+                "peak_in_flight": self._peak_in_flight,
+                "saturation": self._peak_in_flight / self.max_connections
+                if self.max_connections
+                else 0.0,
+                "saturated_requests": self._saturated,
+                "connections_opened": self._connections_opened,
+                "tls_handshakes": self._tls_handshakes,
+                "connection_reuse_rate": (reused / self._requests)
+                if self._requests
+                else 0.0,
+                "errors": self._errors,
+            }
+
+
+# Global transport instance
+_http_transport: Optional[PooledHttp] = None
+_http_transport_lock = Lock()
+
+
+def is_pooled_transport_enabled() -> bool:
+    """
+    Whether Google API clients should use the shared pooled transport.
+
+    Set WORKSPACE_MCP_HTTP_TRANSPORT=httplib2 to give every client its own
+    httplib2 connection instead.
+    """
+    mode = os.getenv("WORKSPACE_MCP_HTTP_TRANSPORT", "pooled").strip().lower()
+    return mode != "httplib2"
+
+
+def get_transport_settings() -> Dict[str, Any]:
+    """
+    Read transport configuration from the environment.
+
+    Environment variables:
+        WORKSPACE_MCP_HTTP_MAX_CONNECTIONS: Max open connections across all hosts
+        WORKSPACE_MCP_HTTP_MAX_KEEPALIVE: Max idle keep-alive connections kept
+        WORKSPACE_MCP_HTTP_KEEPALIVE_EXPIRY: Seconds an idle connection is kept
+        WORKSPACE_MCP_HTTP_TIMEOUT: Per-request timeout in seconds
+        WORKSPACE_MCP_HTTP2: Enable HTTP/2 (requires the 'h2' package)
+    """
+    return {
+        "max_connections": int(
+            os.getenv(
+                "WORKSPACE_MCP_HTTP_MAX_CONNECTIONS", str(DEFAULT_MAX_CONNECTIONS)
+            )
+        ),
+        "max_keepalive_connections": int(
+            os.getenv(
+                "WORKSPACE_MCP_HTTP_MAX_KEEPALIVE",
+                str(DEFAULT_MAX_KEEPALIVE_CONNECTIONS),
+            )
+        ),
+        "keepalive_expiry": float(
+            os.getenv(
+                "WORKSPACE_MCP_HTTP_KEEPALIVE_EXPIRY",
+                str(DEFAULT_KEEPALIVE_EXPIRY_SECONDS),
+            )
+        ),
+        "timeout": float(
+            os.getenv("WORKSPACE_MCP_HTTP_TIMEOUT", str(DEFAULT_TIMEOUT_SECONDS))
+        ),
+        "http2": _parse_bool_env(os.getenv("WORKSPACE_MCP_HTTP2", "false")),
+    }
+
+
+def get_http_transport() -> PooledHttp:
+    """Get the shared pooled transport, creating it from environment configuration."""
+    global _http_transport
+
+    if _http_transport is None:
+        with _http_transport_lock:
+            if _http_transport is None:
+                settings = get_transport_settings()
+                _http_transport = PooledHttp(**settings)
+                logger.info(
+                    f"Initialized pooled Google API transport (max_connections={settings['max_connections']}, "
+                    f"keepalive={settings['max_keepalive_connections']}, http2={_http_transport.http2})"
+                )
+
+    return _http_transport
+
+
+def set_http_transport(transport: Optional[PooledHttp]):
+    """
+    Set the global transport instance.
+
+    Args:
+        transport: Transport to use, or None to rebuild from configuration
+    """
+    global _http_transport
+    _http_transport = transport
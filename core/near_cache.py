@@ -0,0 +1,230 @@
+"""
+In-process near cache for the OAuth proxy's key-value storage.
+
+With Valkey or disk storage, FastMCP's OAuth proxy reads clients, tokens and
+JTI mappings through ``FernetEncryptionWrapper``: every lookup is a network
+round trip or a file read followed by a Fernet decrypt. Most of those lookups
+repeat within seconds (the same client and token on every MCP request).
+
+NearCacheWrapper sits on top of the encrypted store and keeps recently used
+decrypted values in a bounded LRU for a short TTL. Writes and deletes go
+through to the underlying store and update the cache, so this process always
+reads its own writes; other replicas see them once their entry expires.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, List, Optional, Set, SupportsFloat, Tuple
+
+from key_value.aio.protocols.key_value import AsyncKeyValue
+from key_value.aio.wrappers.base import BaseWrapper
+
+logger = logging.getLogger(__name__)
+
+# Default near cache configuration (overridable via environment variables)
+DEFAULT_NEAR_CACHE_TTL_SECONDS = 30.0
+DEFAULT_NEAR_CACHE_MAX_ENTRIES = 1024
+
+_CacheKey = Tuple[Optional[str], str]
+
+
+class NearCacheWrapper(BaseWrapper):
+    """
+    Bounded LRU cache of decrypted values in front of an AsyncKeyValue store.
+
+    Entries live for at most ``ttl_seconds`` and never past the TTL the
+    underlying store reports for them. Misses are not cached. A read that
+    races a write for the same key does not cache its (older) result.
+    """
+
+    def __init__(
+        self,
+        key_value: AsyncKeyValue,
+        ttl_seconds: float = DEFAULT_NEAR_CACHE_TTL_SECONDS,
+        max_entries: int = DEFAULT_NEAR_CACHE_MAX_ENTRIES,
+    ):
+        """
+        Initialize the near cache.
+
+        Args:
+            key_value: The store to cache (usually the encryption wrapper)
+            ttl_seconds: Max seconds a value is served without re-reading it
+            max_entries: Max number of cached values
+        """
+        self.key_value = key_value
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max(1, max_entries)
+        # Maps (collection, key) -> (value, monotonic expiry)
+        self._entries: "OrderedDict[_CacheKey, Tuple[Dict[str, Any], float]]" = (
+            OrderedDict()
+        )
+        # Reads in flight per key, and keys written while a read was in flight:
+        # those reads may have fetched the old value, so they must not cache it
+        self._inflight_reads: Dict[_CacheKey, int] = {}
+        self._raced_keys: Set[_CacheKey] = set()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        super().__init__()
+
+    def _lookup(self, cache_key: _CacheKey) -> Optional[Tuple[Dict[str, Any], float]]:
+        entry = self._entries.get(cache_key)
+        if entry is None:
+            self._misses += 1
+            return None
+        now = time.monotonic()
+        if entry[1] <= now:
+            del self._entries[cache_key]
+            self._misses += 1
+            return None
+        self._entries.move_to_end(cache_key)
+        self._hits += 1
+        return dict(entry[0]), entry[1] - now
+
+    def _store(
+        self,
+        cache_key: _CacheKey,
+        value: Optional[Mapping[str, Any]],
+        ttl: Optional[SupportsFloat],
+    ) -> None:
+        if value is None:
+            self._entries.pop(cache_key, None)
+            return
+        lifetime = (
+            self.ttl_seconds if ttl is None else min(self.ttl_seconds, float(ttl))
+        )
+        if lifetime <= 0:
+            self._entries.pop(cache_key, None)
+            return
+        self._entries[cache_key] = (dict(value), time.monotonic() + lifetime)
+        self._entries.move_to_end(cache_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def _invalidate(self, cache_key: _CacheKey) -> None:
+        self._entries.pop(cache_key, None)
+        if cache_key in self._inflight_reads:
+            self._raced_keys.add(cache_key)
+
+    async def _read_through(
+        self, keys: Sequence[str], collection: Optional[str]
+    ) -> List[Tuple[Optional[Dict[str, Any]], Optional[float]]]:
+        results: List[Tuple[Optional[Dict[str, Any]], Optional[float]]] = []
+        missing: List[int] = []
+        for index, key in enumerate(keys):
+            cached = self._lookup((collection, key))
+            results.append(cached if cached is not None else (None, None))
+            if cached is None:
+                missing.append(index)
+        if not missing:
+            return results
+
+        missing_keys = [keys[index] for index in missing]
+        cache_keys = [(collection, key) for key in missing_keys]
+        for cache_key in cache_keys:
+            self._inflight_reads[cache_key] = self._inflight_reads.get(cache_key, 0) + 1
+        try:
+            if len(missing_keys) == 1:
+                loaded = [
+                    await self.key_value.ttl(missing_keys[0], collection=collection)
+                ]
+            else:
+                loaded = await self.key_value.ttl_many(
+                    missing_keys, collection=collection
+                )
+
+            for index, cache_key, (value, ttl) in zip(missing, cache_keys, loaded):
+                if cache_key not in self._raced_keys:
+                    self._store(cache_key, value, ttl)
+                results[index] = (value, ttl)
+        finally:
+            for cache_key in cache_keys:
+                remaining = self._inflight_reads[cache_key] - 1
+                if remaining:
+                    self._inflight_reads[cache_key] = remaining
+                else:
+                    del self._inflight_reads[cache_key]
+                    self._raced_keys.discard(cache_key)
+        return results
+
+    async def get(
+        self, key: str, *, collection: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        return (await self._read_through([key], collection))[0][0]
+
+    async def get_many(
+        self, keys: Sequence[str], *, collection: Optional[str] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        return [value for value, _ in await self._read_through(keys, collection)]
+
+    async def ttl(
+        self, key: str, *, collection: Optional[str] = None
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[float]]:
+        return (await self._read_through([key], collection))[0]
+
+    async def ttl_many(
+        self, keys: Sequence[str], *, collection: Optional[str] = None
+    ) -> List[Tuple[Optional[Dict[str, Any]], Optional[float]]]:
+        return await self._read_through(keys, collection)
+
+    async def put(
+        self,
+        key: str,
+        value: Mapping[str, Any],
+        *,
+        collection: Optional[str] = None,
+        ttl: Optional[SupportsFloat] = None,
+    ) -> None:
+        cache_key = (collection, key)
+        self._invalidate(cache_key)
+        await self.key_value.put(key, value, collection=collection, ttl=ttl)
+        # Again: reads that started during the write may hold the old value
+        self._invalidate(cache_key)
+        self._store(cache_key, value, ttl)
+
+    async def put_many(
+        self,
+        keys: Sequence[str],
+        values: Sequence[Mapping[str, Any]],
+        *,
+        collection: Optional[str] = None,
+        ttl: Optional[SupportsFloat] = None,
+    ) -> None:
+        for key in keys:
+            self._invalidate((collection, key))
+        await self.key_value.put_many(keys, values, collection=collection, ttl=ttl)
+        for key, value in zip(keys, values):
+            self._invalidate((collection, key))
+            self._store((collection, key), value, ttl)
+
+    async def delete(self, key: str, *, collection: Optional[str] = None) -> bool:
+        self._invalidate((collection, key))
+        deleted = await self.key_value.delete(key, collection=collection)
+        self._invalidate((collection, key))
+        return deleted
+
+    async def delete_many(
+        self, keys: Sequence[str], *, collection: Optional[str] = None
+    ) -> int:
+        for key in keys:
+            self._invalidate((collection, key))
+        deleted = await self.key_value.delete_many(keys, collection=collection)
+        for key in keys:
+            self._invalidate((collection, key))
+        return deleted
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get near cache statistics."""
+        lookups = self._hits + self._misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self._hits,
+            "misses": self._misses,
+            "evictions": self._evictions,
+            "hit_rate": (self._hits / lookups) if lookups else 0.0,
+        }
@@ -0,0 +1,401 @@
+"""
+Client-side rate limiting that mirrors Google API quotas.
+
+Google enforces quotas per user and per project (the OAuth client), and some
+APIs charge different amounts per method: Gmail bills quota units
+(``messages.get`` costs 5, ``messages.send`` 100) against a per-user budget,
+while Sheets, Docs and Slides count read and write requests per minute. Bulk
+agents exceed these budgets quickly, and every 429 costs a round trip plus a
+backoff.
+
+QuotaRateLimiter is consulted by ``execute_async`` before each Google call. It
+knows the unit cost of each method and keeps a token bucket per user and one
+per project for each quota group. When a budget is exhausted the call waits
+for enough tokens to refill instead of being sent and rejected.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+from core.context import get_current_user_email
+
+logger = logging.getLogger(__name__)
+
+# Per-user buckets are pruned once this many exist, dropping those at full capacity
+MAX_USER_BUCKETS = 10000
+
+_ANONYMOUS_USER = ""
+
+# Quota groups: (per-user limit, per-project limit, period in seconds)
+DEFAULT_QUOTAS: Dict[str, Tuple[float, float, float]] = {
+    # Gmail: 15,000 units/user/minute and 1,200,000 units/project/minute,
+    # enforced by Google as a moving per-second average
+    "gmail": (250, 20_000, 1.0),
+    "sheets.read": (60, 300, 60.0),
+    "sheets.write": (60, 300, 60.0),
+    "docs.read": (300, 3000, 60.0),
+    "docs.write": (60, 600, 60.0),
+    "slides.read": (600, 3000, 60.0),
+    "slides.write": (60, 600, 60.0),
+}
+
+# Gmail quota units per method (methodId without the "gmail.users." prefix)
+GMAIL_METHOD_COSTS: Dict[str, int] = {
+    "getProfile": 1,
+    "history.list": 2,
+    "drafts.create": 10,
+    "drafts.delete": 10,
+    "drafts.get": 5,
+    "drafts.list": 5,
+    "drafts.send": 100,
+    "drafts.update": 15,
+    "labels.create": 5,
+    "labels.delete": 5,
+    "labels.get": 1,
+    "labels.list": 1,
+    "labels.patch": 5,
+    "labels.update": 5,
+    "messages.attachments.get": 5,
+    "messages.batchDelete": 50,
+    "messages.batchModify": 50,
+    "messages.delete": 10,
+    "messages.get": 5,
+    "messages.import": 25,
+    "messages.insert": 25,
+    "messages.list": 5,
+    "messages.modify": 5,
+    "messages.send": 100,
+    "messages.trash": 5,
+    "messages.untrash": 5,
+    "settings.filters.create": 5,
+    "settings.filters.delete": 5,
+    "settings.filters.get": 1,
+    "settings.filters.list": 1,
+    "threads.delete": 20,
+    "threads.get": 10,
+    "threads.list": 10,
+    "threads.modify": 10,
+    "threads.trash": 10,
+    "threads.untrash": 10,
+}
+DEFAULT_GMAIL_METHOD_COST = 5
+
+# APIs whose quotas count read and write requests separately
+_READ_WRITE_APIS = frozenset({"sheets", "docs", "slides"})
+_READ_METHOD_PREFIXES = ("get", "batchGet", "list", "search")
+
+
+def quota_cost(method_id: Optional[str]) -> Tuple[Optional[str], int]:
+    """
+    Map a discovery methodId to its quota group and cost.
+
+    Args:
+        method_id: e.g. "gmail.users.messages.get" or "sheets.spreadsheets.values.get"
+
+    Returns:
+        (quota group, cost), with a None group for methods without a known quota
+    """
+    if not method_id:
+        return None, 0
+    api, _, method = method_id.partition(".")
+    if api == "gmail":
+        method = method.removeprefix("users.")
+        return "gmail", GMAIL_METHOD_COSTS.get(method, DEFAULT_GMAIL_METHOD_COST)
+    if api in _READ_WRITE_APIS:
+        action = method.rsplit(".", 1)[-1]
+        kind = "read" if action.startswith(_READ_METHOD_PREFIXES) else "write"
+        return f"{api}.{kind}", 1
+    return None, 0
+
+
+def request_costs(request: Any) -> Dict[str, int]:
+    """
+    Total quota cost of an HttpRequest or BatchHttpRequest, per quota group.
+
+    A batch is billed for each request it contains.
+    """
+    subrequests = getattr(request, "_requests", None)
+    requests = list(subrequests.values()) if subrequests else [request]
+    costs: Dict[str, int] = {}
+    for sub in requests:
+        group, cost = quota_cost(getattr(sub, "methodId", None))
+        if group is not None:
+            costs[group] = costs.get(group, 0) + cost
+    return costs
+
+
+class TokenBucket:
+    """
+    Token bucket that hands out reservations instead of blocking.
+
+    ``reserve`` always takes the tokens, letting the balance go negative, and
+    returns how long the caller must wait before the tokens are really
+    available. Callers therefore queue in FIFO order without holding a lock
+    while they wait. Not thread-safe; QuotaRateLimiter serializes access.
+    """
+
+    __slots__ = ("capacity", "refill_per_second", "tokens", "updated_at")
+
+    def __init__(self, capacity: float, period_seconds: float):
+        self.capacity = float(capacity)
+        self.refill_per_second = self.capacity / period_seconds
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated_at
+        if elapsed > 0:
+            self.tokens = min(
+                self.capacity, self.tokens + elapsed * self.refill_per_second
+            )
+            self.updated_at = now
+
+    def reserve(self, cost: float, now: float) -> float:
+        """Take cost tokens and return the seconds until they are available."""
+        self._refill(now)
+        # A single call larger than the bucket waits for a full bucket
+        self.tokens -= min(cost, self.capacity)
+        if self.tokens >= 0:
+            return 0.0
+        return -self.tokens / self.refill_per_second
+
+    def refund(self, cost: float) -> None:
+        """Give back tokens from a reservation that was not used."""
+        self.tokens = min(self.capacity, self.tokens + min(cost, self.capacity))
+
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+class _GroupStats:
+    __slots__ = ("calls", "units", "throttled", "total_wait", "max_wait")
+
+    def __init__(self):
+        self.calls = 0
+        self.units = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "units": self.units,
+            "throttled": self.throttled,
+            "total_wait_seconds": round(self.total_wait, 3),
+            "max_wait_seconds": round(self.max_wait, 3),
+        }
+
+
+class QuotaRateLimiter:
+    """
+    Per-user and per-project token buckets for each quota group.
+
+    Each call reserves its cost from both the user's bucket and the project's
+    bucket of every quota group it touches, then waits for the slower of the
+    reservations.
+    """
+
+    def __init__(self, quotas: Optional[Dict[str, Tuple[float, float, float]]] = None):
+        self.quotas = dict(DEFAULT_QUOTAS if quotas is None else quotas)
+        self._lock = Lock()
+        self._project_buckets: Dict[str, TokenBucket] = {}
+        self._user_buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._stats: Dict[str, _GroupStats] = {}
+
+    def _project_bucket_locked(self, group: str) -> TokenBucket:
+        bucket = self._project_buckets.get(group)
+        if bucket is None:
+            _, per_project, period = self.quotas[group]
+            bucket = self._project_buckets[group] = TokenBucket(per_project, period)
+        return bucket
+
+    def _user_bucket_locked(self, group: str, user: str, now: float) -> TokenBucket:
+        key = (group, user)
+        bucket = self._user_buckets.get(key)
+        if bucket is None:
+            if len(self._user_buckets) >= MAX_USER_BUCKETS:
+                self._prune_locked(now)
+            per_user, _, period = self.quotas[group]
+            bucket = self._user_buckets[key] = TokenBucket(per_user, period)
+        return bucket
+
+    def _prune_locked(self, now: float) -> None:
+        # A full bucket behaves exactly like a new one, so it can be dropped
+        for key in [k for k, b in self._user_buckets.items() if b.is_full(now)]:
+            del self._user_buckets[key]
+
+    def reserve(self, costs: Dict[str, int], user: Optional[str] = None) -> float:
+        """
+        Reserve quota for a call and return how long to wait before making it.
+
+        Args:
+            costs: Cost per quota group (see request_costs)
+            user: User the call is made for, or None for anonymous calls
+
+        Returns:
+            Seconds to wait before the call fits within every budget
+        """
+        user = user or _ANONYMOUS_USER
+        now = time.monotonic()
+        wait = 0.0
+        with self._lock:
+            for group, cost in costs.items():
+                if group not in self.quotas or cost <= 0:
+                    continue
+                group_wait = max(
+                    self._user_bucket_locked(group, user, now).reserve(cost, now),
+                    self._project_bucket_locked(group).reserve(cost, now),
+                )
+                stats = self._stats.get(group)
+                if stats is None:
+                    stats = self._stats[group] = _GroupStats()
+                stats.calls += 1
+                stats.units += cost
+                if group_wait > 0:
+                    stats.throttled += 1
+                    stats.total_wait += group_wait
+                    stats.max_wait = max(stats.max_wait, group_wait)
+                wait = max(wait, group_wait)
+        return wait
+
+    def refund(self, costs: Dict[str, int], user: Optional[str] = None) -> None:
+        """Return a reservation's quota, e.g. when the waiting call was cancelled."""
+        user = user or _ANONYMOUS_USER
+        with self._lock:
+            for group, cost in costs.items():
+                if group not in self.quotas or cost <= 0:
+                    continue
+                project_bucket = self._project_buckets.get(group)
+                if project_bucket is not None:
+                    project_bucket.refund(cost)
+                user_bucket = self._user_buckets.get((group, user))
+                if user_bucket is not None:
+                    user_bucket.refund(cost)
+
+    async def acquire(self, request: Any, user: Optional[str] = None) -> float:
+        """
+        Wait until a Google API request fits within its quotas.
+
+        Args:
+            request: An HttpRequest or BatchHttpRequest about to be executed
+            user: User the request is made for (defaults to the current user)
+
+        Returns:
+            Seconds spent waiting
+        """
+        costs = request_costs(request)
+        if not costs:
+            return 0.0
+        if user is None:
+            user = get_current_user_email()
+        wait = self.reserve(costs, user)
+        if wait > 0:
+            logger.debug(
+                f"Rate limiting {costs} for {user or 'anonymous'}: {wait:.2f}s"
+            )
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                self.refund(costs, user)
+                raise
+        return wait
+
+    def try_acquire(self, request: Any, user: Optional[str] = None) -> bool:
+        """
+        Take quota for an optional request only if it is available right now.
+
+        Args:
+            request: An HttpRequest or BatchHttpRequest that may be executed
+            user: User the request is made for (defaults to the current user)
+
+        Returns:
+            True if the quota was taken, False if the request would have to wait
+        """
+        costs = request_costs(request)
+        if not costs:
+            return True
+        if user is None:
+            user = get_current_user_email()
+        if self.reserve(costs, user) > 0:
+            self.refund(costs, user)
+            return False
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-group call, unit and throttling statistics."""
+        with self._lock:
+            return {
+                "user_buckets": len(self._user_buckets),
+                "groups": {
+                    group: stats.as_dict()
+                    for group, stats in sorted(self._stats.items())
+                },
+            }
+
+
+def _load_quotas() -> Dict[str, Tuple[float, float, float]]:
+    quotas = dict(DEFAULT_QUOTAS)
+    raw = os.getenv("WORKSPACE_MCP_QUOTA_LIMITS", "").strip()
+    if not raw:
+        return quotas
+    try:
+        for group, limits in json.loads(raw).items():
+            per_user, per_project, period = quotas.get(group, (None, None, 60.0))
+            quotas[group] = (
+                float(limits.get("per_user", per_user)),
+                float(limits.get("per_project", per_project)),
+                float(limits.get("period", period)),
+            )
+    except (ValueError, TypeError, AttributeError) as e:
+        logger.warning(f"Ignoring invalid WORKSPACE_MCP_QUOTA_LIMITS: {e}")
+        return dict(DEFAULT_QUOTAS)
+    return quotas
+
+
+# Global limiter instance
+_rate_limiter: Optional[QuotaRateLimiter] = None
+_rate_limiter_lock = Lock()
+
+
+def is_rate_limiter_enabled() -> bool:
+    """Whether client-side quota limiting is on (WORKSPACE_MCP_RATE_LIMITER, default true)."""
+    return os.getenv("WORKSPACE_MCP_RATE_LIMITER", "true").lower() in (
+        "true",
+        "1",
+        "yes",
+    )
+
+
+def get_rate_limiter() -> QuotaRateLimiter:
+    """
+    Get the global quota rate limiter, creating it from environment configuration.
+
+    Environment variables:
+        WORKSPACE_MCP_QUOTA_LIMITS: JSON overrides per quota group, e.g.
+            {"gmail": {"per_user": 100, "period": 1}, "sheets.read": {"per_project": 600}}
+    """
+    global _rate_limiter
+
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = QuotaRateLimiter(_load_quotas())
+    return _rate_limiter
+
+
+def set_rate_limiter(limiter: Optional[QuotaRateLimiter]):
+    """
+    Set the global quota rate limiter.
+
+    Args:
+        limiter: Limiter to use, or None to rebuild from configuration
+    """
+    global _rate_limiter
+    _rate_limiter = limiter
@@ -0,0 +1,401 @@
+"""
+Read-through cache of read-only tool results.
+
+Agents often call the same read tool with the same arguments several times
+within seconds, e.g. ``get_spreadsheet_info`` before each edit or
+``list_gmail_labels`` before each label change. Each repeat costs a Google
+round trip and quota for an answer that has not changed.
+
+``handle_http_errors`` sends read-only tools with a TTL through
+ToolResultCache.read_through. Results are keyed by (user, tool, arguments),
+held for the tool's TTL and bounded by entry count and total size (least
+recently used first). Errors are never cached.
+
+Write tools invalidate what they may have changed. Every entry remembers the
+resource IDs among its arguments (document, spreadsheet, presentation,
+calendar and file IDs). A write that names one of those IDs drops all entries
+for it, whichever user cached them. TOOL_INVALIDATIONS covers writes that
+change a listing without naming a resource. A read that was in flight during
+an invalidation is returned but not cached, because it may have fetched the
+old state.
+
+Edits made outside this server (in the Google UI or by another replica) are
+only seen once an entry expires, so TTLs stay short.
+"""
+
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Default cache configuration (overridable via environment variables)
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+# Seconds each read-only tool's results are cached. Tools not listed are not
+# cached; WORKSPACE_MCP_RESULT_CACHE_TTLS adds or overrides entries.
+TOOL_RESULT_TTLS: Dict[str, float] = {
+    "get_spreadsheet_info": 30.0,
+    "inspect_doc_structure": 30.0,
+    "get_presentation": 30.0,
+    # Labels and calendars change rarely, and label changes made here invalidate
+    "list_gmail_labels": 300.0,
+    "list_calendars": 300.0,
+}
+
+# Arguments that name a Google resource a write may change
+RESOURCE_ID_PARAMS = (
+    "document_id",
+    "spreadsheet_id",
+    "presentation_id",
+    "calendar_id",
+    "file_id",
+)
+
+# Write tools that change the results of other tools without naming a resource
+TOOL_INVALIDATIONS: Dict[str, Tuple[str, ...]] = {
+    "manage_gmail_label": ("list_gmail_labels",),
+}
+
+_CacheKey = Tuple[str, str, str]
+
+
+def resource_ids(arguments: Dict[str, Any]) -> FrozenSet[str]:
+    """The resource IDs among a tool call's arguments."""
+    return frozenset(
+        str(arguments[param])
+        for param in RESOURCE_ID_PARAMS
+        if arguments.get(param) not in (None, "")
+    )
+
+
+def tool_call_user(arguments: Dict[str, Any]) -> Optional[str]:
+    """The Google user a tool call acts for, or None if it is unknown."""
+    # With OAuth 2.1 the authenticated user wins over the tool argument, just
+    # as the service decorator uses that user's credentials
+    try:
+        from fastmcp.server.dependencies import get_context
+
+        ctx = get_context()
+        authenticated_user = ctx.get_state("authenticated_user_email")
+        if authenticated_user:
+            return authenticated_user
+    except Exception:
+        # Not inside an MCP request
+        pass
+    return arguments.get("user_google_email")
+
+
+def tool_call_key(
+    tool_name: str, arguments: Optional[Dict[str, Any]]
+) -> Optional[Tuple[str, str, str]]:
+    """
+    Identify a tool call by (user, tool, normalized arguments).
+
+    Args:
+        tool_name: The tool being called
+        arguments: The call's bound arguments, or None if they are unknown
+
+    Returns:
+        The key, or None if the call has no known user or its arguments
+        cannot be compared safely
+    """
+    if arguments is None:
+        return None
+    user = tool_call_user(arguments)
+    if user is None:
+        return None
+    try:
+        normalized = json.dumps(
+            {k: v for k, v in arguments.items() if k != "user_google_email"},
+            sort_keys=True,
+        )
+    except (TypeError, ValueError):
+        return None
+    return user, tool_name, normalized
+
+
+def _size_of(value: Any) -> int:
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    return len(repr(value))
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "size", "resources")
+
+    def __init__(
+        self, value: Any, expires_at: float, size: int, resources: FrozenSet[str]
+    ):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+        self.resources = resources
+
+
+class _ToolCacheStats:
+    __slots__ = ("hits", "misses", "invalidations", "evictions")
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "evictions": self.evictions,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+        }
+
+
+class ToolResultCache:
+    """
+    Bounded TTL cache of read-only tool results with write-driven invalidation.
+
+    Args:
+        ttls: Seconds to cache each tool's results; unlisted tools are not cached
+        max_entries: Max number of cached results
+        max_bytes: Max total size of cached results (string length for text)
+    """
+
+    def __init__(
+        self,
+        ttls: Optional[Dict[str, float]] = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.ttls = dict(TOOL_RESULT_TTLS if ttls is None else ttls)
+        self.max_entries = max(1, max_entries)
+        self.max_bytes = max(1, max_bytes)
+        self._lock = Lock()
+        self._entries: "OrderedDict[_CacheKey, _Entry]" = OrderedDict()
+        self._by_resource: Dict[str, Set[_CacheKey]] = {}
+        self._bytes = 0
+        # Bumped by every invalidation; reads that saw it change don't cache
+        self._epoch = 0
+        self._stats: Dict[str, _ToolCacheStats] = {}
+
+    def ttl_for(self, tool_name: str) -> float:
+        return self.ttls.get(tool_name, 0.0)
+
+    def _tool_stats_locked(self, tool_name: str) -> _ToolCacheStats:
+        stats = self._stats.get(tool_name)
+        if stats is None:
+            stats = self._stats[tool_name] = _ToolCacheStats()
+        return stats
+
+    def _remove_locked(self, key: _CacheKey) -> None:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        for resource in entry.resources:
+            keys = self._by_resource.get(resource)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_resource[resource]
+
+    def _store_locked(self, key: _CacheKey, entry: _Entry) -> None:
+        if key in self._entries:
+            self._remove_locked(key)
+        self._entries[key] = entry
+        self._bytes += entry.size
+        for resource in entry.resources:
+            self._by_resource.setdefault(resource, set()).add(key)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove_locked(oldest)
+            self._tool_stats_locked(oldest[1]).evictions += 1
+
+    async def read_through(
+        self,
+        tool_name: str,
+        arguments: Optional[Dict[str, Any]],
+        call: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        Return a cached result for a read-only tool call, or make the call and cache it.
+
+        Args:
+            tool_name: The tool being called
+            arguments: The call's bound arguments, or None if they are unknown
+            call: Coroutine function that runs the tool
+
+        Returns:
+            The tool's result
+        """
+        ttl = self.ttl_for(tool_name)
+        key = tool_call_key(tool_name, arguments) if ttl > 0 else None
+        if key is None:
+            return await call()
+
+        now = time.monotonic()
+        with self._lock:
+            stats = self._tool_stats_locked(tool_name)
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires_at > now:
+                    self._entries.move_to_end(key)
+                    stats.hits += 1
+                    return entry.value
+                self._remove_locked(key)
+            stats.misses += 1
+            epoch = self._epoch
+
+        result = await call()
+
+        size = _size_of(result)
+        if size <= self.max_bytes:
+            with self._lock:
+                if self._epoch == epoch:
+                    self._store_locked(
+                        key,
+                        _Entry(
+                            result,
+                            time.monotonic() + ttl,
+                            size,
+                            resource_ids(arguments),
+                        ),
+                    )
+        return result
+
+    def invalidate_for_write(
+        self, tool_name: str, arguments: Optional[Dict[str, Any]]
+    ) -> int:
+        """
+        Drop cached results a write tool call may have changed.
+
+        Args:
+            tool_name: The write tool that was called
+            arguments: The call's bound arguments, or None if they are unknown
+
+        Returns:
+            Number of entries removed
+        """
+        resources = resource_ids(arguments) if arguments is not None else frozenset()
+        dependent_tools = TOOL_INVALIDATIONS.get(tool_name, ())
+        if not resources and not dependent_tools:
+            return 0
+        user = tool_call_user(arguments) if arguments is not None else None
+
+        with self._lock:
+            self._epoch += 1
+            keys: Set[_CacheKey] = set()
+            for resource in resources:
+                keys.update(self._by_resource.get(resource, ()))
+            if dependent_tools:
+                keys.update(
+                    key
+                    for key in self._entries
+                    if key[1] in dependent_tools and (user is None or key[0] == user)
+                )
+            for key in keys:
+                self._remove_locked(key)
+                self._tool_stats_locked(key[1]).invalidations += 1
+        if keys:
+            logger.debug(
+                f"{tool_name} invalidated {len(keys)} cached result(s) for {sorted(resources)}"
+            )
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._epoch += 1
+            self._entries.clear()
+            self._by_resource.clear()
+            self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache size and per-tool hit, miss, invalidation and eviction counts."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "tools": {
+                    tool: stats.as_dict() for tool, stats in sorted(self._stats.items())
+                },
+            }
+
+
+def _load_ttl_overrides() -> Dict[str, float]:
+    raw = os.getenv("WORKSPACE_MCP_RESULT_CACHE_TTLS", "").strip()
+    if not raw:
+        return {}
+    try:
+        return {tool: float(ttl) for tool, ttl in json.loads(raw).items()}
+    except (ValueError, TypeError, AttributeError) as e:
+        logger.warning(f"Ignoring invalid WORKSPACE_MCP_RESULT_CACHE_TTLS: {e}")
+        return {}
+
+
+# Global cache instance (None while the cache is disabled)
+_tool_result_cache: Optional[ToolResultCache] = None
+_tool_result_cache_loaded = False
+_tool_result_cache_lock = Lock()
+
+
+def get_tool_result_cache() -> Optional[ToolResultCache]:
+    """
+    Get the global tool result cache, or None if it is disabled.
+
+    Environment variables:
+        WORKSPACE_MCP_RESULT_CACHE: Cache read-only tool results (default true)
+        WORKSPACE_MCP_RESULT_CACHE_TTLS: JSON object of per-tool TTLs in
+            seconds, merged over TOOL_RESULT_TTLS (0 disables a tool)
+        WORKSPACE_MCP_RESULT_CACHE_MAX_ENTRIES: Max cached results
+        WORKSPACE_MCP_RESULT_CACHE_MAX_BYTES: Max total size of cached results
+    """
+    global _tool_result_cache, _tool_result_cache_loaded
+
+    if not _tool_result_cache_loaded:
+        with _tool_result_cache_lock:
+            if not _tool_result_cache_loaded:
+                if os.getenv("WORKSPACE_MCP_RESULT_CACHE", "true").lower() in (
+                    "true",
+                    "1",
+                    "yes",
+                ):
+                    ttls = dict(TOOL_RESULT_TTLS)
+                    ttls.update(_load_ttl_overrides())
+                    _tool_result_cache = ToolResultCache(
+                        ttls=ttls,
+                        max_entries=int(
+                            os.getenv(
+                                "WORKSPACE_MCP_RESULT_CACHE_MAX_ENTRIES",
+                                str(DEFAULT_MAX_ENTRIES),
+                            )
+                        ),
+                        max_bytes=int(
+                            os.getenv(
+                                "WORKSPACE_MCP_RESULT_CACHE_MAX_BYTES",
+                                str(DEFAULT_MAX_BYTES),
+                            )
+                        ),
+                    )
+                _tool_result_cache_loaded = True
+
+    return _tool_result_cache
+
+
+def set_tool_result_cache(cache: Optional[ToolResultCache], loaded: bool = True):
+    """
+    Set the global tool result cache.
+
+    Args:
+        cache: Cache to use, or None to disable caching
+        loaded: Pass False to rebuild from configuration on next use
+    """
+    global _tool_result_cache, _tool_result_cache_loaded
+    _tool_result_cache = cache
+    _tool_result_cache_loaded = loaded
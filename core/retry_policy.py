@@ -0,0 +1,353 @@
+"""
+Retry policy for Google API errors raised by tools.
+
+Google answers quota pressure and backend hiccups with errors that succeed on
+a later attempt: 429, 403 ``rateLimitExceeded``/``userRateLimitExceeded``, and
+500/502/503/504. ``handle_http_errors`` uses this module to retry tools that
+are safe to repeat (read-only tools, and writes marked idempotent) instead of
+handing the failure to the LLM.
+
+A RetryPolicy classifies each error by its Google error reason, honors the
+``Retry-After`` header, backs off with decorrelated jitter and gives up once a
+total deadline would be exceeded. Policies can be overridden per tool, and
+retries and time spent backing off are recorded per tool.
+"""
+
+import email.utils
+import json
+import logging
+import os
+import random
+import ssl
+import time
+from threading import Lock
+from typing import Any, Dict, Optional, Set
+
+from googleapiclient.errors import HttpError
+
+logger = logging.getLogger(__name__)
+
+# Default retry configuration (overridable via environment variables)
+DEFAULT_MAX_ATTEMPTS = 4
+DEFAULT_BASE_DELAY_SECONDS = 0.5
+DEFAULT_MAX_DELAY_SECONDS = 16.0
+DEFAULT_DEADLINE_SECONDS = 45.0
+
+# Retry classifications
+RATE_LIMITED = "rate_limited"
+SERVER_ERROR = "server_error"
+NETWORK_ERROR = "network_error"
+
+# Google error reasons that mean "slow down and try again"
+_RATE_LIMIT_REASONS = frozenset(
+    {
+        "rateLimitExceeded",
+        "userRateLimitExceeded",
+        "RATE_LIMIT_EXCEEDED",
+        "RESOURCE_EXHAUSTED",
+    }
+)
+# Reasons that look like rate limits but will not clear within a retry window
+_PERMANENT_QUOTA_REASONS = frozenset(
+    {"dailyLimitExceeded", "quotaExceeded", "dailyLimitExceededUnreg"}
+)
+_SERVER_ERROR_REASONS = frozenset({"backendError", "internalError"})
+_SERVER_ERROR_STATUSES = frozenset({500, 502, 503, 504})
+
+
+def google_error_reasons(error: HttpError) -> Set[str]:
+    """
+    Collect the machine-readable reasons from a Google API error response.
+
+    Covers both the legacy ``error.errors[].reason`` format and the newer
+    ``error.status`` / ``error.details[].reason`` format.
+    """
+    reasons: Set[str] = set()
+    try:
+        data = json.loads(error.content.decode("utf-8"))
+    except (AttributeError, ValueError, UnicodeDecodeError):
+        return reasons
+    if isinstance(data, list) and data:
+        data = data[0]
+    body = data.get("error") if isinstance(data, dict) else None
+    if not isinstance(body, dict):
+        return reasons
+    if isinstance(body.get("status"), str):
+        reasons.add(body["status"])
+    for key in ("errors", "details"):
+        for item in body.get(key) or ():
+            if isinstance(item, dict) and isinstance(item.get("reason"), str):
+                reasons.add(item["reason"])
+    return reasons
+
+
+def classify_error(error: BaseException) -> Optional[str]:
+    """
+    Decide whether an error is worth retrying.
+
+    Returns:
+        RATE_LIMITED, SERVER_ERROR or NETWORK_ERROR, or None if retrying
+        cannot help
+    """
+    if isinstance(error, ssl.SSLError):
+        return NETWORK_ERROR
+    if not isinstance(error, HttpError):
+        return None
+
+    status = error.resp.status
+    reasons = google_error_reasons(error)
+    if reasons & _PERMANENT_QUOTA_REASONS:
+        return None
+    if status == 429 or (status == 403 and reasons & _RATE_LIMIT_REASONS):
+        return RATE_LIMITED
+    if status in _SERVER_ERROR_STATUSES or reasons & _SERVER_ERROR_REASONS:
+        return SERVER_ERROR
+    return None
+
+
+def retry_after_seconds(error: BaseException) -> Optional[float]:
+    """Read the Retry-After header (delta seconds or HTTP date) from an HttpError."""
+    resp = getattr(error, "resp", None)
+    value = resp.get("retry-after") if hasattr(resp, "get") else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+class RetryPolicy:
+    """
+    Retry limits for one tool.
+
+    Delays use decorrelated jitter: each sleep is drawn uniformly from
+    ``[base_delay, previous_delay * 3]`` and capped at ``max_delay``. A
+    ``Retry-After`` header raises the delay to at least what Google asked for.
+    No retry starts if it would finish waiting after ``deadline`` seconds.
+    """
+
+    __slots__ = ("max_attempts", "base_delay", "max_delay", "deadline")
+
+    def __init__(
+        self,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        base_delay: float = DEFAULT_BASE_DELAY_SECONDS,
+        max_delay: float = DEFAULT_MAX_DELAY_SECONDS,
+        deadline: float = DEFAULT_DEADLINE_SECONDS,
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    def replace(self, **overrides: Any) -> "RetryPolicy":
+        """Return a copy of this policy with some limits changed."""
+        values = {name: getattr(self, name) for name in self.__slots__}
+        values.update(overrides)
+        return RetryPolicy(**values)
+
+    def next_delay(
+        self,
+        attempt: int,
+        previous_delay: float,
+        elapsed: float,
+        error: BaseException,
+    ) -> Optional[float]:
+        """
+        Compute how long to wait before retrying after a failed attempt.
+
+        Args:
+            attempt: Number of attempts made so far (1 after the first failure)
+            previous_delay: The delay used before the last attempt (0 if none)
+            elapsed: Seconds since the first attempt started
+            error: The error the last attempt raised
+
+        Returns:
+            Seconds to wait, or None to stop retrying
+        """
+        if attempt >= self.max_attempts:
+            return None
+        upper = max(self.base_delay, previous_delay * 3)
+        delay = min(self.max_delay, random.uniform(self.base_delay, upper))
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        if elapsed + delay > self.deadline:
+            return None
+        return delay
+
+
+class _ToolRetryStats:
+    __slots__ = (
+        "calls",
+        "retries",
+        "retries_by_reason",
+        "backoff_seconds",
+        "gave_up",
+        "deadline_exceeded",
+    )
+
+    def __init__(self):
+        self.calls = 0
+        self.retries = 0
+        self.retries_by_reason: Dict[str, int] = {}
+        self.backoff_seconds = 0.0
+        self.gave_up = 0
+        self.deadline_exceeded = 0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "retries_by_reason": dict(self.retries_by_reason),
+            "backoff_seconds": round(self.backoff_seconds, 3),
+            "gave_up": self.gave_up,
+            "deadline_exceeded": self.deadline_exceeded,
+        }
+
+
+_default_policy: Optional[RetryPolicy] = None
+_tool_policies: Dict[str, RetryPolicy] = {}
+_policy_lock = Lock()
+_stats: Dict[str, _ToolRetryStats] = {}
+_stats_lock = Lock()
+
+
+def _load_default_policy() -> RetryPolicy:
+    return RetryPolicy(
+        max_attempts=int(
+            os.getenv("WORKSPACE_MCP_RETRY_MAX_ATTEMPTS", str(DEFAULT_MAX_ATTEMPTS))
+        ),
+        base_delay=float(
+            os.getenv("WORKSPACE_MCP_RETRY_BASE_DELAY", str(DEFAULT_BASE_DELAY_SECONDS))
+        ),
+        max_delay=float(
+            os.getenv("WORKSPACE_MCP_RETRY_MAX_DELAY", str(DEFAULT_MAX_DELAY_SECONDS))
+        ),
+        deadline=float(
+            os.getenv("WORKSPACE_MCP_RETRY_DEADLINE", str(DEFAULT_DEADLINE_SECONDS))
+        ),
+    )
+
+
+def _load_tool_policies(default: RetryPolicy) -> Dict[str, RetryPolicy]:
+    raw = os.getenv("WORKSPACE_MCP_TOOL_RETRY_POLICIES", "").strip()
+    if not raw:
+        return {}
+    try:
+        overrides = json.loads(raw)
+        return {
+            tool: default.replace(**settings) for tool, settings in overrides.items()
+        }
+    except (ValueError, TypeError, AttributeError) as e:
+        logger.warning(f"Ignoring invalid WORKSPACE_MCP_TOOL_RETRY_POLICIES: {e}")
+        return {}
+
+
+def get_retry_policy(tool_name: str) -> RetryPolicy:
+    """
+    Get the retry policy for a tool.
+
+    Environment variables:
+        WORKSPACE_MCP_RETRY_MAX_ATTEMPTS: Attempts per tool call, including the first
+        WORKSPACE_MCP_RETRY_BASE_DELAY: Smallest backoff delay in seconds
+        WORKSPACE_MCP_RETRY_MAX_DELAY: Largest backoff delay in seconds
+        WORKSPACE_MCP_RETRY_DEADLINE: Seconds after which no new retry starts
+        WORKSPACE_MCP_TOOL_RETRY_POLICIES: JSON object of per-tool overrides,
+            e.g. {"search_drive_files": {"max_attempts": 6, "deadline": 90}}
+    """
+    global _default_policy, _tool_policies
+
+    if _default_policy is None:
+        with _policy_lock:
+            if _default_policy is None:
+                default = _load_default_policy()
+                _tool_policies = {**_load_tool_policies(default), **_tool_policies}
+                _default_policy = default
+    return _tool_policies.get(tool_name, _default_policy)
+
+
+def set_retry_policy(tool_name: Optional[str], policy: Optional[RetryPolicy]):
+    """
+    Override the retry policy for one tool, or the default policy.
+
+    Args:
+        tool_name: Tool to configure, or None for the default policy
+        policy: Policy to use, or None to go back to configuration
+    """
+    global _default_policy
+
+    with _policy_lock:
+        if tool_name is None:
+            _default_policy = policy
+            if policy is None:
+                _tool_policies.clear()
+        elif policy is None:
+            _tool_policies.pop(tool_name, None)
+        else:
+            _tool_policies[tool_name] = policy
+
+
+def _tool_stats_locked(tool_name: str) -> _ToolRetryStats:
+    stats = _stats.get(tool_name)
+    if stats is None:
+        stats = _stats[tool_name] = _ToolRetryStats()
+    return stats
+
+
+def record_call(tool_name: str) -> None:
+    """Record a tool call that is covered by a retry policy."""
+    with _stats_lock:
+        _tool_stats_locked(tool_name).calls += 1
+
+
+def record_retry(tool_name: str, classification: str, delay: float) -> None:
+    """Record a retry and the time spent backing off before it."""
+    with _stats_lock:
+        stats = _tool_stats_locked(tool_name)
+        stats.retries += 1
+        stats.retries_by_reason[classification] = (
+            stats.retries_by_reason.get(classification, 0) + 1
+        )
+        stats.backoff_seconds += delay
+
+
+def record_gave_up(tool_name: str) -> None:
+    """Record a retryable failure that ran out of attempts or deadline."""
+    with _stats_lock:
+        _tool_stats_locked(tool_name).gave_up += 1
+
+
+def record_deadline_exceeded(tool_name: str) -> None:
+    """Record a tool call cancelled for running past its deadline."""
+    with _stats_lock:
+        _tool_stats_locked(tool_name).deadline_exceeded += 1
+
+
+def get_retry_stats() -> Dict[str, Any]:
+    """Get retry statistics per tool, plus totals."""
+    with _stats_lock:
+        selected = dict(_stats)
+        return {
+            "retries": sum(stats.retries for stats in selected.values()),
+            "backoff_seconds": round(
+                sum(stats.backoff_seconds for stats in selected.values()), 3
+            ),
+            "gave_up": sum(stats.gave_up for stats in selected.values()),
+            "deadline_exceeded": sum(
+                stats.deadline_exceeded for stats in selected.values()
+            ),
+            "tools": {name: stats.as_dict() for name, stats in selected.items()},
+        }
+
+
+def reset_retry_stats() -> None:
+    """Clear recorded retry statistics."""
+    with _stats_lock:
+        _stats.clear()
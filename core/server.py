@@ -11,7 +11,11 @@ from starlette.middleware import Middleware
 from fastmcp import FastMCP
 from fastmcp.server.auth.providers.google import GoogleProvider
 
-from auth.oauth21_session_store import get_oauth21_session_store, set_auth_provider
+from auth.oauth21_session_store import (
+    get_oauth21_session_store,
+    run_session_store_call,
+    set_auth_provider,
+)
 from auth.google_auth import handle_auth_callback, start_auth_flow, check_client_secrets
 from auth.oauth_config import is_oauth21_enabled, is_external_oauth21_provider
 from auth.mcp_session_middleware import MCPSessionMiddleware
@@ -33,6 +37,7 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 _auth_provider: Optional[GoogleProvider] = None
+_client_storage_cache = None
 _legacy_callback_registered = False
 
 session_middleware = Middleware(MCPSessionMiddleware)
@@ -88,13 +93,29 @@ def configure_server_for_http():
     Configures the authentication provider for HTTP transport.
     This must be called BEFORE server.run().
     """
-    global _auth_provider
+    global _auth_provider, _client_storage_cache
 
     transport_mode = get_transport_mode()
 
     if transport_mode != "streamable-http":
         return
 
+    # Share OAuth 2.1 sessions between replicas when a backend is configured
+    from auth.oauth21_session_store import configure_session_backend
+
+    if configure_session_backend():
+        logger.info("OAuth 2.1 sessions shared through the configured session backend")
+
+    # Evict idle and least recently used OAuth 2.1 sessions to bound memory
+    from auth.oauth21_session_store import start_session_sweeper
+
+    start_session_sweeper()
+
+    # Refresh stored tokens ahead of expiry so tool calls don't wait on the token endpoint
+    from auth.google_auth import start_background_token_refresh
+
+    start_background_token_refresh()
+
     # Use centralized OAuth configuration
     from auth.oauth_config import get_oauth_config
 
@@ -342,6 +363,38 @@ def configure_server_for_http():
                 )
             # else: client_storage remains None, FastMCP uses its default
 
+            # Keep hot decrypted entries in process to skip Valkey/disk reads and Fernet decrypts
+            near_cache_ttl = float(
+                os.getenv("WORKSPACE_MCP_OAUTH_PROXY_NEAR_CACHE_TTL", "0").strip()
+                or "0"
+            )
+            if (
+                (use_valkey or use_disk)
+                and client_storage is not None
+                and near_cache_ttl > 0
+            ):
+                from core.near_cache import (
+                    DEFAULT_NEAR_CACHE_MAX_ENTRIES,
+                    NearCacheWrapper,
+                )
+
+                client_storage = NearCacheWrapper(
+                    client_storage,
+                    ttl_seconds=near_cache_ttl,
+                    max_entries=int(
+                        os.getenv(
+                            "WORKSPACE_MCP_OAUTH_PROXY_NEAR_CACHE_SIZE",
+                            str(DEFAULT_NEAR_CACHE_MAX_ENTRIES),
+                        )
+                    ),
+                )
+                _client_storage_cache = client_storage
+                logger.info(
+                    "OAuth 2.1: Near cache enabled for client_storage (ttl=%ss, max_entries=%s)",
+                    near_cache_ttl,
+                    client_storage.max_entries,
+                )
+
             # Ensure JWT signing key is always derived for all storage backends
             if "jwt_signing_key" not in locals():
                 jwt_signing_key = validate_and_derive_jwt_key(
@@ -420,19 +473,67 @@ def get_auth_provider() -> Optional[GoogleProvider]:
     return _auth_provider
 
 
+def _google_api_transport_health() -> dict:
+    """Report statistics for the Google API call path, tool result reuse and the OAuth storage cache."""
+    from core.circuit_breaker import get_circuit_breaker_stats
+    from core.concurrency import get_concurrency_stats
+    from core.google_executor import get_google_executor
+    from core.hedging import get_request_hedger
+    from core.http_transport import get_http_transport, is_pooled_transport_enabled
+    from core.rate_limiter import get_rate_limiter, is_rate_limiter_enabled
+    from core.result_cache import get_tool_result_cache
+    from core.retry_policy import get_retry_stats
+    from core.single_flight import get_single_flight
+
+    health = {
+        "google_api_executor": get_google_executor().get_stats(),
+        "google_api_retries": get_retry_stats(),
+        "google_api_concurrency": get_concurrency_stats(),
+        "google_api_circuit_breakers": get_circuit_breaker_stats(),
+    }
+    if is_rate_limiter_enabled():
+        health["google_api_rate_limiter"] = get_rate_limiter().get_stats()
+    hedger = get_request_hedger()
+    if hedger is not None:
+        health["google_api_hedging"] = hedger.get_stats()
+    result_cache = get_tool_result_cache()
+    if result_cache is not None:
+        health["tool_result_cache"] = result_cache.get_stats()
+    single_flight = get_single_flight()
+    if single_flight is not None:
+        health["tool_single_flight"] = single_flight.get_stats()
+    if is_pooled_transport_enabled():
+        health["google_api_transport"] = get_http_transport().get_stats()
+    if _client_storage_cache is not None:
+        health["oauth_proxy_storage_cache"] = _client_storage_cache.get_stats()
+    return health
+
+
 @server.custom_route("/health", methods=["GET"])
 async def health_check(request: Request):
+    from core.circuit_breaker import any_circuit_open
+
     try:
         version = metadata.version("workspace-mcp")
     except metadata.PackageNotFoundError:
         version = "dev"
+    # A Google API outage makes the server degraded: tools for that API fail
+    # fast until its circuit breaker closes again
+    degraded = any_circuit_open()
+    status_code = 200
+    if degraded and os.getenv(
+        "WORKSPACE_MCP_HEALTH_FAIL_WHEN_DEGRADED", "false"
+    ).lower() in ("true", "1", "yes"):
+        status_code = 503
     return JSONResponse(
         {
-            "status": "healthy",
+            "status": "degraded" if degraded else "healthy",
             "service": "workspace-mcp",
             "version": version,
             "transport": get_transport_mode(),
-        }
+            **_google_api_transport_health(),
+        },
+        status_code=status_code,
     )
 
 
@@ -502,7 +603,8 @@ async def legacy_oauth2_callback(request: Request) -> HTMLResponse:
         try:
             store = get_oauth21_session_store()
 
-            store.store_session(
+            await run_session_store_call(
+                store.store_session,
                 user_email=verified_user_id,
                 access_token=credentials.token,
                 refresh_token=credentials.refresh_token,
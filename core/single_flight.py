@@ -0,0 +1,211 @@
+"""
+Single-flight coalescing of identical concurrent read-only tool calls.
+
+MCP clients that retry, or several agents sharing one deployment, often send
+the same read-only tool call while an identical one is still running. With
+single-flight, ``handle_http_errors`` runs such calls once. The first call
+for a (user, tool, arguments) key starts the work, and identical calls that
+arrive while it runs wait for the same result (or error). This works below
+the tool result cache (core.result_cache) and applies whether or not a tool
+has a cache TTL.
+
+The shared work runs as its own task, so one caller being cancelled does not
+fail the others. It is only cancelled once every caller has gone away.
+
+A write tool call detaches in-flight reads of the resources it names (using
+the same rules as the result cache). Calls made after the write start a fresh
+execution instead of joining one that began before it.
+"""
+
+import asyncio
+import logging
+import os
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Optional, Tuple
+
+from core.result_cache import (
+    TOOL_INVALIDATIONS,
+    resource_ids,
+    tool_call_key,
+    tool_call_user,
+)
+
+logger = logging.getLogger(__name__)
+
+_FlightKey = Tuple[str, str, str]
+
+
+class _Flight:
+    __slots__ = ("loop", "task", "resources", "waiters")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, resources: FrozenSet[str]):
+        self.loop = loop
+        self.task: Optional[asyncio.Task] = None
+        self.resources = resources
+        self.waiters = 1
+
+
+class _ToolFlightStats:
+    __slots__ = ("executions", "coalesced")
+
+    def __init__(self):
+        self.executions = 0
+        self.coalesced = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {"executions": self.executions, "coalesced": self.coalesced}
+
+
+class SingleFlight:
+    """Shares one execution among identical concurrent tool calls."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._flights: Dict[_FlightKey, _Flight] = {}
+        self._stats: Dict[str, _ToolFlightStats] = {}
+
+    def _tool_stats_locked(self, tool_name: str) -> _ToolFlightStats:
+        stats = self._stats.get(tool_name)
+        if stats is None:
+            stats = self._stats[tool_name] = _ToolFlightStats()
+        return stats
+
+    async def _run(
+        self, key: _FlightKey, flight: _Flight, call: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        try:
+            return await call()
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+
+    async def do(
+        self,
+        tool_name: str,
+        arguments: Optional[Dict[str, Any]],
+        call: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        Run a read-only tool call, or join an identical one already running.
+
+        Args:
+            tool_name: The tool being called
+            arguments: The call's bound arguments, or None if they are unknown
+            call: Coroutine function that runs the tool
+
+        Returns:
+            The tool's result
+        """
+        key = tool_call_key(tool_name, arguments)
+        if key is None:
+            return await call()
+
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            stats = self._tool_stats_locked(tool_name)
+            flight = self._flights.get(key)
+            if flight is not None and flight.loop is loop:
+                flight.waiters += 1
+                stats.coalesced += 1
+            else:
+                flight = _Flight(loop, resource_ids(arguments))
+                flight.task = loop.create_task(self._run(key, flight, call))
+                self._flights[key] = flight
+                stats.executions += 1
+
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            with self._lock:
+                flight.waiters -= 1
+                abandoned = flight.waiters == 0 and not flight.task.done()
+                if abandoned and self._flights.get(key) is flight:
+                    # Don't let a new caller join a flight that is being cancelled
+                    del self._flights[key]
+            if abandoned:
+                # Every caller has gone away; nobody needs the result
+                flight.task.cancel()
+
+    def forget_for_write(
+        self, tool_name: str, arguments: Optional[Dict[str, Any]]
+    ) -> int:
+        """
+        Stop new calls from joining reads that a write tool call may have outdated.
+
+        Args:
+            tool_name: The write tool that was called
+            arguments: The call's bound arguments, or None if they are unknown
+
+        Returns:
+            Number of in-flight reads detached
+        """
+        resources = resource_ids(arguments) if arguments is not None else frozenset()
+        dependent_tools = TOOL_INVALIDATIONS.get(tool_name, ())
+        if not resources and not dependent_tools:
+            return 0
+        user = tool_call_user(arguments) if arguments is not None else None
+
+        with self._lock:
+            keys = [
+                key
+                for key, flight in self._flights.items()
+                if flight.resources & resources
+                or (key[1] in dependent_tools and (user is None or key[0] == user))
+            ]
+            for key in keys:
+                del self._flights[key]
+        return len(keys)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get in-flight calls and per-tool execution and coalescing counts."""
+        with self._lock:
+            return {
+                "in_flight": len(self._flights),
+                "tools": {
+                    tool: stats.as_dict() for tool, stats in sorted(self._stats.items())
+                },
+            }
+
+
+# Global single-flight instance (None while coalescing is disabled)
+_single_flight: Optional[SingleFlight] = None
+_single_flight_loaded = False
+_single_flight_lock = Lock()
+
+
+def get_single_flight() -> Optional[SingleFlight]:
+    """
+    Get the global single-flight group, or None if coalescing is disabled.
+
+    Environment variables:
+        WORKSPACE_MCP_SINGLE_FLIGHT: Coalesce identical concurrent read-only
+            tool calls (default true)
+    """
+    global _single_flight, _single_flight_loaded
+
+    if not _single_flight_loaded:
+        with _single_flight_lock:
+            if not _single_flight_loaded:
+                if os.getenv("WORKSPACE_MCP_SINGLE_FLIGHT", "true").lower() in (
+                    "true",
+                    "1",
+                    "yes",
+                ):
+                    _single_flight = SingleFlight()
+                _single_flight_loaded = True
+
+    return _single_flight
+
+
+def set_single_flight(single_flight: Optional[SingleFlight], loaded: bool = True):
+    """
+    Set the global single-flight group.
+
+    Args:
+        single_flight: Group to use, or None to disable coalescing
+        loaded: Pass False to rebuild from configuration on next use
+    """
+    global _single_flight, _single_flight_loaded
+    _single_flight = single_flight
+    _single_flight_loaded = loaded
@@ -6,11 +6,27 @@ import xml.etree.ElementTree as ET
 import ssl
 import asyncio
 import functools
+import inspect
+import time
 
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from googleapiclient.errors import HttpError
 from .api_enablement import get_api_enablement_message
+from .circuit_breaker import get_circuit_breakers, is_circuit_breaker_enabled
+from .config import get_tool_deadline
+from .context import get_current_deadline, reset_current_deadline, set_current_deadline
+from .result_cache import get_tool_result_cache
+from .single_flight import get_single_flight
+from .retry_policy import (
+    RATE_LIMITED,
+    classify_error,
+    get_retry_policy,
+    record_call,
+    record_deadline_exceeded,
+    record_gave_up,
+    record_retry,
+)
 from auth.google_auth import GoogleAuthenticationError
 from auth.oauth_config import is_oauth21_enabled, is_external_oauth21_provider
 
@@ -23,6 +39,12 @@ class TransientNetworkError(Exception):
     pass
 
 
+class ToolDeadlineExceededError(TransientNetworkError):
+    """Raised when a tool call runs past its deadline and is cancelled."""
+
+    pass
+
+
 class UserInputError(Exception):
     """Raised for user-facing input/validation errors that shouldn't be retried."""
 
@@ -243,7 +265,10 @@ def extract_office_xml_text(file_bytes: bytes, mime_type: str) -> Optional[str]:
 
 
 def handle_http_errors(
-    tool_name: str, is_read_only: bool = False, service_type: Optional[str] = None
+    tool_name: str,
+    is_read_only: bool = False,
+    service_type: Optional[str] = None,
+    idempotent: bool = False,
 ):
     """
     A decorator to handle Google API HttpErrors and transient SSL errors in a standardized way.
@@ -251,45 +276,125 @@ def handle_http_errors(
     It wraps a tool function, catches HttpError, logs a detailed error message,
     and raises a generic Exception with a user-friendly message.
 
-    If is_read_only is True, it will also catch ssl.SSLError and retry with
-    exponential backoff. After exhausting retries, it raises a TransientNetworkError.
+    If the tool is safe to repeat (is_read_only or idempotent), transient
+    failures are retried according to the tool's RetryPolicy (see
+    core/retry_policy.py): SSL errors, rate limits (429 and 403
+    rateLimitExceeded/userRateLimitExceeded) and 500/502/503/504 responses.
+    Retry-After is honored and backoff uses decorrelated jitter within a total
+    deadline. After exhausting retries on SSL errors, it raises a
+    TransientNetworkError.
+
+    Each attempt also goes through the circuit breakers for service_type (see
+    core/circuit_breaker.py); while a breaker is open the call fails fast
+    with a TransientNetworkError instead of waiting on a failing API.
+
+    The whole call, retries included, runs under the tool's deadline from
+    core.config.get_tool_deadline. The time remaining caps every Google
+    request's socket timeout, and a call that runs past it is cancelled with
+    a ToolDeadlineExceededError (and counted as a network failure by the
+    service's circuit breaker). For writes that are not idempotent the error
+    warns that Google may already have applied the change.
+
+    Read-only tools with a result cache TTL are served from the tool result
+    cache (see core/result_cache.py) when the same user repeats a call, and
+    identical concurrent read-only calls share one execution (see
+    core/single_flight.py). Write tools invalidate cached and in-flight
+    results for the resource IDs they name.
 
     Args:
         tool_name (str): The name of the tool being decorated (e.g., 'list_calendars').
         is_read_only (bool): If True, the operation is considered safe to retry on
-                             transient network errors. Defaults to False.
+                             transient errors. Defaults to False.
         service_type (str): Optional. The Google service type (e.g., 'calendar', 'gmail').
+        idempotent (bool): If True, a write operation is also safe to retry
+                           (e.g. it overwrites a value instead of appending).
+                           Defaults to False.
     """
+    retryable = is_read_only or idempotent
 
     def decorator(func):
-        @functools.wraps(func)
-        async def wrapper(*args, **kwargs):
-            max_retries = 3
-            base_delay = 1
+        async def call_with_retries(args, kwargs):
+            policy = get_retry_policy(tool_name) if retryable else None
+            breakers = (
+                get_circuit_breakers(service_type)
+                if service_type and is_circuit_breaker_enabled()
+                else None
+            )
+            if policy is not None:
+                record_call(tool_name)
+            started = time.monotonic()
+            attempt = 0
+            delay = 0.0
+
+            def next_retry_delay(error: BaseException) -> Optional[float]:
+                # Returns the backoff before the next attempt, or None to give up
+                classification = classify_error(error) if policy else None
+                if classification is None:
+                    return None
+                next_delay = policy.next_delay(
+                    attempt, delay, time.monotonic() - started, error
+                )
+                deadline_at = get_current_deadline()
+                if (
+                    next_delay is not None
+                    and deadline_at is not None
+                    and time.monotonic() + next_delay >= deadline_at
+                ):
+                    # Sleeping would run past the tool deadline
+                    next_delay = None
+                if next_delay is None:
+                    record_gave_up(tool_name)
+                    return None
+                record_retry(tool_name, classification, next_delay)
+                logger.warning(
+                    f"{classification} in {tool_name} on attempt {attempt}: {error}. "
+                    f"Retrying in {next_delay:.2f} seconds..."
+                )
+                return next_delay
 
-            for attempt in range(max_retries):
+            async def call_through_breaker():
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception as e:
+                    breakers.record(e)
+                    raise
+                breakers.record(None)
+                return result
+
+            while True:
+                attempt += 1
+                if breakers is not None and not breakers.allow():
+                    # The API is failing; don't wait out another timeout or retry
+                    message = breakers.open_message(tool_name)
+                    logger.warning(message)
+                    raise TransientNetworkError(message)
                 try:
-                    return await func(*args, **kwargs)
+                    if breakers is None:
+                        return await func(*args, **kwargs)
+                    return await call_through_breaker()
                 except ssl.SSLError as e:
-                    if is_read_only and attempt < max_retries - 1:
-                        delay = base_delay * (2**attempt)
-                        logger.warning(
-                            f"SSL error in {tool_name} on attempt {attempt + 1}: {e}. Retrying in {delay} seconds..."
-                        )
+                    retry_delay = next_retry_delay(e)
+                    if retry_delay is not None:
+                        delay = retry_delay
                         await asyncio.sleep(delay)
-                    else:
-                        logger.error(
-                            f"SSL error in {tool_name} on final attempt: {e}. Raising exception."
-                        )
-                        raise TransientNetworkError(
-                            f"A transient SSL error occurred in '{tool_name}' after {max_retries} attempts. "
-                            "This is likely a temporary network or certificate issue. Please try again shortly."
-                        ) from e
+                        continue
+                    logger.error(
+                        f"SSL error in {tool_name} on final attempt: {e}. Raising exception."
+                    )
+                    raise TransientNetworkError(
+                        f"A transient SSL error occurred in '{tool_name}' after {attempt} attempts. "
+                        "This is likely a temporary network or certificate issue. Please try again shortly."
+                    ) from e
                 except UserInputError as e:
                     message = f"Input error in {tool_name}: {e}"
                     logger.warning(message)
                     raise e
                 except HttpError as error:
+                    retry_delay = next_retry_delay(error)
+                    if retry_delay is not None:
+                        delay = retry_delay
+                        await asyncio.sleep(delay)
+                        continue
                     user_google_email = kwargs.get("user_google_email", "N/A")
                     error_details = str(error)
 
@@ -313,6 +418,12 @@ def handle_http_errors(
                                 f"The required API is not enabled for your project. "
                                 f"Please check the Google Cloud Console to enable it."
                             )
+                    elif classify_error(error) == RATE_LIMITED:
+                        message = (
+                            f"API error in {tool_name}: {error}. "
+                            f"Google API rate limit reached after {attempt} attempts; "
+                            f"try again later or reduce the request rate."
+                        )
                     elif error.resp.status in [401, 403]:
                         # Authentication/authorization errors
                         if is_oauth21_enabled():
@@ -353,6 +464,94 @@ def handle_http_errors(
                     logger.exception(message)
                     raise Exception(message) from e
 
+        async def call_with_deadline(args, kwargs):
+            deadline = get_tool_deadline(tool_name, is_read_only)
+            if deadline is None:
+                return await call_with_retries(args, kwargs)
+            deadline_at = time.monotonic() + deadline
+            outer_deadline = get_current_deadline()
+            if outer_deadline is not None and outer_deadline < deadline_at:
+                deadline_at = outer_deadline
+            token = set_current_deadline(deadline_at)
+            try:
+                return await asyncio.wait_for(
+                    call_with_retries(args, kwargs),
+                    max(0.0, deadline_at - time.monotonic()),
+                )
+            except asyncio.TimeoutError as e:
+                record_deadline_exceeded(tool_name)
+                if service_type and is_circuit_breaker_enabled():
+                    # The cancelled call never reached the breaker; a hung Google
+                    # call is the outage it exists to detect
+                    get_circuit_breakers(service_type).record(
+                        TimeoutError(f"{tool_name} exceeded its deadline")
+                    )
+                if retryable:
+                    message = (
+                        f"'{tool_name}' exceeded its {deadline:g}s deadline and was cancelled "
+                        "because Google did not respond in time. Please try again shortly, "
+                        "or request less data at once."
+                    )
+                else:
+                    message = (
+                        f"'{tool_name}' exceeded its {deadline:g}s deadline and was cancelled "
+                        "while waiting for Google, but Google may already have applied the "
+                        "change. Check whether it took effect (e.g. the message was sent or "
+                        "the item was created) before retrying, so it is not done twice."
+                    )
+                logger.error(message)
+                raise ToolDeadlineExceededError(message) from e
+            finally:
+                reset_current_deadline(token)
+
+        try:
+            signature = inspect.signature(func)
+        except (TypeError, ValueError):
+            signature = None
+
+        def bind_arguments(args, kwargs) -> Optional[Dict[str, Any]]:
+            if signature is None:
+                return None
+            try:
+                bound = signature.bind(*args, **kwargs)
+            except TypeError:
+                return None
+            bound.apply_defaults()
+            return dict(bound.arguments)
+
+        async def call_read_only(args, kwargs, arguments):
+            single_flight = get_single_flight()
+            if single_flight is None:
+                return await call_with_deadline(args, kwargs)
+            return await single_flight.do(
+                tool_name, arguments, lambda: call_with_deadline(args, kwargs)
+            )
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            cache = get_tool_result_cache()
+            if is_read_only:
+                arguments = bind_arguments(args, kwargs)
+                if cache is None:
+                    return await call_read_only(args, kwargs, arguments)
+                return await cache.read_through(
+                    tool_name,
+                    arguments,
+                    lambda: call_read_only(args, kwargs, arguments),
+                )
+            single_flight = get_single_flight()
+            if cache is None and single_flight is None:
+                return await call_with_deadline(args, kwargs)
+            try:
+                return await call_with_deadline(args, kwargs)
+            finally:
+                # Even a failed write may have changed something
+                arguments = bind_arguments(args, kwargs)
+                if single_flight is not None:
+                    single_flight.forget_for_write(tool_name, arguments)
+                if cache is not None:
+                    cache.invalidate_for_write(tool_name, arguments)
+
         # Propagate _required_google_scopes if present (for tool filtering)
         if hasattr(func, "_required_google_scopes"):
             wrapper._required_google_scopes = func._required_google_scopes
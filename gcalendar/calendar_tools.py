@@ -6,16 +6,16 @@ This module provides MCP tools for interacting with Google Calendar API.
 
 import datetime
 import logging
-import asyncio
 import re
 import uuid
 import json
 from typing import List, Optional, Dict, Any, Union
 
 from googleapiclient.errors import HttpError
-from googleapiclient.discovery import build
 
 from auth.service_decorator import require_google_service
+from core.api_executor import execute_async
+from core.discovery import build_service
 from core.utils import handle_http_errors
 
 from core.server import server
@@ -316,9 +316,7 @@ async def list_calendars(service, user_google_email: str) -> str:
     """
     logger.info(f"[list_calendars] Invoked. Email: '{user_google_email}'")
 
-    calendar_list_response = await asyncio.to_thread(
-        lambda: service.calendarList().list().execute()
-    )
+    calendar_list_response = await execute_async(service.calendarList().list())
     items = calendar_list_response.get("items", [])
     if not items:
         return f"No calendars found for {user_google_email}."
@@ -375,10 +373,8 @@ async def get_events(
     # Handle single event retrieval
     if event_id:
         logger.info(f"[get_events] Retrieving single event with ID: {event_id}")
-        event = await asyncio.to_thread(
-            lambda: service.events()
-            .get(calendarId=calendar_id, eventId=event_id)
-            .execute()
+        event = await execute_async(
+            service.events().get(calendarId=calendar_id, eventId=event_id)
         )
         items = [event]
     else:
@@ -422,9 +418,7 @@ async def get_events(
         if query:
             request_params["q"] = query
 
-        events_result = await asyncio.to_thread(
-            lambda: service.events().list(**request_params).execute()
-        )
+        events_result = await execute_async(service.events().list(**request_params))
         items = events_result.get("items", [])
     if not items:
         if event_id:
@@ -669,90 +663,82 @@ async def create_event(
     if attachments:
         # Accept both file URLs and file IDs. If a URL, extract the fileId.
         event_body["attachments"] = []
+        # The Drive client shares the Calendar service's pooled transport, so it
+        # must not be closed here.
         drive_service = None
         try:
-            try:
-                drive_service = service._http and build(
-                    "drive", "v3", http=service._http
+            drive_service = service._http and build_service(
+                "drive", "v3", http=service._http
+            )
+        except Exception as e:
+            logger.warning(
+                f"Could not build Drive service for MIME type lookup: {e}"
+            )
+        for att in attachments:
+            file_id = None
+            if att.startswith("https://"):
+                # Match /d/<id>, /file/d/<id>, ?id=<id>
+                match = re.search(r"(?:/d/|/file/d/|id=)([\w-]+)", att)
+                file_id = match.group(1) if match else None
+                logger.info(
+                    f"[create_event] Extracted file_id '{file_id}' from attachment URL '{att}'"
                 )
-            except Exception as e:
-                logger.warning(
-                    f"Could not build Drive service for MIME type lookup: {e}"
+            else:
+                file_id = att
+                logger.info(
+                    f"[create_event] Using direct file_id '{file_id}' for attachment"
                 )
-            for att in attachments:
-                file_id = None
-                if att.startswith("https://"):
-                    # Match /d/<id>, /file/d/<id>, ?id=<id>
-                    match = re.search(r"(?:/d/|/file/d/|id=)([\w-]+)", att)
-                    file_id = match.group(1) if match else None
-                    logger.info(
-                        f"[create_event] Extracted file_id '{file_id}' from attachment URL '{att}'"
-                    )
-                else:
-                    file_id = att
-                    logger.info(
-                        f"[create_event] Using direct file_id '{file_id}' for attachment"
-                    )
-                if file_id:
-                    file_url = f"https://drive.google.com/open?id={file_id}"
-                    mime_type = "application/vnd.google-apps.drive-sdk"
-                    title = "Drive Attachment"
-                    # Try to get the actual MIME type and filename from Drive
-                    if drive_service:
-                        try:
-                            file_metadata = await asyncio.to_thread(
-                                lambda: drive_service.files()
-                                .get(
-                                    fileId=file_id,
-                                    fields="mimeType,name",
-                                    supportsAllDrives=True,
-                                )
-                                .execute()
+            if file_id:
+                file_url = f"https://drive.google.com/open?id={file_id}"
+                mime_type = "application/vnd.google-apps.drive-sdk"
+                title = "Drive Attachment"
+                # Try to get the actual MIME type and filename from Drive
+                if drive_service:
+                    try:
+                        file_metadata = await execute_async(
+                            drive_service.files().get(
+                                fileId=file_id,
+                                fields="mimeType,name",
+                                supportsAllDrives=True,
                             )
-                            mime_type = file_metadata.get("mimeType", mime_type)
-                            filename = file_metadata.get("name")
-                            if filename:
-                                title = filename
-                                logger.info(
-                                    f"[create_event] Using filename '{filename}' as attachment title"
-                                )
-                            else:
-                                logger.info(
-                                    "[create_event] No filename found, using generic title"
-                                )
-                        except Exception as e:
-                            logger.warning(
-                                f"Could not fetch metadata for file {file_id}: {e}"
+                        )
+                        mime_type = file_metadata.get("mimeType", mime_type)
+                        filename = file_metadata.get("name")
+                        if filename:
+                            title = filename
+                            logger.info(
+                                f"[create_event] Using filename '{filename}' as attachment title"
                             )
-                    event_body["attachments"].append(
-                        {
-                            "fileUrl": file_url,
-                            "title": title,
-                            "mimeType": mime_type,
-                        }
-                    )
-        finally:
-            if drive_service:
-                drive_service.close()
-        created_event = await asyncio.to_thread(
-            lambda: service.events()
-            .insert(
+                        else:
+                            logger.info(
+                                "[create_event] No filename found, using generic title"
+                            )
+                    except Exception as e:
+                        logger.warning(
+                            f"Could not fetch metadata for file {file_id}: {e}"
+                        )
+                event_body["attachments"].append(
+                    {
+                        "fileUrl": file_url,
+                        "title": title,
+                        "mimeType": mime_type,
+                    }
+                )
+        created_event = await execute_async(
+            service.events().insert(
                 calendarId=calendar_id,
                 body=event_body,
                 supportsAttachments=True,
                 conferenceDataVersion=1 if add_google_meet else 0,
             )
-            .execute()
         )
     else:
-        created_event = await asyncio.to_thread(
-            lambda: service.events()
-            .insert(
+        created_event = await execute_async(
+            service.events().insert(
                 calendarId=calendar_id,
                 body=event_body,
                 conferenceDataVersion=1 if add_google_meet else 0,
             )
-            .execute()
         )
     link = created_event.get("htmlLink", "No link available")
     confirmation_message = f"Successfully created event '{created_event.get('summary', summary)}' for {user_google_email}. Link: {link}"
@@ -896,10 +882,8 @@ async def modify_event(
         else:
             # Preserve existing event's useDefault value if not explicitly specified
             try:
-                existing_event = (
-                    service.events()
-                    .get(calendarId=calendar_id, eventId=event_id)
-                    .execute()
+                existing_event = await execute_async(
+                    service.events().get(calendarId=calendar_id, eventId=event_id)
                 )
                 reminder_data["useDefault"] = existing_event.get("reminders", {}).get(
                     "useDefault", True
@@ -975,10 +959,8 @@ async def modify_event(
 
     # Get the existing event to preserve fields that aren't being updated
     try:
-        existing_event = await asyncio.to_thread(
-            lambda: service.events()
-            .get(calendarId=calendar_id, eventId=event_id)
-            .execute()
+        existing_event = await execute_async(
+            service.events().get(calendarId=calendar_id, eventId=event_id)
         )
         logger.info(
             "[modify_event] Successfully retrieved existing event before update"
@@ -1034,15 +1016,13 @@ async def modify_event(
             )
 
     # Proceed with the update
-    updated_event = await asyncio.to_thread(
-        lambda: service.events()
-        .update(
+    updated_event = await execute_async(
+        service.events().update(
             calendarId=calendar_id,
             eventId=event_id,
             body=event_body,
             conferenceDataVersion=1,
         )
-        .execute()
     )
 
     link = updated_event.get("htmlLink", "No link available")
@@ -1095,10 +1075,8 @@ async def delete_event(
 
     # Try to get the event first to verify it exists
     try:
-        await asyncio.to_thread(
-            lambda: service.events()
-            .get(calendarId=calendar_id, eventId=event_id)
-            .execute()
+        await execute_async(
+            service.events().get(calendarId=calendar_id, eventId=event_id)
         )
         logger.info("[delete_event] Successfully verified event exists before deletion")
     except HttpError as get_error:
@@ -1114,10 +1092,8 @@ async def delete_event(
             )
 
     # Proceed with the deletion
-    await asyncio.to_thread(
-        lambda: service.events()
-        .delete(calendarId=calendar_id, eventId=event_id)
-        .execute()
+    await execute_async(
+        service.events().delete(calendarId=calendar_id, eventId=event_id)
     )
 
     confirmation_message = f"Successfully deleted event (ID: {event_id}) from calendar '{calendar_id}' for {user_google_email}."
@@ -1180,9 +1156,7 @@ async def query_freebusy(
     )
 
     # Execute the freebusy query
-    freebusy_result = await asyncio.to_thread(
-        lambda: service.freebusy().query(body=request_body).execute()
-    )
+    freebusy_result = await execute_async(service.freebusy().query(body=request_body))
 
     # Parse the response
     calendars = freebusy_result.get("calendars", {})
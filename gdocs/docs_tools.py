@@ -6,12 +6,12 @@ Three RED tools (unmerge_table_cells, update_table_row_style, pin_table_header_r
 use REST API via TableOperationManager.
 """
 
-import asyncio
 import json
 import logging
 from typing import Any
 
 from auth.service_decorator import require_google_service
+from core.api_executor import execute_async
 from core.utils import handle_http_errors
 from core.server import server
 
@@ -62,19 +62,17 @@ logger = logging.getLogger(__name__)
 
 async def _get_doc(service: Any, document_id: str) -> dict[str, Any]:
     """Fetch the full document JSON via documents.get()."""
-    return await asyncio.to_thread(
-        service.documents().get(documentId=document_id).execute
-    )
+    return await execute_async(service.documents().get(documentId=document_id))
 
 
 async def _batch_update(
     service: Any, document_id: str, requests: list[dict[str, Any]]
 ) -> dict[str, Any]:
     """Execute a batchUpdate with the given request list."""
-    return await asyncio.to_thread(
-        service.documents()
-        .batchUpdate(documentId=document_id, body={"requests": requests})
-        .execute
+    return await execute_async(
+        service.documents().batchUpdate(
+            documentId=document_id, body={"requests": requests}
+        )
     )
 
 
@@ -315,9 +313,7 @@ async def create_doc(
     """
     logger.info(f"[create_doc] Invoked. Email: '{user_google_email}', Title='{title}'")
 
-    result = await asyncio.to_thread(
-        service.documents().create(body={"title": title}).execute
-    )
+    result = await execute_async(service.documents().create(body={"title": title}))
     doc_id = result.get("documentId")
 
     if content:
@@ -8,9 +8,9 @@ Handles 3 specialized table operations:
 """
 
 import logging
-import asyncio
 from typing import List, Dict, Any, Tuple
 
+from core.api_executor import execute_async
 from gdocs.docs_helpers import (
     create_unmerge_table_cells_request,
     create_update_table_row_style_request,
@@ -29,9 +29,7 @@ class TableOperationManager:
 
     async def _get_document_tables(self, document_id: str) -> List[Dict[str, Any]]:
         """Get fresh document structure and extract table information."""
-        doc = await asyncio.to_thread(
-            self.service.documents().get(documentId=document_id).execute
-        )
+        doc = await execute_async(self.service.documents().get(documentId=document_id))
         return find_tables(doc)
 
     async def unmerge_cells(
@@ -59,10 +57,10 @@ class TableOperationManager:
                 table_start_index, row_index, col_index, row_span, col_span
             )
 
-            await asyncio.to_thread(
-                self.service.documents()
-                .batchUpdate(documentId=document_id, body={"requests": [request]})
-                .execute
+            await execute_async(
+                self.service.documents().batchUpdate(
+                    documentId=document_id, body={"requests": [request]}
+                )
             )
 
             return (
@@ -125,10 +123,10 @@ class TableOperationManager:
             if request is None:
                 return False, "No valid style properties to apply", {}
 
-            await asyncio.to_thread(
-                self.service.documents()
-                .batchUpdate(documentId=document_id, body={"requests": [request]})
-                .execute
+            await execute_async(
+                self.service.documents().batchUpdate(
+                    documentId=document_id, body={"requests": [request]}
+                )
             )
 
             return (
@@ -179,10 +177,10 @@ class TableOperationManager:
                 table_start_index, pinned_header_rows_count
             )
 
-            await asyncio.to_thread(
-                self.service.documents()
-                .batchUpdate(documentId=document_id, body={"requests": [request]})
-                .execute
+            await execute_async(
+                self.service.documents().batchUpdate(
+                    documentId=document_id, body={"requests": [request]}
+                )
             )
 
             action = "pinned" if pinned_header_rows_count > 0 else "unpinned"
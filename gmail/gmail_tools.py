@@ -9,6 +9,7 @@ import asyncio
 import base64
 import ssl
 import mimetypes
+import time
 from pathlib import Path
 from html.parser import HTMLParser
 from typing import Optional, List, Dict, Literal, Any, Union
@@ -23,6 +24,12 @@ from fastapi import Body
 from pydantic import Field
 
 from auth.service_decorator import require_google_service
+from core.api_executor import execute_async
+from core.concurrency import (
+    AdaptiveConcurrencyController,
+    get_concurrency_controller,
+    is_overload_error,
+)
 from core.utils import handle_http_errors
 from core.server import server
 from auth.scopes import (
@@ -34,10 +41,30 @@ from auth.scopes import (
 
 logger = logging.getLogger(__name__)
 
-GMAIL_BATCH_SIZE = 25
-GMAIL_REQUEST_DELAY = 0.1
 HTML_BODY_TRUNCATE_LIMIT = 20000
 GMAIL_METADATA_HEADERS = ["Subject", "From", "To", "Cc", "Message-ID", "Date"]
+# Gmail rejects batch requests with more than 100 calls
+GMAIL_BATCH_MAX_REQUESTS = 100
+
+
+def _batch_chunk_size(controller: AdaptiveConcurrencyController) -> int:
+    """Size the next batch by the adaptive window, capped at Gmail's batch limit."""
+    return min(controller.window, GMAIL_BATCH_MAX_REQUESTS)
+
+
+def _record_batch_outcome(
+    controller: AdaptiveConcurrencyController,
+    results: Dict[str, Dict],
+    started_at: float,
+) -> None:
+    """Feed a batch's sub-request results into the adaptive concurrency controller."""
+    if any(is_overload_error(entry["error"]) for entry in results.values()):
+        controller.record_overload(started_at)
+    elif results:
+        elapsed = time.monotonic() - started_at
+        controller.record_success(
+            elapsed / len(results), count=len(results), started_at=started_at
+        )
 
 
 class _HTMLTextExtractor(HTMLParser):
@@ -509,9 +536,7 @@ async def search_gmail_messages(
         request_params["pageToken"] = page_token
         logger.info("[search_gmail_messages] Using page_token for pagination")
 
-    response = await asyncio.to_thread(
-        service.users().messages().list(**request_params).execute
-    )
+    response = await execute_async(service.users().messages().list(**request_params))
 
     # Handle potential null response (but empty dict {} is valid)
     if response is None:
@@ -575,7 +600,7 @@ async def get_gmail_message_content(
 
         if format == "metadata":
             # Fetch metadata only
-            message = await asyncio.to_thread(
+            message = await execute_async(
                 service.users()
                 .messages()
                 .get(
@@ -584,7 +609,6 @@ async def get_gmail_message_content(
                     format="metadata",
                     metadataHeaders=GMAIL_METADATA_HEADERS,
                 )
-                .execute
             )
 
             payload = message.get("payload", {})
@@ -612,7 +636,7 @@ async def get_gmail_message_content(
             return "\n".join(content_lines)
         else:
             # Full format: fetch metadata first, then full message
-            message_metadata = await asyncio.to_thread(
+            message_metadata = await execute_async(
                 service.users()
                 .messages()
                 .get(
@@ -621,7 +645,6 @@ async def get_gmail_message_content(
                     format="metadata",
                     metadataHeaders=GMAIL_METADATA_HEADERS,
                 )
-                .execute
             )
 
             headers = _extract_headers(
@@ -634,11 +657,10 @@ async def get_gmail_message_content(
             rfc822_msg_id = headers.get("Message-ID", "")
 
             # Now fetch the full message to get the body parts
-            message_full = await asyncio.to_thread(
+            message_full = await execute_async(
                 service.users()
                 .messages()
                 .get(userId="me", id=message_id, format="full")
-                .execute
             )
 
             # Extract both text and HTML bodies
@@ -686,9 +708,13 @@ async def get_gmail_message_content(
     # Multiple messages: use batch processing
     output_messages = []
 
-    # Process in smaller chunks to prevent SSL connection exhaustion
-    for chunk_start in range(0, len(ids), GMAIL_BATCH_SIZE):
-        chunk_ids = ids[chunk_start : chunk_start + GMAIL_BATCH_SIZE]
+    # Process in chunks sized by the adaptive concurrency window, which grows
+    # while Gmail keeps up and shrinks on 429/503 or rising latency
+    controller = get_concurrency_controller(user_google_email, "gmail")
+    chunk_start = 0
+    while chunk_start < len(ids):
+        chunk_ids = ids[chunk_start : chunk_start + _batch_chunk_size(controller)]
+        chunk_start += len(chunk_ids)
         results: Dict[str, Dict] = {}
 
         def _batch_callback(request_id, response, exception):
@@ -696,6 +722,7 @@ async def get_gmail_message_content(
             results[request_id] = {"data": response, "error": exception}
 
         # Try to use batch API
+        started_at = time.monotonic()
         try:
             batch = service.new_batch_http_request(callback=_batch_callback)
 
@@ -720,12 +747,15 @@ async def get_gmail_message_content(
                 batch.add(req, request_id=mid)
 
             # Execute batch request
-            await asyncio.to_thread(batch.execute)
+            await execute_async(batch)
+            _record_batch_outcome(controller, results, started_at)
 
         except Exception as batch_error:
-            # Fallback to sequential processing to prevent SSL exhaustion
+            if is_overload_error(batch_error):
+                controller.record_overload(started_at)
+            # Fall back to individual requests, bounded by the concurrency window
             logger.warning(
-                f"[get_gmail_message_content] Batch API failed, falling back to sequential processing: {batch_error}"
+                f"[get_gmail_message_content] Batch API failed, falling back to individual requests: {batch_error}"
             )
 
             async def fetch_message_with_retry(mid: str, max_retries: int = 3):
@@ -733,7 +763,7 @@ async def get_gmail_message_content(
                 for attempt in range(max_retries):
                     try:
                         if format == "metadata":
-                            msg = await asyncio.to_thread(
+                            request = (
                                 service.users()
                                 .messages()
                                 .get(
@@ -742,15 +772,15 @@ async def get_gmail_message_content(
                                     format="metadata",
                                     metadataHeaders=GMAIL_METADATA_HEADERS,
                                 )
-                                .execute
                             )
                         else:
-                            msg = await asyncio.to_thread(
+                            request = (
                                 service.users()
                                 .messages()
                                 .get(userId="me", id=mid, format="full")
-                                .execute
                             )
+                        async with controller.slot():
+                            msg = await execute_async(request)
                         return mid, msg, None
                     except ssl.SSLError as ssl_error:
                         if attempt < max_retries - 1:
@@ -767,11 +797,11 @@ async def get_gmail_message_content(
                     except Exception as e:
                         return mid, None, e
 
-            # Process messages sequentially with small delays
-            for mid in chunk_ids:
-                mid_result, msg_data, error = await fetch_message_with_retry(mid)
+            fetched = await asyncio.gather(
+                *(fetch_message_with_retry(mid) for mid in chunk_ids)
+            )
+            for mid_result, msg_data, error in fetched:
                 results[mid_result] = {"data": msg_data, "error": error}
-                await asyncio.sleep(GMAIL_REQUEST_DELAY)
 
         # Process results for this chunk
         for mid in chunk_ids:
@@ -878,12 +908,11 @@ async def get_gmail_attachment_content(
     # to fail. The attachment download endpoint returns size information, and filename/mime
     # type should be obtained from the original message content call that provided this ID.
     try:
-        attachment = await asyncio.to_thread(
+        attachment = await execute_async(
             service.users()
             .messages()
             .attachments()
             .get(userId="me", messageId=message_id, id=attachment_id)
-            .execute
         )
     except Exception as e:
         logger.error(
@@ -930,11 +959,10 @@ async def get_gmail_attachment_content(
         try:
             # Quick metadata fetch to try to get attachment info
             # Note: This might fail if attachment IDs changed, but worth trying
-            message_metadata = await asyncio.to_thread(
+            message_metadata = await execute_async(
                 service.users()
                 .messages()
                 .get(userId="me", id=message_id, format="metadata")
-                .execute
             )
             payload = message_metadata.get("payload", {})
             attachments = _extract_attachments(payload)
@@ -1153,8 +1181,8 @@ async def send_gmail_message(
         send_body["threadId"] = thread_id_final
 
     # Send the message
-    sent_message = await asyncio.to_thread(
-        service.users().messages().send(userId="me", body=send_body).execute
+    sent_message = await execute_async(
+        service.users().messages().send(userId="me", body=send_body)
     )
     message_id = sent_message.get("id")
 
@@ -1314,8 +1342,8 @@ async def draft_gmail_message(
         draft_body["message"]["threadId"] = thread_id_final
 
     # Create the draft
-    created_draft = await asyncio.to_thread(
-        service.users().drafts().create(userId="me", body=draft_body).execute
+    created_draft = await execute_async(
+        service.users().drafts().create(userId="me", body=draft_body)
     )
     draft_id = created_draft.get("id")
     attachment_info = f" with {len(attachments)} attachment(s)" if attachments else ""
@@ -1429,11 +1457,8 @@ async def get_gmail_thread_content(
     # Single thread: use simple direct API call
     if len(ids) == 1:
         thread_id = ids[0]
-        thread_response = await asyncio.to_thread(
-            service.users()
-            .threads()
-            .get(userId="me", id=thread_id, format="full")
-            .execute
+        thread_response = await execute_async(
+            service.users().threads().get(userId="me", id=thread_id, format="full")
         )
         return _format_thread_content(thread_response, thread_id)
 
@@ -1444,12 +1469,16 @@ async def get_gmail_thread_content(
         """Callback for batch requests"""
         results[request_id] = {"data": response, "error": exception}
 
-    # Process in smaller chunks to prevent SSL connection exhaustion
-    for chunk_start in range(0, len(ids), GMAIL_BATCH_SIZE):
-        chunk_ids = ids[chunk_start : chunk_start + GMAIL_BATCH_SIZE]
+    # Process in chunks sized by the adaptive concurrency window
+    controller = get_concurrency_controller(user_google_email, "gmail")
+    chunk_start = 0
+    while chunk_start < len(ids):
+        chunk_ids = ids[chunk_start : chunk_start + _batch_chunk_size(controller)]
+        chunk_start += len(chunk_ids)
         results: Dict[str, Dict] = {}
 
         # Try to use batch API
+        started_at = time.monotonic()
         try:
             batch = service.new_batch_http_request(callback=_batch_callback)
 
@@ -1458,24 +1487,28 @@ async def get_gmail_thread_content(
                 batch.add(req, request_id=tid)
 
             # Execute batch request
-            await asyncio.to_thread(batch.execute)
+            await execute_async(batch)
+            _record_batch_outcome(controller, results, started_at)
 
         except Exception as batch_error:
-            # Fallback to sequential processing to prevent SSL exhaustion
+            if is_overload_error(batch_error):
+                controller.record_overload(started_at)
+            # Fall back to individual requests, bounded by the concurrency window
             logger.warning(
-                f"[get_gmail_thread_content] Batch API failed, falling back to sequential processing: {batch_error}"
+                f"[get_gmail_thread_content] Batch API failed, falling back to individual requests: {batch_error}"
             )
 
             async def fetch_thread_with_retry(tid: str, max_retries: int = 3):
                 """Fetch a single thread with exponential backoff retry for SSL errors"""
                 for attempt in range(max_retries):
                     try:
-                        thread = await asyncio.to_thread(
+                        request = (
                             service.users()
                             .threads()
                             .get(userId="me", id=tid, format="full")
-                            .execute
                         )
+                        async with controller.slot():
+                            thread = await execute_async(request)
                         return tid, thread, None
                     except ssl.SSLError as ssl_error:
                         if attempt < max_retries - 1:
@@ -1492,11 +1525,11 @@ async def get_gmail_thread_content(
                     except Exception as e:
                         return tid, None, e
 
-            # Process threads sequentially with small delays
-            for tid in chunk_ids:
-                tid_result, thread_data, error = await fetch_thread_with_retry(tid)
+            fetched = await asyncio.gather(
+                *(fetch_thread_with_retry(tid) for tid in chunk_ids)
+            )
+            for tid_result, thread_data, error in fetched:
                 results[tid_result] = {"data": thread_data, "error": error}
-                await asyncio.sleep(GMAIL_REQUEST_DELAY)
 
         # Process results for this chunk
         for tid in chunk_ids:
@@ -1532,9 +1565,7 @@ async def list_gmail_labels(service, user_google_email: str) -> str:
     """
     logger.info(f"[list_gmail_labels] Invoked. Email: '{user_google_email}'")
 
-    response = await asyncio.to_thread(
-        service.users().labels().list(userId="me").execute
-    )
+    response = await execute_async(service.users().labels().list(userId="me"))
     labels = response.get("labels", [])
 
     if not labels:
@@ -1607,14 +1638,14 @@ async def manage_gmail_label(
             "labelListVisibility": label_list_visibility,
             "messageListVisibility": message_list_visibility,
         }
-        created_label = await asyncio.to_thread(
-            service.users().labels().create(userId="me", body=label_object).execute
+        created_label = await execute_async(
+            service.users().labels().create(userId="me", body=label_object)
         )
         return f"Label created successfully!\nName: {created_label['name']}\nID: {created_label['id']}"
 
     elif action == "update":
-        current_label = await asyncio.to_thread(
-            service.users().labels().get(userId="me", id=label_id).execute
+        current_label = await execute_async(
+            service.users().labels().get(userId="me", id=label_id)
         )
 
         label_object = {
@@ -1624,23 +1655,18 @@ async def manage_gmail_label(
             "messageListVisibility": message_list_visibility,
         }
 
-        updated_label = await asyncio.to_thread(
-            service.users()
-            .labels()
-            .update(userId="me", id=label_id, body=label_object)
-            .execute
+        updated_label = await execute_async(
+            service.users().labels().update(userId="me", id=label_id, body=label_object)
         )
         return f"Label updated successfully!\nName: {updated_label['name']}\nID: {updated_label['id']}"
 
     elif action == "delete":
-        label = await asyncio.to_thread(
-            service.users().labels().get(userId="me", id=label_id).execute
+        label = await execute_async(
+            service.users().labels().get(userId="me", id=label_id)
         )
         label_name = label["name"]
 
-        await asyncio.to_thread(
-            service.users().labels().delete(userId="me", id=label_id).execute
-        )
+        await execute_async(service.users().labels().delete(userId="me", id=label_id))
         return f"Label '{label_name}' (ID: {label_id}) deleted successfully!"
 
 
@@ -1659,8 +1685,8 @@ async def list_gmail_filters(service, user_google_email: str) -> str:
     """
     logger.info(f"[list_gmail_filters] Invoked. Email: '{user_google_email}'")
 
-    response = await asyncio.to_thread(
-        service.users().settings().filters().list(userId="me").execute
+    response = await execute_async(
+        service.users().settings().filters().list(userId="me")
     )
 
     filters = response.get("filter") or response.get("filters") or []
@@ -1750,12 +1776,8 @@ async def create_gmail_filter(
 
     filter_body = {"criteria": criteria, "action": action}
 
-    created_filter = await asyncio.to_thread(
-        service.users()
-        .settings()
-        .filters()
-        .create(userId="me", body=filter_body)
-        .execute
+    created_filter = await execute_async(
+        service.users().settings().filters().create(userId="me", body=filter_body)
     )
 
     filter_id = created_filter.get("id", "(unknown)")
@@ -1782,12 +1804,12 @@ async def delete_gmail_filter(
     """
     logger.info(f"[delete_gmail_filter] Invoked. Filter ID: '{filter_id}'")
 
-    filter_details = await asyncio.to_thread(
-        service.users().settings().filters().get(userId="me", id=filter_id).execute
+    filter_details = await execute_async(
+        service.users().settings().filters().get(userId="me", id=filter_id)
     )
 
-    await asyncio.to_thread(
-        service.users().settings().filters().delete(userId="me", id=filter_id).execute
+    await execute_async(
+        service.users().settings().filters().delete(userId="me", id=filter_id)
     )
 
     criteria = filter_details.get("criteria", {})
@@ -1802,7 +1824,9 @@ async def delete_gmail_filter(
 
 
 @server.tool()
-@handle_http_errors("modify_gmail_message_labels", service_type="gmail")
+@handle_http_errors(
+    "modify_gmail_message_labels", service_type="gmail", idempotent=True
+)
 @require_google_service("gmail", GMAIL_MODIFY_SCOPE)
 async def modify_gmail_message_labels(
     service,
@@ -1854,11 +1878,8 @@ async def modify_gmail_message_labels(
         if remove_label_ids:
             body["removeLabelIds"] = remove_label_ids
 
-        await asyncio.to_thread(
-            service.users()
-            .messages()
-            .modify(userId="me", id=message_id, body=body)
-            .execute
+        await execute_async(
+            service.users().messages().modify(userId="me", id=message_id, body=body)
         )
 
         actions = []
@@ -1876,9 +1897,7 @@ async def modify_gmail_message_labels(
     if remove_label_ids:
         body["removeLabelIds"] = remove_label_ids
 
-    await asyncio.to_thread(
-        service.users().messages().batchModify(userId="me", body=body).execute
-    )
+    await execute_async(service.users().messages().batchModify(userId="me", body=body))
 
     actions = []
     if add_label_ids:
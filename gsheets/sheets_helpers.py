@@ -5,11 +5,11 @@ Shared utilities for Google Sheets operations including A1 parsing and
 conditional formatting helpers.
 """
 
-import asyncio
 import json
 import re
 from typing import List, Optional, Union
 
+from core.api_executor import execute_async
 from core.utils import UserInputError
 
 
@@ -327,15 +327,13 @@ def _extract_cell_errors_from_grid(spreadsheet: dict) -> list[dict[str, Optional
 async def _fetch_detailed_sheet_errors(
     service, spreadsheet_id: str, a1_range: str
 ) -> list[dict[str, Optional[str]]]:
-    response = await asyncio.to_thread(
-        service.spreadsheets()
-        .get(
+    response = await execute_async(
+        service.spreadsheets().get(
             spreadsheetId=spreadsheet_id,
             ranges=[a1_range],
             includeGridData=True,
             fields="sheets(properties(title),data(startRow,startColumn,rowData(values(effectiveValue(errorValue(type,message))))))",
         )
-        .execute
     )
     return _extract_cell_errors_from_grid(response)
 
@@ -560,13 +558,11 @@ async def _fetch_sheets_with_rules(
     """
     Fetch sheets with titles and conditional format rules in a single request.
     """
-    response = await asyncio.to_thread(
-        service.spreadsheets()
-        .get(
+    response = await execute_async(
+        service.spreadsheets().get(
             spreadsheetId=spreadsheet_id,
             fields="sheets(properties(sheetId,title),conditionalFormats)",
         )
-        .execute
     )
     sheets = response.get("sheets", []) or []
     sheet_titles: dict[int, str] = {}
@@ -5,12 +5,12 @@ This module provides MCP tools for interacting with Google Sheets API.
 """
 
 import logging
-import asyncio
 import json
 import copy
 from typing import List, Optional, Union
 
 from auth.service_decorator import require_google_service
+from core.api_executor import execute_async
 from core.server import server
 from core.utils import handle_http_errors, UserInputError
 
@@ -57,13 +57,11 @@ async def get_spreadsheet_info(
         f"[get_spreadsheet_info] Invoked. Email: '{user_google_email}', Spreadsheet ID: {spreadsheet_id}"
     )
 
-    spreadsheet = await asyncio.to_thread(
-        service.spreadsheets()
-        .get(
+    spreadsheet = await execute_async(
+        service.spreadsheets().get(
             spreadsheetId=spreadsheet_id,
             fields="spreadsheetId,properties(title,locale),sheets(properties(title,sheetId,gridProperties(rowCount,columnCount)),conditionalFormats)",
         )
-        .execute
     )
 
     properties = spreadsheet.get("properties", {})
@@ -137,11 +135,10 @@ async def read_sheet_values(
         f"[read_sheet_values] Invoked. Email: '{user_google_email}', Spreadsheet: {spreadsheet_id}, Range: {range_name}"
     )
 
-    result = await asyncio.to_thread(
+    result = await execute_async(
         service.spreadsheets()
         .values()
         .get(spreadsheetId=spreadsheet_id, range=range_name)
-        .execute
     )
 
     values = result.get("values", [])
@@ -184,7 +181,7 @@ async def read_sheet_values(
 
 
 @server.tool()
-@handle_http_errors("modify_sheet_values", service_type="sheets")
+@handle_http_errors("modify_sheet_values", service_type="sheets", idempotent=True)
 @require_google_service("sheets", "sheets_write")
 async def modify_sheet_values(
     service,
@@ -243,11 +240,10 @@ async def modify_sheet_values(
         )
 
     if clear_values:
-        result = await asyncio.to_thread(
+        result = await execute_async(
             service.spreadsheets()
             .values()
             .clear(spreadsheetId=spreadsheet_id, range=range_name)
-            .execute
         )
 
         cleared_range = result.get("clearedRange", range_name)
@@ -258,7 +254,7 @@ async def modify_sheet_values(
     else:
         body = {"values": values}
 
-        result = await asyncio.to_thread(
+        result = await execute_async(
             service.spreadsheets()
             .values()
             .update(
@@ -271,7 +267,6 @@ async def modify_sheet_values(
                 responseValueRenderOption="FORMATTED_VALUE",
                 body=body,
             )
-            .execute
         )
 
         updated_cells = result.get("updatedCells", 0)
@@ -313,7 +308,7 @@ async def modify_sheet_values(
 
 
 @server.tool()
-@handle_http_errors("format_sheet_range", service_type="sheets")
+@handle_http_errors("format_sheet_range", service_type="sheets", idempotent=True)
 @require_google_service("sheets", "sheets_write")
 async def format_sheet_range(
     service,
@@ -382,13 +377,11 @@ async def format_sheet_range(
         if number_format_pattern:
             number_format["pattern"] = number_format_pattern
 
-    metadata = await asyncio.to_thread(
-        service.spreadsheets()
-        .get(
+    metadata = await execute_async(
+        service.spreadsheets().get(
             spreadsheetId=spreadsheet_id,
             fields="sheets(properties(sheetId,title))",
         )
-        .execute
     )
     sheets = metadata.get("sheets", [])
     grid_range = _parse_a1_range(range_name, sheets)
@@ -422,10 +415,10 @@ async def format_sheet_range(
         ]
     }
 
-    await asyncio.to_thread(
-        service.spreadsheets()
-        .batchUpdate(spreadsheetId=spreadsheet_id, body=request_body)
-        .execute
+    await execute_async(
+        service.spreadsheets().batchUpdate(
+            spreadsheetId=spreadsheet_id, body=request_body
+        )
     )
 
     applied_parts = []
@@ -548,10 +541,10 @@ async def add_conditional_formatting(
 
     request_body = {"requests": [{"addConditionalFormatRule": add_rule_request}]}
 
-    await asyncio.to_thread(
-        service.spreadsheets()
-        .batchUpdate(spreadsheetId=spreadsheet_id, body=request_body)
-        .execute
+    await execute_async(
+        service.spreadsheets().batchUpdate(
+            spreadsheetId=spreadsheet_id, body=request_body
+        )
     )
 
     format_desc = ", ".join(applied_parts) if applied_parts else "format applied"
@@ -752,10 +745,10 @@ async def update_conditional_formatting(
         ]
     }
 
-    await asyncio.to_thread(
-        service.spreadsheets()
-        .batchUpdate(spreadsheetId=spreadsheet_id, body=request_body)
-        .execute
+    await execute_async(
+        service.spreadsheets().batchUpdate(
+            spreadsheetId=spreadsheet_id, body=request_body
+        )
     )
 
     state_text = _format_conditional_rules_section(
@@ -830,10 +823,10 @@ async def delete_conditional_formatting(
         ]
     }
 
-    await asyncio.to_thread(
-        service.spreadsheets()
-        .batchUpdate(spreadsheetId=spreadsheet_id, body=request_body)
-        .execute
+    await execute_async(
+        service.spreadsheets().batchUpdate(
+            spreadsheetId=spreadsheet_id, body=request_body
+        )
     )
 
     state_text = _format_conditional_rules_section(
@@ -879,13 +872,11 @@ async def create_spreadsheet(
             {"properties": {"title": sheet_name}} for sheet_name in sheet_names
         ]
 
-    spreadsheet = await asyncio.to_thread(
-        service.spreadsheets()
-        .create(
+    spreadsheet = await execute_async(
+        service.spreadsheets().create(
             body=spreadsheet_body,
             fields="spreadsheetId,spreadsheetUrl,properties(title,locale)",
         )
-        .execute
     )
 
     properties = spreadsheet.get("properties", {})
@@ -930,10 +921,10 @@ async def create_sheet(
 
     request_body = {"requests": [{"addSheet": {"properties": {"title": sheet_name}}}]}
 
-    response = await asyncio.to_thread(
-        service.spreadsheets()
-        .batchUpdate(spreadsheetId=spreadsheet_id, body=request_body)
-        .execute
+    response = await execute_async(
+        service.spreadsheets().batchUpdate(
+            spreadsheetId=spreadsheet_id, body=request_body
+        )
     )
 
     sheet_id = response["replies"][0]["addSheet"]["properties"]["sheetId"]
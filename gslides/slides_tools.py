@@ -5,11 +5,11 @@ This module provides MCP tools for interacting with Google Slides API.
 """
 
 import logging
-import asyncio
 from typing import List, Dict, Any
 
 
 from auth.service_decorator import require_google_service
+from core.api_executor import execute_async
 from core.server import server
 from core.utils import handle_http_errors
 # Comment tools are now unified in core/comments.py (read_comments, create_comment, etc.)
@@ -39,7 +39,7 @@ async def create_presentation(
 
     body = {"title": title}
 
-    result = await asyncio.to_thread(service.presentations().create(body=body).execute)
+    result = await execute_async(service.presentations().create(body=body))
 
     presentation_id = result.get("presentationId")
     presentation_url = f"https://docs.google.com/presentation/d/{presentation_id}/edit"
@@ -74,8 +74,8 @@ async def get_presentation(
         f"[get_presentation] Invoked. Email: '{user_google_email}', ID: '{presentation_id}'"
     )
 
-    result = await asyncio.to_thread(
-        service.presentations().get(presentationId=presentation_id).execute
+    result = await execute_async(
+        service.presentations().get(presentationId=presentation_id)
     )
 
     title = result.get("title", "Untitled")
@@ -173,10 +173,8 @@ async def batch_update_presentation(
 
     body = {"requests": requests}
 
-    result = await asyncio.to_thread(
-        service.presentations()
-        .batchUpdate(presentationId=presentation_id, body=body)
-        .execute
+    result = await execute_async(
+        service.presentations().batchUpdate(presentationId=presentation_id, body=body)
     )
 
     replies = result.get("replies", [])
@@ -228,11 +226,10 @@ async def get_page(
         f"[get_page] Invoked. Email: '{user_google_email}', Presentation: '{presentation_id}', Page: '{page_object_id}'"
     )
 
-    result = await asyncio.to_thread(
+    result = await execute_async(
         service.presentations()
         .pages()
         .get(presentationId=presentation_id, pageObjectId=page_object_id)
-        .execute
     )
 
     page_type = result.get("pageType", "Unknown")
@@ -294,7 +291,7 @@ async def get_page_thumbnail(
         f"[get_page_thumbnail] Invoked. Email: '{user_google_email}', Presentation: '{presentation_id}', Page: '{page_object_id}', Size: '{thumbnail_size}'"
     )
 
-    result = await asyncio.to_thread(
+    result = await execute_async(
         service.presentations()
         .pages()
         .getThumbnail(
@@ -303,7 +300,6 @@ async def get_page_thumbnail(
             thumbnailProperties_thumbnailSize=thumbnail_size,
             thumbnailProperties_mimeType="PNG",
         )
-        .execute
     )
 
     thumbnail_url = result.get("contentUrl", "")
@@ -302,6 +302,20 @@ def main():
         exit_code = asyncio.run(handle_cli_mode(server, args.cli))
         sys.exit(exit_code)
 
+    # Parse pinned discovery documents up front so no tool call pays for discovery I/O
+    from core.discovery import (
+        get_stale_discovery_documents,
+        preload_discovery_documents,
+    )
+
+    loaded_documents = preload_discovery_documents()
+    logger.info(f"Preloaded {loaded_documents} pinned Google API discovery documents")
+    for stale_document in get_stale_discovery_documents():
+        logger.warning(
+            f"Pinned discovery document {stale_document['service']} {stale_document['version']} "
+            f"is {stale_document['age_days']} days old (revision {stale_document['revision']})"
+        )
+
     safe_print("📊 Configuration Summary:")
     safe_print(f"   🔧 Services Loaded: {len(tools_to_import)}/{len(tool_imports)}")
     if args.tool_tier is not None:
@@ -386,6 +400,12 @@ def main():
                     warning_msg += f": {error_msg}"
                 safe_print(warning_msg)
 
+            # HTTP deployments start this in configure_server_for_http()
+            from auth.google_auth import start_background_token_refresh
+
+            if start_background_token_refresh():
+                safe_print("🔄 Background token refresh enabled")
+
         safe_print("✅ Ready for MCP connections")
         safe_print("")
 
@@ -0,0 +1,205 @@
+"""
+Unit tests for credential store backends.
+"""
+
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from cryptography.fernet import Fernet
+from google.oauth2.credentials import Credentials
+
+from auth.credential_store import LocalDirectoryCredentialStore, SqliteCredentialStore
+
+
+def _credentials(token="tok", refresh_token="rt"):
+    return Credentials(
+        token=token,
+        refresh_token=refresh_token,
+        token_uri="https://oauth2.googleapis.com/token",
+        client_id="client",
+        client_secret="secret",
+        scopes=["https://www.googleapis.com/auth/gmail.readonly"],
+        expiry=datetime(2030, 1, 1, 12, 0, 0),
+    )
+
+
+def _age(path, seconds=10):
+    """Backdate a file so it falls outside the racy-write window."""
+    past = time.time() - seconds
+    os.utime(path, (past, past))
+
+
+class TestLocalDirectoryCredentialStoreCache:
+    def test_warm_lookup_skips_file_read(self, tmp_path, monkeypatch):
+        store = LocalDirectoryCredentialStore(str(tmp_path))
+        store.store_credential("a@example.com", _credentials())
+        _age(tmp_path / "a@example.com.json")
+
+        first = store.get_credential("a@example.com")
+
+        def fail_open(*args, **kwargs):
+            raise AssertionError("credential file should not be re-read")
+
+        monkeypatch.setattr("builtins.open", fail_open)
+        second = store.get_credential("a@example.com")
+
+        assert second is not first
+        assert second.token == "tok"
+        assert second.expiry == datetime(2030, 1, 1, 12, 0, 0)
+        assert store.get_cache_stats()["hits"] == 1
+
+    def test_external_rewrite_is_detected(self, tmp_path):
+        store = LocalDirectoryCredentialStore(str(tmp_path))
+        store.store_credential("a@example.com", _credentials(token="old"))
+        path = tmp_path / "a@example.com.json"
+        _age(path, 20)
+        assert store.get_credential("a@example.com").token == "old"
+
+        data = json.loads(path.read_text())
+        data["token"] = "rewritten-by-another-process"
+        path.write_text(json.dumps(data))
+        _age(path, 5)
+
+        assert (
+            store.get_credential("a@example.com").token
+            == "rewritten-by-another-process"
+        )
+
+    def test_deleted_file_is_not_served_from_cache(self, tmp_path):
+        store = LocalDirectoryCredentialStore(str(tmp_path))
+        store.store_credential("a@example.com", _credentials())
+        _age(tmp_path / "a@example.com.json")
+        store.get_credential("a@example.com")
+
+        os.remove(tmp_path / "a@example.com.json")
+
+        assert store.get_credential("a@example.com") is None
+
+    def test_user_index_tracks_directory_changes(self, tmp_path):
+        store = LocalDirectoryCredentialStore(str(tmp_path))
+        store.store_credential("b@example.com", _credentials())
+        store.store_credential("a@example.com", _credentials())
+        _age(tmp_path, 30)
+
+        assert store.list_users() == ["a@example.com", "b@example.com"]
+        assert store.get_cache_stats()["user_index_cached"]
+
+        store.delete_credential("b@example.com")
+        os.utime(tmp_path, (time.time() - 10, time.time() - 10))
+
+        assert store.list_users() == ["a@example.com"]
+
+    def test_refreshed_expiry_round_trips(self, tmp_path):
+        store = LocalDirectoryCredentialStore(str(tmp_path))
+        credentials = _credentials()
+        credentials.expiry = datetime(2031, 6, 1) + timedelta(minutes=5)
+        store.store_credential("a@example.com", credentials)
+
+        assert store.get_credential("a@example.com").expiry == credentials.expiry
+
+
+class TestSqliteCredentialStore:
+    def _store(self, tmp_path, **kwargs):
+        return SqliteCredentialStore(
+            str(tmp_path / "creds.sqlite3"), Fernet.generate_key(), **kwargs
+        )
+
+    def test_round_trip_and_encryption_at_rest(self, tmp_path):
+        store = self._store(tmp_path, batch_window_ms=0)
+        store.store_credential("a@example.com", _credentials(token="secret-token"))
+
+        loaded = store.get_credential("a@example.com")
+        assert loaded.token == "secret-token"
+        assert loaded.expiry == datetime(2030, 1, 1, 12, 0, 0)
+        assert store.list_users() == ["a@example.com"]
+        store.close()
+        assert b"secret-token" not in (tmp_path / "creds.sqlite3").read_bytes()
+
+    def test_batched_writes_are_read_your_writes(self, tmp_path):
+        store = self._store(tmp_path, batch_window_ms=60_000)
+        for i in range(5):
+            store.store_credential(f"u{i}@example.com", _credentials(token=f"t{i}"))
+        store.delete_credential("u0@example.com")
+
+        assert store.get_credential("u3@example.com").token == "t3"
+        assert store.get_credential("u0@example.com") is None
+        assert store.get_stats()["pending_writes"] == 5
+
+        assert store.flush()
+        stats = store.get_stats()
+        assert stats["batches"] == 1
+        assert stats["pending_writes"] == 0
+        assert store.list_users() == [f"u{i}@example.com" for i in range(1, 5)]
+        store.close()
+
+    def test_close_does_not_wait_out_the_batch_window(self, tmp_path):
+        store = self._store(tmp_path, batch_window_ms=60_000)
+        store.store_credential("a@example.com", _credentials())
+        time.sleep(0.05)
+
+        started = time.monotonic()
+        store.close()
+
+        assert time.monotonic() - started < 5
+        reopened = self._store(tmp_path)
+        assert reopened.list_users() == ["a@example.com"]
+        reopened.close()
+
+    def test_expiry_index_lookup(self, tmp_path):
+        store = self._store(tmp_path)
+        soon = _credentials()
+        soon.expiry = datetime.utcnow() + timedelta(minutes=1)
+        store.store_credential("soon@example.com", soon)
+        store.store_credential("later@example.com", _credentials())
+
+        deadline = datetime.utcnow() + timedelta(hours=1)
+        assert store.list_users_expiring_before(deadline) == ["soon@example.com"]
+        store.close()
+
+    def test_migration_from_directory_store_runs_once(self, tmp_path):
+        source = LocalDirectoryCredentialStore(str(tmp_path / "dir"))
+        source.store_credential("a@example.com", _credentials(token="old"))
+        source.store_credential("b@example.com", _credentials())
+        store = self._store(tmp_path, batch_window_ms=0)
+        store.store_credential("a@example.com", _credentials(token="new"))
+
+        assert store.migrate_from_directory_store(source) == 1
+        assert store.get_credential("a@example.com").token == "new"
+        assert store.list_users() == ["a@example.com", "b@example.com"]
+
+        source.store_credential("c@example.com", _credentials())
+        assert store.migrate_from_directory_store(source) == 0
+        assert store.get_credential("c@example.com") is None
+        store.close()
+
+    def test_failed_background_commits_back_off(self, tmp_path, monkeypatch):
+        store = self._store(tmp_path, batch_window_ms=1)
+        attempts = []
+
+        def failing_flush():
+            attempts.append(time.monotonic())
+            return False
+
+        monkeypatch.setattr(store, "flush", failing_flush)
+        store.store_credential("a@example.com", _credentials())
+        time.sleep(0.5)
+        background_attempts = list(attempts)
+        store.close()
+
+        # Retries wait 0.1s, 0.2s, ... instead of spinning every batch window
+        assert 3 <= len(background_attempts) <= 4
+        assert background_attempts[2] - background_attempts[1] >= 0.15
+
+    def test_migration_is_skipped_once_closed(self, tmp_path):
+        source = LocalDirectoryCredentialStore(str(tmp_path / "dir"))
+        source.store_credential("a@example.com", _credentials())
+        store = self._store(tmp_path, batch_window_ms=0)
+        store.close()
+
+        assert store.migrate_from_directory_store(source) == 0
+        assert store.get_stats()["pending_writes"] == 0
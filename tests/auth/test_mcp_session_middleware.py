@@ -0,0 +1,126 @@
+"""
+Unit tests for the pure ASGI MCP session middleware.
+"""
+
+import asyncio
+import os
+import sys
+
+import httpx
+import jwt
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from auth import mcp_session_middleware
+from auth.mcp_session_middleware import BearerEmailCache, MCPSessionMiddleware
+from auth.oauth21_session_store import OAuth21SessionStore, get_session_context
+
+
+async def _context_endpoint(request):
+    context = get_session_context()
+    body = await request.body()
+    return JSONResponse(
+        {
+            "session_id": context.session_id if context else None,
+            "user_id": context.user_id if context else None,
+            "body": body.decode(),
+        }
+    )
+
+
+async def _stream_endpoint(request):
+    async def chunks():
+        for i in range(3):
+            yield f"event {i}\n"
+
+    return StreamingResponse(chunks(), media_type="text/event-stream")
+
+
+def _client(middleware):
+    app = Starlette(
+        routes=[
+            Route("/mcp", _context_endpoint, methods=["POST"]),
+            Route("/mcp/stream", _stream_endpoint),
+            Route("/health", _context_endpoint, methods=["POST"]),
+        ]
+    )
+    app.add_middleware(middleware)
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test"
+    )
+
+
+def _request(path, headers=None, content=""):
+    async def send():
+        async with _client(MCPSessionMiddleware) as client:
+            return await client.post(path, headers=headers or {}, content=content)
+
+    return asyncio.run(send()).json()
+
+
+class TestMCPSessionMiddleware:
+    def test_session_header_sets_context_and_body_passes_through(self):
+        result = _request(
+            "/mcp", {"Mcp-Session-Id": "abc"}, content='{"jsonrpc": "2.0"}'
+        )
+
+        assert result == {
+            "session_id": "abc",
+            "user_id": None,
+            "body": '{"jsonrpc": "2.0"}',
+        }
+
+    def test_bearer_jwt_email_is_used(self):
+        token = jwt.encode({"email": "a@example.com"}, "s" * 32, algorithm="HS256")
+
+        result = _request("/mcp", {"Authorization": f"Bearer {token}"})
+
+        assert result["user_id"] == "a@example.com"
+        assert result["session_id"].startswith("bearer_token_")
+
+    def test_bearer_token_resolves_stored_session(self, monkeypatch):
+        store = OAuth21SessionStore()
+        store.store_session("a@example.com", "ya29.token", session_id="google_a")
+        monkeypatch.setattr(
+            mcp_session_middleware, "get_oauth21_session_store", lambda: store
+        )
+
+        result = _request("/mcp", {"Authorization": "Bearer ya29.token"})
+
+        assert result["session_id"] == "google_a"
+
+    def test_non_mcp_paths_get_no_context(self):
+        assert _request("/health", {"Mcp-Session-Id": "abc"})["session_id"] is None
+
+    def test_streaming_responses_pass_through(self):
+        async def stream():
+            async with _client(MCPSessionMiddleware) as client:
+                async with client.stream("GET", "/mcp/stream") as response:
+                    return [line async for line in response.aiter_lines()]
+
+        assert asyncio.run(stream()) == ["event 0", "event 1", "event 2"]
+
+
+class TestBearerEmailCache:
+    def test_token_is_decoded_once(self, monkeypatch):
+        decoded = []
+        original = mcp_session_middleware._decode_email_claim
+
+        def decode(token):
+            decoded.append(token)
+            return original(token)
+
+        monkeypatch.setattr(mcp_session_middleware, "_decode_email_claim", decode)
+        cache = BearerEmailCache()
+        token = jwt.encode({"email": "a@example.com"}, "s" * 32, algorithm="HS256")
+
+        assert cache.get_email(token) == "a@example.com"
+        assert cache.get_email(token) == "a@example.com"
+        assert cache.get_email("ya29.opaque") is None
+        assert cache.get_email("ya29.opaque") is None
+        assert len(decoded) == 2
+        assert cache.get_stats()["hits"] == 2
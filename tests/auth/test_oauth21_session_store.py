@@ -0,0 +1,274 @@
+"""
+Unit tests for the OAuth 2.1 session store and its access-token credential cache.
+"""
+
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from fastmcp.server.auth import AccessToken
+
+from auth import oauth21_session_store
+from auth.oauth21_session_store import (
+    AccessTokenCredentialCache,
+    OAuth21SessionStore,
+    ensure_session_from_access_token,
+    extract_session_from_headers,
+    set_access_token_credential_cache,
+)
+
+
+def _access_token(token="ya29.token", lifetime=3600):
+    return AccessToken(
+        token=token,
+        client_id="client",
+        scopes=["https://www.googleapis.com/auth/gmail.readonly"],
+        expires_at=int(time.time() + lifetime),
+    )
+
+
+@pytest.fixture
+def store(monkeypatch):
+    store = OAuth21SessionStore()
+    writes = []
+    original = store.store_session
+
+    def store_session(**kwargs):
+        writes.append(kwargs["access_token"])
+        return original(**kwargs)
+
+    monkeypatch.setattr(store, "store_session", store_session)
+    monkeypatch.setattr(oauth21_session_store, "_global_store", store)
+    store.writes = writes
+    set_access_token_credential_cache(AccessTokenCredentialCache())
+    yield store
+    set_access_token_credential_cache(None)
+
+
+class TestAccessTokenCredentialCache:
+    def test_repeated_token_skips_rebuild_and_store_write(self, store):
+        first = ensure_session_from_access_token(_access_token(), "a@example.com", "s1")
+        second = ensure_session_from_access_token(
+            _access_token(), "a@example.com", "s1"
+        )
+
+        assert second is first
+        assert store.writes == ["ya29.token"]
+        assert store.get_credentials("a@example.com").token == "ya29.token"
+
+    def test_new_token_or_session_takes_write_path(self, store):
+        ensure_session_from_access_token(_access_token(), "a@example.com", "s1")
+        ensure_session_from_access_token(_access_token(), "a@example.com", "s2")
+        rotated = ensure_session_from_access_token(
+            _access_token("ya29.rotated"), "a@example.com", "s2"
+        )
+
+        assert rotated.token == "ya29.rotated"
+        assert store.writes == ["ya29.token", "ya29.token", "ya29.rotated"]
+
+    def test_entries_never_outlive_the_token(self, store):
+        ensure_session_from_access_token(
+            _access_token(lifetime=10), "a@example.com", "s1"
+        )
+        ensure_session_from_access_token(
+            _access_token(lifetime=10), "a@example.com", "s1"
+        )
+
+        assert len(store.writes) == 2
+
+    def test_removing_session_invalidates_cached_credentials(self, store):
+        ensure_session_from_access_token(_access_token(), "a@example.com", "s1")
+        store.remove_session("a@example.com")
+        ensure_session_from_access_token(_access_token(), "a@example.com", "s1")
+
+        assert len(store.writes) == 2
+        assert store.has_session("a@example.com")
+
+
+class TestOAuth21SessionStore:
+    def test_session_binding_is_first_wins(self):
+        store = OAuth21SessionStore()
+        store.store_session("a@example.com", "t1", mcp_session_id="mcp-1")
+
+        with pytest.raises(ValueError):
+            store.store_session("b@example.com", "t2", mcp_session_id="mcp-1")
+
+        assert not store.has_session("b@example.com")
+        assert store.get_user_by_mcp_session("mcp-1") == "a@example.com"
+        assert store.get_credentials_with_validation("b@example.com", "mcp-1") is None
+
+    def test_remove_session_drops_every_indexed_session_id(self):
+        store = OAuth21SessionStore()
+        store.store_session(
+            "a@example.com", "t1", session_id="google_a", mcp_session_id="mcp-1"
+        )
+        store.store_session("a@example.com", "t2", mcp_session_id="mcp-2")
+        store.store_session("b@example.com", "t3", mcp_session_id="mcp-3")
+
+        store.remove_session("a@example.com")
+
+        assert store.get_user_by_mcp_session("mcp-1") is None
+        assert store.get_user_by_mcp_session("mcp-2") is None
+        assert store.get_user_by_mcp_session("mcp-3") == "b@example.com"
+        # The freed session IDs can be bound again
+        store.store_session("c@example.com", "t4", mcp_session_id="mcp-1")
+        assert store.get_user_by_mcp_session("mcp-1") == "c@example.com"
+
+    def test_update_session_tokens_replaces_record(self):
+        store = OAuth21SessionStore()
+        store.store_session("a@example.com", "t1", mcp_session_id="mcp-1")
+        before = store.get_session_info("a@example.com")
+
+        assert store.update_session_tokens("a@example.com", "t2")
+        assert before["access_token"] == "t1"
+        assert store.get_credentials("a@example.com").token == "t2"
+        assert store.get_user_by_mcp_session("mcp-1") == "a@example.com"
+
+    def test_access_token_index_is_keyed_by_token_hash(self):
+        store = OAuth21SessionStore()
+        store.store_session("a@example.com", "ya29.raw", mcp_session_id="mcp-1")
+
+        assert store.get_user_by_access_token("ya29.raw") == "a@example.com"
+        assert "ya29.raw" not in store._access_token_users
+
+        store.update_session_tokens("a@example.com", "ya29.new")
+        assert store.get_user_by_access_token("ya29.raw") is None
+        assert store.get_user_by_access_token("ya29.new") == "a@example.com"
+
+    def test_bearer_header_resolves_to_the_stored_session_id(self, monkeypatch):
+        store = OAuth21SessionStore()
+        monkeypatch.setattr(oauth21_session_store, "_global_store", store)
+        store.store_session("a@example.com", "ya29.raw", session_id="google-s1")
+        store._last_access.pop("a@example.com")
+
+        headers = {"authorization": "Bearer ya29.raw"}
+        assert extract_session_from_headers(headers) == "google-s1"
+        # Resolved through get_session_info(), which marks the session used
+        assert "a@example.com" in store._last_access
+        assert extract_session_from_headers(
+            {"authorization": "Bearer ya29.other"}
+        ).startswith("bearer_token_")
+
+    def test_expired_oauth_states_are_purged(self):
+        store = OAuth21SessionStore(lock_stripes=1)
+        store.store_oauth_state("expired", expires_in_seconds=0)
+        store.store_oauth_state("live", session_id="s1")
+
+        with pytest.raises(ValueError):
+            store.validate_and_consume_oauth_state("expired")
+        assert store.get_stats()["pending_oauth_states"] == 1
+        assert (
+            store.validate_and_consume_oauth_state("live", "s1")["session_id"] == "s1"
+        )
+        with pytest.raises(ValueError):
+            store.validate_and_consume_oauth_state("live", "s1")
+
+    def test_concurrent_binders_for_one_session_id_have_one_winner(self):
+        store = OAuth21SessionStore()
+        errors = []
+        barrier = threading.Barrier(8)
+
+        def bind(i):
+            barrier.wait()
+            try:
+                store.store_session(f"u{i}@example.com", "t", mcp_session_id="shared")
+            except ValueError:
+                errors.append(i)
+
+        threads = [threading.Thread(target=bind, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(errors) == 7
+        winner = store.get_user_by_mcp_session("shared")
+        assert store.list_users() == [winner]
+
+
+class TestSessionEviction:
+    def test_idle_sessions_are_evicted_and_rehydrated(self):
+        from google.oauth2.credentials import Credentials
+
+        loaded = []
+
+        def loader(user_email):
+            loaded.append(user_email)
+            return Credentials(token="stored", refresh_token="r", client_id="c")
+
+        store = OAuth21SessionStore(idle_ttl_seconds=60, credential_loader=loader)
+        store.store_session("idle@example.com", "t1", mcp_session_id="mcp-1")
+        store.store_session("busy@example.com", "t2")
+        store._last_access["idle@example.com"] -= 120
+
+        assert store.sweep() == {"idle": 1, "capacity": 0}
+        assert store.list_users() == ["busy@example.com"]
+        assert store.get_user_by_access_token("t1") is None
+
+        assert store.get_credentials("idle@example.com").token == "stored"
+        assert loaded == ["idle@example.com"]
+        assert store.get_stats()["eviction"]["rehydrations"] == 1
+
+    def test_evicted_users_keep_their_session_bindings(self):
+        from google.oauth2.credentials import Credentials
+
+        store = OAuth21SessionStore(
+            max_sessions=0,
+            credential_loader=lambda _: Credentials(token="stored", refresh_token="r"),
+        )
+        store.store_session(
+            "a@example.com", "t1", session_id="google-s1", mcp_session_id="mcp-1"
+        )
+        assert store.sweep() == {"idle": 0, "capacity": 1}
+
+        # Nobody else can claim the evicted user's sessions
+        with pytest.raises(ValueError):
+            store.store_session("b@example.com", "t2", mcp_session_id="mcp-1")
+        assert store.get_credentials_with_validation("b@example.com", "mcp-1") is None
+
+        # The bound MCP session still reaches the user, rehydrated under its IDs
+        credentials = store.get_credentials_with_validation("a@example.com", "mcp-1")
+        assert credentials.token == "stored"
+        assert store.get_user_by_mcp_session("mcp-1") == "a@example.com"
+        session_info = store.get_session_info("a@example.com")
+        assert session_info["session_id"] == "google-s1"
+        assert session_info["mcp_session_id"] == "mcp-1"
+
+        # Only an explicit removal releases the bindings
+        store.remove_session("a@example.com")
+        store.store_session("b@example.com", "t2", mcp_session_id="mcp-1")
+        assert store.get_user_by_mcp_session("mcp-1") == "b@example.com"
+
+    def test_capacity_evicts_least_recently_used(self):
+        store = OAuth21SessionStore(max_sessions=2, credential_loader=lambda _: None)
+        for name in ("a", "b", "c"):
+            store.store_session(f"{name}@example.com", "t")
+        store.get_credentials("a@example.com")
+
+        assert store.sweep() == {"idle": 0, "capacity": 1}
+        assert sorted(store.list_users()) == ["a@example.com", "c@example.com"]
+        assert store.get_stats()["eviction"]["capacity_evictions"] == 1
+
+    def test_removed_users_are_not_rehydrated(self):
+        loaded = []
+        store = OAuth21SessionStore(
+            max_sessions=0, credential_loader=lambda u: loaded.append(u)
+        )
+        store.store_session("a@example.com", "t")
+        store.sweep()
+        store.remove_session("a@example.com")
+
+        assert store.get_credentials("a@example.com") is None
+        assert loaded == []
+
+    def test_stats_report_memory(self):
+        store = OAuth21SessionStore()
+        empty = store.get_stats()["approx_memory_bytes"]
+        store.store_session("a@example.com", "t", mcp_session_id="mcp-1")
+
+        assert store.get_stats()["approx_memory_bytes"] > empty
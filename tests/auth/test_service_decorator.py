@@ -0,0 +1,110 @@
+"""
+Unit tests for the compiled call plans of the Google service decorators.
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from auth import service_decorator
+from auth.scopes import DOCS_READONLY_SCOPE, GMAIL_READONLY_SCOPE, SHEETS_READONLY_SCOPE
+from auth.service_decorator import require_google_service, require_multiple_services
+
+
+@pytest.fixture
+def fake_auth(monkeypatch):
+    """Stub out authentication, recording what each service was built with."""
+    calls = []
+
+    async def authenticate(
+        use_oauth21,
+        service_name,
+        service_version,
+        tool_name,
+        user_google_email,
+        resolved_scopes,
+        mcp_session_id,
+        authenticated_user,
+    ):
+        calls.append(
+            (service_name, service_version, user_google_email, resolved_scopes)
+        )
+        return f"{service_name}-service", user_google_email
+
+    monkeypatch.setattr(
+        service_decorator, "_get_auth_context", lambda tool_name: (None, None, None)
+    )
+    monkeypatch.setattr(service_decorator, "_authenticate_service", authenticate)
+    monkeypatch.setattr(service_decorator, "release_service", lambda service: None)
+    monkeypatch.setattr(service_decorator, "is_oauth21_enabled", lambda: False)
+    return calls
+
+
+class TestToolCallPlan:
+    def test_plan_resolves_service_and_scopes_once(self, fake_auth):
+        @require_google_service("gmail", "gmail_read")
+        async def tool(service, user_google_email: str, query: str):
+            return service, query
+
+        plan = tool._tool_call_plan
+        assert plan.tool_name == "tool"
+        assert plan.user_email_index == 0
+        assert plan.services[0].service_name == "gmail"
+        assert plan.services[0].service_version == "v1"
+        assert tool._required_google_scopes == [GMAIL_READONLY_SCOPE]
+
+    def test_user_email_found_positionally_and_by_keyword(self, fake_auth):
+        @require_google_service("gmail", "gmail_read", version="v2")
+        async def tool(service, query: str, user_google_email: str = "d@example.com"):
+            return service, query
+
+        assert asyncio.run(tool("q", "p@example.com")) == ("gmail-service", "q")
+        asyncio.run(tool(query="q", user_google_email="k@example.com"))
+        asyncio.run(tool("q"))
+        assert [call[2] for call in fake_auth] == [
+            "p@example.com",
+            "k@example.com",
+            "d@example.com",
+        ]
+        assert fake_auth[0][1] == "v2"
+
+    def test_missing_user_email_raises(self, fake_auth):
+        @require_google_service("gmail", "gmail_read")
+        async def tool(service, user_google_email: str = ""):
+            return service
+
+        with pytest.raises(Exception, match="user_google_email"):
+            asyncio.run(tool())
+        assert fake_auth == []
+
+    def test_unknown_service_type_fails_at_decoration(self):
+        with pytest.raises(ValueError, match="Unknown service type"):
+
+            @require_google_service("nonexistent", "gmail_read")
+            async def tool(service, user_google_email: str):
+                return service
+
+    def test_multiple_services_injected(self, fake_auth):
+        @require_multiple_services(
+            [
+                {"service_type": "docs", "scopes": "docs_read", "param_name": "docs"},
+                {
+                    "service_type": "sheets",
+                    "scopes": "sheets_read",
+                    "param_name": "sheets",
+                },
+            ]
+        )
+        async def tool(docs, sheets, user_google_email: str, doc_id: str):
+            return docs, sheets, doc_id
+
+        result = asyncio.run(tool(user_google_email="u@example.com", doc_id="d"))
+        assert result == ("docs-service", "sheets-service", "d")
+        assert tool._required_google_scopes == [
+            DOCS_READONLY_SCOPE,
+            SHEETS_READONLY_SCOPE,
+        ]
@@ -0,0 +1,126 @@
+"""
+Unit tests for the Google API service pool.
+"""
+
+import pytest
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from google.oauth2.credentials import Credentials
+
+from auth.service_pool import GoogleServicePool
+
+
+class _FakeHttp:
+    def __init__(self, credentials):
+        self.credentials = credentials
+
+
+class _FakeService:
+    def __init__(self, credentials):
+        self._http = _FakeHttp(credentials)
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class _FakePool(GoogleServicePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.builds = 0
+
+    def _build(self, service_name, version, credentials):
+        self.builds += 1
+        return _FakeService(credentials)
+
+
+def _creds(token="tok", refresh_token="refresh"):
+    return Credentials(
+        token=token,
+        refresh_token=refresh_token,
+        client_id="client",
+        client_secret="secret",
+        token_uri="https://oauth2.googleapis.com/token",
+    )
+
+
+class TestGoogleServicePool:
+    def test_reuses_released_service(self):
+        pool = _FakePool(max_size=4)
+        first = pool.acquire("a@example.com", "gmail", "v1", _creds())
+        pool.release(first)
+        second = pool.acquire("a@example.com", "gmail", "v1", _creds())
+
+        assert second is first
+        assert pool.builds == 1
+        stats = pool.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    def test_concurrent_leases_get_distinct_services(self):
+        pool = _FakePool(max_size=4)
+        first = pool.acquire("a@example.com", "gmail", "v1", _creds())
+        second = pool.acquire("a@example.com", "gmail", "v1", _creds())
+
+        assert first is not second
+        assert pool.get_stats()["leased"] == 2
+
+    def test_refreshed_credentials_swapped_without_rebuild(self):
+        pool = _FakePool(max_size=4)
+        service = pool.acquire("a@example.com", "gmail", "v1", _creds(token="old"))
+        pool.release(service)
+
+        refreshed = _creds(token="new")
+        reused = pool.acquire("a@example.com", "gmail", "v1", refreshed)
+
+        assert reused is service
+        assert reused._http.credentials is refreshed
+        assert pool.get_stats()["credential_swaps"] == 1
+
+    def test_different_grant_is_separate_entry(self):
+        pool = _FakePool(max_size=4)
+        service = pool.acquire("a@example.com", "gmail", "v1", _creds())
+        pool.release(service)
+        other = pool.acquire(
+            "a@example.com", "gmail", "v1", _creds(refresh_token="other")
+        )
+
+        assert other is not service
+        assert pool.builds == 2
+
+    def test_lru_eviction_closes_oldest(self):
+        pool = _FakePool(max_size=1)
+        first = pool.acquire("a@example.com", "gmail", "v1", _creds())
+        second = pool.acquire("b@example.com", "gmail", "v1", _creds())
+        pool.release(first)
+        pool.release(second)
+
+        assert first.closed
+        assert not second.closed
+        assert pool.get_stats()["evictions"] == 1
+
+    def test_idle_ttl_expires_entries(self, monkeypatch):
+        pool = _FakePool(max_size=4, idle_ttl_seconds=10)
+        now = [1000.0]
+        monkeypatch.setattr("auth.service_pool.time.monotonic", lambda: now[0])
+
+        service = pool.acquire("a@example.com", "gmail", "v1", _creds())
+        pool.release(service)
+        now[0] += 11
+        fresh = pool.acquire("a@example.com", "gmail", "v1", _creds())
+
+        assert fresh is not service
+        assert service.closed
+        assert pool.get_stats()["expirations"] == 1
+
+    @pytest.mark.parametrize("max_size", [0])
+    def test_disabled_pool_builds_and_closes(self, max_size):
+        pool = _FakePool(max_size=max_size)
+        service = pool.acquire("a@example.com", "gmail", "v1", _creds())
+        pool.release(service)
+
+        assert service.closed
+        assert pool.builds == 1
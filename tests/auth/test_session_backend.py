@@ -0,0 +1,230 @@
+"""
+Unit tests for sharing OAuth21SessionStore state through a Valkey session backend.
+
+FakeValkey implements the handful of commands the backend uses, in memory, so
+several store instances can stand in for replicas sharing one Valkey server.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from cryptography.fernet import Fernet
+
+from auth import oauth21_session_store
+from auth.oauth21_session_store import OAuth21SessionStore, run_session_store_call
+from auth.session_backend import ValkeySessionBackend
+
+
+class FakeValkey:
+    """In-memory stand-in for a synchronous Valkey client (bytes responses)."""
+
+    def __init__(self):
+        self.data = {}
+        self.expiry = {}
+        self.fail = False
+
+    def _check(self, key):
+        if self.fail:
+            raise ConnectionError("valkey unavailable")
+        if key in self.expiry and self.expiry[key] <= time.monotonic():
+            self.data.pop(key, None)
+            self.expiry.pop(key, None)
+
+    def get(self, key):
+        self._check(key)
+        value = self.data.get(key)
+        return value.encode() if isinstance(value, str) else value
+
+    def set(self, key, value, ex=None, nx=False):
+        self._check(key)
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        if ex is not None:
+            self.expiry[key] = time.monotonic() + ex
+        return True
+
+    def getdel(self, key):
+        value = self.get(key)
+        self.data.pop(key, None)
+        return value
+
+    def delete(self, *keys):
+        for key in keys:
+            self._check(key)
+            self.data.pop(key, None)
+
+    def sadd(self, key, *members):
+        self._check(key)
+        self.data.setdefault(key, set()).update(members)
+
+    def srem(self, key, *members):
+        self._check(key)
+        self.data.get(key, set()).difference_update(members)
+
+    def smembers(self, key):
+        self._check(key)
+        return {member.encode() for member in self.data.get(key, set())}
+
+
+@pytest.fixture
+def valkey():
+    return FakeValkey()
+
+
+def _replica(valkey, near_cache_ttl_seconds=5.0):
+    backend = ValkeySessionBackend(valkey, encryption_key=Fernet.generate_key())
+    return OAuth21SessionStore(
+        backend=backend,
+        near_cache_ttl_seconds=near_cache_ttl_seconds,
+        credential_loader=lambda _: None,
+    )
+
+
+@pytest.fixture
+def replicas(valkey):
+    key = Fernet.generate_key()
+    return [
+        OAuth21SessionStore(
+            backend=ValkeySessionBackend(valkey, encryption_key=key),
+            near_cache_ttl_seconds=0,
+            credential_loader=lambda _: None,
+        )
+        for _ in range(2)
+    ]
+
+
+class TestValkeySessionBackend:
+    def test_sessions_are_shared_between_replicas(self, replicas):
+        first, second = replicas
+        first.store_session("a@example.com", "t1", scopes=["s"], mcp_session_id="mcp-1")
+
+        assert second.get_credentials("a@example.com").token == "t1"
+        assert second.get_user_by_mcp_session("mcp-1") == "a@example.com"
+        assert (
+            second.get_credentials_with_validation("a@example.com", "mcp-1").token
+            == "t1"
+        )
+        assert second.list_users() == ["a@example.com"]
+
+    def test_binding_is_first_wins_across_replicas(self, replicas):
+        first, second = replicas
+        first.store_session("a@example.com", "t1", mcp_session_id="mcp-1")
+
+        with pytest.raises(ValueError):
+            second.store_session("b@example.com", "t2", mcp_session_id="mcp-1")
+        assert second.get_credentials_with_validation("b@example.com", "mcp-1") is None
+
+    def test_oauth_state_is_consumed_once_on_any_replica(self, replicas):
+        first, second = replicas
+        first.store_oauth_state("state-1", session_id="s1")
+
+        assert (
+            second.validate_and_consume_oauth_state("state-1", "s1")["session_id"]
+            == "s1"
+        )
+        with pytest.raises(ValueError):
+            first.validate_and_consume_oauth_state("state-1", "s1")
+
+    def test_removal_reaches_other_replicas(self, replicas):
+        first, second = replicas
+        first.store_session("a@example.com", "t1", mcp_session_id="mcp-1")
+        assert second.has_session("a@example.com")
+
+        first.remove_session("a@example.com")
+
+        assert second.get_credentials("a@example.com") is None
+        assert second.list_users() == []
+        second.store_session("b@example.com", "t2", mcp_session_id="mcp-1")
+
+    def test_near_cache_serves_hot_reads(self, valkey):
+        store = _replica(valkey)
+        store.store_session("a@example.com", "t1")
+        valkey.fail = True
+
+        # Within the near cache TTL nothing is read from Valkey
+        assert store.get_credentials("a@example.com").token == "t1"
+
+    def test_backend_outage_falls_back_to_near_cache(self, valkey):
+        store = _replica(valkey, near_cache_ttl_seconds=0)
+        store.store_session("a@example.com", "t1")
+        valkey.fail = True
+
+        assert store.get_credentials("a@example.com").token == "t1"
+        with pytest.raises(ConnectionError):
+            store.store_session("b@example.com", "t2")
+
+    def test_records_are_encrypted(self, valkey):
+        store = _replica(valkey)
+        store.store_session("a@example.com", "secret-token", refresh_token="refresh")
+
+        stored = valkey.data["workspace-mcp:session:user:a@example.com"]
+        assert "secret-token" not in stored
+        assert "refresh" not in stored
+
+    def test_backend_calls_are_made_outside_the_lock_stripes(self, valkey):
+        store = OAuth21SessionStore(
+            lock_stripes=1,
+            backend=ValkeySessionBackend(valkey),
+            near_cache_ttl_seconds=0,
+            credential_loader=lambda _: None,
+        )
+        held_during = []
+
+        def stripe_is_free():
+            acquired = store._stripes[0].acquire(blocking=False)
+            if acquired:
+                store._stripes[0].release()
+            return acquired
+
+        for command in ("get", "set", "sadd", "smembers", "delete", "srem"):
+            original = getattr(valkey, command)
+
+            def checked(*args, _command=command, _original=original, **kwargs):
+                # Probe from another thread: the stripe is an RLock
+                result = []
+                probe = threading.Thread(target=lambda: result.append(stripe_is_free()))
+                probe.start()
+                probe.join()
+                if not result[0]:
+                    held_during.append(_command)
+                return _original(*args, **kwargs)
+
+            setattr(valkey, command, checked)
+
+        store.store_session("a@example.com", "t1", session_id="s1", mcp_session_id="m1")
+        store.update_session_tokens("a@example.com", "t2")
+        assert store.get_credentials("a@example.com").token == "t2"
+        store.remove_session("a@example.com")
+
+        assert held_during == []
+
+    def test_async_callers_reach_the_backend_off_the_event_loop(
+        self, valkey, monkeypatch
+    ):
+        store = _replica(valkey, near_cache_ttl_seconds=0)
+        monkeypatch.setattr(
+            oauth21_session_store, "get_oauth21_session_store", lambda: store
+        )
+        store.store_session("a@example.com", "t1")
+        threads = []
+        get = valkey.get
+
+        def recording_get(key):
+            threads.append(threading.get_ident())
+            return get(key)
+
+        valkey.get = recording_get
+
+        async def scenario():
+            return await run_session_store_call(store.get_credentials, "a@example.com")
+
+        assert asyncio.run(scenario()).token == "t1"
+        assert threads and threading.get_ident() not in threads
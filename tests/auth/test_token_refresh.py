@@ -0,0 +1,242 @@
+"""
+Unit tests for single-flight token refresh.
+"""
+
+import threading
+import time
+import sys
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from google.auth.exceptions import RefreshError
+from google.oauth2.credentials import Credentials
+
+from auth import token_refresh
+from auth.token_refresh import BackgroundTokenRefresher, TokenRefreshCoordinator
+
+
+class _CountingRefresh:
+    """Stands in for Credentials.refresh(), counting calls to the token endpoint."""
+
+    def __init__(self, delay=0.0, error=None):
+        self.calls = 0
+        self.delay = delay
+        self.error = error
+        self._lock = threading.Lock()
+
+    def __call__(self, credentials, request):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        time.sleep(self.delay)
+        if self.error:
+            raise self.error
+        credentials.token = f"fresh-{call}"
+        credentials.expiry = datetime.utcnow() + timedelta(hours=1)
+
+
+def _expired_credentials(monkeypatch, refresher, expires_in=timedelta(minutes=-1)):
+    credentials = Credentials(
+        token="stale",
+        refresh_token="refresh-1",
+        client_id="client",
+        client_secret="secret",
+        token_uri="https://oauth2.googleapis.com/token",
+        expiry=datetime.utcnow() + expires_in,
+    )
+    monkeypatch.setattr(
+        credentials, "refresh", lambda request: refresher(credentials, request)
+    )
+    return credentials
+
+
+class TestTokenRefreshCoordinator:
+    def test_concurrent_refreshes_are_coalesced_and_persisted_once(self, monkeypatch):
+        coordinator = TokenRefreshCoordinator()
+        refresher = _CountingRefresh(delay=0.2)
+        persisted = []
+        creds = [_expired_credentials(monkeypatch, refresher) for _ in range(10)]
+
+        threads = [
+            threading.Thread(
+                target=coordinator.refresh,
+                args=(c, None),
+                kwargs={"persist": persisted.append},
+            )
+            for c in creds
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(5)
+
+        assert refresher.calls == 1
+        assert len(persisted) == 1
+        assert {c.token for c in creds} == {"fresh-1"}
+        assert all(c.valid for c in creds)
+        assert coordinator.get_stats()["refreshes"] == 1
+
+    def test_late_caller_reuses_recent_refresh(self, monkeypatch):
+        coordinator = TokenRefreshCoordinator()
+        refresher = _CountingRefresh()
+
+        coordinator.refresh(_expired_credentials(monkeypatch, refresher), None)
+        late = _expired_credentials(monkeypatch, refresher)
+        coordinator.refresh(late, None)
+
+        assert refresher.calls == 1
+        assert late.token == "fresh-1"
+        assert coordinator.get_stats()["reused"] == 1
+
+    def test_failure_is_raised_to_every_waiter(self, monkeypatch):
+        coordinator = TokenRefreshCoordinator()
+        refresher = _CountingRefresh(
+            delay=0.2, error=RefreshError("temporarily_unavailable")
+        )
+        errors = []
+
+        def call():
+            try:
+                coordinator.refresh(_expired_credentials(monkeypatch, refresher), None)
+            except RefreshError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(5)
+
+        assert refresher.calls == 1
+        assert len(errors) == 3
+
+        # A failed refresh is not remembered; the next caller tries again
+        with pytest.raises(RefreshError):
+            coordinator.refresh(_expired_credentials(monkeypatch, refresher), None)
+        assert refresher.calls == 2
+
+    def test_invalid_grant_fails_fast_until_forgotten(self, monkeypatch):
+        coordinator = TokenRefreshCoordinator()
+        refresher = _CountingRefresh(error=RefreshError("invalid_grant: revoked"))
+        credentials = _expired_credentials(monkeypatch, refresher)
+
+        with pytest.raises(RefreshError):
+            coordinator.refresh(credentials, None)
+        with pytest.raises(RefreshError):
+            coordinator.refresh(credentials, None)
+
+        assert refresher.calls == 1
+        assert coordinator.is_revoked(credentials)
+
+        coordinator.forget(credentials)
+        assert not coordinator.is_revoked(credentials)
+
+    def test_revoked_grants_are_bounded(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(token_refresh.time, "monotonic", lambda: now[0])
+        coordinator = TokenRefreshCoordinator(revoked_ttl_seconds=60, max_revoked=2)
+        for key in ("a", "b", "c"):
+            with coordinator._lock:
+                coordinator._mark_revoked_locked(key)
+
+        # The oldest grant made room for the newest
+        assert list(coordinator._revoked) == ["b", "c"]
+
+        now[0] += 60
+        with coordinator._lock:
+            assert not coordinator._is_revoked_locked("b")
+            coordinator._mark_revoked_locked("d")
+        assert list(coordinator._revoked) == ["d"]
+
+
+class TestBackgroundTokenRefresher:
+    def _refresher(self, candidates, persisted, coordinator):
+        return BackgroundTokenRefresher(
+            load_credentials=lambda: candidates,
+            persist=lambda user, creds: persisted.append((user, creds.token)),
+            request_factory=lambda: None,
+            margin_seconds=300,
+            jitter_seconds=0,
+            coordinator=coordinator,
+        )
+
+    def test_refreshes_only_tokens_inside_the_margin(self, monkeypatch):
+        refresher = _CountingRefresh()
+        candidates = {
+            "soon@example.com": _expired_credentials(
+                monkeypatch, refresher, timedelta(minutes=2)
+            ),
+            "later@example.com": _expired_credentials(
+                monkeypatch, refresher, timedelta(minutes=50)
+            ),
+        }
+        candidates["later@example.com"]._refresh_token = "refresh-2"
+        persisted = []
+        background = self._refresher(candidates, persisted, TokenRefreshCoordinator())
+
+        assert background.scan() == 1
+        background.stop()
+
+        assert persisted == [("soon@example.com", "fresh-1")]
+        assert background.get_stats()["refreshed"] == 1
+
+    def test_skips_revoked_grants(self, monkeypatch):
+        coordinator = TokenRefreshCoordinator()
+        refresher = _CountingRefresh(error=RefreshError("invalid_grant"))
+        credentials = _expired_credentials(monkeypatch, refresher)
+        background = self._refresher({"u@example.com": credentials}, [], coordinator)
+
+        background.scan()
+        background.stop()
+        assert coordinator.is_revoked(credentials)
+
+        assert background.scan() == 0
+        background.stop()
+        assert refresher.calls == 1
+
+    def test_sqlite_candidates_come_from_the_expiry_index(self, tmp_path, monkeypatch):
+        from cryptography.fernet import Fernet
+
+        from auth import credential_store, google_auth
+        from auth.oauth21_session_store import OAuth21SessionStore
+
+        store = credential_store.SqliteCredentialStore(
+            str(tmp_path / "credentials.db"), Fernet.generate_key(), batch_window_ms=0
+        )
+        for user_email, expires_in in (
+            ("soon@example.com", timedelta(minutes=2)),
+            ("later@example.com", timedelta(hours=5)),
+        ):
+            store.store_credential(
+                user_email,
+                Credentials(
+                    token="tok",
+                    refresh_token="rt",
+                    expiry=datetime.utcnow() + expires_in,
+                ),
+            )
+        monkeypatch.setattr(credential_store, "_credential_store", store)
+        monkeypatch.setattr(
+            google_auth, "get_oauth21_session_store", lambda: OAuth21SessionStore()
+        )
+        monkeypatch.setattr(google_auth, "is_stateless_mode", lambda: False)
+        decrypted = []
+        decode = store._decode
+
+        def counting_decode(user_email, blob):
+            decrypted.append(user_email)
+            return decode(user_email, blob)
+
+        monkeypatch.setattr(store, "_decode", counting_decode)
+
+        try:
+            candidates = google_auth._load_refreshable_credentials()
+        finally:
+            store.close()
+
+        assert list(candidates) == ["soon@example.com"]
+        assert decrypted == ["soon@example.com"]
@@ -0,0 +1,129 @@
+"""
+Unit tests for the verified-token cache used by AuthInfoMiddleware.
+"""
+
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from auth.oauth21_session_store import (
+    AccessTokenCredentialCache,
+    set_access_token_credential_cache,
+)
+from auth.verified_token_cache import (
+    VerifiedTokenCache,
+    invalidate_verified_token,
+    set_verified_token_cache,
+)
+
+
+class _CountingVerifier:
+    def __init__(self, result):
+        self.result = result
+        self.calls = 0
+
+    async def __call__(self, token):
+        self.calls += 1
+        return self.result
+
+
+def _verified(lifetime=3600):
+    return SimpleNamespace(
+        claims={"email": "a@example.com"}, expires_at=int(time.time() + lifetime)
+    )
+
+
+class TestVerifiedTokenCache:
+    def test_repeated_verification_hits_cache(self):
+        cache = VerifiedTokenCache()
+        verifier = _CountingVerifier(_verified())
+
+        async def run():
+            return [await cache.verify("ya29.abc", verifier) for _ in range(5)]
+
+        results = asyncio.run(run())
+        assert verifier.calls == 1
+        assert all(result is results[0] for result in results)
+        assert cache.get_stats()["hits"] == 4
+
+    def test_ttl_capped_at_token_expiry(self):
+        cache = VerifiedTokenCache()
+        verifier = _CountingVerifier(_verified(lifetime=5))
+
+        async def run():
+            await cache.verify("ya29.abc", verifier)
+            await cache.verify("ya29.abc", verifier)
+
+        asyncio.run(run())
+        assert verifier.calls == 2
+
+    def test_negative_results_cached_briefly(self):
+        cache = VerifiedTokenCache(negative_ttl_seconds=0.05)
+        verifier = _CountingVerifier(None)
+
+        async def run():
+            assert await cache.verify("ya29.bad", verifier) is None
+            assert await cache.verify("ya29.bad", verifier) is None
+            assert verifier.calls == 1
+            await asyncio.sleep(0.06)
+            await cache.verify("ya29.bad", verifier)
+
+        asyncio.run(run())
+        assert verifier.calls == 2
+        assert cache.get_stats()["negative_hits"] == 1
+
+    def test_zero_ttl_disables_negative_caching_too(self):
+        cache = VerifiedTokenCache(ttl_seconds=0)
+        verifier = _CountingVerifier(None)
+
+        async def run():
+            await cache.verify("ya29.bad", verifier)
+            # The token became valid; nothing may remember the old rejection
+            verifier.result = _verified()
+            return await cache.verify("ya29.bad", verifier)
+
+        assert asyncio.run(run()) is not None
+        assert verifier.calls == 2
+        assert cache.get_stats()["entries"] == 0
+
+    def test_verifier_errors_are_not_cached(self):
+        cache = VerifiedTokenCache()
+        calls = []
+
+        async def failing(token):
+            calls.append(token)
+            raise RuntimeError("network down")
+
+        async def run():
+            for _ in range(2):
+                try:
+                    await cache.verify("ya29.abc", failing)
+                except RuntimeError:
+                    pass
+
+        asyncio.run(run())
+        assert len(calls) == 2
+
+    def test_invalidate_on_rejection_forces_reverification(self):
+        cache = VerifiedTokenCache()
+        set_verified_token_cache(cache)
+        set_access_token_credential_cache(AccessTokenCredentialCache())
+        verifier = _CountingVerifier(_verified())
+        try:
+
+            async def run():
+                await cache.verify("ya29.abc", verifier)
+                invalidate_verified_token("ya29.abc")
+                await cache.verify("ya29.abc", verifier)
+
+            asyncio.run(run())
+        finally:
+            set_verified_token_cache(None)
+            set_access_token_credential_cache(None)
+
+        assert verifier.calls == 2
+        assert cache.get_stats()["invalidations"] == 1
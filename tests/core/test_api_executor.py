@@ -0,0 +1,140 @@
+"""
+Unit tests for native asyncio Google API execution.
+"""
+
+import asyncio
+import sys
+import os
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.errors import HttpError
+
+import core.api_executor as api_executor
+from core.api_executor import execute_async
+from core.discovery import build_service
+
+
+class _FakeCredentials:
+    def __init__(self, token="old", valid=True):
+        self.token = token
+        self.valid = valid
+        self.refreshes = 0
+
+    def apply(self, headers):
+        headers["authorization"] = f"Bearer {self.token}"
+
+    def refresh(self, request):
+        self.refreshes += 1
+        self.token = f"new{self.refreshes}"
+        self.valid = True
+
+
+def _run(handler, build_request, credentials=None):
+    """Run build_request(service) through execute_async against a mock transport."""
+    credentials = credentials or _FakeCredentials()
+    service = build_service("gmail", "v1", http=AuthorizedHttp(credentials))
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        api_executor._clients[loop] = httpx.AsyncClient(
+            transport=httpx.MockTransport(handler)
+        )
+        try:
+            return await execute_async(build_request(service))
+        finally:
+            await api_executor.close_async_http_client()
+
+    return asyncio.run(run())
+
+
+@pytest.fixture(autouse=True)
+def _no_real_refresh_transport(monkeypatch):
+    monkeypatch.setattr(api_executor, "get_http_transport", lambda: None)
+
+
+class TestExecuteAsync:
+    def test_returns_deserialized_response(self):
+        seen = []
+
+        def handler(request):
+            seen.append(request)
+            return httpx.Response(200, json={"labels": [{"id": "INBOX"}]})
+
+        result = _run(handler, lambda s: s.users().labels().list(userId="me"))
+
+        assert result == {"labels": [{"id": "INBOX"}]}
+        assert seen[0].method == "GET"
+        assert seen[0].headers["authorization"] == "Bearer old"
+
+    def test_refreshes_and_retries_on_401(self, monkeypatch):
+        credentials = _FakeCredentials()
+        tokens = []
+        invalidated = []
+        monkeypatch.setattr(
+            api_executor, "invalidate_verified_token", invalidated.append
+        )
+
+        def handler(request):
+            tokens.append(request.headers["authorization"])
+            if len(tokens) == 1:
+                return httpx.Response(401, json={"error": {"message": "expired"}})
+            return httpx.Response(200, json={"id": "m1"})
+
+        result = _run(
+            handler,
+            lambda s: s.users().messages().get(userId="me", id="m1"),
+            credentials,
+        )
+
+        assert result == {"id": "m1"}
+        assert tokens == ["Bearer old", "Bearer new1"]
+        assert credentials.refreshes == 1
+        assert invalidated == ["old"]
+
+    def test_invalid_credentials_are_refreshed_first(self):
+        credentials = _FakeCredentials(valid=False)
+
+        _run(
+            lambda request: httpx.Response(200, json={}),
+            lambda s: s.users().labels().list(userId="me"),
+            credentials,
+        )
+
+        assert credentials.refreshes == 1
+
+    def test_error_status_raises_http_error(self):
+        with pytest.raises(HttpError) as exc_info:
+            _run(
+                lambda request: httpx.Response(404, json={"error": {"code": 404}}),
+                lambda s: s.users().messages().get(userId="me", id="missing"),
+            )
+
+        assert exc_info.value.resp.status == 404
+
+    def test_long_get_uri_is_sent_as_post(self):
+        seen = []
+
+        def handler(request):
+            seen.append(request)
+            return httpx.Response(200, json={})
+
+        _run(
+            handler,
+            lambda s: s.users().messages().list(userId="me", q="x" * 3000),
+        )
+
+        assert seen[0].method == "POST"
+        assert seen[0].headers["x-http-method-override"] == "GET"
+        assert b"q=" in seen[0].content
+
+    def test_non_http_requests_run_in_a_thread(self):
+        class _Batch:
+            def execute(self):
+                return "done"
+
+        assert asyncio.run(execute_async(_Batch())) == "done"
@@ -0,0 +1,133 @@
+"""
+Unit tests for the per-API circuit breakers and their use in handle_http_errors.
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+import httplib2
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from googleapiclient.errors import HttpError
+
+from core import circuit_breaker
+from core.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    ApiCircuitBreakers,
+    CircuitBreaker,
+    any_circuit_open,
+    get_circuit_breakers,
+)
+from core.retry_policy import NETWORK_ERROR, SERVER_ERROR
+from core.utils import TransientNetworkError, handle_http_errors
+
+
+def _http_error(status):
+    body = json.dumps({"error": {"code": status, "message": "boom"}}).encode()
+    return HttpError(httplib2.Response({"status": status}), body)
+
+
+@pytest.fixture(autouse=True)
+def _reset_breakers(monkeypatch):
+    monkeypatch.setenv("WORKSPACE_MCP_CIRCUIT_MIN_CALLS", "4")
+    circuit_breaker.reset_circuit_breakers()
+    yield
+    circuit_breaker.reset_circuit_breakers()
+
+
+class TestCircuitBreaker:
+    def test_opens_on_failure_rate_and_probes_when_half_open(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+        breaker = CircuitBreaker(minimum_calls=4, open_seconds=30, probe_interval=5)
+
+        breaker.record_success()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CLOSED
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+
+        now[0] += 30
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow()
+        assert not breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == OPEN
+
+        now[0] += 30
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CLOSED
+
+    def test_old_outcomes_leave_the_window(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+        breaker = CircuitBreaker(minimum_calls=4, window_seconds=10)
+
+        for _ in range(3):
+            breaker.record_failure()
+        now[0] += 11
+        breaker.record_failure()
+
+        assert breaker.state == CLOSED
+        assert breaker.get_stats()["calls"] == 1
+
+    def test_rejected_call_does_not_spend_another_breakers_probe(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+        api = ApiCircuitBreakers(
+            "docs", minimum_calls=1, open_seconds=30, probe_interval=5
+        )
+        server, network = api.breakers[SERVER_ERROR], api.breakers[NETWORK_ERROR]
+        server.record_failure()
+        network.record_failure()
+        now[0] += 30
+        # The network breaker's probe is already out
+        assert network.allow()
+
+        assert not api.allow()
+        assert server.would_allow()
+
+        now[0] += 5
+        assert api.allow()
+        assert not server.would_allow()
+        assert not network.would_allow()
+
+
+class TestHandleHttpErrorsCircuit:
+    def test_open_circuit_fails_fast(self):
+        calls = []
+
+        @handle_http_errors("failing_tool", service_type="gmail")
+        async def failing_tool():
+            calls.append(1)
+            raise _http_error(503)
+
+        for _ in range(4):
+            with pytest.raises(Exception, match="API error in failing_tool"):
+                asyncio.run(failing_tool())
+
+        with pytest.raises(TransientNetworkError, match="Google gmail API"):
+            asyncio.run(failing_tool())
+        assert len(calls) == 4
+        assert any_circuit_open()
+        assert get_circuit_breakers("sheets").allow()
+
+    def test_client_errors_and_rate_limits_do_not_trip(self):
+        @handle_http_errors("picky_tool", service_type="gmail")
+        async def picky_tool(status):
+            raise _http_error(status)
+
+        for status in (404, 429, 400, 429, 404):
+            with pytest.raises(Exception):
+                asyncio.run(picky_tool(status))
+
+        assert not any_circuit_open()
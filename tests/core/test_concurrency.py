@@ -0,0 +1,122 @@
+"""
+Unit tests for the adaptive (AIMD) concurrency controller.
+"""
+
+import asyncio
+import os
+import sys
+
+import httplib2
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from googleapiclient.errors import HttpError
+
+from core import concurrency
+from core.concurrency import (
+    AdaptiveConcurrencyController,
+    get_concurrency_controller,
+    get_concurrency_stats,
+)
+
+
+def _http_error(status):
+    return HttpError(httplib2.Response({"status": status}), b"{}")
+
+
+@pytest.fixture(autouse=True)
+def _reset_controllers():
+    concurrency.reset_concurrency_controllers()
+    yield
+    concurrency.reset_concurrency_controllers()
+
+
+class TestAdaptiveConcurrencyController:
+    def test_additive_increase_and_multiplicative_decrease(self):
+        controller = AdaptiveConcurrencyController(initial_window=4, max_window=6)
+
+        for _ in range(5):
+            controller.record_success(0.1)
+        assert controller.window == 5
+
+        controller.record_overload()
+        assert controller.window == 2
+
+        for _ in range(100):
+            controller.record_success(0.1)
+        assert controller.window == 6
+
+    def test_latency_spike_cuts_window_once(self):
+        controller = AdaptiveConcurrencyController(initial_window=8)
+        controller.record_success(0.1)
+        window = controller.window
+        decreased_at = controller._last_decrease_at
+
+        controller.record_success(1.0, started_at=decreased_at + 1)
+        assert controller.window == window // 2
+        # A slow request that started before the cut reflects the old window
+        controller.record_success(1.0, started_at=0.0)
+        assert controller.window == window // 2
+
+    def test_slots_bound_in_flight_requests(self):
+        controller = AdaptiveConcurrencyController(initial_window=2, max_window=2)
+        peak = 0
+        running = 0
+
+        async def request(fail=False):
+            nonlocal peak, running
+            async with controller.slot():
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.001)
+                running -= 1
+                if fail:
+                    raise _http_error(429)
+
+        async def scenario():
+            await asyncio.gather(*(request() for _ in range(6)))
+            with pytest.raises(HttpError):
+                await request(fail=True)
+
+        asyncio.run(scenario())
+
+        assert peak == 2
+        assert controller.window == 1
+        assert controller.get_stats()["in_flight"] == 0
+
+    def test_cancelled_waiter_does_not_leak_a_slot(self):
+        controller = AdaptiveConcurrencyController(initial_window=1, max_window=1)
+
+        async def scenario():
+            await controller.acquire()
+            waiter = asyncio.create_task(controller.acquire())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            controller.release()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+            await asyncio.wait_for(controller.acquire(), 1)
+            controller.release()
+
+        asyncio.run(scenario())
+        assert controller.get_stats()["in_flight"] == 0
+
+
+class TestControllerRegistry:
+    def test_controllers_are_per_user_and_api(self):
+        a = get_concurrency_controller("a@example.com", "gmail")
+
+        assert get_concurrency_controller("a@example.com", "gmail") is a
+        assert get_concurrency_controller("b@example.com", "gmail") is not a
+        assert get_concurrency_controller("a@example.com", "sheets") is not a
+
+    def test_stats_report_windows_per_api(self):
+        get_concurrency_controller("a@example.com", "gmail").record_overload()
+        get_concurrency_controller("b@example.com", "gmail")
+
+        stats = get_concurrency_stats()["apis"]["gmail"]
+        assert stats["controllers"] == 2
+        assert stats["window_min"] == 5
+        assert stats["window_max"] == 10
+        assert stats["decreases"] == 1
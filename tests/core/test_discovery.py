@@ -0,0 +1,39 @@
+"""
+Unit tests for pinned discovery document handling.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from core.discovery import (
+    PINNED_DISCOVERY_DOCUMENTS,
+    build_service,
+    get_discovery_document,
+    get_stale_discovery_documents,
+)
+
+
+class TestPinnedDiscoveryDocuments:
+    def test_every_pinned_document_is_shipped(self):
+        for service_name, version in PINNED_DISCOVERY_DOCUMENTS:
+            document = get_discovery_document(service_name, version)
+            assert document is not None
+            assert document["name"] == service_name
+            assert document["version"] == version
+
+    def test_unknown_document_is_none(self):
+        assert get_discovery_document("nonexistent", "v0") is None
+
+    def test_build_service_uses_pinned_document(self):
+        service = build_service("gmail", "v1", http=object())
+        request = service.users().messages().list(userId="me")
+        assert request.methodId == "gmail.users.messages.list"
+
+    def test_stale_documents_respect_max_age(self):
+        assert get_stale_discovery_documents(max_age_days=100000) == []
+        stale = get_stale_discovery_documents(max_age_days=-1)
+        assert {d["service"] for d in stale} == {
+            s for s, _ in PINNED_DISCOVERY_DOCUMENTS
+        }
@@ -0,0 +1,103 @@
+"""
+Unit tests for the fair Google API executor.
+"""
+
+import asyncio
+import threading
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from core.context import (
+    reset_current_tool_name,
+    reset_current_user_email,
+    set_current_tool_name,
+    set_current_user_email,
+)
+from core.google_executor import FairExecutor, run_blocking, set_google_executor
+
+
+@pytest.fixture
+def executor():
+    executor = FairExecutor(max_workers=2, per_user_limit=1)
+    yield executor
+    executor.shutdown(wait=False)
+
+
+class TestFairExecutor:
+    def test_one_user_cannot_hold_every_worker(self, executor):
+        release = threading.Event()
+        started = []
+
+        def blocking(name):
+            started.append(name)
+            release.wait(5)
+            return name
+
+        heavy = [
+            executor.submit(lambda i=i: blocking(f"a{i}"), user="a@example.com")
+            for i in range(5)
+        ]
+        light = executor.submit(lambda: "b", user="b@example.com")
+
+        # The second worker serves user b even though user a queued first
+        assert light.result(timeout=5) == "b"
+        assert started == ["a0"]
+
+        release.set()
+        assert [f.result(timeout=5) for f in heavy] == [f"a{i}" for i in range(5)]
+
+    def test_users_are_served_round_robin(self):
+        executor = FairExecutor(max_workers=1, per_user_limit=1)
+        gate = threading.Event()
+        order = []
+        blocker = executor.submit(lambda: gate.wait(5), user="gate")
+        futures = [
+            executor.submit(lambda u=u, i=i: order.append(f"{u}{i}"), user=u)
+            for u in ("a", "b")
+            for i in range(2)
+        ]
+        gate.set()
+        for future in [blocker, *futures]:
+            future.result(timeout=5)
+        executor.shutdown()
+
+        assert order == ["a0", "b0", "a1", "b1"]
+
+    def test_exceptions_propagate_and_are_counted(self, executor):
+        def boom():
+            raise ValueError("boom")
+
+        future = executor.submit(boom, user="a", tool="tool_x")
+
+        with pytest.raises(ValueError):
+            future.result(timeout=5)
+        executor.submit(lambda: None, user="a", tool="tool_x").result(timeout=5)
+
+        stats = executor.get_stats()["tools"]["tool_x"]
+        assert stats["failed"] == 1
+        assert stats["completed"] == 1
+        assert stats["queue_depth"] == 0
+
+    def test_run_blocking_attributes_current_user_and_tool(self, executor):
+        set_google_executor(executor)
+        try:
+
+            async def call():
+                user_token = set_current_user_email("user@example.com")
+                tool_token = set_current_tool_name("search_gmail_messages")
+                try:
+                    return await run_blocking(lambda x: x * 2, 21)
+                finally:
+                    reset_current_tool_name(tool_token)
+                    reset_current_user_email(user_token)
+
+            assert asyncio.run(call()) == 42
+        finally:
+            set_google_executor(None)
+
+        tools = executor.get_stats()["tools"]
+        assert tools["search_gmail_messages"]["completed"] == 1
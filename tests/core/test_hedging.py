@@ -0,0 +1,172 @@
+"""
+Unit tests for latency histograms and hedged Google API requests.
+"""
+
+import asyncio
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from core import hedging
+from core.hedging import (
+    MIN_SAMPLES,
+    LatencyHistogram,
+    RequestHedger,
+    get_request_hedger,
+    set_request_hedger,
+)
+from core.rate_limiter import QuotaRateLimiter
+
+
+class _FakeRequest:
+    methodId = "sheets.spreadsheets.values.get"
+    _requests = None
+
+
+def _warm_hedger(latency=0.02, method_id="m"):
+    hedger = RequestHedger(tools=frozenset({"read_tool"}), percentile=90)
+    for _ in range(MIN_SAMPLES):
+        hedger._histogram(method_id).record(latency)
+    return hedger
+
+
+class TestLatencyHistogram:
+    def test_percentiles_follow_recorded_latencies(self):
+        histogram = LatencyHistogram()
+        for _ in range(90):
+            histogram.record(0.05)
+        for _ in range(10):
+            histogram.record(2.0)
+
+        assert 0.05 <= histogram.percentile(50) < 0.06
+        assert 2.0 <= histogram.percentile(99) < 2.2
+
+    def test_empty_histogram_has_no_percentile(self):
+        assert LatencyHistogram().percentile(95) is None
+
+
+class TestRequestHedger:
+    def test_no_hedge_until_enough_samples(self):
+        hedger = RequestHedger(tools=frozenset({"read_tool"}))
+        assert hedger.hedge_delay("m") is None
+        assert _warm_hedger().hedge_delay("m") == pytest.approx(0.02, rel=0.1)
+
+    def test_slow_primary_is_beaten_by_the_hedge(self):
+        hedger = _warm_hedger()
+        delays = [1.0, 0.0]
+        cancelled = []
+
+        async def send():
+            delay = delays.pop(0)
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                cancelled.append(delay)
+                raise
+            return delay
+
+        result = asyncio.run(hedger.run("read_tool", "m", send, lambda: True))
+
+        assert result == 0.0
+        assert cancelled == [1.0]
+        assert hedger.get_stats()["tools"]["read_tool"] == {
+            "calls": 1,
+            "hedges": 1,
+            "hedge_wins": 1,
+            "skipped_for_budget": 0,
+        }
+
+    def test_failed_copy_falls_back_to_the_other(self):
+        hedger = _warm_hedger()
+        outcomes = [(0.2, "primary"), (0.0, ValueError("hedge failed"))]
+
+        async def send():
+            delay, outcome = outcomes.pop(0)
+            await asyncio.sleep(delay)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        assert asyncio.run(hedger.run("read_tool", "m", send, lambda: True)) == (
+            "primary"
+        )
+
+    def test_hedge_is_skipped_without_budget(self):
+        hedger = _warm_hedger()
+        sends = []
+
+        async def send():
+            sends.append(1)
+            await asyncio.sleep(0.1)
+            return "ok"
+
+        assert asyncio.run(hedger.run("read_tool", "m", send, lambda: False)) == "ok"
+        assert len(sends) == 1
+        assert hedger.get_stats()["tools"]["read_tool"]["skipped_for_budget"] == 1
+
+    def test_hedge_rate_stays_near_the_configured_percentile(self):
+        hedger = RequestHedger(tools=frozenset({"read_tool"}), percentile=90)
+        rng = random.Random(7)
+
+        async def send():
+            # A fast bulk with a slow tail that hedges win against
+            slow = rng.random() < 0.1
+            await asyncio.sleep(0.15 if slow else rng.uniform(0.005, 0.015))
+            return "ok"
+
+        async def scenario():
+            for _ in range(12):
+                await asyncio.gather(
+                    *(
+                        hedger.run("read_tool", "m", send, lambda: True)
+                        for _ in range(25)
+                    )
+                )
+
+        asyncio.run(scenario())
+
+        stats = hedger.get_stats()["tools"]["read_tool"]
+        hedge_rate = stats["hedges"] / (stats["calls"] - MIN_SAMPLES)
+        # Steady latencies should be hedged about 100 - percentile % of the time
+        assert stats["hedge_wins"] > 0
+        assert 0.05 <= hedge_rate <= 0.2
+
+
+class TestHedgeBudget:
+    def test_try_acquire_never_waits_or_overdraws(self):
+        limiter = QuotaRateLimiter({"sheets.read": (2, 100, 60.0)})
+        request = _FakeRequest()
+
+        assert limiter.try_acquire(request, user="a@example.com")
+        assert limiter.try_acquire(request, user="a@example.com")
+        assert not limiter.try_acquire(request, user="a@example.com")
+        # The refused hedge left the budget as it was
+        assert limiter.reserve({"sheets.read": 1}, "b@example.com") == 0
+
+
+class TestHedgingConfig:
+    def test_disabled_by_default(self, monkeypatch):
+        monkeypatch.delenv("WORKSPACE_MCP_HEDGING", raising=False)
+        monkeypatch.delenv("WORKSPACE_MCP_HEDGED_TOOLS", raising=False)
+        set_request_hedger(None, loaded=False)
+        try:
+            assert get_request_hedger() is None
+        finally:
+            set_request_hedger(None, loaded=False)
+
+    def test_tool_list_enables_hedging(self, monkeypatch):
+        monkeypatch.setenv("WORKSPACE_MCP_HEDGED_TOOLS", "get_events, list_files")
+        monkeypatch.setenv("WORKSPACE_MCP_HEDGE_PERCENTILE", "99")
+        set_request_hedger(None, loaded=False)
+        try:
+            hedger = get_request_hedger()
+            assert hedger.tools == frozenset({"get_events", "list_files"})
+            assert hedger.percentile == 99
+            assert not hedger.is_hedged("search_gmail_messages")
+        finally:
+            set_request_hedger(None, loaded=False)
+        assert hedging.DEFAULT_HEDGED_TOOLS >= {"search_gmail_messages", "get_events"}
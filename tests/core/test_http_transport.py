@@ -0,0 +1,97 @@
+"""
+Unit tests for the pooled Google API HTTP transport.
+"""
+
+import json
+import socket
+import sys
+import os
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.errors import HttpError
+
+from core.discovery import build_service
+from core.http_transport import PooledHttp
+
+
+def _transport(handler) -> PooledHttp:
+    return PooledHttp(client=httpx.Client(transport=httpx.MockTransport(handler)))
+
+
+class TestPooledHttp:
+    def test_executes_google_api_request(self):
+        seen = {}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen["auth"] = request.headers.get("authorization")
+            seen["url"] = str(request.url)
+            return httpx.Response(200, json={"messages": [{"id": "m1"}]})
+
+        transport = _transport(handler)
+        http = AuthorizedHttp(Credentials(token="tok"), http=transport)
+        service = build_service("gmail", "v1", http=http)
+
+        result = service.users().messages().list(userId="me").execute()
+
+        assert result == {"messages": [{"id": "m1"}]}
+        assert seen["auth"] == "Bearer tok"
+        assert "/gmail/v1/users/me/messages" in seen["url"]
+        assert transport.get_stats()["requests"] == 1
+        assert transport.get_stats()["in_flight"] == 0
+
+    def test_error_status_raises_http_error(self):
+        transport = _transport(
+            lambda request: httpx.Response(404, json={"error": {"message": "nope"}})
+        )
+        service = build_service(
+            "gmail", "v1", http=AuthorizedHttp(Credentials(token="t"), http=transport)
+        )
+
+        with pytest.raises(HttpError) as exc_info:
+            service.users().messages().get(userId="me", id="x").execute()
+
+        assert exc_info.value.resp.status == 404
+
+    def test_response_headers_are_httplib2_style(self):
+        transport = _transport(
+            lambda request: httpx.Response(
+                201, headers={"X-Test": "a"}, content=json.dumps({}).encode()
+            )
+        )
+
+        resp, content = transport.request("https://example.com/", "POST", body="{}")
+
+        assert resp.status == 201
+        assert resp["x-test"] == "a"
+        assert content == b"{}"
+
+    def test_timeout_maps_to_socket_timeout(self):
+        def handler(request):
+            raise httpx.ReadTimeout("slow", request=request)
+
+        transport = _transport(handler)
+
+        with pytest.raises(socket.timeout):
+            transport.request("https://example.com/")
+        assert transport.get_stats()["errors"] == 1
+
+    def test_connect_error_maps_to_connection_error(self):
+        def handler(request):
+            raise httpx.ConnectError("refused", request=request)
+
+        with pytest.raises(ConnectionError):
+            _transport(handler).request("https://example.com/")
+
+    def test_close_keeps_shared_pool_open(self):
+        transport = _transport(lambda request: httpx.Response(200))
+        transport.close()
+
+        resp, _ = transport.request("https://example.com/")
+
+        assert resp.status == 200
@@ -0,0 +1,98 @@
+"""
+Unit tests for the near cache in front of the OAuth proxy's client_storage.
+"""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from key_value.aio.stores.memory import MemoryStore
+from key_value.aio.wrappers.statistics import StatisticsWrapper
+
+from core.near_cache import NearCacheWrapper
+
+
+def _cached_store(**kwargs):
+    primary = StatisticsWrapper(MemoryStore())
+    return NearCacheWrapper(primary, **kwargs), primary
+
+
+def _primary_reads(primary, collection="clients"):
+    stats = primary.statistics.get_collection(collection)
+    return stats.ttl.count
+
+
+class TestNearCacheWrapper:
+    def test_repeated_reads_skip_the_store(self):
+        async def scenario():
+            cache, primary = _cached_store()
+            await cache.put("c1", {"name": "one"}, collection="clients")
+            for _ in range(5):
+                assert await cache.get("c1", collection="clients") == {"name": "one"}
+            return cache, primary
+
+        cache, primary = asyncio.run(scenario())
+        assert _primary_reads(primary) == 0
+        assert cache.get_stats()["hits"] == 5
+
+    def test_reads_populate_and_respect_store_ttl(self):
+        async def scenario():
+            cache, primary = _cached_store(ttl_seconds=30)
+            await primary.put("c1", {"name": "one"}, collection="clients", ttl=5)
+            assert await cache.get("c1", collection="clients") == {"name": "one"}
+            _, ttl = await cache.ttl("c1", collection="clients")
+            return cache, primary, ttl
+
+        cache, primary, ttl = asyncio.run(scenario())
+        assert _primary_reads(primary) == 1
+        assert ttl <= 5
+        assert cache.get_stats()["misses"] == 1
+
+    def test_writes_and_deletes_go_through(self):
+        async def scenario():
+            cache, primary = _cached_store()
+            await cache.put("c1", {"v": 1}, collection="clients")
+            await cache.put("c1", {"v": 2}, collection="clients")
+            stored = await primary.get("c1", collection="clients")
+            cached = await cache.get("c1", collection="clients")
+            await cache.delete("c1", collection="clients")
+            return stored, cached, await cache.get("c1", collection="clients")
+
+        stored, cached, after_delete = asyncio.run(scenario())
+        assert stored == cached == {"v": 2}
+        assert after_delete is None
+
+    def test_lru_bound_and_returned_values_are_copies(self):
+        async def scenario():
+            cache, _ = _cached_store(max_entries=2)
+            for key in ("a", "b", "c"):
+                await cache.put(key, {"key": key}, collection="clients")
+            value = await cache.get("c", collection="clients")
+            value["key"] = "mutated"
+            return cache, await cache.get("c", collection="clients")
+
+        cache, value = asyncio.run(scenario())
+        assert value == {"key": "c"}
+        assert cache.get_stats()["entries"] == 2
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_read_racing_a_write_does_not_cache_old_value(self):
+        class SlowStore(StatisticsWrapper):
+            async def ttl(self, key, *, collection=None):
+                result = await super().ttl(key, collection=collection)
+                await asyncio.sleep(0.01)
+                return result
+
+        async def scenario():
+            primary = SlowStore(MemoryStore())
+            cache = NearCacheWrapper(primary)
+            await primary.put("c1", {"v": 1}, collection="clients")
+            read = asyncio.create_task(cache.get("c1", collection="clients"))
+            await asyncio.sleep(0)
+            await cache.put("c1", {"v": 2}, collection="clients")
+            await read
+            return await cache.get("c1", collection="clients")
+
+        assert asyncio.run(scenario()) == {"v": 2}
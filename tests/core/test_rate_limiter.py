@@ -0,0 +1,104 @@
+"""
+Unit tests for the client-side Google quota rate limiter.
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from googleapiclient.http import BatchHttpRequest, HttpRequest
+
+from core import rate_limiter
+from core.rate_limiter import QuotaRateLimiter, TokenBucket, quota_cost, request_costs
+
+
+def _request(method_id):
+    return HttpRequest(None, None, "https://example.com", methodId=method_id)
+
+
+class TestQuotaCost:
+    def test_gmail_methods_use_quota_units(self):
+        assert quota_cost("gmail.users.messages.get") == ("gmail", 5)
+        assert quota_cost("gmail.users.messages.send") == ("gmail", 100)
+        assert quota_cost("gmail.users.labels.list") == ("gmail", 1)
+
+    def test_read_write_apis_and_unknown_methods(self):
+        assert quota_cost("sheets.spreadsheets.values.get") == ("sheets.read", 1)
+        assert quota_cost("sheets.spreadsheets.values.update") == ("sheets.write", 1)
+        assert quota_cost("docs.documents.batchUpdate") == ("docs.write", 1)
+        assert quota_cost("calendar.events.list") == (None, 0)
+
+    def test_batch_is_billed_per_request(self):
+        batch = BatchHttpRequest(batch_uri="https://example.com/batch")
+        for _ in range(3):
+            batch.add(_request("gmail.users.messages.get"))
+        batch.add(_request("gmail.users.threads.get"))
+
+        assert request_costs(batch) == {"gmail": 25}
+
+
+class TestTokenBucket:
+    def test_reservations_queue_past_capacity(self):
+        bucket = TokenBucket(10, 1.0)
+        now = bucket.updated_at
+
+        assert bucket.reserve(10, now) == 0
+        assert bucket.reserve(5, now) == pytest.approx(0.5)
+        assert bucket.reserve(5, now) == pytest.approx(1.0)
+        assert bucket.reserve(5, now + 1.0) == pytest.approx(0.5)
+
+
+class TestQuotaRateLimiter:
+    def test_user_and_project_budgets(self):
+        limiter = QuotaRateLimiter({"gmail": (10, 15, 1.0)})
+
+        assert limiter.reserve({"gmail": 10}, "a@example.com") == 0
+        # The project still has budget, but this user's bucket is empty
+        assert limiter.reserve({"gmail": 5}, "a@example.com") > 0
+        # Another user is limited only by what is left of the project budget
+        assert limiter.reserve({"gmail": 5}, "b@example.com") > 0
+        assert limiter.get_stats()["groups"]["gmail"]["throttled"] == 2
+
+    def test_acquire_waits_for_budget(self, monkeypatch):
+        sleeps = []
+
+        async def fake_sleep(delay):
+            sleeps.append(delay)
+
+        monkeypatch.setattr(rate_limiter.asyncio, "sleep", fake_sleep)
+        limiter = QuotaRateLimiter({"gmail": (250, 20_000, 1.0)})
+        request = _request("gmail.users.messages.send")
+
+        async def send_three():
+            for _ in range(3):
+                await limiter.acquire(request, user="a@example.com")
+
+        asyncio.run(send_three())
+
+        assert len(sleeps) == 1
+        assert sleeps[0] == pytest.approx(0.2, abs=0.01)
+
+    def test_cancelled_wait_refunds_quota(self):
+        limiter = QuotaRateLimiter({"gmail": (100, 20_000, 100.0)})
+        request = _request("gmail.users.messages.send")
+
+        async def scenario():
+            await limiter.acquire(request, user="a@example.com")
+            waiting = asyncio.create_task(
+                limiter.acquire(request, user="a@example.com")
+            )
+            await asyncio.sleep(0)
+            waiting.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiting
+
+        asyncio.run(scenario())
+
+        # Only the first send's units remain reserved
+        assert limiter.reserve({"gmail": 1}, "a@example.com") == pytest.approx(
+            1.0, abs=0.05
+        )
@@ -0,0 +1,172 @@
+"""
+Unit tests for the read-only tool result cache and its write invalidation.
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from core import result_cache
+from core.result_cache import ToolResultCache, set_tool_result_cache
+from core.utils import handle_http_errors
+
+USER = "user@example.com"
+
+
+@pytest.fixture
+def cache():
+    cache = ToolResultCache(ttls={"get_doc": 30.0, "list_labels": 30.0})
+    set_tool_result_cache(cache)
+    yield cache
+    set_tool_result_cache(None, loaded=False)
+
+
+def _tools(calls):
+    @handle_http_errors("get_doc", is_read_only=True)
+    async def get_doc(user_google_email: str, document_id: str, detailed=False):
+        calls.append(document_id)
+        return f"{document_id} v{len(calls)}"
+
+    @handle_http_errors("update_doc")
+    async def update_doc(user_google_email: str, document_id: str, text: str):
+        return "updated"
+
+    return get_doc, update_doc
+
+
+class TestReadThrough:
+    def test_repeated_calls_are_served_from_cache(self, cache):
+        calls = []
+        get_doc, _ = _tools(calls)
+
+        async def scenario():
+            first = await get_doc(USER, "doc1")
+            again = await get_doc(user_google_email=USER, document_id="doc1")
+            other_user = await get_doc("other@example.com", "doc1")
+            other_args = await get_doc(USER, "doc1", detailed=True)
+            return first, again, other_user, other_args
+
+        first, again, other_user, other_args = asyncio.run(scenario())
+
+        assert first == again == "doc1 v1"
+        assert other_user == "doc1 v2"
+        assert other_args == "doc1 v3"
+        stats = cache.get_stats()["tools"]["get_doc"]
+        assert stats["hits"] == 1
+        assert stats["misses"] == 3
+
+    def test_entries_expire(self, cache, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(result_cache.time, "monotonic", lambda: now[0])
+        calls = []
+        get_doc, _ = _tools(calls)
+
+        asyncio.run(get_doc(USER, "doc1"))
+        now[0] += 31
+        asyncio.run(get_doc(USER, "doc1"))
+
+        assert len(calls) == 2
+
+    def test_errors_and_uncached_tools_always_call_through(self, cache):
+        calls = []
+
+        @handle_http_errors("search_docs", is_read_only=True)
+        async def search_docs(user_google_email: str, query: str):
+            calls.append(query)
+            return "results"
+
+        @handle_http_errors("get_doc", is_read_only=True)
+        async def failing_get_doc(user_google_email: str, document_id: str):
+            calls.append(document_id)
+            raise ValueError("boom")
+
+        for _ in range(2):
+            asyncio.run(search_docs(USER, "q"))
+            with pytest.raises(Exception, match="boom"):
+                asyncio.run(failing_get_doc(USER, "doc1"))
+
+        assert calls == ["q", "doc1", "q", "doc1"]
+
+    def test_memory_bounds_evict_least_recently_used(self):
+        cache = ToolResultCache(ttls={"get_doc": 30.0}, max_entries=2, max_bytes=10)
+
+        async def scenario():
+            for document_id in ("a", "b", "a", "c", "toolongvalue"):
+                await cache.read_through(
+                    "get_doc",
+                    {"user_google_email": USER, "document_id": document_id},
+                    lambda: _value(document_id),
+                )
+
+        async def _value(document_id):
+            return document_id * 4
+
+        asyncio.run(scenario())
+
+        stats = cache.get_stats()
+        assert stats["entries"] == 2
+        assert stats["bytes"] == 8
+        assert stats["tools"]["get_doc"]["evictions"] == 1
+
+
+class TestWriteInvalidation:
+    def test_write_to_a_resource_drops_its_entries(self, cache):
+        calls = []
+        get_doc, update_doc = _tools(calls)
+
+        async def scenario():
+            await get_doc(USER, "doc1")
+            await get_doc("other@example.com", "doc1")
+            await get_doc(USER, "doc2")
+            await update_doc(USER, "doc1", "hello")
+            return await get_doc(USER, "doc1"), await get_doc(USER, "doc2")
+
+        doc1, doc2 = asyncio.run(scenario())
+
+        assert doc1 == "doc1 v4"
+        assert doc2 == "doc2 v3"
+        assert cache.get_stats()["tools"]["get_doc"]["invalidations"] == 2
+
+    def test_read_racing_a_write_is_not_cached(self, cache):
+        calls = []
+        get_doc, update_doc = _tools(calls)
+
+        async def scenario():
+            gate = asyncio.Event()
+
+            @handle_http_errors("get_doc", is_read_only=True)
+            async def slow_get_doc(user_google_email: str, document_id: str):
+                calls.append(document_id)
+                await gate.wait()
+                return "stale"
+
+            read = asyncio.create_task(slow_get_doc(USER, "doc1"))
+            await asyncio.sleep(0)
+            await update_doc(USER, "doc1", "hello")
+            gate.set()
+            return await read
+
+        assert asyncio.run(scenario()) == "stale"
+        assert cache.get_stats()["entries"] == 0
+
+    def test_label_changes_invalidate_label_listing(self, monkeypatch):
+        monkeypatch.setitem(
+            result_cache.TOOL_INVALIDATIONS, "change_label", ("list_labels",)
+        )
+        cache = ToolResultCache(ttls={"list_labels": 30.0})
+
+        async def labels():
+            return "INBOX"
+
+        async def scenario():
+            await cache.read_through("list_labels", {"user_google_email": USER}, labels)
+            return cache.invalidate_for_write(
+                "change_label", {"user_google_email": USER, "name": "x"}
+            )
+
+        assert asyncio.run(scenario()) == 1
+        assert cache.get_stats()["entries"] == 0
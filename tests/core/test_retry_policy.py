@@ -0,0 +1,134 @@
+"""
+Unit tests for the Google API retry policy and its use in handle_http_errors.
+"""
+
+import asyncio
+import json
+import os
+import sys
+
+import httplib2
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from googleapiclient.errors import HttpError
+
+from core import retry_policy, utils
+from core.retry_policy import (
+    RATE_LIMITED,
+    SERVER_ERROR,
+    RetryPolicy,
+    classify_error,
+    get_retry_stats,
+    retry_after_seconds,
+)
+from core.utils import handle_http_errors
+
+
+def _http_error(status, reason=None, headers=None):
+    body = {"error": {"code": status, "message": "boom"}}
+    if reason:
+        body["error"]["errors"] = [{"reason": reason}]
+    resp = httplib2.Response({"status": status, **(headers or {})})
+    return HttpError(resp, json.dumps(body).encode("utf-8"))
+
+
+@pytest.fixture(autouse=True)
+def _fast_retries(monkeypatch):
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr(utils.asyncio, "sleep", fake_sleep)
+    retry_policy.set_retry_policy(None, RetryPolicy(max_attempts=3, base_delay=0.1))
+    retry_policy.reset_retry_stats()
+    yield sleeps
+    retry_policy.set_retry_policy(None, None)
+    retry_policy.reset_retry_stats()
+
+
+def _flaky_tool(errors, **decorator_kwargs):
+    calls = []
+
+    @handle_http_errors("flaky_tool", **decorator_kwargs)
+    async def tool():
+        calls.append(1)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return "ok"
+
+    return tool, calls
+
+
+class TestClassifyError:
+    def test_retryable_and_permanent_errors(self):
+        assert classify_error(_http_error(429)) == RATE_LIMITED
+        assert classify_error(_http_error(403, "userRateLimitExceeded")) == RATE_LIMITED
+        assert classify_error(_http_error(503)) == SERVER_ERROR
+        assert classify_error(_http_error(403, "dailyLimitExceeded")) is None
+        assert classify_error(_http_error(403, "insufficientPermissions")) is None
+        assert classify_error(_http_error(404)) is None
+
+    def test_retry_after_header(self):
+        assert retry_after_seconds(_http_error(429, headers={"retry-after": "7"})) == 7
+        http_date = {"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"}
+        assert retry_after_seconds(_http_error(429, headers=http_date)) == 0
+        assert retry_after_seconds(_http_error(429)) is None
+
+
+class TestRetryPolicy:
+    def test_delays_stay_within_bounds_and_deadline(self):
+        policy = RetryPolicy(max_attempts=10, base_delay=1, max_delay=4, deadline=30)
+        error = _http_error(503)
+        delay = 0.0
+        for attempt in range(1, 9):
+            delay = policy.next_delay(attempt, delay, 0, error)
+            assert 1 <= delay <= 4
+        assert policy.next_delay(10, delay, 0, error) is None
+        assert policy.next_delay(1, 0, 29.5, error) is None
+
+    def test_retry_after_overrides_jitter(self):
+        policy = RetryPolicy(base_delay=0.1, deadline=60)
+        error = _http_error(429, headers={"retry-after": "20"})
+        assert policy.next_delay(1, 0, 0, error) == 20
+
+
+class TestHandleHttpErrorsRetries:
+    def test_read_only_tool_retries_rate_limits(self, _fast_retries):
+        tool, calls = _flaky_tool(
+            [_http_error(429), _http_error(500)], is_read_only=True
+        )
+
+        assert asyncio.run(tool()) == "ok"
+        assert len(calls) == 3
+        assert len(_fast_retries) == 2
+        stats = get_retry_stats()["tools"]["flaky_tool"]
+        assert stats["retries_by_reason"] == {RATE_LIMITED: 1, SERVER_ERROR: 1}
+
+    def test_writes_are_not_retried_unless_idempotent(self):
+        tool, calls = _flaky_tool([_http_error(503)])
+        with pytest.raises(Exception, match="API error in flaky_tool"):
+            asyncio.run(tool())
+        assert len(calls) == 1
+
+        tool, calls = _flaky_tool([_http_error(503)], idempotent=True)
+        assert asyncio.run(tool()) == "ok"
+        assert len(calls) == 2
+
+    def test_gives_up_after_max_attempts(self):
+        tool, calls = _flaky_tool([_http_error(429)] * 5, is_read_only=True)
+
+        with pytest.raises(Exception, match="rate limit reached after 3 attempts"):
+            asyncio.run(tool())
+        assert len(calls) == 3
+        assert get_retry_stats()["gave_up"] == 1
+
+    def test_per_tool_policy_override(self):
+        retry_policy.set_retry_policy("flaky_tool", RetryPolicy(max_attempts=1))
+        tool, calls = _flaky_tool([_http_error(503)], is_read_only=True)
+
+        with pytest.raises(Exception):
+            asyncio.run(tool())
+        assert len(calls) == 1
@@ -0,0 +1,63 @@
+"""
+Unit tests for the shared HTTP startup path used by main.py and fastmcp_server.py.
+"""
+
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from auth import oauth21_session_store
+from core import server as core_server
+
+
+class _LegacyOAuthConfig:
+    def is_oauth21_enabled(self):
+        return False
+
+
+@pytest.fixture
+def started(monkeypatch):
+    """Run configure_server_for_http() in legacy mode, recording background starts."""
+    calls = []
+    monkeypatch.setattr(
+        "auth.oauth_config.get_oauth_config", lambda: _LegacyOAuthConfig()
+    )
+    monkeypatch.setattr(core_server, "_ensure_legacy_callback_route", lambda: None)
+    monkeypatch.setattr(
+        oauth21_session_store,
+        "configure_session_backend",
+        lambda: calls.append("session_backend") or False,
+    )
+    monkeypatch.setattr(
+        oauth21_session_store,
+        "start_session_sweeper",
+        lambda: calls.append("session_sweeper") or False,
+    )
+    monkeypatch.setattr(
+        "auth.google_auth.start_background_token_refresh",
+        lambda: calls.append("token_refresh"),
+    )
+
+    def run(transport_mode):
+        monkeypatch.setattr(core_server, "get_transport_mode", lambda: transport_mode)
+        core_server.configure_server_for_http()
+        return calls
+
+    return run
+
+
+class TestConfigureServerForHttp:
+    def test_http_startup_attaches_session_backend(self, started):
+        assert "session_backend" in started("streamable-http")
+
+    def test_http_startup_starts_session_sweeper(self, started):
+        assert "session_sweeper" in started("streamable-http")
+
+    def test_http_startup_starts_background_token_refresh(self, started):
+        assert "token_refresh" in started("streamable-http")
+
+    def test_stdio_skips_http_startup(self, started):
+        assert started("stdio") == []
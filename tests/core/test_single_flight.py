@@ -0,0 +1,122 @@
+"""
+Unit tests for single-flight coalescing of identical concurrent tool calls.
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from core.result_cache import set_tool_result_cache
+from core.single_flight import SingleFlight, set_single_flight
+from core.utils import handle_http_errors
+
+USER = "user@example.com"
+
+
+@pytest.fixture
+def single_flight():
+    # Keep the result cache out of the way so only coalescing is exercised
+    set_tool_result_cache(None)
+    single_flight = SingleFlight()
+    set_single_flight(single_flight)
+    yield single_flight
+    set_single_flight(None, loaded=False)
+    set_tool_result_cache(None, loaded=False)
+
+
+def _slow_read(calls, gate, result="content"):
+    @handle_http_errors("get_doc_content", is_read_only=True)
+    async def get_doc_content(user_google_email: str, document_id: str):
+        calls.append(document_id)
+        await gate.wait()
+        if isinstance(result, Exception):
+            raise result
+        return f"{result} {len(calls)}"
+
+    return get_doc_content
+
+
+class TestSingleFlight:
+    def test_identical_concurrent_calls_share_one_execution(self, single_flight):
+        calls = []
+
+        async def scenario():
+            gate = asyncio.Event()
+            get_doc_content = _slow_read(calls, gate)
+            tasks = [
+                asyncio.create_task(get_doc_content(USER, "doc1")),
+                asyncio.create_task(get_doc_content(USER, "doc1")),
+                asyncio.create_task(get_doc_content(USER, "doc2")),
+                asyncio.create_task(get_doc_content("other@example.com", "doc1")),
+            ]
+            await asyncio.sleep(0)
+            gate.set()
+            return await asyncio.gather(*tasks)
+
+        results = asyncio.run(scenario())
+
+        assert sorted(calls) == ["doc1", "doc1", "doc2"]
+        assert results[0] == results[1]
+        stats = single_flight.get_stats()
+        assert stats["tools"]["get_doc_content"] == {"executions": 3, "coalesced": 1}
+        assert stats["in_flight"] == 0
+
+    def test_errors_are_shared(self, single_flight):
+        calls = []
+
+        async def scenario():
+            gate = asyncio.Event()
+            get_doc_content = _slow_read(calls, gate, ValueError("boom"))
+            tasks = [
+                asyncio.create_task(get_doc_content(USER, "doc1")) for _ in range(3)
+            ]
+            await asyncio.sleep(0)
+            gate.set()
+            return await asyncio.gather(*tasks, return_exceptions=True)
+
+        results = asyncio.run(scenario())
+
+        assert len(calls) == 1
+        assert all("boom" in str(result) for result in results)
+
+    def test_cancelled_caller_does_not_fail_the_others(self, single_flight):
+        calls = []
+
+        async def scenario():
+            gate = asyncio.Event()
+            get_doc_content = _slow_read(calls, gate)
+            first = asyncio.create_task(get_doc_content(USER, "doc1"))
+            second = asyncio.create_task(get_doc_content(USER, "doc1"))
+            await asyncio.sleep(0)
+            first.cancel()
+            await asyncio.sleep(0)
+            gate.set()
+            return await second, first.cancelled()
+
+        assert asyncio.run(scenario()) == ("content 1", True)
+        assert len(calls) == 1
+
+    def test_calls_after_a_write_do_not_join_older_reads(self, single_flight):
+        calls = []
+
+        @handle_http_errors("update_doc")
+        async def update_doc(user_google_email: str, document_id: str):
+            return "updated"
+
+        async def scenario():
+            gate = asyncio.Event()
+            get_doc_content = _slow_read(calls, gate)
+            before = asyncio.create_task(get_doc_content(USER, "doc1"))
+            await asyncio.sleep(0)
+            await update_doc(USER, "doc1")
+            after = asyncio.create_task(get_doc_content(USER, "doc1"))
+            await asyncio.sleep(0)
+            gate.set()
+            return await asyncio.gather(before, after)
+
+        assert asyncio.run(scenario()) == ["content 1", "content 2"]
+        assert single_flight.get_stats()["tools"]["get_doc_content"]["coalesced"] == 0
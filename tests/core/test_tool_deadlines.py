@@ -0,0 +1,129 @@
+"""
+Unit tests for per-tool deadlines, their propagation to request timeouts and
+tracking of abandoned executor work.
+"""
+
+import asyncio
+import os
+import socket
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from core import circuit_breaker, config, retry_policy
+from core.context import get_current_deadline, set_current_deadline
+from core.google_executor import FairExecutor, run_blocking, set_google_executor
+from core.http_transport import request_timeout
+from core.utils import ToolDeadlineExceededError, handle_http_errors
+
+
+class TestToolDeadlineConfig:
+    def test_read_only_tools_get_tighter_defaults(self, monkeypatch):
+        monkeypatch.setitem(config.TOOL_DEADLINES, "special_tool", 5.0)
+
+        read_only = config.get_tool_deadline("some_read_tool", is_read_only=True)
+        write = config.get_tool_deadline("some_write_tool")
+
+        assert read_only < write
+        assert config.get_tool_deadline("special_tool", is_read_only=True) == 5.0
+
+    def test_zero_disables_the_deadline(self, monkeypatch):
+        monkeypatch.setitem(config.TOOL_DEADLINES, "unbounded_tool", 0)
+        assert config.get_tool_deadline("unbounded_tool") is None
+
+
+class TestHandleHttpErrorsDeadline:
+    def test_slow_tool_is_cancelled_with_a_clear_error(self, monkeypatch):
+        monkeypatch.setitem(config.TOOL_DEADLINES, "slow_tool", 0.05)
+        retry_policy.reset_retry_stats()
+        seen_deadlines = []
+
+        @handle_http_errors("slow_tool", is_read_only=True)
+        async def slow_tool():
+            seen_deadlines.append(get_current_deadline())
+            await asyncio.sleep(5)
+
+        with pytest.raises(
+            ToolDeadlineExceededError, match="exceeded its 0.05s deadline"
+        ):
+            asyncio.run(slow_tool())
+
+        assert seen_deadlines[0] is not None
+        stats = retry_policy.get_retry_stats()["tools"]["slow_tool"]
+        assert stats["deadline_exceeded"] == 1
+
+    def test_deadline_counts_against_the_circuit_breaker(self, monkeypatch):
+        monkeypatch.setitem(config.TOOL_DEADLINES, "hung_tool", 0.01)
+        monkeypatch.setenv("WORKSPACE_MCP_CIRCUIT_MIN_CALLS", "3")
+        circuit_breaker.reset_circuit_breakers()
+
+        @handle_http_errors("hung_tool", is_read_only=True, service_type="docs")
+        async def hung_tool():
+            await asyncio.sleep(5)
+
+        try:
+            for _ in range(3):
+                with pytest.raises(ToolDeadlineExceededError):
+                    asyncio.run(hung_tool())
+            assert circuit_breaker.any_circuit_open()
+            stats = circuit_breaker.get_circuit_breaker_stats()["docs"]
+            assert stats["network_error"]["times_opened"] == 1
+        finally:
+            circuit_breaker.reset_circuit_breakers()
+
+    def test_write_deadline_warns_the_change_may_have_applied(self, monkeypatch):
+        monkeypatch.setitem(config.TOOL_DEADLINES, "slow_send", 0.01)
+
+        @handle_http_errors("slow_send")
+        async def slow_send():
+            await asyncio.sleep(5)
+
+        with pytest.raises(ToolDeadlineExceededError) as excinfo:
+            asyncio.run(slow_send())
+
+        message = str(excinfo.value)
+        assert "may already have applied" in message
+        assert "try again shortly" not in message
+
+    def test_request_timeout_is_capped_by_the_deadline(self):
+        async def scenario():
+            set_current_deadline(time.monotonic() + 2)
+            capped = request_timeout(60.0)
+            set_current_deadline(time.monotonic() - 1)
+            with pytest.raises(socket.timeout):
+                request_timeout(60.0)
+            return capped
+
+        assert request_timeout(60.0) == 60.0
+        assert 1 < asyncio.run(scenario()) <= 2
+
+
+class TestAbandonedWork:
+    def test_cancelled_caller_abandons_running_work(self):
+        executor = FairExecutor(max_workers=1)
+        set_google_executor(executor)
+        started = threading.Event()
+        release = threading.Event()
+
+        def blocking_call():
+            started.set()
+            release.wait(5)
+
+        async def scenario():
+            task = asyncio.create_task(run_blocking(blocking_call))
+            await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        try:
+            asyncio.run(scenario())
+            assert executor.get_stats()["abandoned"] == 1
+        finally:
+            release.set()
+            executor.shutdown()
+            set_google_executor(None)
@@ -0,0 +1 @@
+# Gmail tests
@@ -0,0 +1,24 @@
+"""
+Unit tests for sizing Gmail batch requests from the adaptive concurrency window.
+"""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from core.concurrency import AdaptiveConcurrencyController
+from gmail.gmail_tools import GMAIL_BATCH_MAX_REQUESTS, _batch_chunk_size
+
+
+class TestBatchChunkSize:
+    def test_follows_window_below_gmail_limit(self):
+        controller = AdaptiveConcurrencyController(initial_window=10, max_window=50)
+
+        assert _batch_chunk_size(controller) == 10
+
+    def test_caps_large_window_at_gmail_limit(self):
+        controller = AdaptiveConcurrencyController(initial_window=250, max_window=500)
+
+        assert controller.window == 250
+        assert _batch_chunk_size(controller) == GMAIL_BATCH_MAX_REQUESTS == 100